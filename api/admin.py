@@ -641,6 +641,13 @@ class CronJobAdmin(CompareVersionAdmin):
             )
 
 
+class ScrapePdfCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('url', 'pdf_type', 'status', 'attempts', 'updated_at')
+    search_fields = ('url', 'filename',)
+    list_filter = ('status', 'pdf_type')
+    readonly_fields = ('updated_at',)
+
+
 class EmergencyOperationsBaseAdmin(CompareVersionAdmin):
     search_fields = ('file_name', 'raw_file_name', 'appeal_number',)
     list_display = ('file_name', 'raw_file_name', 'raw_file_url', 'appeal_number', 'is_validated',)
@@ -812,6 +819,7 @@ admin.site.register(models.EmergencyOperationsPeopleReached, EmergencyOperations
 admin.site.register(models.EmergencyOperationsFR, EmergencyOperationsFRAdmin)
 admin.site.register(models.EmergencyOperationsEA, EmergencyOperationsEAAdmin)
 admin.site.register(models.CronJob, CronJobAdmin)
+admin.site.register(models.ScrapePdfCheckpoint, ScrapePdfCheckpointAdmin)
 admin.site.register(models.AuthLog, AuthLogAdmin)
 admin.site.register(models.ReversionDifferenceLog, ReversionDifferenceLogAdmin)
 admin.site.register(models.MainContact, MainContactAdmin)
@@ -18,9 +18,12 @@ from django.utils.translation import get_language as django_get_language
 from drf_spectacular.utils import extend_schema
 
 from main.utils import is_tableau
+from main.serializers import RowAnnotationsViewSetMixin
+from lang.serializers import TranslatedModelViewSetMixin
 from main.enums import GlobalEnumSerializer, get_enum_values
 from main.translation import TRANSLATOR_ORIGINAL_LANGUAGE_FIELD_NAME
 from deployments.models import Personnel
+from databank.models import CountryOverview
 from databank.serializers import CountryOverviewSerializer
 
 from .utils import is_user_ifrc
@@ -37,9 +40,16 @@ from .models import (
     Region,
     RegionKeyFigure,
     RegionSnippet,
+    RegionEmergencySnippet,
+    RegionProfileSnippet,
+    RegionPreparednessSnippet,
+    RegionLink,
+    RegionContact,
     Country,
     CountryKeyFigure,
     CountrySnippet,
+    CountryLink,
+    CountryContact,
     District,
     Admin2,
     Event,
@@ -129,8 +139,19 @@ class DeploymentsByEventViewset(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         today = timezone.now().date().strftime("%Y-%m-%d")
+        now = timezone.now()
         return (
-            Event.objects.prefetch_related("personneldeployment_set__personnel_set__country_from")
+            Event.objects.prefetch_related(
+                "personneldeployment_set",
+                # The ongoing personnel of DeploymentsByEventSerializer.get_organizations_from
+                Prefetch(
+                    "personneldeployment_set__personnel_set",
+                    queryset=Personnel.objects.filter(
+                        end_date__gte=now, start_date__lte=now, is_active=True
+                    ).select_related("country_from"),
+                    to_attr="active_personnel",
+                ),
+            )
             .annotate(
                 personnel_count=Count(
                     "personneldeployment__personnel",
@@ -166,12 +187,28 @@ class EventDeploymentsViewset(viewsets.ReadOnlyModelViewSet):
 
 
 class DisasterTypeViewset(viewsets.ReadOnlyModelViewSet):
+    cache_visibility_classes = ("anonymous", "authenticated", "ifrc")
+    cache_dependencies = (DisasterType,)
+    cache_seconds = 60 * 60 * 6
     queryset = DisasterType.objects.all()
     serializer_class = DisasterTypeSerializer
     search_fields = ("name",)  # for /docs
 
 
 class RegionViewset(viewsets.ReadOnlyModelViewSet):
+    cache_visibility_classes = ("anonymous", "authenticated", "ifrc")
+    cache_dependencies = (
+        Region,
+        RegionLink,
+        RegionContact,
+        RegionSnippet,
+        RegionEmergencySnippet,
+        RegionProfileSnippet,
+        RegionPreparednessSnippet,
+        Country,
+        CountryPlan,
+    )
+    cache_seconds = 60 * 60 * 6
     queryset = Region.objects.annotate(
         country_plan_count=Count("country__country_plan", filter=Q(country__country_plan__is_publish=True))
     )
@@ -196,6 +233,9 @@ class CountryFilter(filters.FilterSet):
 
 
 class CountryViewset(viewsets.ReadOnlyModelViewSet):
+    cache_visibility_classes = ("anonymous", "authenticated", "ifrc")
+    cache_dependencies = (Country, CountryLink, CountryContact, CountryPlan, CountryOverview, Region)
+    cache_seconds = 60 * 60 * 6
     queryset = Country.objects.filter(is_deprecated=False).annotate(
         has_country_plan=models.Exists(CountryPlan.objects.filter(country=OuterRef("pk"), is_publish=True))
     )
@@ -360,6 +400,7 @@ class DistrictFilter(filters.FilterSet):
 
 
 class DistrictViewset(viewsets.ReadOnlyModelViewSet):
+    cache_visibility_classes = ("anonymous", "authenticated", "ifrc")
     queryset = District.objects.select_related("country").filter(country__is_deprecated=False).filter(is_deprecated=False)
     filterset_class = DistrictFilter
     search_fields = (
@@ -387,6 +428,7 @@ class Admin2Filter(filters.FilterSet):
 
 
 class Admin2Viewset(viewsets.ReadOnlyModelViewSet):
+    cache_visibility_classes = ("anonymous", "authenticated", "ifrc")
     filterset_class = Admin2Filter
     search_fields = ("name", "district__name", "district__country__name")
     serializer_class = Admin2Serializer
@@ -420,7 +462,9 @@ class EventFilter(filters.FilterSet):
         }
 
 
-class EventViewset(ReadOnlyVisibilityViewset):
+class EventViewset(TranslatedModelViewSetMixin, RowAnnotationsViewSetMixin, ReadOnlyVisibilityViewset):
+    # Non-IFRC users see IFRC_NS records of their own countries, so only anonymous and IFRC users share the cache
+    cache_visibility_classes = ("anonymous", "ifrc")
     ordering_fields = (
         "disaster_start_date",
         "created_at",
@@ -591,6 +635,9 @@ class SituationReportViewset(ReadOnlyVisibilityViewset):
         "event__name",
     )  # for /docs
 
+    def get_queryset(self):
+        return super().get_queryset().select_related("type")
+
     def get_serializer_class(self):
         if is_tableau(self.request) is True:
             return SituationReportTableauSerializer
@@ -719,7 +766,7 @@ class AppealDocumentFilter(filters.FilterSet):
 
 
 class AppealDocumentViewset(viewsets.ReadOnlyModelViewSet):
-    queryset = AppealDocument.objects.all()
+    queryset = AppealDocument.objects.select_related("appeal", "type")
     ordering_fields = (
         "created_at",
         "name",
@@ -734,6 +781,8 @@ class AppealDocumentViewset(viewsets.ReadOnlyModelViewSet):
 
 
 class ProfileViewset(viewsets.ModelViewSet):
+    # Personal endpoint, never cached
+    cache_visibility_classes = ()
     serializer_class = ProfileSerializer
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
@@ -743,6 +792,8 @@ class ProfileViewset(viewsets.ModelViewSet):
 
 
 class UserViewset(viewsets.ModelViewSet):
+    # Personal endpoint, never cached
+    cache_visibility_classes = ()
     serializer_class = UserSerializer
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
@@ -776,7 +827,9 @@ class FieldReportFilter(filters.FilterSet):
         }
 
 
-class FieldReportViewset(ReadOnlyVisibilityViewset):
+class FieldReportViewset(TranslatedModelViewSetMixin, ReadOnlyVisibilityViewset):
+    # Non-IFRC users see IFRC_NS records of their own countries, so only anonymous and IFRC users share the cache
+    cache_visibility_classes = ("anonymous", "ifrc")
     authentication_classes = (TokenAuthentication,)
     visibility_model_class = FieldReport
     search_fields = (
@@ -788,7 +841,16 @@ class FieldReportViewset(ReadOnlyVisibilityViewset):
     def get_queryset(self, *args, **kwargs):
         qset = super().get_queryset()
         qset = qset.select_related("dtype", "event")
-        return qset.prefetch_related("actions_taken", "actions_taken__actions", "countries", "districts", "regions")
+        return qset.prefetch_related(
+            "actions_taken",
+            "actions_taken__actions",
+            "countries",
+            "districts",
+            "regions",
+            "external_partners",
+            "supported_activities",
+            "event__countries_for_preview",
+        )
 
     def get_serializer_class(self):
         if is_tableau(self.request) is True:
@@ -983,8 +1045,8 @@ class GenericFieldReportView(GenericAPIView):
         if "countries" in locations:
             instance.countries.add(*locations["countries"])
             # Add countries in automatically, based on regions
-            countries = Country.objects.filter(pk__in=locations["countries"])
-            instance.regions.add(*[country.region for country in countries if (country.region is not None)])
+            regions = Country.objects.filter(pk__in=locations["countries"], region__isnull=False).values_list("region", flat=True)
+            instance.regions.add(*set(regions))
 
     def save_partners_activities(self, instance, locations, is_update=False):
         if is_update:
@@ -1173,7 +1235,7 @@ class GoHistoricalViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_class = GoHistoricalFilter
 
     def get_queryset(self):
-        return Event.objects.filter(appeals__isnull=False)
+        return Event.objects.filter(appeals__isnull=False).select_related("dtype").prefetch_related("appeals", "countries")
 
 
 class CountryOfFieldReportToReviewViewset(viewsets.ReadOnlyModelViewSet):
@@ -1196,7 +1258,11 @@ class UsersViewset(viewsets.ReadOnlyModelViewSet):
     filterset_class = UserFilterSet
 
     def get_queryset(self):
-        return User.objects.filter(is_active=True)
+        return (
+            User.objects.filter(is_active=True)
+            .select_related("profile__country")
+            .prefetch_related("subscription", "groups")
+        )
 
 
 class GlobalEnumView(APIView):
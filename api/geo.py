@@ -0,0 +1,75 @@
+from collections import namedtuple
+
+from django.db import connection
+
+from .models import Admin2, Admin2Geoms, CountryGeoms, District, DistrictGeoms
+
+# Points sent per query
+ADMIN_AREAS_BATCH_SIZE = 5000
+
+AdminAreas = namedtuple('AdminAreas', ['country_id', 'district_id', 'admin2_id'])
+
+# One row per point, the areas are found using the GiST indexes of the geoms tables
+# When the point's country is known (country_id), the districts/admin2 are looked up only in that country
+ADMIN_AREAS_SQL = f'''
+WITH points AS (
+    SELECT idx, ST_SetSRID(ST_MakePoint(lon, lat), 4326) AS geom, country_id
+    FROM unnest(%(indexes)s::int[], %(lons)s::float8[], %(lats)s::float8[], %(country_ids)s::int[])
+        AS t(idx, lon, lat, country_id)
+)
+SELECT
+    p.idx,
+    COALESCE(p.country_id, (
+        SELECT g.country_id FROM {CountryGeoms._meta.db_table} g
+        WHERE ST_Intersects(g.geom, p.geom)
+        LIMIT 1
+    )) AS country_id,
+    (
+        SELECT g.district_id FROM {DistrictGeoms._meta.db_table} g
+        JOIN {District._meta.db_table} d ON d.id = g.district_id
+        WHERE ST_Intersects(g.geom, p.geom) AND (p.country_id IS NULL OR d.country_id = p.country_id)
+        ORDER BY d.is_deprecated
+        LIMIT 1
+    ) AS district_id,
+    (
+        SELECT g.admin2_id FROM {Admin2Geoms._meta.db_table} g
+        JOIN {Admin2._meta.db_table} a ON a.id = g.admin2_id
+        JOIN {District._meta.db_table} d ON d.id = a.admin1_id
+        WHERE ST_Intersects(g.geom, p.geom) AND (p.country_id IS NULL OR d.country_id = p.country_id)
+        ORDER BY a.is_deprecated
+        LIMIT 1
+    ) AS admin2_id
+FROM points p
+'''
+
+
+def get_admin_areas(geometries, country_ids=None):
+    """
+    Returns the AdminAreas (Country, District and Admin2 ids, None if not found) containing each geometry
+    Points are used as is, other geometries by a point on their surface
+    country_ids: optional country id of each geometry (None if unknown), used to restrict the lookup
+    """
+    if country_ids is None:
+        country_ids = [None] * len(geometries)
+    points = []
+    for geometry in geometries:
+        if geometry is not None:
+            if geometry.srid and geometry.srid != 4326:
+                geometry = geometry.transform(4326, clone=True)
+            if geometry.geom_type != 'Point':
+                geometry = geometry.point_on_surface
+        points.append(geometry)
+    admin_areas = [AdminAreas(None, None, None)] * len(points)
+    indexes = [index for index, point in enumerate(points) if point is not None]
+    with connection.cursor() as cursor:
+        for start in range(0, len(indexes), ADMIN_AREAS_BATCH_SIZE):
+            batch = indexes[start:start + ADMIN_AREAS_BATCH_SIZE]
+            cursor.execute(ADMIN_AREAS_SQL, {
+                'indexes': batch,
+                'lons': [points[index].x for index in batch],
+                'lats': [points[index].y for index in batch],
+                'country_ids': [country_ids[index] for index in batch],
+            })
+            for index, *ids in cursor.fetchall():
+                admin_areas[index] = AdminAreas(*ids)
+    return admin_areas
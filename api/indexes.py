@@ -15,6 +15,18 @@ GenericMapping = {
             'analyzer': 'autocomplete'
         },
         'date': {'type': 'date'},
+        # Used by the typeahead (completion suggester), see SUGGEST_TYPES
+        'suggest': {
+            'type': 'completion',
+            'analyzer': 'simple',
+            'contexts': [
+                {
+                    # <visibility>.<type>, eg: public.country
+                    'name': 'scope',
+                    'type': 'category',
+                },
+            ],
+        },
     }
 }
 
@@ -55,3 +67,8 @@ GenericSetting = {
 }
 
 ES_PAGE_NAME = 'page_all'
+
+# Page types which are included in the typeahead suggestions
+SUGGEST_TYPES = ['country', 'district', 'event', 'appeal', 'surgealert']
+# Page types indexed for the typeahead, only returned by the page search (EsPageSearch) when asked for by type
+SUGGEST_ONLY_TYPES = ['district', 'surgealert']
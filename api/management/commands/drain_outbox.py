@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.logger import logger
+from api.models import CronJobStatus
+from api.create_cron import create_cron_record
+from api.outbox import OUTBOX_BATCH_SIZE, drain
+
+CRON_NAME = 'drain_outbox'
+
+
+class Command(BaseCommand):
+    help = "Handle the pending outbox events (search index, ERP and history side effects) and retry the failed ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        stats = drain(batch_size=options['batch_size'])
+        msg = 'Outbox lag: %.1fs, events: %d, handled: %d, failed: %d' % (
+            stats['lag'], stats['events'], stats['handled'], stats['failed'],
+        )
+        logger.info(msg)
+        # Most runs have nothing to do (the events are drained by the celery task after each commit)
+        if stats['events']:
+            cron_status = CronJobStatus.WARNED if stats['failed'] else CronJobStatus.SUCCESSFUL
+            create_cron_record(CRON_NAME, msg, cron_status, num_result=stats['handled'])
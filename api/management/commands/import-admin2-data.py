@@ -1,17 +1,18 @@
 import csv
+from collections import defaultdict
 
 from django.core.management.base import BaseCommand, CommandError
 from django.contrib.gis.gdal import DataSource
 from django.contrib.gis.geos import GEOSGeometry
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import IntegrityError
 from django.db import transaction
 
-from api.models import Country
+from api.geo import get_admin_areas
 from api.models import District
-from api.models import DistrictGeoms
 from api.models import Admin2
 from api.models import Admin2Geoms
+from middlewares.cache import bump_cache_generation
+
+BULK_BATCH_SIZE = 500
 
 
 class Command(BaseCommand):
@@ -63,6 +64,7 @@ class Command(BaseCommand):
             raise CommandError("Could not open file")
 
         # loop through each feature in the shapefile
+        features = []
         for feature in data[0]:
             code = feature.get("code") if "code" in feature.fields else feature.get("pcode")
             name = feature.get("name") if "name" in feature.fields else feature.get("shapeName")
@@ -78,110 +80,138 @@ class Command(BaseCommand):
             geom = GEOSGeometry(geom_wkt, srid=4326)
             centroid = geom.centroid.wkt
             bbox = geom.envelope.wkt
+            features.append((code, name, feature, geom, centroid, bbox))
+
+        # Existing admin2 of the file, fetched at once
+        admin2_by_code = defaultdict(list)
+        for admin2 in Admin2.objects.filter(code__in=[code for code, *_ in features]):
+            admin2_by_code[admin2.code].append(admin2)
+
+        features_to_add = []
+        admin2_to_update = []
+        for code, name, feature, geom, centroid, bbox in features:
             # import all shapes for admin2
             if options["import_all"]:
-                self.add_admin2(options, "all", feature, geom, centroid, bbox)
-            else:
-                admin2_objects = Admin2.objects.filter(code=code)
-                if len(admin2_objects) == 0:
+                features_to_add.append((feature, geom, centroid, bbox))
+                continue
+            admin2_objects = admin2_by_code[code]
+            if len(admin2_objects) == 0:
+                if options["import_missing"]:
+                    # if it doesn't exist, add it
+                    features_to_add.append((feature, geom, centroid, bbox))
+                else:
+                    missing_file.writerow({"code": code, "name": name})
+
+            # if there are more than one admin2 with the same code, filter also using name
+            if len(admin2_objects) > 1:
+                admins2_names = [admin2 for admin2 in admin2_objects if name.lower() in admin2.name.lower()]
+                # if we get a match, update geometry. otherwise consider this as missing because it's possible the names aren't matching.
+                if len(admins2_names):
+                    # update geom, centroid and bbox
+                    admin2_to_update.append((admins2_names[0], geom, centroid, bbox))
+                else:
                     if options["import_missing"]:
                         # if it doesn't exist, add it
-                        self.add_admin2(options, import_missing, feature, geom, centroid, bbox)
+                        features_to_add.append((feature, geom, centroid, bbox))
                     else:
                         missing_file.writerow({"code": code, "name": name})
+            if len(admin2_objects) == 1:
+                admin2_to_update.append((admin2_objects[0], geom, centroid, bbox))
 
-                # if there are more than one admin2 with the same code, filter also using name
-                if len(admin2_objects) > 1:
-                    admins2_names = Admin2.objects.filter(code=code, name__icontains=name)
-                    # if we get a match, update geometry. otherwise consider this as missing because it's possible the names aren't matching.
-                    if len(admins2_names):
-                        # update geom, centroid and bbox
-                        self.update_admin2_columns(options, admins2_names[0], geom, centroid, bbox)
-                    else:
-                        if options["import_missing"]:
-                            # if it doesn't exist, add it
-                            self.add_admin2(options, import_missing, feature, geom, centroid, bbox)
-                        else:
-                            missing_file.writerow({"code": code, "name": name})
-                if len(admin2_objects) == 1:
-                    self.update_admin2_columns(options, admin2_objects[0], geom, centroid, bbox)
+        self.add_admin2(options, "all" if options["import_all"] else import_missing, features_to_add)
+        self.update_admin2_columns(options, admin2_to_update)
         print("done!")
 
-    @transaction.atomic
-    def add_admin2(self, options, import_missing, feature, geom, centroid, bbox):
-        code = feature.get("code") if "code" in feature.fields else feature.get("pcode")
-        name = feature.get("name") if "name" in feature.fields else feature.get("shapeName")
-        admin1_id = feature.get("district_id") if "district_id" in feature.fields else feature.get("admin1_id")
-        local_name = feature.get("local_name") if "local_name" in feature.fields else None
-        local_name_code = feature.get("local_name_code") if "local_name_code" in feature.fields else None
-        alternate_name = feature.get("alternate_name") if "alternate_name" in feature.fields else None
-        alternate_name_code = feature.get("alternate_name_code") if "alternate_name_code" in feature.fields else None
-        admin2 = Admin2()
-        admin2.code = code
-        admin2.name = name
-        admin2.centroid = centroid
-        admin2.bbox = bbox
-        admin2.local_name = local_name
-        admin2.local_name_code = local_name_code
-        admin2.alternate_name = alternate_name
-        admin2.alternate_name_code = alternate_name_code
-
-        try:
-            admin1 = District.objects.get(id=admin1_id)
-            admin2.admin1_id = admin1.id
-        except ObjectDoesNotExist:
-            print(f"admin1 {admin1_id} not found for - admin2: {name}")
-            pass
+    def add_admin2(self, options, import_missing, features):
+        admin2_list = []
+        geoms = []
+        for feature, geom, centroid, bbox in features:
+            code = feature.get("code") if "code" in feature.fields else feature.get("pcode")
+            if (import_missing != "all") and (code not in import_missing.keys()):
+                continue
+            name = feature.get("name") if "name" in feature.fields else feature.get("shapeName")
+            admin1_id = feature.get("district_id") if "district_id" in feature.fields else feature.get("admin1_id")
+            local_name = feature.get("local_name") if "local_name" in feature.fields else None
+            local_name_code = feature.get("local_name_code") if "local_name_code" in feature.fields else None
+            alternate_name = feature.get("alternate_name") if "alternate_name" in feature.fields else None
+            alternate_name_code = feature.get("alternate_name_code") if "alternate_name_code" in feature.fields else None
+            admin2 = Admin2()
+            admin2.code = code
+            admin2.name = name
+            admin2.centroid = centroid
+            admin2.bbox = bbox
+            admin2.local_name = local_name
+            admin2.local_name_code = local_name_code
+            admin2.alternate_name = alternate_name
+            admin2.alternate_name_code = alternate_name_code
+            admin2.admin1_id = admin1_id
+            admin2_list.append(admin2)
+            geoms.append(geom)
+
+        # Admin1 not given (or unknown): the district containing the admin2, all found in one query
+        district_ids = set(
+            District.objects.filter(
+                id__in=[admin2.admin1_id for admin2 in admin2_list if admin2.admin1_id]
+            ).values_list("id", flat=True)
+        )
+        unknown_admin1 = [index for index, admin2 in enumerate(admin2_list) if admin2.admin1_id not in district_ids]
+        admin_areas = get_admin_areas([geoms[index] for index in unknown_admin1])
+        for index, areas in zip(unknown_admin1, admin_areas):
+            admin2 = admin2_list[index]
+            if areas.district_id is None:
+                print(f"admin1 {admin2.admin1_id} not found for - admin2: {admin2.name}")
+            admin2.admin1_id = areas.district_id
+
+        existing_codes = set(
+            Admin2.objects.filter(code__in=[admin2.code for admin2 in admin2_list]).values_list("code", flat=True)
+        )
+        admin2_to_create = []
+        geoms_by_admin2 = []
+        for admin2, geom in zip(admin2_list, geoms):
+            if admin2.admin1_id is None:
+                continue
+            if admin2.code in existing_codes:
+                print(f"Duplicate object {admin2.name}")
+                continue
+            print("importing", admin2.name)
+            existing_codes.add(admin2.code)
+            admin2_to_create.append(admin2)
+            geoms_by_admin2.append((admin2, geom))
 
         # save data
-        if admin2.admin1_id is not None and ((import_missing == "all") or (code in import_missing.keys())):
-            try:
-                print("importing", admin2.name)
-                admin2.save()
-                if options["update_geom"]:
-                    self.update_geom(admin2, geom)
-            except IntegrityError as e:
-                print(f"Duplicate object {admin2.name}")
-                pass
+        Admin2.objects.bulk_create(admin2_to_create, batch_size=BULK_BATCH_SIZE)
+        bump_cache_generation(Admin2)
+        if options["update_geom"]:
+            self.update_geom(geoms_by_admin2)
+
+    def update_geom(self, geoms_by_admin2):
+        existing_geoms = Admin2Geoms.objects.in_bulk([admin2.pk for admin2, _ in geoms_by_admin2])
+        admin2_geoms_to_create = []
+        for admin2, geom in geoms_by_admin2:
+            if admin2.pk in existing_geoms:
+                existing_geoms[admin2.pk].geom = geom
+            else:
+                admin2_geoms_to_create.append(Admin2Geoms(admin2=admin2, geom=geom))
+        Admin2Geoms.objects.bulk_update(existing_geoms.values(), ["geom"], batch_size=BULK_BATCH_SIZE)
+        Admin2Geoms.objects.bulk_create(admin2_geoms_to_create, batch_size=BULK_BATCH_SIZE)
+        bump_cache_generation(Admin2Geoms)
 
-    def update_geom(self, admin2, geom):
-        try:
-            Admin2Geom = Admin2Geoms.objects.get(admin2=admin2)
-            Admin2Geom.geom = geom
-            Admin2Geom.save()
-        except ObjectDoesNotExist:
-            Admin2Geom = Admin2Geoms()
-            Admin2Geom.admin2 = admin2
-            Admin2Geom.geom = geom
-            Admin2Geom.save()
-
-    def find_district_id(self, centroid, country_iso2):
-        """Find district_id for admin2, according to the point with in the district polygon.
-        Args:
-            centroid (str): Admin2 centroid
-            country_iso2 (str): Country iso2
-        """
-        admin1_id = None
-        country_id = Country.objects.get(iso=country_iso2)
-        if country_id is not None:
-            districts = District.objects.filter(country_id=country_id)
-            districts_ids = [d.id for d in districts]
-            districts_geoms = DistrictGeoms.objects.filter(district_id__in=districts_ids)
-            centroid_geom = GEOSGeometry(centroid, srid=4326)
-            for district_geom in districts_geoms:
-                if centroid_geom.within(district_geom.geom):
-                    admin1_id = district_geom.district_id
-                    break
-        return admin1_id
-
-    def update_admin2_columns(self, options, admin2, geom, centroid, bbox):
+    def update_admin2_columns(self, options, admin2_list):
+        update_fields = []
         if options["update_geom"]:
-            print(f"Update geom for {admin2.name}")
-            self.update_geom(admin2, geom)
+            for admin2, *_ in admin2_list:
+                print(f"Update geom for {admin2.name}")
+            self.update_geom([(admin2, geom) for admin2, geom, _, _ in admin2_list])
         if options["update_centroid"]:
-            print(f"Update centroid for {admin2.name}")
-            admin2.centroid = centroid
+            update_fields.append("centroid")
+            for admin2, _, centroid, _ in admin2_list:
+                print(f"Update centroid for {admin2.name}")
+                admin2.centroid = centroid
         if options["update_bbox"]:
-            print(f"Update bbox for {admin2.name}")
-            admin2.bbox = bbox
-        admin2.save()
+            update_fields.append("bbox")
+            for admin2, _, _, bbox in admin2_list:
+                print(f"Update bbox for {admin2.name}")
+                admin2.bbox = bbox
+        if update_fields:
+            Admin2.objects.bulk_update([admin2 for admin2, *_ in admin2_list], update_fields, batch_size=BULK_BATCH_SIZE)
+            bump_cache_generation(Admin2)
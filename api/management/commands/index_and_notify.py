@@ -1,22 +1,23 @@
 import html
 from datetime import datetime, timezone, timedelta
 
-from django.db.models import Q, F, ExpressionWrapper, DurationField, Sum
+from django.db.models import Q, F, ExpressionWrapper, DurationField, Sum, Count
 from django.db.models.query import QuerySet
 from django.core.management.base import BaseCommand
-from django.contrib.auth.models import User
 from django.conf import settings
 from django.template.loader import render_to_string
+from django.utils.functional import cached_property
 from django.utils.html import strip_tags
 
 from elasticsearch.helpers import bulk
 from utils.elasticsearch import construct_es_data
 from api.esconnection import ES_CLIENT
-from api.models import Country, Appeal, Event, FieldReport, ActionsTaken, CronJob, CronJobStatus
+from api.models import Country, Appeal, Event, FieldReport, CronJob, CronJobStatus
 from api.logger import logger
-from notifications.models import RecordType, SubscriptionType, Subscription, SurgeAlert
+from notifications.models import RecordType, SubscriptionType, SurgeAlert
 from notifications.hello import get_hello
-from notifications.notification import send_notification
+from notifications.notification import send_notification, EmailDelivery
+from notifications.subscribers import SubscriberIndex
 from deployments.models import PersonnelDeployment, ERU, Personnel
 
 time_5_minutes = timedelta(minutes=5)
@@ -60,6 +61,11 @@ RTYPE_NAMES = {
 class Command(BaseCommand):
     help = 'Index and send notifications about new/changed records'
 
+    @cached_property
+    def subscriber_index(self):
+        # Built once per run, used to resolve the recipients of all the notifications
+        return SubscriberIndex()
+
     # Digest mode duration is 5 minutes once a week
     def is_digest_mode(self):
         today = datetime.utcnow().replace(tzinfo=timezone.utc)
@@ -86,9 +92,9 @@ class Command(BaseCommand):
         regions = []
         for record in records:
             if record.country is not None:
-                countries.append('c%s' % record.country.id)
-                if record.country.region is not None:
-                    regions.append('r%s' % record.country.region.id)
+                countries.append('c%s' % record.country_id)
+                if record.country.region_id is not None:
+                    regions.append('r%s' % record.country.region_id)
         countries = list(set(countries))
         regions = list(set(regions))
         return countries, regions
@@ -101,8 +107,8 @@ class Command(BaseCommand):
             if record.countries is not None:
                 countries += [country.id for country in record.countries.all()]
         countries = list(set(countries))
-        qs = Country.objects.filter(pk__in=countries)
-        regions = ['r%s' % country.region.id for country in qs if country.region is not None]
+        region_ids = Country.objects.filter(pk__in=countries, region__isnull=False).values_list('region_id', flat=True)
+        regions = ['r%s' % region_id for region_id in region_ids]
         countries = ['c%s' % id for id in countries]
         return countries, regions
 
@@ -121,22 +127,17 @@ class Command(BaseCommand):
 
         # Gather the email addresses of users who should be notified
         if self.is_digest_mode():
-            subscribers = User.objects.filter(subscription__rtype=RecordType.WEEKLY_DIGEST,
-                                              is_active=True).values('email')
             # In digest mode we do not care about other circumstances, just get every subscriber's email.
-            emails = [subscriber['email'] for subscriber in subscribers]
-            return emails
-        else:
-            # Start with any users subscribed directly to this record type.
-            subscribers = User.objects.filter(subscription__rtype=rtype_of_subscr,
-                                              subscription__stype=stype, is_active=True).values('email')
+            return list(self.subscriber_index.get_rtype_emails(RecordType.WEEKLY_DIGEST))
+        # Start with any users subscribed directly to this record type.
+        emails = self.subscriber_index.get_emails((rtype_of_subscr, stype))
 
         # For FOLLOWED_EVENTs and DEPLOYMENTs we do not collect other generic (d*, country, region) subscriptions, just one.
         # This part is not called.
         if rtype_of_subscr != RecordType.FOLLOWED_EVENT and \
            rtype_of_subscr != RecordType.SURGE_ALERT and \
            rtype_of_subscr != RecordType.SURGE_DEPLOYMENT_MESSAGES:
-            dtypes = list(set(['d%s' % record.dtype.id for record in records if record.dtype is not None]))
+            dtypes = list(set(['d%s' % record.dtype_id for record in records if record.dtype_id is not None]))
 
             if (rtype_of_subscr == RecordType.NEW_OPERATIONS):
                 countries, regions = self.gather_country_and_region(records)
@@ -145,11 +146,30 @@ class Command(BaseCommand):
 
             lookups = dtypes + countries + regions
             if len(lookups):
-                subscribers = (
-                    subscribers | User.objects.filter(subscription__lookup_id__in=lookups, is_active=True).values('email')
-                ).distinct()
-        emails = list(set([subscriber['email'] for subscriber in subscribers]))
-        return emails
+                emails |= self.subscriber_index.get_emails(*lookups)
+        return list(emails)
+
+    def prefetch_records(self, records, rtype):
+        # Everything used by gather_subscribers and construct_template_record, so that the
+        # number of queries doesn't depend on the number of records
+        if rtype == RecordType.FIELD_REPORT:
+            return records.select_related('event').prefetch_related(
+                'countries',
+                'districts',
+                'contacts',
+                'external_partners',
+                'supported_activities',
+                'actions_taken__actions',
+            )
+        elif rtype == RecordType.APPEAL:
+            return records.select_related('event', 'country').prefetch_related('event__field_reports')
+        elif rtype in [RecordType.EVENT, RecordType.FOLLOWED_EVENT]:
+            return records.prefetch_related('countries')
+        elif rtype == RecordType.SURGE_ALERT:
+            return records.select_related('event', 'country')
+        elif rtype == RecordType.SURGE_DEPLOYMENT_MESSAGES:
+            return records.select_related('event_deployed_to')
+        return records
 
     def get_template(self, rtype=99):
         # older: return 'email/generic_notification.html'
@@ -264,42 +284,35 @@ class Command(BaseCommand):
             display += 's'
         return display
 
-    def get_weekly_digest_data(self, field):
+    def get_weekly_digest_data(self):
         today = datetime.utcnow().replace(tzinfo=timezone.utc)
-        if field == 'dref':
-            return Appeal.objects.filter(end_date__gt=today, atype=0).count()
-        elif field == 'ea':
-            return Appeal.objects.filter(end_date__gt=today, atype=1).count()
-        elif field == 'fund':
-            amount_req = (Appeal.objects
-                                .filter(Q(end_date__gt=today, atype=1) | Q(end_date__gt=today, atype=2))
-                                .aggregate(Sum('amount_requested'))['amount_requested__sum'] or 0)
-            amount_fund = (Appeal.objects
-                                 .filter(Q(end_date__gt=today, atype=1) | Q(end_date__gt=today, atype=2))
-                                 .aggregate(Sum('amount_funded'))['amount_funded__sum'] or 0)
-            percent = float(round(amount_fund / amount_req, 3) * 100) if amount_req != 0 else 0
-            return percent
-        elif field == 'budget':
-            amount = (Appeal.objects
-                            .filter(end_date__gt=today)
-                            .aggregate(Sum('amount_requested'))['amount_requested__sum'] or 0)
-            rounded_amount = round(amount / 1000000, 2)
-            return rounded_amount
-        elif field == 'pop':
-            people = (Appeal.objects
-                            .filter(end_date__gt=today)
-                            .aggregate(Sum('num_beneficiaries'))['num_beneficiaries__sum'] or 0)
-            rounded_people = round(people / 1000000, 2)
-            return rounded_people
+        is_appeal = Q(atype=1) | Q(atype=2)
+        figures = Appeal.objects.filter(end_date__gt=today).aggregate(
+            dref=Count('id', filter=Q(atype=0)),
+            ea=Count('id', filter=Q(atype=1)),
+            appeal_amount_requested=Sum('amount_requested', filter=is_appeal),
+            appeal_amount_funded=Sum('amount_funded', filter=is_appeal),
+            amount_requested=Sum('amount_requested'),
+            num_beneficiaries=Sum('num_beneficiaries'),
+        )
+        amount_req = figures['appeal_amount_requested'] or 0
+        amount_fund = figures['appeal_amount_funded'] or 0
+        return {
+            'dref': figures['dref'],
+            'ea': figures['ea'],
+            'fund': float(round(amount_fund / amount_req, 3) * 100) if amount_req != 0 else 0,
+            'budget': round((figures['amount_requested'] or 0) / 1000000, 2),
+            'pop': round((figures['num_beneficiaries'] or 0) / 1000000, 2),
+        }
 
     def get_weekly_digest_latest_ops(self):
         dig_time = self.diff_1_week()
-        ops = Appeal.objects.filter(created_at__gte=dig_time).order_by('-created_at')
+        ops = Appeal.objects.filter(created_at__gte=dig_time).select_related('country').order_by('-created_at')
         ret_ops = []
         for op in ops:
             op_to_add = {
                 'op_event_id': op.event_id,
-                'op_country': Country.objects.values_list('name', flat=True).get(id=op.country_id) if op.country_id else '',
+                'op_country': op.country.name if op.country_id else '',
                 'op_name': op.name,
                 'op_created_at': op.created_at,
                 'op_funding': float(op.amount_requested),
@@ -332,11 +345,12 @@ class Command(BaseCommand):
         #         ret_data.append(alert_to_add)
 
         # Surge Deployments
-        personnel_list = Personnel.objects.filter(start_date__gte=dig_time).order_by('start_date')
+        personnel_list = Personnel.objects.filter(
+            start_date__gte=dig_time
+        ).select_related('deployment__event_deployed_to', 'country_from').order_by('start_date')
         for pers in personnel_list:
-            deployment = PersonnelDeployment.objects.get(id=pers.deployment_id)
-            event = Event.objects.get(id=deployment.event_deployed_to_id) if deployment.event_deployed_to_id is not None else None
-            country_from = Country.objects.get(id=pers.country_from_id) if pers.country_from_id is not None else None
+            event = pers.deployment.event_deployed_to
+            country_from = pers.country_from
             dep_to_add = {
                 'operation': event.name if event else '',
                 'event_url': (
@@ -355,13 +369,33 @@ class Command(BaseCommand):
 
     def get_weekly_digest_highlights(self):
         dig_time = self.diff_1_week()
-        events = Event.objects.filter(is_featured=True, updated_at__gte=dig_time).order_by('-updated_at')
+        events = list(Event.objects.filter(is_featured=True, updated_at__gte=dig_time).order_by('-updated_at'))
+        event_ids = [ev.id for ev in events]
+        # Grouped aggregates of all the highlighted events
+        appeal_figures = {
+            figures['event']: figures
+            for figures in Appeal.objects.filter(event__in=event_ids).order_by().values('event').annotate(
+                amount_requested=Sum('amount_requested'),
+                amount_funded=Sum('amount_funded'),
+                num_beneficiaries=Sum('num_beneficiaries'),
+            )
+        }
+        deployed_eru = dict(
+            ERU.objects.filter(event__in=event_ids).order_by().values('event').annotate(
+                units=Sum('units'),
+            ).values_list('event', 'units')
+        )
+        deployed_sp = dict(
+            PersonnelDeployment.objects.filter(event_deployed_to__in=event_ids)
+            .order_by().values('event_deployed_to')
+            .annotate(count=Count('id'))
+            .values_list('event_deployed_to', 'count')
+        )
         ret_highlights = []
         for ev in events:
-            amount_requested = (
-                Appeal.objects.filter(event_id=ev.id).aggregate(Sum('amount_requested'))['amount_requested__sum'] or '--'
-            )
-            amount_funded = Appeal.objects.filter(event_id=ev.id).aggregate(Sum('amount_funded'))['amount_funded__sum'] or '--'
+            figures = appeal_figures.get(ev.id, {})
+            amount_requested = figures.get('amount_requested') or '--'
+            amount_funded = figures.get('amount_funded') or '--'
             coverage = '--'
 
             if amount_funded != '--' and amount_requested != '--':
@@ -371,32 +405,27 @@ class Command(BaseCommand):
                 'hl_id': ev.id,
                 'hl_name': ev.name,
                 'hl_last_update': ev.updated_at,
-                'hl_people': (
-                    Appeal.objects.filter(event_id=ev.id).aggregate(Sum('num_beneficiaries'))['num_beneficiaries__sum'] or '--'
-                ),
+                'hl_people': figures.get('num_beneficiaries') or '--',
                 'hl_funding': amount_requested,
-                'hl_deployed_eru': ERU.objects.filter(event_id=ev.id).aggregate(Sum('units'))['units__sum'] or '--',
-                'hl_deployed_sp': PersonnelDeployment.objects.filter(event_deployed_to_id=ev.id).count(),
+                'hl_deployed_eru': deployed_eru.get(ev.id) or '--',
+                'hl_deployed_sp': deployed_sp.get(ev.id, 0),
                 'hl_coverage': coverage,
             }
             ret_highlights.append(data_to_add)
         return ret_highlights
 
-    def get_actions_taken(self, frid):
+    def get_actions_taken(self, field_report):
         ret_actions_taken = {
             'NTLS': [],
             'PNS': [],
             'FDRN': [],
         }
-        actions_taken = ActionsTaken.objects.filter(field_report_id=frid)
-        for at in actions_taken:
+        # Uses the prefetched actions_taken__actions (see prefetch_records)
+        for at in field_report.actions_taken.all():
             action_to_add = {
                 'action_summary': at.summary,
-                'actions': [],
+                'actions': list(at.actions.all()),
             }
-            if at.actions.all():
-                for act in at.actions.all():
-                    action_to_add['actions'].append(act)
             if at.organization == 'NTLS':
                 ret_actions_taken['NTLS'].append(action_to_add)
             elif at.organization == 'PNS':
@@ -408,11 +437,12 @@ class Command(BaseCommand):
     def get_weekly_latest_frs(self):
         dig_time = self.diff_1_week()
         ret_fr_list = []
-        fr_list = list(FieldReport.objects.filter(created_at__gte=dig_time).order_by('-created_at'))
+        fr_list = FieldReport.objects.filter(created_at__gte=dig_time).prefetch_related('countries').order_by('-created_at')
         for fr in fr_list:
+            countries = fr.countries.all()
             fr_data = {
                 'id': fr.id,
-                'country': fr.countries.all()[0].name if fr.countries else None,
+                'country': countries[0].name if countries else None,
                 'summary': fr.summary,
                 'created_at': fr.created_at,
             }
@@ -474,7 +504,7 @@ class Command(BaseCommand):
                 },
                 'epi_figures_source': self.get_epi_figures_source_name(record.epi_figures_source),
                 'sit_fields_date': record.sit_fields_date,
-                'actions_taken': self.get_actions_taken(record.id),
+                'actions_taken': self.get_actions_taken(record),
                 'actions_others': record.actions_others.split("\n") if record.actions_others else None,
                 'gov_assistance': 'Yes' if record.request_assistance else 'No',
                 'ns_assistance': 'Yes' if record.ns_request_assistance else 'No',
@@ -572,7 +602,7 @@ class Command(BaseCommand):
             }
             # If you augment these lists ^, do not forget about api/models.py - AppealType
             local_staff = volunteers = delegates = None
-            field_reports = list(FieldReport.objects.filter(event_id=record.event_id)) if record.event_id is not None else None
+            field_reports = list(record.event.field_reports.all()) if record.event_id is not None else None
             if field_reports:
                 local_staff = volunteers = delegates = 0
                 for f in field_reports:
@@ -590,9 +620,7 @@ class Command(BaseCommand):
                 'follow_url': follow_url,
                 'admin_uri': self.get_admin_uri(record, rtype),
                 'title': self.get_record_title(record, rtype),
-                'situation_overview': (
-                    Event.objects.values_list('summary', flat=True).get(id=record.event_id) if record.event_id is not None else ''
-                ),
+                'situation_overview': record.event.summary if record.event_id is not None else '',
                 'key_figures': {
                     'people_targeted': float(record.num_beneficiaries),
                     'funding_req': float(record.amount_requested),
@@ -608,13 +636,14 @@ class Command(BaseCommand):
                 'field_reports': field_reports,
             }
         elif rtype == RecordType.WEEKLY_DIGEST:
+            digest_data = self.get_weekly_digest_data()
             rec_obj = {
                 'resource_uri': settings.FRONTEND_URL,
-                'active_dref': self.get_weekly_digest_data('dref'),
-                'active_ea': self.get_weekly_digest_data('ea'),
-                'funding_coverage': self.get_weekly_digest_data('fund'),
-                'budget': self.get_weekly_digest_data('budget'),
-                'population': self.get_weekly_digest_data('pop'),
+                'active_dref': digest_data['dref'],
+                'active_ea': digest_data['ea'],
+                'funding_coverage': digest_data['fund'],
+                'budget': digest_data['budget'],
+                'population': digest_data['pop'],
                 'highlighted_ops': self.get_weekly_digest_highlights(),
                 'latest_ops': self.get_weekly_digest_latest_ops(),
                 'latest_deployments': self.get_weekly_digest_latest_deployments(),
@@ -638,11 +667,12 @@ class Command(BaseCommand):
 
     def notify(self, records, rtype, stype, uid=None):
         record_count = 0
-        if records:
-            if isinstance(records, QuerySet):
-                record_count = records.count()
-            elif isinstance(records, list):
-                record_count = len(records)
+        if isinstance(records, QuerySet):
+            # Evaluated once with all the related data, reused below (count, [:10], gather_subscribers)
+            records = self.prefetch_records(records, rtype)
+            record_count = len(records)
+        elif isinstance(records, list):
+            record_count = len(records)
         if not record_count and rtype != RecordType.WEEKLY_DIGEST:
             return
 
@@ -652,11 +682,11 @@ class Command(BaseCommand):
             if not len(emails):
                 return
         else:
-            usr = User.objects.filter(pk=uid, is_active=True)
-            if not len(usr):
+            usr = self.subscriber_index.get_user(uid)
+            if usr is None:
                 return
             else:
-                emails = list(usr.values_list('email', flat=True))  # Only one email in this case
+                emails = [usr.email]  # Only one email in this case
 
         # Only serialize the first 10 records
         record_entries = []
@@ -668,7 +698,7 @@ class Command(BaseCommand):
                 record_entries.append(self.construct_template_record(rtype, record))
 
         if uid is not None:
-            is_staff = usr.values_list('is_staff', flat=True)[0]
+            is_staff = usr.is_staff
 
         if rtype == RecordType.WEEKLY_DIGEST:
             record_type = 'weekly digest'
@@ -730,11 +760,9 @@ class Command(BaseCommand):
                 rtype_of_subscr, stype = self.fix_types_for_subs(rtype, stype)
                 non_ifrc_records = [rec for rec in record_entries if rec['visibility'] != 'IFRC Only']
                 if non_ifrc_records:
-                    non_ifrc_filters = (Q(subscription__rtype=rtype_of_subscr) &
-                                        Q(subscription__stype=stype) &
-                                        Q(is_active=True) &
-                                        (~Q(groups__name='IFRC Admins') & ~Q(is_superuser=True)))
-                    non_ifrc_recipients = list(User.objects.filter(non_ifrc_filters).values_list('email', flat=True))
+                    non_ifrc_recipients = list(
+                        self.subscriber_index.get_emails((rtype_of_subscr, stype), is_ifrc=False)
+                    )
 
                     # FIXME: Code duplication but this whole thing would need a huge refactor
                     # (almost the same as above and in the 'else' part)
@@ -752,11 +780,7 @@ class Command(BaseCommand):
                                           non_ifrc_html,
                                           RTYPE_NAMES[rtype] + ' notification (non_ifrc) - ' + subject)
 
-                ifrc_filters = (Q(subscription__rtype=rtype_of_subscr) &
-                                Q(subscription__stype=stype) &
-                                Q(is_active=True) &
-                                (Q(groups__name='IFRC Admins') | Q(is_superuser=True)))
-                ifrc_emails = list(User.objects.filter(ifrc_filters).values_list('email', flat=True))
+                ifrc_emails = list(self.subscriber_index.get_emails((rtype_of_subscr, stype), is_ifrc=True))
                 ifrc_recipients = ifrc_emails
 
                 # FIXME: Code duplication but this whole thing would need a huge refactor
@@ -909,32 +933,36 @@ class Command(BaseCommand):
         new_surgealerts = SurgeAlert.objects.filter(cond1)
         new_pers_deployments = PersonnelDeployment.objects.filter(cond1)
 
-        # Merge Weekly Digest into one mail instead of separate ones
-        if self.is_digest_mode():
-            self.notify(None, RecordType.WEEKLY_DIGEST, SubscriptionType.NEW)
-        else:
-            self.notify(new_reports, RecordType.FIELD_REPORT, SubscriptionType.NEW)
-            # self.notify(updated_reports, RecordType.FIELD_REPORT, SubscriptionType.EDIT)
-            self.notify(new_appeals, RecordType.APPEAL, SubscriptionType.NEW)
-            # self.notify(updated_appeals, RecordType.APPEAL, SubscriptionType.EDIT)
-            self.notify(new_events, RecordType.EVENT, SubscriptionType.NEW)
-            # self.notify(updated_events, RecordType.EVENT, SubscriptionType.EDIT)
-            # temporary switched off while historical data is uploaded: self.notify(new_surgealerts, RecordType.SURGE_ALERT, SubscriptionType.NEW)
-            # temporary switched off while historical data is uploaded: self.notify(new_pers_deployments, RecordType.SURGE_DEPLOYMENT_MESSAGES, SubscriptionType.NEW)
-
-        # Followed Events
-        if self.is_daily_checkup_time():
-            condU = Q(updated_at__gte=time_diff_1_day)
-            cond2 = Q(previous_update__gte=time_diff_1_day)  # not negated, we collect those, who had 2 changes in the last 1 day
-
-        fe_subs = Subscription.objects.filter(event_id__isnull=False)  # subscriptions of FEs
-        subscribers = fe_subs.values_list('user_id', flat=True).distinct()
-        for usr in subscribers:  # looping in user_ids of specific FOLLOWED_EVENT subscriptions
-            eventlist = fe_subs.filter(user_id=usr).values_list('event_id', flat=True).distinct()
-            cond3 = Q(pk__in=eventlist)
-            followed_events = Event.objects.filter(condU & cond2 & cond3)
-            if len(followed_events):  # usr - unique (we loop one-by-one), followed_events - more
-                self.notify(followed_events, RecordType.FOLLOWED_EVENT, SubscriptionType.NEW, usr)
+        # Notifications are sent as one batch (see notifications.notification.EmailDelivery)
+        with EmailDelivery('index_and_notify'):
+            # Merge Weekly Digest into one mail instead of separate ones
+            if self.is_digest_mode():
+                self.notify(None, RecordType.WEEKLY_DIGEST, SubscriptionType.NEW)
+            else:
+                self.notify(new_reports, RecordType.FIELD_REPORT, SubscriptionType.NEW)
+                # self.notify(updated_reports, RecordType.FIELD_REPORT, SubscriptionType.EDIT)
+                self.notify(new_appeals, RecordType.APPEAL, SubscriptionType.NEW)
+                # self.notify(updated_appeals, RecordType.APPEAL, SubscriptionType.EDIT)
+                self.notify(new_events, RecordType.EVENT, SubscriptionType.NEW)
+                # self.notify(updated_events, RecordType.EVENT, SubscriptionType.EDIT)
+                # temporary switched off while historical data is uploaded: self.notify(new_surgealerts, RecordType.SURGE_ALERT, SubscriptionType.NEW)
+                # temporary switched off while historical data is uploaded: self.notify(new_pers_deployments, RecordType.SURGE_DEPLOYMENT_MESSAGES, SubscriptionType.NEW)
+
+            # Followed Events
+            if self.is_daily_checkup_time():
+                condU = Q(updated_at__gte=time_diff_1_day)
+                cond2 = Q(previous_update__gte=time_diff_1_day)  # not negated, we collect those, who had 2 changes in the last 1 day
+
+            followed_events_by_user = self.subscriber_index.get_followed_events()  # user_id: event_ids of FE subscriptions
+            all_followed_events = set().union(*followed_events_by_user.values())
+            changed_events = {
+                event.pk: event
+                for event in Event.objects.filter(condU & cond2 & Q(pk__in=all_followed_events))
+            }
+            for usr, eventlist in followed_events_by_user.items():
+                followed_events = [event for pk, event in changed_events.items() if pk in eventlist]
+                if len(followed_events):  # usr - unique (we loop one-by-one), followed_events - more
+                    self.notify(followed_events, RecordType.FOLLOWED_EVENT, SubscriptionType.NEW, usr)
 
         # Indexing
         logger.info('Indexing %s new field reports' % new_reports.count())
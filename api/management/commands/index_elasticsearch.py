@@ -7,7 +7,8 @@ from elasticsearch import Elasticsearch
 from utils.elasticsearch import construct_es_data
 from api.esconnection import ES_CLIENT
 from api.indexes import GenericMapping, GenericSetting, ES_PAGE_NAME
-from api.models import Region, Country, Event, Appeal, FieldReport
+from api.models import Region, Country, District, Event, Appeal, FieldReport
+from notifications.models import SurgeAlert
 from api.logger import logger
 
 
@@ -33,6 +34,12 @@ class Command(BaseCommand):
         logger.info('Indexing field reports')
         self.push_table_to_index(model=FieldReport)
 
+        logger.info('Indexing districts')
+        self.push_table_to_index(model=District)
+
+        logger.info('Indexing surge alerts')
+        self.push_table_to_index(model=SurgeAlert)
+
     def recreate_index(self, index_name, index_mapping, index_setting):
         indices_client = IndicesClient(client=ES_CLIENT)
         if indices_client.exists(index_name):
@@ -48,6 +55,10 @@ class Command(BaseCommand):
             query = model.objects.filter(parent_event__isnull=True)
         elif model.__name__ == 'Country':
             query = model.objects.filter(in_search=True)
+        elif model.__name__ == 'District':
+            query = model.objects.filter(is_deprecated=False).select_related('country')
+        elif model.__name__ == 'SurgeAlert':
+            query = model.objects.filter(is_active=True).select_related('event', 'country')
         else:
             query = model.objects.all()
         data = [
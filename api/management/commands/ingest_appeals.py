@@ -6,7 +6,18 @@ from datetime import datetime, timezone, timedelta
 from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone as tz
-from api.models import AppealType, Appeal, AppealFilter, Region, Country, DisasterType, Event, CronJobStatus, GECCode
+from api.models import (
+    AppealType,
+    Appeal,
+    AppealFilter,
+    Region,
+    Country,
+    DisasterType,
+    Event,
+    CronJobStatus,
+    GECCode,
+    DailyAppealFigures,
+)
 from api.fixtures.dtype_map import DISASTER_TYPE_MAPPING
 from api.logger import logger
 from api.create_cron import create_cron_record
@@ -340,6 +351,11 @@ class Command(BaseCommand):
         if errors:
             create_cron_record(CRON_NAME, '\n'.join(errors), CronJobStatus.WARNED, len(errors))
 
+        # Key figures (AggregateHeaderFigures) rollup of today: at 00:00 (rebuilt from the AppealHistory) and current
+        now = tz.now()
+        DailyAppealFigures.update_for_date(DailyAppealFigures.get_day_start(now.date()))
+        DailyAppealFigures.update_for_date(now)
+
         appeals_count = Appeal.objects.all().count()
         logger.info(f'{num_created} appeals created')
         logger.info(f'{num_updated} appeals updated')
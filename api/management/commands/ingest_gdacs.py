@@ -1,4 +1,3 @@
-import requests
 import datetime as dt
 import xmltodict
 from dateutil.parser import parse
@@ -6,6 +5,7 @@ from django.core.management.base import BaseCommand
 from api.models import Country, Event, GDACSEvent, CronJob, CronJobStatus
 from api.event_sources import SOURCES
 from api.logger import logger
+from main.fetch import fetch
 
 
 class Command(BaseCommand):
@@ -16,7 +16,7 @@ class Command(BaseCommand):
         # get latest
         nspace = 'gdacs:'  # not '{http://www.gdacs.org}' any more according to the xml parser
         url = 'http://www.gdacs.org/xml/rss_7d.xml'
-        response = requests.get(url)
+        response = fetch(url, save=False)
         if response.status_code != 200:
             text_to_log = 'Error querying GDACS xml feed at ' + url
             logger.error(text_to_log)
@@ -24,6 +24,12 @@ class Command(BaseCommand):
             body = { "name": "ingest_gdacs", "message": text_to_log, "status": CronJobStatus.ERRONEOUS } # not every case is catched here, e.g. if the base URL is wrong....
             CronJob.sync_cron(body)
             raise Exception('Error querying GDACS')
+        if not response.changed:
+            text_to_log = 'GDACS feed unchanged, 0 GDACs events added'
+            logger.info(text_to_log)
+            body = {"name": "ingest_gdacs", "message": text_to_log, "num_result": 0, "status": CronJobStatus.SUCCESSFUL}
+            CronJob.sync_cron(body)
+            return
 
         # get as XML, but then do not use the obsolate xml2dict = XML2Dict(), but xmltodict
         results = xmltodict.parse(response.content)
@@ -92,6 +98,8 @@ class Command(BaseCommand):
                     # add countries
                     [event.countries.add(c) for c in gdacsevent.countries.all()]
 
+        # Handled, the next run can skip the feed if it's unchanged
+        response.save()
         text_to_log = '%s GDACs events added' % added
         logger.info(text_to_log)
         body = { "name": "ingest_gdacs", "message": text_to_log, "num_result": added, "status": CronJobStatus.SUCCESSFUL }
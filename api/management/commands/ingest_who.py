@@ -1,4 +1,3 @@
-import requests
 import datetime as dt
 import xmltodict
 from dateutil.parser import parse
@@ -6,6 +5,7 @@ from django.core.management.base import BaseCommand
 from api.models import Country, Region, Event, CronJob, CronJobStatus
 from api.event_sources import SOURCES
 from api.logger import logger
+from main.fetch import fetch
 
 
 class Command(BaseCommand):
@@ -23,7 +23,7 @@ class Command(BaseCommand):
         ur2.append('https://www.who.int/feeds/entity/hac/en/rss.xml')
 
         for index, url in enumerate(ur2):
-            response = requests.get(url)
+            response = fetch(url, save=False)
             if response.status_code != 200:
                 text_to_log = 'Error querying WHO xml feed at ' + url
                 logger.error(text_to_log)
@@ -31,6 +31,15 @@ class Command(BaseCommand):
                 body = { "name": "ingest_who", "message": text_to_log, "status": CronJobStatus.ERRONEOUS } # not every case is catched here, e.g. if the base URL is wrong...
                 CronJob.sync_cron(body)
                 raise Exception('Error querying WHO')
+            if not response.changed:
+                text_to_log = "WHO feed unchanged, 0 WHO messages added, URL-{}".format(index + 1)
+                logger.info(text_to_log)
+                body = {
+                    "name": "ingest_who", "message": text_to_log, "num_result": 0, "storing_days": 6,
+                    "status": CronJobStatus.SUCCESSFUL,
+                }
+                CronJob.sync_cron(body)
+                continue
 
             # get as XML, but then do not use the obsolate xml2dict = XML2Dict(), but xmltodict
             results = xmltodict.parse(response.content)
@@ -148,6 +157,8 @@ class Command(BaseCommand):
                 if region is not None:
                     event.regions.add(region)
 
+            # Handled, the next run can skip the feed if it's unchanged
+            response.save()
             text_to_log = "{} WHO messages added, URL-{}".format(added, index + 1)
             logger.info(text_to_log)
 
@@ -1,16 +1,11 @@
 # Officially a work of Navin (toggle-corp/ifrc), modified some parts for Django Admin usage
-import re
+import multiprocessing
+import time
 import urllib3
 import xmltodict
-import requests
 import api.scrapers.cleaners as cleaners
-from io import BytesIO
-from bs4 import BeautifulSoup as bsoup
-from pdfminer.converter import HTMLConverter
-from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-from pdfminer.layout import LAParams
-from pdfminer.pdfpage import PDFPage
-from tidylib import tidy_document
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 from api.models import (
     EmergencyOperationsDataset,
@@ -18,12 +13,15 @@ from api.models import (
     EmergencyOperationsEA,
     EmergencyOperationsFR,
     CronJob,
-    CronJobStatus
+    CronJobStatus,
+    ScrapePdfCheckpoint,
 )
 from api.logger import logger
 from django.core.management.base import BaseCommand
-from api.scrapers.extractor import MetaFieldExtractor, SectorFieldExtractor
+from django.db.models import F
 from api.scrapers.config import _mfd, _s, _sfd
+from api.scrapers.pdf import extract_pdf_fields
+from main.fetch import fetch
 
 
 SECTORS = [
@@ -96,12 +94,39 @@ TYPE_URLS = {
 }
 
 
+# Pipeline: downloads (threads, shared connection pool) -> parse/extract (processes) -> save (main thread)
+DOWNLOAD_WORKERS = 8
+EXTRACT_WORKERS = 4
+DOWNLOAD_TIMEOUT = 60
+# Documents which failed this many times are skipped (use --retry-failed to try them again)
+MAX_ATTEMPTS = 3
+
+
 class Command(BaseCommand):
     help = 'Scrape data from PDFs (only which are not already in the database)'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--download-workers', type=int, default=DOWNLOAD_WORKERS,
+            help='Number of parallel downloads',
+        )
+        parser.add_argument(
+            '--extract-workers', type=int, default=EXTRACT_WORKERS,
+            help='Number of processes used to parse the PDFs',
+        )
+        parser.add_argument(
+            '--use-html', action='store_true',
+            help='Extract the text blocks using the previous HTML rendering (slower)',
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help=f'Also retry the documents which already failed {MAX_ATTEMPTS} times',
+        )
+
     def get_documents(self, pdf_type):
         def get_documents_for(url, d_type, db_set):
-            response = requests.get(url)
+            # Revalidated (ETag/Last-Modified), the documents not handled yet are still listed if the feed is unchanged
+            response = fetch(url)
             if response.status_code != 200:
                 body = {
                     "name": "scrape_pdfs",
@@ -134,43 +159,13 @@ class Command(BaseCommand):
 
         return get_documents_for(TYPE_URLS[pdf_type], pdf_type, db_set)
 
-    def convert_pdf_to_html(self, pdf_data):
-        pdf_rm = PDFResourceManager()
-        bytesio = BytesIO()
-        laparams = LAParams()
-        html_conv = HTMLConverter(pdf_rm, bytesio, codec='utf-8', laparams=laparams)
-        pdf_intr = PDFPageInterpreter(pdf_rm, html_conv)
-
-        for page in PDFPage.get_pages(pdf_data, set(), maxpages=0, caching=False, check_extractable=True):
-            pdf_intr.process_page(page)
-
-        text = bytesio.getvalue().decode()
-        html, errors = tidy_document(text)
-        html = re.sub(r'\s\s+', ' ', html)
-
-        html_conv.close()
-        bytesio.close()
-
-        return html
-
-    def convert_pdf_to_text_blocks(self, pdf_data):
-        html = self.convert_pdf_to_html(pdf_data)
-        soup = bsoup(html, 'html.parser')
-        texts = []
-        for div in soup.find_all('div'):
-            text = []
-            for span in div.find_all(['span', 'a']):
-                text.append(' '.join(span.get_text().split()))
-            texts.append(' '.join(text).strip())
-
-        return texts
-
     def read_pdf_into_memory(self, url):
-        http = urllib3.PoolManager()
-        response = http.request('GET', url, headers=HEADERS)
-        pdf_data = BytesIO(response.data)
-
-        return pdf_data
+        """ Download stage, returns (pdf content, seconds) """
+        start_time = time.monotonic()
+        response = self.http.request('GET', url, headers=HEADERS, timeout=DOWNLOAD_TIMEOUT)
+        if response.status != 200:
+            raise Exception(f'Download failed ({response.status})')
+        return response.data, time.monotonic() - start_time
 
     def clean_data_and_save(self, scraped_data):
         epoa_to_add = []
@@ -607,89 +602,179 @@ class Command(BaseCommand):
                 ea_errors.append(f'Save to DB failed for: {ea_rec.raw_file_url}')
         return epoa_errors, ou_errors, fr_errors, ea_errors
 
+    def save_document(self, doc, data):
+        """ Save stage, the extracted data is kept in the checkpoint until the record is saved """
+        url, filename, pdf_type = doc
+        start_time = time.monotonic()
+        checkpoint, _ = ScrapePdfCheckpoint.objects.update_or_create(
+            url=url,
+            defaults=dict(
+                pdf_type=pdf_type,
+                filename=filename,
+                status=ScrapePdfCheckpoint.Status.EXTRACTED,
+                data=data,
+                error=None,
+            ),
+        )
+        errors = [
+            error
+            for type_errors in self.clean_data_and_save([{
+                'url': url,
+                'filename': filename,
+                'meta': data['meta'],
+                'sector': data['sector'],
+                'd_type': pdf_type,
+            }])
+            for error in type_errors
+        ]
+        if errors:
+            checkpoint.error = '\n'.join(errors)
+            checkpoint.save(update_fields=['error', 'updated_at'])
+            self.save_errors[pdf_type].extend(errors)
+        else:
+            checkpoint.status = ScrapePdfCheckpoint.Status.SAVED
+            checkpoint.data = None
+            checkpoint.save(update_fields=['status', 'data', 'updated_at'])
+            self.saved_count += 1
+        self.timings['save'] += time.monotonic() - start_time
+
+    def fail_document(self, doc, stage, ex):
+        url, filename, pdf_type = doc
+        logger.error(f'Scraping ({stage}) failed for: {url}. Exception: {str(ex)}')
+        self.scrape_errors[pdf_type].append(f'Scraping failed for: {url}. Exception: {str(ex)}\n')
+        checkpoint, _ = ScrapePdfCheckpoint.objects.update_or_create(
+            url=url,
+            defaults=dict(
+                pdf_type=pdf_type,
+                filename=filename,
+                status=ScrapePdfCheckpoint.Status.FAILED,
+                data=None,
+                error=f'{stage}: {str(ex)}',
+            ),
+        )
+        ScrapePdfCheckpoint.objects.filter(pk=checkpoint.pk).update(attempts=F('attempts') + 1)
+
+    def get_pending_documents(self, documents, retry_failed):
+        """ Returns (documents to scrape, [(document, extracted data), ...] to save) using the checkpoints """
+        checkpoints = {
+            checkpoint.url: checkpoint
+            for checkpoint in ScrapePdfCheckpoint.objects.filter(url__in=[doc[0] for doc in documents])
+        }
+        to_scrape = []
+        to_save = []
+        for doc in documents:
+            checkpoint = checkpoints.get(doc[0])
+            if checkpoint is None or checkpoint.status == ScrapePdfCheckpoint.Status.SAVED:
+                # NOTE: Saved documents are only listed again when their record was deleted
+                to_scrape.append(doc)
+            elif checkpoint.status == ScrapePdfCheckpoint.Status.EXTRACTED:
+                # Interrupted (or failed) before saving
+                to_save.append((doc, checkpoint.data))
+            elif retry_failed or checkpoint.attempts < MAX_ATTEMPTS:
+                to_scrape.append(doc)
+            else:
+                self.skipped_count += 1
+        return to_scrape, to_save
+
+    def run_pipeline(self, documents, download_workers, extract_workers, use_html=False):
+        fields_by_type = dict(PDF_TYPES)
+        # Shared by the download threads
+        self.http = urllib3.PoolManager(maxsize=download_workers)
+        # Spawned workers don't inherit the database connections (or any lock held by the download threads)
+        mp_context = multiprocessing.get_context('spawn')
+        with ThreadPoolExecutor(max_workers=download_workers) as download_executor, \
+                ProcessPoolExecutor(max_workers=extract_workers, mp_context=mp_context) as extract_executor:
+            download_futures = {
+                download_executor.submit(self.read_pdf_into_memory, doc[0]): doc
+                for doc in documents
+            }
+            extract_futures = {}
+            pending = set(download_futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in download_futures:
+                        doc = download_futures.pop(future)
+                        try:
+                            pdf_content, seconds = future.result()
+                        except Exception as ex:
+                            self.fail_document(doc, 'download', ex)
+                            continue
+                        self.timings['download'] += seconds
+                        extract_future = extract_executor.submit(
+                            extract_pdf_fields,
+                            pdf_content, fields_by_type[doc[2]], SECTORS, SECTOR_FIELDS,
+                            use_html=use_html,
+                        )
+                        extract_futures[extract_future] = doc
+                        pending.add(extract_future)
+                    else:
+                        doc = extract_futures.pop(future)
+                        try:
+                            data, seconds = future.result()
+                        except Exception as ex:
+                            self.fail_document(doc, 'extract', ex)
+                            continue
+                        self.timings['extract'] += seconds
+                        self.scraped_count += 1
+                        self.save_document(doc, data)
+
     def handle(self, *args, **options):
         logger.info('Starting PDF scraping.')
-        processed_data = []
-        epoa_errs = []
-        ou_errs = []
-        fr_errs = []
-        ea_errs = []
+        start_time = time.monotonic()
+        self.timings = defaultdict(float)
+        self.scrape_errors = defaultdict(list)
+        self.save_errors = defaultdict(list)
+        self.scraped_count = self.saved_count = self.skipped_count = 0
 
         # Loop through the data types (epoa, ou, etc)
+        documents = []
         for pdf_type, fields in PDF_TYPES:
             logger.info('Getting document list.')
             urls_with_filenames = self.get_documents(pdf_type)
             logger.info('Count of new {pdftype} documents: {doc_count}'.format(pdftype=pdf_type, doc_count=len(urls_with_filenames)))
-            logger.info('Starting to process PDFs.')
-
-            for doc in urls_with_filenames:
-                try:
-                    pdf_data = self.read_pdf_into_memory(doc[0])
-                    texts = self.convert_pdf_to_text_blocks(pdf_data)
-                    m_texts = texts[:texts.index('Page 2')]
-                    m_extractor = MetaFieldExtractor(m_texts, fields)
-                    s_extractor = SectorFieldExtractor(texts, SECTORS, SECTOR_FIELDS)
-                    m_data_with_score, m_data = m_extractor.extract_fields()
-                    s_data_with_score, s_data = s_extractor.extract_fields()
-
-                    processed_data.append({
-                        'url': doc[0],
-                        'filename': doc[1],
-                        'meta': m_data,
-                        'sector': s_data,
-                        'd_type': doc[2],
-                    })
-                except Exception as ex:
-                    err_msg = f'Scraping failed for: {doc[0]}. Exception: {str(ex)}\n'
-                    if pdf_type == 'epoa':
-                        epoa_errs.append(err_msg)
-                    elif pdf_type == 'ou':
-                        ou_errs.append(err_msg)
-                    elif pdf_type == 'fr':
-                        fr_errs.append(err_msg)
-                    elif pdf_type == 'ea':
-                        ea_errs.append(err_msg)
-
+            documents.extend(urls_with_filenames)
+        self.timings['list'] = time.monotonic() - start_time
+
+        to_scrape, to_save = self.get_pending_documents(documents, options['retry_failed'])
+        logger.info(
+            f'Resuming {len(to_save)} already extracted documents,'
+            f' skipping {self.skipped_count} failed documents.'
+        )
+        for doc, data in to_save:
+            self.save_document(doc, data)
+
+        logger.info(f'Starting to process PDFs ({len(to_scrape)}).')
+        self.run_pipeline(
+            to_scrape, options['download_workers'], options['extract_workers'], use_html=options['use_html'],
+        )
         logger.info('Processing PDFs finished.')
 
-        epoa_str_errs = '\n'.join(epoa_errs)
-        ou_str_errs = '\n'.join(ou_errs)
-        fr_str_errs = '\n'.join(fr_errs)
-        ea_str_errs = '\n'.join(ea_errs)
-        errors_count = len(epoa_errs) + len(ou_errs) + len(fr_errs) + len(ea_errs)
-        scraped_count = len(urls_with_filenames) - errors_count
-
-        all_error_msgs = ''
-        if errors_count:
-            all_error_msgs = f'''
-                \nScraping errors --- ({errors_count})
-                {('EPOA errors:' + epoa_str_errs) if epoa_str_errs else ''}
-                {('OU errors:' + ou_str_errs) if ou_str_errs else ''}
-                {('FR errors:' + fr_str_errs) if fr_str_errs else ''}
-                {('EA errors:' + ea_str_errs) if ea_str_errs else ''}
-            '''
-
-        cron_msg = f'Done scraping PDF-s --- ({scraped_count}) {all_error_msgs}'
-
-        logger.info('Starting data-cleaning.')
-        epoa_errors, ou_errors, fr_errors, ea_errors = self.clean_data_and_save(processed_data)
-        errors_count = len(epoa_errors) + len(ou_errors) + len(fr_errors) + len(ea_errors)
-
-        all_error_msgs = ''
-        if errors_count:
-            all_error_msgs = f'''
-                \nSaving errors --- ({errors_count})
-                {('EPOA errors:' + epoa_errors) if epoa_errors else ''}
-                {('OU errors:' + ou_errors) if ou_errors else ''}
-                {('FR errors:' + fr_errors) if fr_errors else ''}
-                {('EA errors:' + ea_errors) if ea_errors else ''}
-            '''
-
-        cron_msg += f'\nDone saving records to DB --- ({scraped_count - errors_count}) {all_error_msgs}'
+        def _format_errors(title, errors):
+            errors_count = sum(len(type_errors) for type_errors in errors.values())
+            if not errors_count:
+                return ''
+            return f'\n{title} --- ({errors_count})\n' + '\n'.join(
+                f'{pdf_type.upper()} errors:' + '\n'.join(errors[pdf_type])
+                for pdf_type, _ in PDF_TYPES
+                if errors[pdf_type]
+            )
+
+        timings = ', '.join(
+            f'{stage} {self.timings[stage]:.1f}s'
+            for stage in ('list', 'download', 'extract', 'save')
+        )
+        cron_msg = (
+            f'Done scraping PDF-s --- ({self.scraped_count}) {_format_errors("Scraping errors", self.scrape_errors)}'
+            f'\nDone saving records to DB --- ({self.saved_count}) {_format_errors("Saving errors", self.save_errors)}'
+            f'\nResumed: {len(to_save)}, skipped (failed {MAX_ATTEMPTS} times): {self.skipped_count}'
+            # download/extract/save are summed over the workers, total is the wall-clock time
+            f'\nStage timings: {timings}, total {time.monotonic() - start_time:.1f}s'
+        )
         cron_body = {
             "name": "scrape_pdfs",
             "message": cron_msg,
-            "num_result": len(urls_with_filenames),
+            "num_result": len(documents),
             "status": CronJobStatus.SUCCESSFUL
         }
         CronJob.sync_cron(cron_body)
@@ -1,14 +1,20 @@
+from collections import defaultdict
 from dateutil import parser as date_parser
 import json
 from django.db import transaction
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
+from django.utils import timezone
+from modeltranslation.manager import get_translatable_fields_for_model
+from modeltranslation.utils import build_localized_fieldname, get_language
 from api.molnix_utils import MolnixApi
 from api.logger import logger
-from deployments.models import MolnixTag, MolnixTagGroup, PersonnelDeployment, Personnel
+from deployments.models import DeployedPerson, MolnixTag, MolnixTagGroup, PersonnelDeployment, Personnel
 from notifications.models import SurgeAlert, SurgeAlertType, SurgeAlertCategory
-from api.models import Event, Country, CronJobStatus
+from api.models import Event, Country, CronJobStatus, OutboxEvent
+from api.outbox import enqueue_many
 from api.create_cron import create_cron_record
+from middlewares.cache import bump_cache_generation
 
 CRON_NAME = 'sync_molnix'
 
@@ -36,6 +42,52 @@ NS_MATCHING_OVERRIDES = {  # NS -> country
 }
 
 
+# Synced fields (attnames) of the rows created/updated from Molnix
+MOLNIX_TAG_FIELDS = ('name', 'description', 'tag_type', 'tag_category')
+MOLNIX_TAG_GROUP_FIELDS = ('created_at', 'updated_at')
+SURGE_ALERT_FIELDS = (
+    'atype', 'category', 'message', 'molnix_status', 'is_stood_down', 'event_id', 'country_id',
+    'opens', 'closes', 'start', 'end', 'is_active',
+)
+PERSONNEL_FIELDS = (
+    'deployment_id', 'molnix_status', 'is_active', 'type', 'start_date', 'end_date', 'name', 'role',
+    'country_to_id', 'country_from_id', 'surge_alert_id', 'appraisal_received', 'gender', 'location',
+)
+
+
+def set_changed_values(obj, values):
+    '''
+        Sets the values (attname -> value) on obj, returns True if any of them changed
+    '''
+    changed = False
+    for attname, value in values.items():
+        if getattr(obj, attname) != value:
+            setattr(obj, attname, value)
+            changed = True
+    return changed
+
+
+def get_update_fields(model, fields):
+    '''
+        bulk_update doesn't go through modeltranslation, also update the current language field of the translated ones
+    '''
+    update_fields = list(fields)
+    for field in get_translatable_fields_for_model(model) or []:
+        if field in fields:
+            update_fields.append(build_localized_fieldname(field, get_language()))
+    return update_fields
+
+
+def get_unique_by(queryset, field):
+    '''
+        {value: object} of the values matching only one object (as .get() would)
+    '''
+    objects = defaultdict(list)
+    for obj in queryset:
+        objects[getattr(obj, field)].append(obj)
+    return {value: objs[0] for value, objs in objects.items() if len(objs) == 1}
+
+
 def get_unique_tags(deployments, open_positions):
     tags = []
     tag_ids = []
@@ -52,7 +104,7 @@ def get_unique_tags(deployments, open_positions):
     return tags
 
 
-def add_tags(molnix_tags, api):
+def get_tag_category(name):
     modality = ['In Person', 'Remote']
     region = ['ASIAP', 'AMER', 'AFRICA', 'MENA', 'EURO']
     scope = ['REGIONAL', 'GLOBAL']
@@ -60,80 +112,164 @@ def add_tags(molnix_tags, api):
     sector = ['ADMIN', 'ASSESS', 'CEA', 'CIVMIL', 'COM', 'CVA', 'DRR', 'FIN', 'HEALTH', 'HR', 'IDRL', 'IM', 'IT', 'LOGS',
               'LVES', 'MHPSS', 'MIG', 'NSD', 'OPS-LEAD', 'PER', 'PGI', 'PMER', 'PRD', 'PSS', 'REC', 'REL', 'RFL', 'SEC',
               'SHCLUSTER', 'SHELTER', 'STAFFHEALTH', 'WASH']
+    n = name
+    return 'molnix_language' if n.startswith('L-') else \
+        'molnix_operation' if n.startswith('OP-') else \
+        'molnix_modality' if n in modality else \
+        'molnix_region' if n in region else \
+        'molnix_scope' if n in scope else \
+        'molnix_sector' if n in sector else \
+        'molnix_status' if n in status else \
+        'molnix_role_profile'
 
+
+def add_tags(molnix_tags, api):
+    '''
+        Creates/updates the MolnixTags (and their groups) using the existing ones fetched at once
+        Returns the number of changed rows
+    '''
+    tags = {
+        tag.molnix_id: tag
+        for tag in MolnixTag.objects.filter(molnix_id__in=[molnix_tag['id'] for molnix_tag in molnix_tags])
+    }
+    new_tags = []
+    changed_tags = []
+    tags_groups = []  # (MolnixTag, Molnix groups)
     for molnix_tag in molnix_tags:
-        tag, created = MolnixTag.objects.get_or_create(molnix_id=molnix_tag['id'])
+        tag = tags.get(molnix_tag['id'])
+        created = tag is None
+        if created:
+            tag = tags[molnix_tag['id']] = MolnixTag(molnix_id=molnix_tag['id'])
+            new_tags.append(tag)
+        description = molnix_tag['description']
+        if description is None:
+            description = ''
+            logger.warning('%s named tag has no description.' % molnix_tag['name'])
+        changed = set_changed_values(tag, {
+            'name': molnix_tag['name'],
+            'description': description,
+            'tag_type': molnix_tag['type'],
+            'tag_category': get_tag_category(molnix_tag['name']),
+        })
+        if changed and not created:
+            changed_tags.append(tag)
         tag_groups = api.get_tag_groups(molnix_tag['id']) if molnix_tag['id'] else []
-        for g in tag_groups:
-            tag_group, created = MolnixTagGroup.objects.get_or_create(
-                molnix_id=g['id'],
-                name=g['name'])
-            if created:
-                tag_group.created_at = g['created_at']
-            tag_group.updated_at = g['updated_at']
-            tag_group.save()
-            tag.groups.add(tag_group)
-        tag.molnix_id = molnix_tag['id']
-        tag.name = n = molnix_tag['name']
-        tag.description = molnix_tag['description']
-        if tag.description is None:
-            tag.description = ''
-            logger.warning('%s named tag has no description.' % tag.name)
-        tag.tag_type = molnix_tag['type']
-        tag.tag_category = 'molnix_language' if n.startswith('L-') else \
-            'molnix_operation' if n.startswith('OP-') else \
-            'molnix_modality' if n in modality else \
-            'molnix_region' if n in region else \
-            'molnix_scope' if n in scope else \
-            'molnix_sector' if n in sector else \
-            'molnix_status' if n in status else \
-            'molnix_role_profile'
-        tag.save()
-
-
-def get_go_event(tags):
+        tags_groups.append((tag, tag_groups))
+    MolnixTag.objects.bulk_create(new_tags)
+    MolnixTag.objects.bulk_update(changed_tags, MOLNIX_TAG_FIELDS)
+
+    # Tag groups, (molnix_id, name) is the key used by the previous get_or_create
+    tag_groups = {
+        (tag_group.molnix_id, tag_group.name): tag_group
+        for tag_group in MolnixTagGroup.objects.filter(
+            molnix_id__in=[g['id'] for _, groups in tags_groups for g in groups]
+        )
+    }
+    new_tag_groups = []
+    for _, groups in tags_groups:
+        for g in groups:
+            if (g['id'], g['name']) not in tag_groups:
+                tag_group = tag_groups[(g['id'], g['name'])] = MolnixTagGroup(molnix_id=g['id'], name=g['name'])
+                new_tag_groups.append(tag_group)
+    MolnixTagGroup.objects.bulk_create(new_tag_groups)
+    changed_tag_groups = {}
+    for _, groups in tags_groups:
+        for g in groups:
+            tag_group = tag_groups[(g['id'], g['name'])]
+            # NOTE: auto_now_add/auto_now are not applied by bulk_update, Molnix dates are kept
+            if set_changed_values(tag_group, {
+                'created_at': get_datetime(g['created_at']),
+                'updated_at': get_datetime(g['updated_at']),
+            }):
+                changed_tag_groups[tag_group.pk] = tag_group
+    MolnixTagGroup.objects.bulk_update(changed_tag_groups.values(), MOLNIX_TAG_GROUP_FIELDS)
+
+    # Groups are only added (as tag.groups.add)
+    Through = MolnixTag.groups.through
+    Through.objects.bulk_create(
+        [
+            Through(molnixtag_id=tag.pk, molnixtaggroup_id=tag_groups[(g['id'], g['name'])].pk)
+            for tag, groups in tags_groups
+            for g in groups
+        ],
+        ignore_conflicts=True,
+    )
+    return len(new_tags) + len(changed_tags) + len(new_tag_groups) + len(changed_tag_groups)
+
+
+def get_op_tag_event_id(tag):
+    '''
+        Event id of an `OP-<event_id>` tag, None if it's not a valid OP- tag
+    '''
+    event_id = tag['name'].replace('OP-', '').strip()
+    try:
+        return int(event_id)
+    except ValueError:
+        return None
+
+
+def get_go_events(molnix_items):
+    '''
+        GO Events of the `OP-` tags of the Molnix positions/deployments, fetched at once
+    '''
+    event_ids = set()
+    for item in molnix_items:
+        for tag in item['tags']:
+            if tag['name'].startswith('OP-'):
+                event_ids.add(get_op_tag_event_id(tag))
+    event_ids.discard(None)
+    return Event.objects.prefetch_related('countries__region').in_bulk(event_ids)
+
+
+def get_go_event(tags, events):
     '''
-        Returns a GO Event object, by looking for a tag like `OP-<event_id>` or
+        Returns a GO Event object (from events, see get_go_events), by looking for a tag like `OP-<event_id>` or
         None if there is not a valid OP- tag on the Position
     '''
     event = None
     for tag in tags:
         if tag['name'].startswith('OP-'):
-            event_id = tag['name'].replace('OP-', '').strip()
-            try:
-                event_id_int = int(event_id)
-            except:
-                logger.warning('%s tag is not a valid OP- tag' % event_id)
+            event_id_int = get_op_tag_event_id(tag)
+            if event_id_int is None:
+                logger.warning('%s tag is not a valid OP- tag' % tag['name'].replace('OP-', '').strip())
                 continue
-            try:
-                event = Event.objects.get(id=event_id_int)
-            except:
+            if event_id_int not in events:
                 logger.warning('Emergency with ID %d not found' % event_id_int)
                 continue
-            return event
+            return events[event_id_int]
     return event
 
-def get_go_country(countries, country_id):
+
+def get_go_countries(countries):
     '''
-        Given a Molnix country ID, returns GO country id
+        GO (independent) countries by ISO, for the Molnix countries (Molnix ID -> ISO)
+    '''
+    return get_unique_by(Country.objects.filter(iso__in=countries.values(), independent=True), 'iso')
+
+
+def get_go_country(countries, country_id, go_countries):
+    '''
+        Given a Molnix country ID, returns GO country
     '''
     if not country_id in countries:
         return None
     iso = countries[country_id]
-    try:
-        country = Country.objects.get(iso=iso, independent=True)
-    except:
+    if iso not in go_countries:
         logger.warning('Country with unknown ISO: %s' % iso)
         return None
-    return country
+    return go_countries[iso]
 
 def get_datetime(datetime_string):
     '''
         Return a python datetime from a date-time string from the API
+        NOTE: Naive ones use the default timezone (as saving them would), so they can be compared with the DB values
     '''
     if not datetime_string or datetime_string == '':
         return None
-    return date_parser.parse(datetime_string)
+    value = date_parser.parse(datetime_string)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
 
 
 def get_status_message(positions_messages, deployments_messages, positions_warnings, deployments_warnings):
@@ -155,80 +291,144 @@ def get_status_message(positions_messages, deployments_messages, positions_warni
     return msg
 
 
-def add_tags_to_obj(obj, tags):
-    _ids = [int(t['id']) for t in tags]
-    tags = list(  # Fetch all at once
-        MolnixTag.objects.filter(molnix_id__in=_ids)
-    )
-    if len(tags) != len(_ids):  # Show warning if all tags are not available
-        missing_tag_ids = list(set(_ids) - set([tag.id for tag in tags]))
+def set_molnix_tags(model, objects_tags):
+    '''
+        Sets the molnix_tags of the objects ([(obj, Molnix tags)]) at once: adds new ones, removes old ones
+        Returns the number of objects with changed tags
+    '''
+    field = model.molnix_tags.field
+    Through = field.remote_field.through
+    source, target = f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+
+    molnix_ids = {int(t['id']) for _, tags in objects_tags for t in tags}
+    tag_ids = defaultdict(list)  # molnix id -> MolnixTag ids
+    for pk, molnix_id in MolnixTag.objects.filter(molnix_id__in=molnix_ids).values_list('pk', 'molnix_id'):
+        tag_ids[molnix_id].append(pk)
+    if len(tag_ids) != len(molnix_ids):  # Show warning if all tags are not available
+        missing_tag_ids = list(molnix_ids - set(tag_ids))
         logger.warning(f'Missing _ids: {missing_tag_ids}')
         # or   ^^^^^^^ logger.error if we need to add molnix tags manually.
-    obj.molnix_tags.set(tags)  # Add new ones, remove old ones
+
+    existing = defaultdict(dict)  # obj id -> {MolnixTag id: through id}
+    for pk, obj_id, tag_id in Through.objects.filter(
+        **{f'{source}__in': [obj.pk for obj, _ in objects_tags]}
+    ).values_list('pk', source, target):
+        existing[obj_id][tag_id] = pk
+
+    new_rows = []
+    removed_row_ids = []
+    changed_objects = set()
+    for obj, tags in objects_tags:
+        new_tag_ids = {pk for t in tags for pk in tag_ids.get(int(t['id']), [])}
+        old_tag_ids = existing[obj.pk]
+        for tag_id in new_tag_ids - set(old_tag_ids):
+            new_rows.append(Through(**{source: obj.pk, target: tag_id}))
+            changed_objects.add(obj.pk)
+        for tag_id in set(old_tag_ids) - new_tag_ids:
+            removed_row_ids.append(old_tag_ids[tag_id])
+            changed_objects.add(obj.pk)
+    Through.objects.bulk_create(new_rows)
+    Through.objects.filter(pk__in=removed_row_ids).delete()
+    return len(changed_objects)
+
+
+def get_changes_messages(created, updated, unchanged, marked_inactive, tags_changed, warnings):
+    return [
+        'Successfully created: %d' % created,
+        'Successfully updated: %d' % updated,
+        'Unchanged: %d' % unchanged,
+        'Marked inactive: %d' % marked_inactive,
+        'Tags changed: %d' % tags_changed,
+        'No of Warnings: %d' % len(warnings)
+    ]
 
 
 def sync_deployments(molnix_deployments, molnix_api, countries):
+    '''
+        Diffs the Molnix deployments with the existing Personnel (fetched at once), then applies the
+        create/update/deactivate sets in bulk
+    '''
     molnix_ids = [d['id'] for d in molnix_deployments]
     warnings = []
     messages = []
-    successful_creates = 0
-    successful_updates = 0
+    events = get_go_events(molnix_deployments)
+    go_countries = get_go_countries(countries)
+    ns_override_countries = get_unique_by(
+        Country.objects.filter(name_en__in=set(NS_MATCHING_OVERRIDES.values())), 'name_en'
+    )
+    ns_countries = get_unique_by(
+        Country.objects.filter(
+            society_name__in={
+                md['incoming']['name'].strip()
+                for md in molnix_deployments
+                if md['incoming']
+            },
+            independent=True,
+        ),
+        'society_name',
+    )
+
     # Ensure there are PersonnelDeployment instances for every unique emergency
-    events = [get_go_event(d['tags']) for d in molnix_deployments]
-    event_ids = [ev.id for ev in events if ev]
-    unique_event_ids = list(set(event_ids))
-    for event_id in unique_event_ids:
-        if PersonnelDeployment.objects.filter(is_molnix=True, event_deployed_to=event_id).count() == 0:
-            event = Event.objects.get(pk=event_id)
-            p = PersonnelDeployment()
-            p.event_deployed_to = event
-
-            if p.event_deployed_to.countries.all().count() > 0:
-                # Since different personnel deployed to the same emergency
-                # can be deployed to different countries affected by the emergency,
-                # we should no longer use country_deployed_to from PersonnelDeployment,
-                # rather get the country for each deployed person directly from the
-                # Personnel model for each deployed person.
-                # FIXME: we should look to deprecate usage of this field entirely.
-                p.country_deployed_to = p.event_deployed_to.countries.all()[0]
-                p.region_deployed_to = p.event_deployed_to.countries.all()[0].region
-            else:
-                warning = 'Event id %d without country' % p.event_deployed_to.id
-                logger.warning(warning)
-                warnings.append(warning)
-                continue
+    event_ids = {ev.id for ev in [get_go_event(d['tags'], events) for d in molnix_deployments] if ev}
+    personnel_deployments = defaultdict(list)  # event id -> molnix PersonnelDeployments
+    for p in PersonnelDeployment.objects.filter(is_molnix=True, event_deployed_to__in=event_ids):
+        personnel_deployments[p.event_deployed_to_id].append(p)
+    new_personnel_deployments = []
+    for event_id in sorted(event_ids - set(personnel_deployments)):
+        event = events[event_id]
+        p = PersonnelDeployment()
+        p.event_deployed_to = event
+        event_countries = event.countries.all()
+        if len(event_countries) > 0:
+            # Since different personnel deployed to the same emergency
+            # can be deployed to different countries affected by the emergency,
+            # we should no longer use country_deployed_to from PersonnelDeployment,
+            # rather get the country for each deployed person directly from the
+            # Personnel model for each deployed person.
+            # FIXME: we should look to deprecate usage of this field entirely.
+            p.country_deployed_to = event_countries[0]
+            p.region_deployed_to = event_countries[0].region
+        else:
+            warning = 'Event id %d without country' % p.event_deployed_to.id
+            logger.warning(warning)
+            warnings.append(warning)
+            continue
 
-            p.is_molnix = True
-            p.save()
+        p.is_molnix = True
+        new_personnel_deployments.append(p)
+        personnel_deployments[event_id].append(p)
+    PersonnelDeployment.objects.bulk_create(new_personnel_deployments)
 
-    # Create Personnel objects
+    surge_alerts = get_unique_by(
+        SurgeAlert.objects.filter(molnix_id__in=[md['position_id'] for md in molnix_deployments if md['position_id']]),
+        'molnix_id',
+    )
+    existing_personnel = {}
+    for personnel in Personnel.objects.filter(molnix_id__in=molnix_ids).order_by('pk'):
+        existing_personnel.setdefault(personnel.molnix_id, personnel)
+
+    new_personnel = []
+    changed_personnel = {}
+    synced_personnel_ids = set()
+    personnel_tags = {}  # molnix id -> (Personnel, tags)
     for md in molnix_deployments:
-        try:
-            personnel = Personnel.objects.get(molnix_id=md['id'])
-            created = False
-        except:
-            personnel = Personnel(molnix_id=md['id'])
-            created = True
-        # print('personnel found', personnel)
-        event = get_go_event(md['tags'])
+        event = get_go_event(md['tags'], events)
         if not event:
             warning = 'Deployment id %d does not have a valid Emergency tag.' % md['id']
             logger.warning(warning)
             warnings.append(warning)
             continue
-        try:
-            deployment = PersonnelDeployment.objects.get(is_molnix=True, event_deployed_to=event)
-        except:
+        if len(personnel_deployments[event.id]) != 1:
             logger.warning('Did not import Deployment with Molnix ID %d. Invalid Event.' % md['id'])
             continue
+        deployment = personnel_deployments[event.id][0]
 
         surge_alert = None
-        try:
-            if md['position_id']:
-                surge_alert = SurgeAlert.objects.get(molnix_id=md['position_id'])
-        except:
-            logger.warning('%d deployment did not find SurgeAlert with Molnix position_id %d.' % (md['id'], md['position_id']))
-            continue
+        if md['position_id']:
+            if md['position_id'] not in surge_alerts:
+                logger.warning('%d deployment did not find SurgeAlert with Molnix position_id %d.' % (md['id'], md['position_id']))
+                continue
+            surge_alert = surge_alerts[md['position_id']]
 
         appraisal_received = 'appraisals' in md and bool(len(md['appraisals']))
 
@@ -248,34 +448,19 @@ def sync_deployments(molnix_deployments, molnix_api, countries):
             logger.warning('Did not find city info in %d' % md['id'])
             continue
 
-        personnel.deployment = deployment
-        personnel.molnix_id = md['id']
         if md['hidden'] == 1:
-            personnel.molnix_status = 'hidden'
-            personnel.is_active = False
+            molnix_status, is_active = 'hidden', False
         elif md['draft'] == 1:
-            personnel.molnix_status = 'draft'
-            personnel.is_active = False
+            molnix_status, is_active = 'draft', False
         else:
-            personnel.molnix_status = 'active'
-            personnel.is_active = True
-        personnel.type = Personnel.TypeChoices.RR
-        personnel.start_date = get_datetime(md['start'])
-        personnel.end_date = get_datetime(md['end'])
-        personnel.name = md['person']['fullname']
-        personnel.role = md['title']
-        country_to = get_go_country(countries, md['country_id'])
+            molnix_status, is_active = 'active', True
+        country_to = get_go_country(countries, md['country_id'], go_countries)
         if not country_to:
             warning = 'Position (id %d) does not have a valid Country To (%s)' % (md['id'], md['country_id'])
             logger.warning(warning)
             warnings.append(warning)
             country_to = None
-        personnel.country_to = country_to
         country_from = None
-        personnel.surge_alert = surge_alert
-        personnel.appraisal_received = appraisal_received
-        personnel.gender = gender
-        personnel.location = location
 
         # Sometimes the `incoming` value from Molnix is null.
         if md['incoming']:
@@ -284,19 +469,16 @@ def sync_deployments(molnix_deployments, molnix_api, countries):
             # We over-ride the matching for some NS names from Molnix
             if incoming_name in NS_MATCHING_OVERRIDES:
                 country_name = NS_MATCHING_OVERRIDES[incoming_name]
-                try:
-                    country_from = Country.objects.get(name_en=country_name)
-                except:
+                country_from = ns_override_countries.get(country_name)
+                if country_from is None:
                     warning = 'Mismatch in NS name: %s' % md['incoming']['name']
                     logger.warning(warning)
                     warnings.append(warning)
             else:
-                try:
-                    country_from = Country.objects.get(society_name=incoming_name, independent=True)
-                    # maybe somewhen:  .filter(society_name__iexact=incoming_name, independent=True).first()
-                except:
-                    #FIXME: Catch possibility of .get() returning multiple records
-                    # even though that should ideally never happen
+                country_from = ns_countries.get(incoming_name)
+                # maybe somewhen:  .filter(society_name__iexact=incoming_name, independent=True).first()
+                if country_from is None:
+                    # NOTE: Multiple matching records are not used either
                     warning = 'NS Name not found for Deployment ID: %d with secondment_incoming %s' % (md['id'], md['incoming']['name'],)
                     logger.warning(warning)
                     warnings.append(warning)
@@ -305,45 +487,79 @@ def sync_deployments(molnix_deployments, molnix_api, countries):
             logger.warning(warning)
             warnings.append(warning)
 
-        personnel.country_from = country_from
-
+        personnel = existing_personnel.get(md['id'])
+        if personnel is None:
+            personnel = existing_personnel[md['id']] = Personnel(molnix_id=md['id'])
+            new_personnel.append(personnel)
+        changed = set_changed_values(personnel, {
+            'deployment_id': deployment.id,
+            'molnix_status': molnix_status,
+            'is_active': is_active,
+            'type': Personnel.TypeChoices.RR,
+            'start_date': get_datetime(md['start']),
+            'end_date': get_datetime(md['end']),
+            'name': md['person']['fullname'],
+            'role': md['title'],
+            'country_to_id': country_to and country_to.id,
+            'country_from_id': country_from and country_from.id,
+            'surge_alert_id': surge_alert and surge_alert.id,
+            'appraisal_received': appraisal_received,
+            'gender': gender,
+            'location': location,
+        })
+        if personnel.pk is not None:
+            synced_personnel_ids.add(personnel.pk)
+            if changed:
+                changed_personnel[personnel.pk] = personnel
+        personnel_tags[md['id']] = (personnel, md['tags'])
+
+    # NOTE: bulk_create doesn't support multi-table inheritance (DeployedPerson), only the new rows are saved one by one
+    for personnel in new_personnel:
         personnel.save()
-        add_tags_to_obj(personnel, md['tags'])
-        if created:
-            successful_creates += 1
-        else:
-            successful_updates += 1
-    all_active_personnel = Personnel.objects.filter(is_active=True, molnix_id__isnull=False)
-    active_personnel_ids = [a.molnix_id for a in all_active_personnel]
-    inactive_ids = list(set(active_personnel_ids) - set(molnix_ids))
-    marked_inactive = len(inactive_ids)
-    # Mark Personnel entries no longer in Molnix as inactive:
+    # The DeployedPerson (parent model) fields are updated using their own table
+    parent_fields = {field.attname for field in DeployedPerson._meta.concrete_fields}
+    DeployedPerson.objects.bulk_update(
+        changed_personnel.values(), [field for field in PERSONNEL_FIELDS if field in parent_fields],
+    )
+    Personnel.objects.bulk_update(
+        changed_personnel.values(), [field for field in PERSONNEL_FIELDS if field not in parent_fields],
+    )
+    tags_changed = set_molnix_tags(Personnel, personnel_tags.values())
 
-    for id in inactive_ids:
-        personnel = Personnel.objects.get(molnix_id=id)
-        personnel.molnix_status = 'deleted'
-        personnel.is_active = False
-        personnel.save()
+    # Mark Personnel entries no longer in Molnix as inactive:
+    marked_inactive = Personnel.objects.filter(
+        is_active=True, molnix_id__isnull=False,
+    ).exclude(molnix_id__in=molnix_ids).update(molnix_status='deleted', is_active=False)
 
-    messages = [
-        'Successfully created: %d' % successful_creates,
-        'Successfully updated: %d' % successful_updates,
-        'Marked inactive: %d' % marked_inactive,
-        'No of Warnings: %d' % len(warnings)
-    ]
-    return messages, warnings, successful_creates
+    messages = get_changes_messages(
+        len(new_personnel), len(changed_personnel), len(synced_personnel_ids) - len(changed_personnel),
+        marked_inactive, tags_changed, warnings,
+    )
+    return messages, warnings, len(new_personnel)
 
 
 def sync_open_positions(molnix_positions, molnix_api, countries):
+    '''
+        Diffs the Molnix positions with the existing SurgeAlerts (fetched at once), then applies the
+        create/update/deactivate sets in bulk
+    '''
     molnix_ids = [p['id'] for p in molnix_positions]
     warnings = []
     messages = []
-    successful_creates = 0
-    successful_updates = 0
-
+    events = get_go_events(molnix_positions)
+    go_countries = get_go_countries(countries)
+    existing_alerts = {}
+    for alert in SurgeAlert.objects.filter(molnix_id__in=molnix_ids).order_by('pk'):
+        existing_alerts.setdefault(alert.molnix_id, alert)
+
+    new_alerts = []
+    changed_alerts = {}
+    synced_alert_ids = set()
+    alert_tags = {}  # molnix id -> (SurgeAlert, tags)
+    now = timezone.now()
     for position in molnix_positions:
-        event = get_go_event(position['tags'])
-        country = get_go_country(countries, position['country_id'])
+        event = get_go_event(position['tags'], events)
+        country = get_go_country(countries, position['country_id'], go_countries)
         if not country:
             warning = 'Position id %d does not have a valid Country' % (position['id'])
             logger.warning(warning)
@@ -355,35 +571,44 @@ def sync_open_positions(molnix_positions, molnix_api, countries):
             logger.warning(warning)
             warnings.append(warning)
             continue
-        go_alert, created = SurgeAlert.objects.get_or_create(molnix_id=position['id'])
-        # We set all Alerts coming from Molnix to RR / Alert
-        go_alert.atype = SurgeAlertType.RAPID_RESPONSE
-        go_alert.category = SurgeAlertCategory.ALERT
-        # print(json.dumps(position, indent=2))
-        go_alert.molnix_id = position['id']
-        go_alert.message = position['name']
-        go_alert.molnix_status = position['status']
-        go_alert.event = event
-        go_alert.country = country
-        go_alert.opens = get_datetime(position['opens'])
-        go_alert.closes = get_datetime(position['closes'])
-        go_alert.start = get_datetime(position['start'])
-        go_alert.end = get_datetime(position['end'])
-        go_alert.is_active = position['status'] == 'active'
-        go_alert.save()
-        add_tags_to_obj(go_alert, position['tags'])
-        if created:
-            successful_creates +=1
-        else:
-            successful_updates += 1
+        go_alert = existing_alerts.get(position['id'])
+        if go_alert is None:
+            # NOTE: bulk_create doesn't call SurgeAlert.save, created_at and is_stood_down are set here
+            go_alert = existing_alerts[position['id']] = SurgeAlert(molnix_id=position['id'], created_at=now)
+            new_alerts.append(go_alert)
+        changed = set_changed_values(go_alert, {
+            # We set all Alerts coming from Molnix to RR / Alert
+            'atype': SurgeAlertType.RAPID_RESPONSE,
+            'category': SurgeAlertCategory.ALERT,
+            'message': position['name'],
+            'molnix_status': position['status'],
+            'is_stood_down': position['status'] == 'unfilled',
+            'event_id': event.id,
+            'country_id': country.id,
+            'opens': get_datetime(position['opens']),
+            'closes': get_datetime(position['closes']),
+            'start': get_datetime(position['start']),
+            'end': get_datetime(position['end']),
+            'is_active': position['status'] == 'active',
+        })
+        if go_alert.pk is not None:
+            synced_alert_ids.add(go_alert.pk)
+            if changed:
+                changed_alerts[go_alert.pk] = go_alert
+        alert_tags[position['id']] = (go_alert, position['tags'])
+
+    update_fields = get_update_fields(SurgeAlert, SURGE_ALERT_FIELDS)
+    SurgeAlert.objects.bulk_create(new_alerts)
+    SurgeAlert.objects.bulk_update(changed_alerts.values(), update_fields)
+    tags_changed = set_molnix_tags(SurgeAlert, alert_tags.values())
 
     # Find existing active alerts that are not in the current list from Molnix
-    existing_alerts = SurgeAlert.objects.filter(is_active=True).exclude(molnix_id__isnull=True)
-    existing_alert_ids = [e.molnix_id for e in existing_alerts]
-    inactive_alerts = list(set(existing_alert_ids) - set(molnix_ids))
+    inactive_alerts = list(
+        SurgeAlert.objects.filter(is_active=True, molnix_id__isnull=False).exclude(molnix_id__in=molnix_ids)
+    )
 
     # Mark alerts that are no longer in Molnix as inactive
-    for alert in SurgeAlert.objects.filter(molnix_id__in=inactive_alerts):
+    for alert in inactive_alerts:
         # We need to check the position ID in Molnix
         # If the status is "unfilled", we don't mark the position as inactive,
         # just set status to unfilled
@@ -394,16 +619,19 @@ def sync_open_positions(molnix_positions, molnix_api, countries):
             alert.molnix_status = position['status']
         else:
             alert.is_active = False
-        alert.save()
+        alert.is_stood_down = alert.molnix_status == 'unfilled'
+    SurgeAlert.objects.bulk_update(inactive_alerts, ['molnix_status', 'is_stood_down', 'is_active'])
+
+    # Bulk changes don't send post_save, the Elasticsearch (typeahead) index is synced here (see api.receivers)
+    es_sync_alerts = {alert.pk: alert for alert in [*new_alerts, *changed_alerts.values(), *inactive_alerts]}
+    enqueue_many(OutboxEvent.Topic.ES_SYNC, list(es_sync_alerts.values()), lambda alert: {'es_id': alert.es_id()})
 
     marked_inactive = len(inactive_alerts)
-    messages = [
-        'Successfully created: %d' % successful_creates,
-        'Successfully updated: %d' % successful_updates,
-        'Marked inactive: %d' % marked_inactive,
-        'No of Warnings: %d' % len(warnings)
-    ]
-    return messages, warnings, successful_creates
+    messages = get_changes_messages(
+        len(new_alerts), len(changed_alerts), len(synced_alert_ids) - len(changed_alerts),
+        marked_inactive, tags_changed, warnings,
+    )
+    return messages, warnings, len(new_alerts)
 
 class Command(BaseCommand):
     help = "Sync data from Molnix API to GO db"
@@ -439,21 +667,29 @@ class Command(BaseCommand):
             return
 
         try:
-            logger.info("Processing tags")
-            used_tags = get_unique_tags(deployments, open_positions)
-            add_tags(used_tags, molnix)  # FIXME 2nd arg: a workaround to be able to get the group details inside.
-            logger.info("Processed tags, syncing positions")
-            positions_messages, positions_warnings, positions_created = sync_open_positions(open_positions, molnix, countries)
-            logger.info("Synced positions, syncing deployments")
-            deployments_messages, deployments_warnings, deployments_created = sync_deployments(deployments, molnix, countries)
-            logger.info("Synced deployments)")
+            # Nothing is applied if any of the steps fails
+            with transaction.atomic():
+                logger.info("Processing tags")
+                used_tags = get_unique_tags(deployments, open_positions)
+                # FIXME 2nd arg: a workaround to be able to get the group details inside.
+                tags_changed = add_tags(used_tags, molnix)
+                logger.info("Processed tags (%d changed), syncing positions" % tags_changed)
+                positions_messages, positions_warnings, positions_created = sync_open_positions(open_positions, molnix, countries)
+                logger.info("Synced positions, syncing deployments")
+                deployments_messages, deployments_warnings, deployments_created = sync_deployments(deployments, molnix, countries)
+                logger.info("Synced deployments)")
         except Exception as ex:
             msg = 'Unknown Error occurred: %s' % str(ex)
             logger.error(msg)
             create_cron_record(CRON_NAME, msg, CronJobStatus.ERRONEOUS)
             return
 
-        msg = get_status_message(positions_messages, deployments_messages, positions_warnings, deployments_warnings)
+        # Bulk changes don't send post_save (see api.receivers)
+        for model in (MolnixTag, MolnixTagGroup, SurgeAlert, PersonnelDeployment, Personnel):
+            bump_cache_generation(model)
+
+        msg = 'Molnix tags changed: %d\n\n' % tags_changed
+        msg += get_status_message(positions_messages, deployments_messages, positions_warnings, deployments_warnings)
         num_records = positions_created + deployments_created
         has_warnings = len(positions_warnings) > 0 or len(deployments_warnings) > 0
         cron_status = CronJobStatus.WARNED if has_warnings else CronJobStatus.SUCCESSFUL
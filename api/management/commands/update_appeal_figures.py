@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from api.models import DailyAppealFigures
+from api.logger import logger
+
+
+class Command(BaseCommand):
+    help = 'Computes the daily key figures rollup (DailyAppealFigures) of past days, e.g. to backfill historic `date=` queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', required=True, help='First day to compute (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Last day to compute (YYYY-MM-DD), defaults to yesterday')
+
+    @staticmethod
+    def _parse_date(value, name):
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise CommandError(f'{name} should be a valid date (YYYY-MM-DD)')
+        return day
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        start_day = self._parse_date(options['start_date'], '--start-date')
+        end_day = today - timedelta(days=1)
+        if options['end_date']:
+            end_day = self._parse_date(options['end_date'], '--end-date')
+        # The current day is maintained by ingest_appeals
+        end_day = min(end_day, today - timedelta(days=1))
+        if start_day > end_day:
+            raise CommandError('Nothing to compute, --start-date should be before --end-date and today')
+
+        day = start_day
+        while day <= end_day:
+            # Same moment used by AggregateHeaderFigures for `date=YYYY-MM-DD`
+            DailyAppealFigures.update_for_date(DailyAppealFigures.get_day_start(day))
+            day += timedelta(days=1)
+        logger.info(f'Computed key figures from {start_day} to {end_day}')
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.18 on 2023-06-20 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0171_merge_20230614_0818'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAppealFigures',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('active_drefs', models.IntegerField(null=True, verbose_name='active DREFs')),
+                ('active_appeals', models.IntegerField(null=True, verbose_name='active appeals')),
+                ('total_appeals', models.IntegerField(null=True, verbose_name='total appeals')),
+                ('target_population', models.BigIntegerField(null=True, verbose_name='target population')),
+                ('amount_requested', models.DecimalField(decimal_places=2, max_digits=18, null=True, verbose_name='amount requested')),
+                ('amount_requested_dref_included', models.DecimalField(decimal_places=2, max_digits=18, null=True, verbose_name='amount requested (DREF included)')),
+                ('amount_funded', models.DecimalField(decimal_places=2, max_digits=18, null=True, verbose_name='amount funded')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('country', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.country', verbose_name='country')),
+                ('region', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.region', verbose_name='region')),
+            ],
+            options={
+                'verbose_name': 'daily appeal figures',
+                'verbose_name_plural': 'daily appeal figures',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyappealfigures',
+            index=models.Index(fields=['date', 'country'], name='api_dailyap_date_f2d792_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyappealfigures',
+            index=models.Index(fields=['date', 'region'], name='api_dailyap_date_4e2869_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.18 on 2023-06-21 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0172_dailyappealfigures'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapePdfCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.TextField(unique=True, verbose_name='url')),
+                ('pdf_type', models.CharField(max_length=10, verbose_name='pdf type')),
+                ('filename', models.TextField(blank=True, null=True, verbose_name='filename')),
+                ('status', models.IntegerField(choices=[(1, 'Extracted'), (2, 'Saved'), (3, 'Failed')], verbose_name='status')),
+                ('data', models.JSONField(blank=True, null=True, verbose_name='data')),
+                ('attempts', models.IntegerField(default=0, verbose_name='attempts')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='error')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'scrape pdf checkpoint',
+                'verbose_name_plural': 'scrape pdf checkpoints',
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.18 on 2023-07-05 10:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0173_scrapepdfcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(choices=[('es_sync', 'Elasticsearch sync'), ('erp_push', 'ERP push'), ('reversion_log', 'Reversion log')], max_length=20, verbose_name='topic')),
+                ('model', models.CharField(max_length=100, verbose_name='model')),
+                ('object_id', models.CharField(max_length=100, verbose_name='object id')),
+                ('payload', models.JSONField(blank=True, null=True, verbose_name='payload')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('available_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='available at')),
+                ('attempts', models.IntegerField(default=0, verbose_name='attempts')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='last error')),
+            ],
+            options={
+                'verbose_name': 'outbox event',
+                'verbose_name_plural': 'outbox events',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.18 on 2023-07-12 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0174_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyappealfigures',
+            name='as_of',
+            field=models.DateTimeField(null=True, verbose_name='as of'),
+        ),
+    ]
@@ -2,6 +2,9 @@ import reversion
 from django.utils.translation import gettext_lazy as _
 # from django.db import models
 from django.contrib.gis.db import models
+from django.db import transaction
+from django.db.models import Q, F, Case, When, Count, Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
 # from django.db.models import Prefetch
@@ -257,6 +260,25 @@ class District(models.Model):
         verbose_name = _('district')
         verbose_name_plural = _('districts')
 
+    def indexing(self):
+        return {
+            'id': self.id,
+            'event_id': None,
+            'type': 'district',
+            'name': self.name,
+            'keyword': None,
+            'visibility': None,
+            'ns': self.country_id,
+            'body': '%s %s' % (
+                self.name,
+                getattr(self.country, 'name', None),
+            ),
+            'date': None
+        }
+
+    def es_id(self):
+        return 'district-%s' % self.id
+
     def __str__(self):
         country_name = self.country.name if self.country else ''
         return f'{country_name} - {self.name}'
@@ -1018,6 +1040,146 @@ class AppealHistory(models.Model):
         return self.aid
 
 
+def get_appeal_figures_aggregates(date):
+    """ Key figures (see api.views.AggregateHeaderFigures) of the AppealHistory records valid at the given date """
+    is_active = Q(end_date__gt=date) & Q(start_date__lt=date)
+    is_appeal = Q(atype=AppealType.APPEAL) | Q(atype=AppealType.INTL)
+    return dict(
+        # Active Appeals with DREF type
+        active_drefs=Count(Case(When(Q(atype=AppealType.DREF) & is_active, then=1), output_field=models.IntegerField())),
+        # Active Appeals with type Emergency Appeal or International Appeal
+        active_appeals=Count(Case(When(is_appeal & is_active, then=1), output_field=models.IntegerField())),
+        # Total Appeals count which are not DREF
+        total_appeals=Count(Case(When(is_appeal, then=1), output_field=models.IntegerField())),
+        # Active Appeals' target population
+        target_population=Sum(
+            Case(When(is_active, then=F('num_beneficiaries')), output_field=models.IntegerField())
+        ),
+        # Active Appeals' requested amount, which are not DREF
+        amount_requested=Sum(
+            Case(When(is_appeal & is_active, then=F('amount_requested')), output_field=models.IntegerField())
+        ),
+        amount_requested_dref_included=Sum(
+            Case(When(is_active, then=F('amount_requested')), output_field=models.IntegerField())
+        ),
+        # Active Appeals' funded amount, which are not DREF
+        amount_funded=Sum(
+            Case(When(is_appeal & is_active, then=F('amount_funded')), output_field=models.IntegerField())
+        ),
+    )
+
+
+class DailyAppealFigures(models.Model):
+    """
+    Precomputed AppealHistory key figures of a day (AggregateHeaderFigures), maintained by ingest_appeals
+    Rows with country are per country, rows with only region are per region, rows without both are global
+    """
+    date = models.DateField(verbose_name=_('date'))
+    country = models.ForeignKey(Country, verbose_name=_('country'), null=True, blank=True, on_delete=models.CASCADE)
+    region = models.ForeignKey(Region, verbose_name=_('region'), null=True, blank=True, on_delete=models.CASCADE)
+    active_drefs = models.IntegerField(verbose_name=_('active DREFs'), null=True)
+    active_appeals = models.IntegerField(verbose_name=_('active appeals'), null=True)
+    total_appeals = models.IntegerField(verbose_name=_('total appeals'), null=True)
+    target_population = models.BigIntegerField(verbose_name=_('target population'), null=True)
+    amount_requested = models.DecimalField(verbose_name=_('amount requested'), max_digits=18, decimal_places=2, null=True)
+    amount_requested_dref_included = models.DecimalField(
+        verbose_name=_('amount requested (DREF included)'), max_digits=18, decimal_places=2, null=True
+    )
+    amount_funded = models.DecimalField(verbose_name=_('amount funded'), max_digits=18, decimal_places=2, null=True)
+    # Moment of the figures: 00:00 (UTC) of the date, or the time of the latest ingest_appeals run of the date
+    as_of = models.DateTimeField(verbose_name=_('as of'), null=True)
+    updated_at = models.DateTimeField(verbose_name=_('updated at'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('daily appeal figures')
+        verbose_name_plural = _('daily appeal figures')
+        indexes = [
+            models.Index(fields=['date', 'country']),
+            models.Index(fields=['date', 'region']),
+        ]
+
+    def __str__(self):
+        return f'{self.date} {self.country or self.region or "Global"}'
+
+    @staticmethod
+    def get_day_start(day):
+        return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+
+    @classmethod
+    def update_for_date(cls, date):
+        """
+        (Re)computes the figures as they are at the given datetime
+        A day keeps two sets of figures: at 00:00, the moment used by AggregateHeaderFigures for `date=YYYY-MM-DD`,
+        and at the latest ingest_appeals run (the current figures), which replaces the previous run's ones
+        """
+        day = date.date()
+        all_appealhistory = AppealHistory.objects.filter(
+            valid_from__lt=date, valid_to__gt=date, appeal__code__isnull=False
+        )
+        aggregates = get_appeal_figures_aggregates(date)
+
+        figures = [
+            cls(date=day, as_of=date, **all_appealhistory.aggregate(**aggregates)),
+            *[
+                cls(date=day, as_of=date, region_id=data.pop('country__region'), **data)
+                for data in all_appealhistory.filter(country__region__isnull=False)
+                .order_by().values('country__region').annotate(**aggregates)
+            ],
+            *[
+                cls(date=day, as_of=date, country_id=data.pop('country'), **data)
+                for data in all_appealhistory.filter(country__isnull=False)
+                .order_by().values('country').annotate(**aggregates)
+            ],
+        ]
+        day_start = cls.get_day_start(day)
+        existing_figures = cls.objects.filter(date=day)
+        if date == day_start:
+            existing_figures = existing_figures.filter(as_of=day_start)
+        else:
+            existing_figures = existing_figures.exclude(as_of=day_start)
+        with transaction.atomic():
+            existing_figures.delete()
+            cls.objects.bulk_create(figures)
+        return figures
+
+    @classmethod
+    def get_figures(cls, day, latest=False, iso3=None, country=None, region=None):
+        """
+        Returns the figures of the day at 00:00, or its latest figures (latest=True)
+        None if they are not computed
+        """
+        day_start = cls.get_day_start(day)
+        qs = cls.objects.filter(date=day, as_of__isnull=False)
+        if latest:
+            qs = qs.exclude(as_of=day_start)
+        else:
+            qs = qs.filter(as_of=day_start)
+        if not qs.filter(country__isnull=True, region__isnull=True).exists():
+            return None
+        if iso3 or country:
+            qs = qs.filter(country__isnull=False)
+            if iso3:
+                qs = qs.filter(country__iso3__iexact=iso3)
+            if country:
+                qs = qs.filter(country__id=country)
+            if region:
+                qs = qs.filter(country__region__id=region)
+        elif region:
+            qs = qs.filter(country__isnull=True, region__id=region)
+        else:
+            qs = qs.filter(country__isnull=True, region__isnull=True)
+        # Same payload as the live figures: counts are 0 and amounts are integers (null without active appeals)
+        return qs.aggregate(
+            active_drefs=Coalesce(Sum('active_drefs'), 0),
+            active_appeals=Coalesce(Sum('active_appeals'), 0),
+            total_appeals=Coalesce(Sum('total_appeals'), 0),
+            **{
+                field: Sum(field, output_field=models.BigIntegerField())
+                for field in ('target_population', 'amount_requested', 'amount_requested_dref_included', 'amount_funded')
+            },
+        )
+
+
 @reversion.register()
 class AppealDocument(models.Model):
     # Don't set `auto_now_add` so we can modify it on save
@@ -1994,6 +2156,59 @@ class CronJob(models.Model):
 # grep -rl CronJob --exclude-dir=__pycache__ --exclude-dir=main --exclude-dir=migrations --exclude=CHANGELOG.md *
 
 
+class ScrapePdfCheckpoint(models.Model):
+    """ Progress of each document handled by scrape_pdfs, used to resume an interrupted run """
+
+    class Status(models.IntegerChoices):
+        EXTRACTED = 1, _('Extracted')
+        SAVED = 2, _('Saved')
+        FAILED = 3, _('Failed')
+
+    url = models.TextField(verbose_name=_('url'), unique=True)
+    pdf_type = models.CharField(verbose_name=_('pdf type'), max_length=10)
+    filename = models.TextField(verbose_name=_('filename'), null=True, blank=True)
+    status = models.IntegerField(verbose_name=_('status'), choices=Status.choices)
+    # Extracted meta/sector fields, kept until they are saved
+    data = models.JSONField(verbose_name=_('data'), null=True, blank=True)
+    attempts = models.IntegerField(verbose_name=_('attempts'), default=0)
+    error = models.TextField(verbose_name=_('error'), null=True, blank=True)
+    updated_at = models.DateTimeField(verbose_name=_('updated at'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('scrape pdf checkpoint')
+        verbose_name_plural = _('scrape pdf checkpoints')
+
+    def __str__(self):
+        return f'{self.pdf_type} | {self.get_status_display()} | {self.url}'
+
+
+class OutboxEvent(models.Model):
+    """ Side effect of a model change (search index, ERP, history log), written in the same transaction (see api.outbox) """
+
+    class Topic(models.TextChoices):
+        ES_SYNC = 'es_sync', _('Elasticsearch sync')
+        ERP_PUSH = 'erp_push', _('ERP push')
+        REVERSION_LOG = 'reversion_log', _('Reversion log')
+
+    topic = models.CharField(verbose_name=_('topic'), max_length=20, choices=Topic.choices)
+    # app_label.model_name and pk of the changed object, events of the same object are coalesced
+    model = models.CharField(verbose_name=_('model'), max_length=100)
+    object_id = models.CharField(verbose_name=_('object id'), max_length=100)
+    payload = models.JSONField(verbose_name=_('payload'), null=True, blank=True)
+    created_at = models.DateTimeField(verbose_name=_('created at'), auto_now_add=True)
+    # Retries are delayed (backoff) using available_at
+    available_at = models.DateTimeField(verbose_name=_('available at'), default=timezone.now, db_index=True)
+    attempts = models.IntegerField(verbose_name=_('attempts'), default=0)
+    last_error = models.TextField(verbose_name=_('last error'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('outbox event')
+        verbose_name_plural = _('outbox events')
+
+    def __str__(self):
+        return f'{self.topic} | {self.model} | {self.object_id}'
+
+
 class AuthLog(models.Model):
     action = models.CharField(verbose_name=_('action'), max_length=64)
     username = models.CharField(verbose_name=_('username'), max_length=256, null=True)
@@ -1,6 +1,7 @@
-import requests
 import json
 
+from main.fetch import fetch
+
 class MolnixApi:
 
     access_token = None
@@ -18,9 +19,10 @@ class MolnixApi:
         if self.access_token:
             headers['Authorization'] = 'Bearer %s' % self.access_token
         if method == 'GET':
-            res = requests.get(url, params=params, headers=headers)
+            # Personnel data, not cached
+            res = fetch(url, params=params, headers=headers, use_cache=False)
         if method == 'POST':
-            res = requests.post(url, json=params, headers=headers)
+            res = fetch(url, method='POST', json=params, headers=headers)
         if res.status_code > 300:
             raise Exception('call to %s failed' % url) #FIXME: print msg from API
         return res.json()
@@ -0,0 +1,150 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from api.logger import logger
+from .models import OutboxEvent
+
+# Events locked and handled per transaction
+OUTBOX_BATCH_SIZE = 100
+# After that many failures the event is kept (with its last_error) but not retried
+OUTBOX_MAX_ATTEMPTS = 8
+# Retry delay (seconds), doubled after each failure
+OUTBOX_RETRY_DELAY = 30
+# The drain is run a bit after the commit, the changes made meanwhile are drained (and coalesced) together
+OUTBOX_DRAIN_COUNTDOWN = 2
+OUTBOX_DRAIN_SCHEDULED_KEY = 'outbox-drain-scheduled'
+
+# topic: handler(model, object_id, payload), see register_handler
+OUTBOX_HANDLERS = {}
+
+
+def register_handler(topic):
+    """
+    Registers the handler of the topic's events, called with the model label, object id and payload of the latest event
+    of the object (the events of the same object are coalesced). Raising an error retries the event later.
+    """
+    def _register(func):
+        OUTBOX_HANDLERS[topic] = func
+        return func
+    return _register
+
+
+def get_outbox_object(model, object_id):
+    """ Current state of the event's object, None if it was deleted """
+    model_class = apps.get_model(model)
+    return model_class._default_manager.filter(pk=object_id).first()
+
+
+def schedule_drain():
+    from .tasks import drain_outbox
+
+    try:
+        # Only one drain is scheduled per countdown
+        if cache.add(OUTBOX_DRAIN_SCHEDULED_KEY, True, timeout=OUTBOX_DRAIN_COUNTDOWN):
+            drain_outbox.apply_async(countdown=OUTBOX_DRAIN_COUNTDOWN)
+    except Exception as ex:
+        # The events are kept, the drain_outbox cronjob handles them
+        logger.error(f'Failed to schedule the outbox drain, error: {str(ex)[:512]}')
+
+
+def enqueue(topic, instance, payload=None):
+    """ Writes an outbox event about the instance in the current transaction, it is drained after the commit """
+    OutboxEvent.objects.create(
+        topic=topic,
+        model=instance._meta.label_lower,
+        object_id=str(instance.pk),
+        payload=payload,
+    )
+    transaction.on_commit(schedule_drain)
+
+
+def enqueue_many(topic, instances, get_payload=None):
+    """ enqueue for the instances changed in bulk (no post_save), get_payload(instance) gives the payload of each """
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(
+            topic=topic,
+            model=instance._meta.label_lower,
+            object_id=str(instance.pk),
+            payload=get_payload and get_payload(instance),
+        )
+        for instance in instances
+    ])
+    if instances:
+        transaction.on_commit(schedule_drain)
+
+
+def get_outbox_lag():
+    """ Seconds since the oldest pending event was written (0 if there is none) """
+    oldest = OutboxEvent.objects.filter(
+        attempts__lt=OUTBOX_MAX_ATTEMPTS,
+    ).aggregate(oldest=Min('created_at'))['oldest']
+    if oldest is None:
+        return 0
+    return (timezone.now() - oldest).total_seconds()
+
+
+def drain_batch(batch_size):
+    """
+    Handles a batch of the available events, locked so that concurrent drains skip them.
+    Returns the number of events, handled objects (coalesced events) and failed objects.
+    """
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True).filter(
+                available_at__lte=timezone.now(),
+                attempts__lt=OUTBOX_MAX_ATTEMPTS,
+            ).order_by('id')[:batch_size]
+        )
+        events_by_object = defaultdict(list)
+        for event in events:
+            events_by_object[(event.topic, event.model, event.object_id)].append(event)
+
+        done_ids = []
+        failed_events = []
+        for (topic, model, object_id), object_events in events_by_object.items():
+            latest = object_events[-1]
+            try:
+                # A failed handler only rolls back its own changes
+                with transaction.atomic():
+                    OUTBOX_HANDLERS[topic](model, object_id, latest.payload)
+            except Exception as ex:
+                logger.error(f'Outbox event failed ({latest}), error: {str(ex)[:512]}')
+                # Only the latest event of the object is kept for the retry
+                done_ids.extend(event.id for event in object_events[:-1])
+                latest.attempts = max(event.attempts for event in object_events) + 1
+                latest.available_at = timezone.now() + timedelta(seconds=OUTBOX_RETRY_DELAY * 2 ** (latest.attempts - 1))
+                latest.last_error = str(ex)
+                failed_events.append(latest)
+            else:
+                done_ids.extend(event.id for event in object_events)
+
+        OutboxEvent.objects.filter(id__in=done_ids).delete()
+        OutboxEvent.objects.bulk_update(failed_events, ['attempts', 'available_at', 'last_error'])
+    return len(events), len(events_by_object) - len(failed_events), len(failed_events)
+
+
+def drain(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Handles the available outbox events, batch by batch.
+    Returns the stats, lag: seconds the oldest pending event was waiting when the drain started.
+    """
+    stats = {
+        'lag': get_outbox_lag(),
+        'events': 0,
+        'handled': 0,
+        'failed': 0,
+    }
+    while True:
+        events_count, handled_count, failed_count = drain_batch(batch_size)
+        stats['events'] += events_count
+        stats['handled'] += handled_count
+        stats['failed'] += failed_count
+        if events_count < batch_size:
+            break
+    return stats
@@ -2,21 +2,22 @@ import json
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
-from django.db import transaction
 from django.db.models import Q
-from django.db.models.signals import pre_delete, pre_save, post_save, post_delete
+from django.db.models.signals import pre_delete, pre_save, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.utils import timezone
 
-from reversion.models import Version
+from reversion.models import Revision, Version
 from reversion.signals import post_revision_commit
-from api.models import ReversionDifferenceLog, Event, Country, FieldReport
+from api.models import ReversionDifferenceLog, Event, Country, District, FieldReport, OutboxEvent
+from api.outbox import enqueue, get_outbox_object, register_handler
 from middlewares.middlewares import get_username
-from utils.elasticsearch import create_es_index, update_es_index, delete_es_index
+from middlewares.cache import bump_cache_generation
+from utils.elasticsearch import delete_es_index_by_id, index_es_index
 from utils.erp import push_fr_data
-from api.logger import logger
 from .models import Appeal, AppealHistory, AppealFilter
 from main.suspend_receivers import suspendingreceiver
+from notifications.models import SurgeAlert
 
 
 MODEL_TYPES = {
@@ -111,11 +112,22 @@ def create_global_reversion_log(versions, revision):
 
 @receiver(post_revision_commit)
 def post_revision_commit_receiver(sender, revision, versions, **kwargs):
-    transaction.on_commit(lambda: create_global_reversion_log(versions, revision))
+    enqueue(OutboxEvent.Topic.REVERSION_LOG, revision)
+
+
+@register_handler(OutboxEvent.Topic.REVERSION_LOG)
+def handle_revision_log(model, object_id, payload):
+    revision = Revision.objects.filter(pk=object_id).select_related('user').first()
+    if revision is not None:
+        create_global_reversion_log(revision.version_set.order_by('id'), revision)
 
 
 @receiver(pre_delete)
 def log_deletion(sender, instance, using, **kwargs):
+    # Drained outbox events are not logged
+    if sender is OutboxEvent:
+        return
+
     model_name = None
     instance_type = instance.__class__.__name__
 
@@ -136,67 +148,98 @@ def log_deletion(sender, instance, using, **kwargs):
     )
 
     # ElasticSearch to also delete the index if a record was deleted
-    delete_es_index(instance)
+    if hasattr(instance, 'es_id'):
+        enqueue(OutboxEvent.Topic.ES_SYNC, instance, {'es_id': instance.es_id()})
 
 
 # NOTE: Adding this to disable indexing in testcases
-@suspendingreceiver(pre_save)
+@suspendingreceiver(pre_save, sender=Event)
 def remove_child_events_from_es(sender, instance, using, **kwargs):
     ''' Handle Emergency Elasticsearch indexes '''
-    model = instance.__class__.__name__
-    try:
-        if model == 'Event':
-            curr_record = Event.objects.filter(id=instance.id).first()
-            # If new record, do nothing, index_and_notify should handle it
-            if curr_record is None:
-                return
-
-            if curr_record.parent_event is None and instance.parent_event:
-                # Delete ES record if Emergency became a child
-                delete_es_index(instance)
-            elif curr_record.parent_event and instance.parent_event is None:
-                # Add back ES record if Emergency became a parent (index_elasticsearch.py)
-                create_es_index(instance)
-        elif model == 'Country':
-            curr_record = Country.objects.filter(id=instance.id).first()
-            if instance.in_search:
-                if not curr_record:
-                    create_es_index(instance)
-                else:
-                    if not curr_record.in_search and instance.in_search:
-                        create_es_index(instance)
-                    elif curr_record.in_search and not instance.in_search:
-                        delete_es_index(instance)
-                    else:
-                        update_es_index(instance)
-            else:
-                delete_es_index(instance)
-    except Exception as ex:
-        logger.error(f'Failed to index a Country, error: {str(ex)[:512]}')
+    # If new record, do nothing, index_and_notify should handle it
+    if instance.id is None:
+        return
+    curr_record = Event.objects.filter(id=instance.id).values('parent_event_id').first()
+    if curr_record is None:
+        return
+    # Delete ES record if Emergency became a child, add it back if Emergency became a parent (see handle_es_sync)
+    if (curr_record['parent_event_id'] is None) != (instance.parent_event_id is None):
+        enqueue(OutboxEvent.Topic.ES_SYNC, instance, {'es_id': instance.es_id()})
+
+
+@suspendingreceiver(post_save, sender=Country)
+def update_country_es_index(sender, instance, **kwargs):
+    enqueue(OutboxEvent.Topic.ES_SYNC, instance, {'es_id': instance.es_id()})
+
+
+# NOTE: SurgeAlerts synced from Molnix are saved in bulk, sync_molnix enqueues them (see enqueue_many)
+@suspendingreceiver(post_save, sender=District)
+@suspendingreceiver(post_save, sender=SurgeAlert)
+def update_suggest_es_index(sender, instance, **kwargs):
+    enqueue(OutboxEvent.Topic.ES_SYNC, instance, {'es_id': instance.es_id()})
+
+
+@register_handler(OutboxEvent.Topic.ES_SYNC)
+def handle_es_sync(model, object_id, payload):
+    ''' Indexes the current state of the record (so coalesced changes are indexed once), deletes the index if it is gone '''
+    instance = get_outbox_object(model, object_id)
+    if instance is None:
+        delete_es_index_by_id(payload['es_id'])
+    elif isinstance(instance, Event) and instance.parent_event_id is not None:
+        # Child Emergencies are not indexed
+        delete_es_index_by_id(instance.es_id())
+    elif isinstance(instance, Country) and not instance.in_search:
+        delete_es_index_by_id(instance.es_id())
+    elif isinstance(instance, District) and instance.is_deprecated:
+        delete_es_index_by_id(instance.es_id())
+    elif isinstance(instance, SurgeAlert) and not instance.is_active:
+        delete_es_index_by_id(instance.es_id())
+    else:
+        index_es_index(instance)
 
 
 # Needs post_save because if a new Field Report is not mapped to an Emergency it will create one
-@receiver(post_save)
+@receiver(post_save, sender=FieldReport)
 def handle_fr_for_erp(sender, instance, using, **kwargs):
+    enqueue(OutboxEvent.Topic.ERP_PUSH, instance)
+
+
+@register_handler(OutboxEvent.Topic.ERP_PUSH)
+def handle_erp_push(model, object_id, payload):
     '''
     If a Field Report is created/updated and Request for International
     Assisstance is checked for any of the Event's Field Reports then
     update ERP with the data, calling a middleware microservice
     '''
+    instance = get_outbox_object(model, object_id)
+    if instance is None:
+        return
 
-    if isinstance(instance, FieldReport):
-        # TODO: maybe add a check, and only send request if anything has changed
-        if instance.ns_request_assistance:
-            push_fr_data(instance)
-            return
+    # TODO: maybe add a check, and only send request if anything has changed
+    if instance.ns_request_assistance:
+        push_fr_data(instance)
+        return
 
-        req_ass_exists = FieldReport.objects.filter(
-            Q(event_id=instance.event_id) & Q(ns_request_assistance=True)
-        ).exists()
-        if not instance.ns_request_assistance and req_ass_exists:
-            # If assistance request was dropped, set retired to yes
-            push_fr_data(instance, retired=True)
-            return
+    req_ass_exists = FieldReport.objects.filter(
+        Q(event_id=instance.event_id) & Q(ns_request_assistance=True)
+    ).exists()
+    if not instance.ns_request_assistance and req_ass_exists:
+        # If assistance request was dropped, set retired to yes
+        push_fr_data(instance, retired=True)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_response_cache(sender, **kwargs):
+    ''' Drop cached API responses which depend on the changed model (middlewares.cache) '''
+    bump_cache_generation(sender)
+
+
+@receiver(m2m_changed)
+def invalidate_response_cache_m2m(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_cache_generation(instance.__class__)
+        bump_cache_generation(model)
 
 
 @receiver(post_save, sender=Appeal)
@@ -0,0 +1,63 @@
+import re
+from functools import lru_cache
+
+from fuzzywuzzy import fuzz
+
+# Window/key scores are shared by all the extractors (and documents) handled by the process
+SCORE_CACHE_SIZE = 2 ** 16
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern, flags=0):
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=None)
+def compile_keys_pattern(keys):
+    """
+    One case-insensitive alternation of the keys (regex patterns), used to skip the text blocks which contain
+    none of them before searching each key in order
+    """
+    return compile_pattern('|'.join(f'(?:{key})' for key in keys), re.IGNORECASE)
+
+
+@lru_cache(maxsize=SCORE_CACHE_SIZE)
+def _partial_ratio(words, search_words):
+    # NOTE: The extractors have always compared the word lists (not the joined words), keep it for the same scores
+    return fuzz.partial_ratio(list(words), list(search_words))
+
+
+def get_window_scores(words, search_words):
+    """
+    Scores of each window of len(search_words) words against search_words, computed at once for a text block
+    NOTE: The last window is not scored, as in the previous implementation
+    """
+    n = len(search_words)
+    search_words = tuple(search_words)
+    return [
+        _partial_ratio(tuple(words[index:index + n]), search_words)
+        for index in range(0, len(words) - n)
+    ]
+
+
+def find_best_window(text, words, search_words, ratio):
+    """
+    Returns (score, start, end, window words) of the window scoring best (more than ratio) which is also found
+    in the text using its words as a pattern, None if there isn't any
+    """
+    best = None
+    for index, score in enumerate(get_window_scores(words, search_words)):
+        if not score > ratio:
+            continue
+        real_text = words[index:index + len(search_words)]
+        try:
+            search = re.search(' '.join(real_text), text)
+        except re.error:
+            continue
+        if search:
+            ratio = score
+            best = (score, *search.span(), real_text)
+            if ratio == 100:
+                # Nothing can score higher
+                break
+    return best
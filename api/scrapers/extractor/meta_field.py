@@ -1,16 +1,18 @@
 import re
-from fuzzywuzzy import fuzz
 from api.scrapers.config import (
     M_KEYS,
     M_EXTRACTORS,
     get_meta_misc_keys,
     # get_sector_misc_keys,
 )
+from .matching import compile_keys_pattern, compile_pattern, find_best_window
 
 
 class MetaFieldExtractor():
     def __init__(self, texts, fields):
         self.texts = texts
+        # Tokenized once, used by the fuzzy search of each key
+        self.texts_words = [text.split() for text in texts]
         self.fields = fields
         self.misc_fields = get_meta_misc_keys(fields)
         self.text_meta = {}
@@ -19,8 +21,10 @@ class MetaFieldExtractor():
 
     def find_block_for_key(self, text, index, field=None, misc=False):
         fields = M_KEYS[field] if not misc else self.misc_fields
+        if not fields or not compile_keys_pattern(tuple(fields)).search(text):
+            return
         for key in fields:
-            search = re.search(key, text, re.IGNORECASE)
+            search = compile_pattern(key, re.IGNORECASE).search(text)
             if search:
                 start, end = search.span()
                 if misc:
@@ -46,31 +50,23 @@ class MetaFieldExtractor():
         def _search(key):
             ratio = 0
             field_meta = {}
-            for text_index, text in enumerate(self.texts):
-                texts = text.split()
-                search_text = key.split()
-                search_text_n = len(search_text)
-                for index in range(0, len(texts) - search_text_n):
-                    real_text = texts[index:index+search_text_n]
-                    new_ratio = fuzz.partial_ratio(real_text, search_text)
-                    if not new_ratio > ratio:
-                        continue
-                    try:
-                        search = re.search(' '.join(real_text), text)
-                        if search:
-                            start, end = search.span()
-                            ratio = new_ratio
-                            field_meta = {
-                                'text_index': text_index,
-                                'text': text,
-                                'start_index': start,
-                                'end_index': end,
-                                'score': ratio,
-                                'real_text': real_text,
-                                'search_text': search_text,
-                            }
-                    except re.error:
-                        pass
+            search_text = key.split()
+            for text_index, (text, words) in enumerate(zip(self.texts, self.texts_words)):
+                match = find_best_window(text, words, search_text, ratio)
+                if match is None:
+                    continue
+                ratio, start, end, real_text = match
+                field_meta = {
+                    'text_index': text_index,
+                    'text': text,
+                    'start_index': start,
+                    'end_index': end,
+                    'score': ratio,
+                    'real_text': real_text,
+                    'search_text': search_text,
+                }
+                if ratio == 100:
+                    break
             return field_meta
 
         def search(key, field_meta):
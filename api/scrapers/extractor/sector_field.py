@@ -1,5 +1,4 @@
 import re
-from fuzzywuzzy import fuzz
 # from common import json_preety
 from api.scrapers.config import (
     S_KEYS,
@@ -7,11 +6,25 @@ from api.scrapers.config import (
     # M_EXTRACTORS,
     # get_sector_misc_keys,
 )
+from .matching import compile_keys_pattern, compile_pattern, find_best_window
+
+# '<sector key> <field key>' patterns of each sector
+SECTOR_FIELD_KEYS = {
+    sector: tuple(
+        '{} {}'.format(sector_key, field_key)
+        for sector_key in S_KEYS[sector]
+        for field in SF_KEYS
+        for field_key in SF_KEYS[field]
+    )
+    for sector in S_KEYS
+}
 
 
 class SectorFieldExtractor():
     def __init__(self, texts, sectors, fields):
         self.texts = texts
+        # Tokenized once, used by the fuzzy searches
+        self.texts_words = {text: text.split() for text in texts}
         self.sectors = sectors
         self.fields = fields
         # self.misc_fields = get_sector_misc_keys(sectors, fields)
@@ -26,13 +39,15 @@ class SectorFieldExtractor():
         """
         for index, text in enumerate(self.texts):
             for sector in S_KEYS:
+                if not compile_keys_pattern(SECTOR_FIELD_KEYS[sector]).search(text):
+                    continue
                 for sector_key in S_KEYS[sector]:
                     for field in SF_KEYS:
                         for field_key in SF_KEYS[field]:
-                            search = re.search(
+                            search = compile_pattern(
                                 '{} {}'.format(sector_key, field_key),
-                                text, re.IGNORECASE
-                            )
+                                re.IGNORECASE
+                            ).search(text)
                             if search:
                                 start, end = search.span()
                                 if not self.sector_meta.get(sector_key):
@@ -54,33 +69,29 @@ class SectorFieldExtractor():
         def _search(key):
             ratio = 0
             sector_meta = {}
+            search_texts = [
+                '{} {}'.format(key, field_key).split()
+                for field in SF_KEYS
+                for field_key in SF_KEYS[field]
+            ]
             for text_index, text in enumerate(self.texts):
-                texts = text.split()
-                for field in SF_KEYS:
-                    for field_key in SF_KEYS[field]:
-                        search_text = '{} {}'.format(key, field_key).split()
-                        search_text_n = len(search_text)
-                        for index in range(0, len(texts) - search_text_n):
-                            real_text = texts[index:index+search_text_n]
-                            new_ratio = fuzz.partial_ratio(real_text, search_text)
-                            if not new_ratio > ratio:
-                                continue
-                            try:
-                                search = re.search(' '.join(real_text), text)
-                                if search:
-                                    start, end = search.span()
-                                    ratio = new_ratio
-                                    sector_meta = {
-                                        'text_index': text_index,
-                                        'text': text,
-                                        'start_index': start,
-                                        'end_index': end,
-                                        'score': ratio,
-                                        'real_text': real_text,
-                                        'search_text': search_text,
-                                    }
-                            except re.error:
-                                pass
+                for search_text in search_texts:
+                    match = find_best_window(text, self.texts_words[text], search_text, ratio)
+                    if match is None:
+                        continue
+                    ratio, start, end, real_text = match
+                    sector_meta = {
+                        'text_index': text_index,
+                        'text': text,
+                        'start_index': start,
+                        'end_index': end,
+                        'score': ratio,
+                        'real_text': real_text,
+                        'search_text': search_text,
+                    }
+                    if ratio == 100:
+                        # Nothing can score higher
+                        return sector_meta
             return sector_meta
 
         def search(key, sector_meta):
@@ -107,7 +118,7 @@ class SectorFieldExtractor():
                 self.field_meta[sector] = {}
             for field in SF_KEYS:
                 for field_key in SF_KEYS[field]:
-                    search = re.search(field_key, text, re.IGNORECASE)
+                    search = compile_pattern(field_key, re.IGNORECASE).search(text)
                     if search:
                         start, end = search.span()
                         if not self.field_meta.get(sector).get(field):
@@ -123,28 +134,17 @@ class SectorFieldExtractor():
                     ratio = 0
                     field_meta = {}
                     for field_key in SF_KEYS[field]:
-                        search_text = field_key.split()
-                        search_text_n = len(search_text)
-                        texts = text.split()
-                        for index in range(0, len(texts) - search_text_n):
-                            real_text = texts[index:index+search_text_n]
-                            new_ratio = fuzz.partial_ratio(real_text, search_text)
-                            if not new_ratio > ratio:
-                                continue
-                            try:
-                                search = re.search(' '.join(real_text), text)
-                                if search:
-                                    start, end = search.span()
-                                    ratio = new_ratio
-                                    field_meta = {
-                                        'text': text,
-                                        'start_index': start,
-                                        'end_index': end,
-                                        'score': new_ratio,
-                                        'sector_score': sector_score,
-                                    }
-                            except re.error:
-                                pass
+                        match = find_best_window(text, self.texts_words[text], field_key.split(), ratio)
+                        if match is None:
+                            continue
+                        ratio, start, end, _ = match
+                        field_meta = {
+                            'text': text,
+                            'start_index': start,
+                            'end_index': end,
+                            'score': ratio,
+                            'sector_score': sector_score,
+                        }
                     if field_meta.get('score'):
                         self.field_meta[sector][field] = field_meta
 
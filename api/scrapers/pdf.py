@@ -0,0 +1,135 @@
+"""
+PDF parsing and field extraction used by api/management/commands/scrape_pdfs.py
+NOTE: Keep this module free of Django imports, it runs in the (spawned) worker processes of the scraping pipeline.
+"""
+import re
+import time
+from io import BytesIO
+
+from bs4 import BeautifulSoup as bsoup
+from pdfminer.converter import HTMLConverter, PDFPageAggregator
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.layout import LAParams, LTChar, LTFigure, LTText, LTTextBox, LTTextLine
+from pdfminer.pdfpage import PDFPage
+from tidylib import tidy_document
+
+from api.scrapers.extractor import MetaFieldExtractor, SectorFieldExtractor
+
+# Text block added at the start of each page, the meta fields are taken from the blocks before 'Page 2'
+PAGE_MARKER = 'Page {}'
+# Pages needed by the meta fields
+META_MAXPAGES = 1
+
+
+def convert_pdf_to_html(pdf_data, maxpages=0):
+    pdf_rm = PDFResourceManager()
+    bytesio = BytesIO()
+    laparams = LAParams()
+    html_conv = HTMLConverter(pdf_rm, bytesio, codec='utf-8', laparams=laparams)
+    pdf_intr = PDFPageInterpreter(pdf_rm, html_conv)
+
+    for page in PDFPage.get_pages(pdf_data, set(), maxpages=maxpages, caching=False, check_extractable=True):
+        pdf_intr.process_page(page)
+
+    text = bytesio.getvalue().decode()
+    html, errors = tidy_document(text)
+    html = re.sub(r'\s\s+', ' ', html)
+
+    html_conv.close()
+    bytesio.close()
+
+    return html
+
+
+def convert_pdf_to_text_blocks_using_html(pdf_data, maxpages=0):
+    """ Previous implementation of convert_pdf_to_text_blocks, the text of each div of the HTML rendering """
+    html = convert_pdf_to_html(pdf_data, maxpages=maxpages)
+    soup = bsoup(html, 'html.parser')
+    texts = []
+    for div in soup.find_all('div'):
+        text = []
+        for span in div.find_all(['span', 'a']):
+            text.append(' '.join(span.get_text().split()))
+        texts.append(' '.join(text).strip())
+
+    return texts
+
+
+def _get_layout_text_blocks(item):
+    """
+    Text blocks of a LTTextBox/LTFigure, same as the HTMLConverter div (one span per font run) read by
+    convert_pdf_to_text_blocks_using_html. Nested figures are separate blocks, added after their parent.
+    """
+    runs = []
+    nested_blocks = []
+    font = None
+
+    def _add(layout_item):
+        nonlocal font
+        for child in layout_item:
+            if isinstance(child, LTChar):
+                if (child.fontname, child.size) != font:
+                    font = (child.fontname, child.size)
+                    runs.append('')
+                runs[-1] += child.get_text()
+            elif isinstance(child, LTTextLine):
+                _add(child)
+            elif isinstance(child, LTFigure):
+                # NOTE: The HTML of nested figures isn't valid (div inside a span), keep them as separate blocks
+                nested_blocks.extend(_get_layout_text_blocks(child))
+                font = None
+            elif isinstance(child, LTText) and font is not None:
+                # LTAnno (spaces and line ends) are written to the current span
+                runs[-1] += child.get_text()
+
+    _add(item)
+    return [' '.join(' '.join(run.split()) for run in runs).strip()] + nested_blocks
+
+
+def convert_pdf_to_text_blocks(pdf_data, maxpages=0):
+    """
+    Returns the text blocks (LTTextBox/LTFigure) of the PDF, each page starting with a PAGE_MARKER block
+    The text is taken straight from the pdfminer layout, without the HTML/tidy/BeautifulSoup round trip
+    """
+    pdf_rm = PDFResourceManager()
+    device = PDFPageAggregator(pdf_rm, laparams=LAParams())
+    pdf_intr = PDFPageInterpreter(pdf_rm, device)
+
+    texts = []
+    for page in PDFPage.get_pages(pdf_data, set(), maxpages=maxpages, caching=False, check_extractable=True):
+        pdf_intr.process_page(page)
+        layout = device.get_result()
+        texts.append(PAGE_MARKER.format(layout.pageid))
+        for item in layout:
+            if isinstance(item, (LTTextBox, LTFigure)):
+                texts.extend(_get_layout_text_blocks(item))
+    device.close()
+
+    return texts
+
+
+def get_meta_text_blocks(texts):
+    """ Text blocks of the first page (before the 'Page 2' marker) """
+    second_page_marker = PAGE_MARKER.format(2)
+    if second_page_marker in texts:
+        return texts[:texts.index(second_page_marker)]
+    return texts
+
+
+def extract_pdf_fields(pdf_content, meta_fields, sectors=None, sector_fields=None, use_html=False):
+    """
+    Parse and extract stage of the scraping pipeline (CPU-bound)
+    Without sectors only the first META_MAXPAGES pages are parsed
+    use_html: use the previous text extraction (convert_pdf_to_text_blocks_using_html)
+    Returns ({'meta': {...}, 'sector': {...}}, seconds)
+    """
+    start_time = time.monotonic()
+    convert = convert_pdf_to_text_blocks_using_html if use_html else convert_pdf_to_text_blocks
+    texts = convert(BytesIO(pdf_content), maxpages=0 if sectors else META_MAXPAGES)
+    m_extractor = MetaFieldExtractor(get_meta_text_blocks(texts), meta_fields)
+    m_data_with_score, m_data = m_extractor.extract_fields()
+    s_data = {}
+    if sectors:
+        s_extractor = SectorFieldExtractor(texts, sectors, sector_fields)
+        s_data_with_score, s_data = s_extractor.extract_fields()
+    return {'meta': m_data, 'sector': s_data}, time.monotonic() - start_time
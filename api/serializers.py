@@ -2,8 +2,10 @@ import json
 from django.utils import timezone
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db.models import OuterRef
 
 from main.utils import get_merged_items_by_fields
+from main.serializers import RowAnnotationsSerializerMixin, SubqueryCount
 from lang.serializers import ModelSerializer
 from lang.models import String
 
@@ -222,7 +224,7 @@ class Admin2Serializer(GeoSerializerMixin, ModelSerializer):
 
 
 class MiniAdmin2Serializer(ModelSerializer):
-    district_id = serializers.IntegerField(source='admin1.id', read_only=True)
+    district_id = serializers.IntegerField(source='admin1_id', read_only=True)
 
     class Meta:
         model = Admin2
@@ -502,7 +504,21 @@ class ListMiniEventSerializer(ModelSerializer):
         )
 
 
-class ListEventSerializer(ModelSerializer):
+def get_active_deployments_count():
+    """ Number of the active Rapid Response deployments of the Emergency (OuterRef) """
+    now = timezone.now()
+    return SubqueryCount(
+        Personnel.objects.filter(
+            type=Personnel.TypeChoices.RR,
+            start_date__lt=now,
+            end_date__gt=now,
+            deployment__event_deployed_to=OuterRef('pk'),
+            is_active=True
+        )
+    )
+
+
+class ListEventSerializer(RowAnnotationsSerializerMixin, ModelSerializer):
     appeals = RelatedAppealSerializer(many=True, read_only=True)
     countries = MiniCountrySerializer(many=True)
     field_reports = MiniFieldReportSerializer(many=True, read_only=True)
@@ -519,15 +535,12 @@ class ListEventSerializer(ModelSerializer):
             'emergency_response_contact_email', 'active_deployments',
         )
 
+    row_annotations = {
+        'active_deployments': get_active_deployments_count,
+    }
+
     def get_active_deployments(self, event):
-        now = timezone.now()
-        return Personnel.objects.filter(
-            type=Personnel.TypeChoices.RR,
-            start_date__lt=now,
-            end_date__gt=now,
-            deployment__event_deployed_to=event,
-            is_active=True
-        ).count()
+        return self.get_row_annotation(event, 'active_deployments')
 
 
 class SurgeEventSerializer(ModelSerializer):
@@ -670,7 +683,13 @@ class DeploymentsByEventSerializer(ModelSerializer):
         deployments = [d for d in obj.personneldeployment_set.all()]
         personnels = []
         for d in deployments:
-            for p in d.personnel_set.filter(end_date__gte=timezone.now(), start_date__lte=timezone.now(), is_active=True):
+            # Prefetched by DeploymentsByEventViewset
+            active_personnel = getattr(d, 'active_personnel', None)
+            if active_personnel is None:
+                active_personnel = d.personnel_set.filter(
+                    end_date__gte=timezone.now(), start_date__lte=timezone.now(), is_active=True
+                )
+            for p in active_personnel:
                 personnels.append(p)
         return list(set([p.country_from.society_name for p in personnels if p.country_from and p.country_from.society_name != '']))
 
@@ -681,7 +700,7 @@ class DeploymentsByEventSerializer(ModelSerializer):
         )
 
 
-class DetailEventSerializer(ModelSerializer):
+class DetailEventSerializer(RowAnnotationsSerializerMixin, ModelSerializer):
     appeals = RelatedAppealSerializer(many=True, read_only=True)
     contacts = EventContactSerializer(many=True, read_only=True)
     key_figures = KeyFigureSerializer(many=True, read_only=True)
@@ -707,18 +726,15 @@ class DetailEventSerializer(ModelSerializer):
         )
         lookup_field = 'slug'
 
+    row_annotations = {
+        'active_deployments': get_active_deployments_count,
+    }
+
     def get_response_activity_count(self, event):
         return EmergencyProject.objects.filter(event=event).count()
 
     def get_active_deployments(self, event):
-        now = timezone.now()
-        return Personnel.objects.filter(
-            type=Personnel.TypeChoices.RR,
-            start_date__lt=now,
-            end_date__gt=now,
-            deployment__event_deployed_to=event,
-            is_active=True
-        ).count()
+        return self.get_row_annotation(event, 'active_deployments')
 
 class SituationReportTypeSerializer(ModelSerializer):
     class Meta:
@@ -899,7 +915,8 @@ class UserSerializer(ModelSerializer):
 
     @staticmethod
     def get_is_ifrc_admin(obj):
-        return obj.groups.filter(name__iexact="IFRC Admins").exists()
+        # Using the groups prefetched by the lists (UsersViewset)
+        return any(group.name.lower() == 'ifrc admins' for group in obj.groups.all())
 
 
 class UserNameSerializer(UserSerializer):
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from main.celery import Queues
+from api.logger import logger
+from .outbox import drain
+
+
+@shared_task(queue=Queues.DEFAULT)
+def drain_outbox():
+    stats = drain()
+    logger.info(f'Outbox drained: {stats}')
+    return stats
@@ -1,13 +1,18 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from main.mock import erp_request_side_effect_mock
 from unittest.mock import patch
 
 import api.models as models
+from api import outbox
+from api.geo import AdminAreas, get_admin_areas
 from api.factories import country as countryFactory
 from api.factories import event as eventFactory
 from api.factories import field_report as fieldReportFactory
+from notifications.models import SurgeAlert
 
 
 class DisasterTypeTest(TestCase):
@@ -111,11 +116,77 @@ class FieldReportTest(TestCase):
             dtype=dtype,
             ns_request_assistance=True,
         )
+        # Pushed by the outbox drain (celery task run after the commit)
+        self.assertEqual(mocked_requests_post.called, False)
+        outbox.drain()
         ERP = models.ERPGUID.objects.get(api_guid='FindThisGUID')
         self.assertEqual(ERP.field_report_id, report.id)
         self.assertEqual(mocked_requests_post.called, True)
 
 
+class OutboxTest(TestCase):
+    def test_drain(self):
+        calls = []
+
+        def handler(model, object_id, payload):
+            calls.append((model, object_id, payload))
+            if payload.get('fail'):
+                raise ValueError('Service unavailable')
+
+        country = models.Country.objects.create(name='abc')
+        other_country = models.Country.objects.create(name='xyz')
+        with patch.dict(outbox.OUTBOX_HANDLERS, {'test': handler}):
+            outbox.enqueue('test', country, {'change': 1})
+            outbox.enqueue('test', other_country, {'fail': True})
+            outbox.enqueue('test', country, {'change': 2})
+            self.assertEqual(models.OutboxEvent.objects.count(), 3)
+
+            stats = outbox.drain()
+            # Changes of the same object are coalesced, handled once with the latest payload
+            self.assertEqual(calls, [
+                ('api.country', str(country.pk), {'change': 2}),
+                ('api.country', str(other_country.pk), {'fail': True}),
+            ])
+            self.assertEqual(stats['events'], 3)
+            self.assertEqual(stats['handled'], 1)
+            self.assertEqual(stats['failed'], 1)
+
+            failed_event = models.OutboxEvent.objects.get()
+            self.assertEqual(failed_event.object_id, str(other_country.pk))
+            self.assertEqual(failed_event.attempts, 1)
+            self.assertIn('Service unavailable', failed_event.last_error)
+            self.assertGreater(failed_event.available_at, timezone.now())
+
+            # Retried after the backoff
+            calls.clear()
+            self.assertEqual(outbox.drain()['events'], 0)
+            models.OutboxEvent.objects.update(available_at=timezone.now())
+            stats = outbox.drain()
+            self.assertEqual(calls, [('api.country', str(other_country.pk), {'fail': True})])
+            self.assertEqual(models.OutboxEvent.objects.get().attempts, 2)
+            self.assertGreater(stats['lag'], 0)
+
+    @override_settings(SUSPEND_SIGNALS=False)
+    @patch('api.receivers.delete_es_index_by_id')
+    @patch('api.receivers.index_es_index')
+    def test_es_sync_suggest_only_types(self, index_es_index, delete_es_index_by_id):
+        alert = SurgeAlert.objects.create(operation='Flood', message='Flood', created_at=timezone.now())
+        outbox.drain()
+        index_es_index.assert_called_once_with(alert)
+
+        # Bulk changes (sync_molnix)
+        alert.is_active = False
+        SurgeAlert.objects.bulk_update([alert], ['is_active'])
+        outbox.enqueue_many(models.OutboxEvent.Topic.ES_SYNC, [alert], lambda alert: {'es_id': alert.es_id()})
+        outbox.drain()
+        delete_es_index_by_id.assert_called_once_with(alert.es_id())
+
+        district = models.District.objects.create(name='District', is_deprecated=True)
+        outbox.drain()
+        delete_es_index_by_id.assert_called_with(district.es_id())
+        self.assertEqual(index_es_index.call_count, 1)
+
+
 class ProfileTestDepartment(TestCase):
     def setUp(self):
         user = User.objects.create(username='test1', password='12345678!')
@@ -125,3 +196,37 @@ class ProfileTestDepartment(TestCase):
     def test_profile_create(self):
         obj = models.Profile.objects.get(user__username='test1')
         self.assertEqual(obj.department, 'testdepartment')
+
+
+class AdminAreasTest(TestCase):
+    def test_get_admin_areas(self):
+        country = models.Country.objects.create(name='abc', iso3='ABC')
+        other_country = models.Country.objects.create(name='xyz', iso3='XYZ')
+        models.CountryGeoms.objects.create(country=country, geom=MultiPolygon(Polygon.from_bbox((0, 0, 10, 10))))
+        district = models.District.objects.create(name='d1', code='d1', country=country)
+        models.DistrictGeoms.objects.create(district=district, geom=MultiPolygon(Polygon.from_bbox((0, 0, 5, 10))))
+        admin2 = models.Admin2.objects.create(name='a1', code='a1', admin1=district)
+        models.Admin2Geoms.objects.create(admin2=admin2, geom=Polygon.from_bbox((0, 0, 5, 5)))
+
+        with self.assertNumQueries(1):
+            admin_areas = get_admin_areas(
+                [
+                    Point(1, 1),
+                    Point(7, 7),
+                    Point(20, 20),
+                    None,
+                    # A point on the surface is used
+                    Polygon.from_bbox((1, 6, 2, 7)),
+                    # Restricted to the known country
+                    Point(1, 1),
+                ],
+                country_ids=[None, None, None, None, None, other_country.pk],
+            )
+        self.assertEqual(admin_areas, [
+            AdminAreas(country.pk, district.pk, admin2.pk),
+            AdminAreas(country.pk, None, None),
+            AdminAreas(None, None, None),
+            AdminAreas(None, None, None),
+            AdminAreas(country.pk, district.pk, None),
+            AdminAreas(other_country.pk, None, None),
+        ])
@@ -1,11 +1,25 @@
+import json
+import os
 import time
 from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+from django.conf import settings
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils.crypto import get_random_string
 from notifications.models import Country, Region, DisasterType, RecordType, SubscriptionType, Subscription
-from .models import Appeal, Event, FieldReport
+from .models import Appeal, Event, FieldReport, CronJob, EmergencyOperationsDataset, ScrapePdfCheckpoint
 from api.management.commands.index_and_notify import Command as Notify
+from api.management.commands.scrape_pdfs import Command as ScrapePdfs, MAX_ATTEMPTS, EPOA_FIELDS, SECTORS, SECTOR_FIELDS
+from api.scrapers.pdf import (
+    convert_pdf_to_text_blocks,
+    convert_pdf_to_text_blocks_using_html,
+    extract_pdf_fields,
+    get_meta_text_blocks,
+)
+from api.scrapers.extractor import MetaFieldExtractor, SectorFieldExtractor
+from api.scrapers.extractor.matching import _partial_ratio
 
 
 def get_user():
@@ -219,3 +233,96 @@ class FilterJustCreatedTest(TestCase):
         filtered = notify.filter_just_created(Appeal.objects.filter(created_at__gte=notify.diff_5_minutes()))
         self.assertEqual(len(filtered), 1)
         self.assertEqual(filtered[0].aid, 'test2')
+
+
+class ScrapePdfsCheckpointTest(TestCase):
+    def test_resume(self):
+        extracted_doc = ['http://example.com/extracted.pdf', 'extracted.pdf', 'epoa']
+        failed_doc = ['http://example.com/failed.pdf', 'failed.pdf', 'epoa']
+        new_doc = ['http://example.com/new.pdf', 'new.pdf', 'epoa']
+        # Interrupted before saving
+        ScrapePdfCheckpoint.objects.create(
+            url=extracted_doc[0],
+            pdf_type='epoa',
+            filename=extracted_doc[1],
+            status=ScrapePdfCheckpoint.Status.EXTRACTED,
+            data={'meta': {'appealNumber': 'MDRXX001'}, 'sector': {}},
+        )
+        ScrapePdfCheckpoint.objects.create(
+            url=failed_doc[0],
+            pdf_type='epoa',
+            filename=failed_doc[1],
+            status=ScrapePdfCheckpoint.Status.FAILED,
+            attempts=MAX_ATTEMPTS,
+        )
+
+        command = ScrapePdfs()
+        with mock.patch.object(
+            ScrapePdfs, 'get_documents',
+            side_effect=lambda pdf_type: [extracted_doc, failed_doc, new_doc] if pdf_type == 'epoa' else [],
+        ), mock.patch.object(ScrapePdfs, 'read_pdf_into_memory', side_effect=Exception('Download failed (404)')) as read_pdf:
+            command.handle(download_workers=2, extract_workers=1, use_html=False, retry_failed=False)
+
+        # Only the new document is downloaded
+        read_pdf.assert_called_once_with(new_doc[0])
+        self.assertTrue(EmergencyOperationsDataset.objects.filter(raw_file_url=extracted_doc[0]).exists())
+        checkpoints = {checkpoint.url: checkpoint for checkpoint in ScrapePdfCheckpoint.objects.all()}
+        self.assertEqual(checkpoints[extracted_doc[0]].status, ScrapePdfCheckpoint.Status.SAVED)
+        self.assertIsNone(checkpoints[extracted_doc[0]].data)
+        self.assertEqual(checkpoints[failed_doc[0]].attempts, MAX_ATTEMPTS)
+        self.assertEqual(checkpoints[new_doc[0]].status, ScrapePdfCheckpoint.Status.FAILED)
+        self.assertEqual(checkpoints[new_doc[0]].attempts, 1)
+        cron_job = CronJob.objects.get(name='scrape_pdfs')
+        self.assertIn('Stage timings:', cron_job.message)
+        self.assertIn('Resumed: 1', cron_job.message)
+
+
+class ScrapePdfsExtractionTest(TestCase):
+    def setUp(self):
+        path = os.path.join(settings.TEST_DIR, 'scrapers')
+        with open(os.path.join(path, 'epoa.pdf'), 'rb') as fp:
+            self.pdf_content = fp.read()
+        with open(os.path.join(path, 'epoa.json')) as fp:
+            self.expected_data = json.load(fp)
+
+    def test_text_blocks(self):
+        # Same text blocks as the previous HTML rendering
+        self.assertEqual(
+            convert_pdf_to_text_blocks(BytesIO(self.pdf_content)),
+            convert_pdf_to_text_blocks_using_html(BytesIO(self.pdf_content)),
+        )
+        texts = convert_pdf_to_text_blocks(BytesIO(self.pdf_content), maxpages=1)
+        self.assertEqual(texts[0], 'Page 1')
+        self.assertNotIn('Page 2', texts)
+
+    def test_extract_fields(self):
+        for use_html in [False, True]:
+            data, _ = extract_pdf_fields(self.pdf_content, EPOA_FIELDS, SECTORS, SECTOR_FIELDS, use_html=use_html)
+            self.assertEqual(data, self.expected_data)
+        # Only the first page is needed for the meta fields
+        data, _ = extract_pdf_fields(self.pdf_content, EPOA_FIELDS)
+        self.assertEqual(data['meta'], self.expected_data['meta'])
+
+    def test_extractors_benchmark(self):
+        texts = convert_pdf_to_text_blocks(BytesIO(self.pdf_content))
+        # Same document layout repeated, as in the boilerplate of the real documents
+        texts = texts + texts[1:] * 4
+
+        def _extract():
+            start_time = time.monotonic()
+            _, meta = MetaFieldExtractor(get_meta_text_blocks(texts), EPOA_FIELDS).extract_fields()
+            _, sector = SectorFieldExtractor(texts, SECTORS, SECTOR_FIELDS).extract_fields()
+            return {'meta': meta, 'sector': sector}, time.monotonic() - start_time
+
+        _partial_ratio.cache_clear()
+        data, cold_duration = _extract()
+        self.assertEqual(data, self.expected_data)
+        cold_cache_info = _partial_ratio.cache_info()
+        # Repeated windows are only scored once
+        self.assertGreater(cold_cache_info.hits, 0)
+
+        data, warm_duration = _extract()
+        self.assertEqual(data, self.expected_data)
+        warm_cache_info = _partial_ratio.cache_info()
+        self.assertEqual(warm_cache_info.misses, cold_cache_info.misses)
+        self.assertLess(warm_duration, cold_duration)
@@ -1,11 +1,34 @@
 import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from unittest import mock
 
+import haystack
 from django.contrib.auth.models import User
+from django.contrib.auth.models import AnonymousUser
 from django.conf import settings
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
 
 from main.test_case import APITestCase, SnapshotTestCase
+from main.mock import ElasticsearchStandIn
+from api.views import HayStackSearch
+from middlewares.cache import get_cache_config
 import api.models as models
 
+from api.factories.country import CountryFactory
+from api.factories.district import DistrictFactory
+from api.factories.field_report import FieldReportFactory
+from api.management.commands.index_and_notify import Command as IndexAndNotifyCommand
+from deployments.factories.emergency_project import EruFactory
+from deployments.factories.personnel import PersonnelFactory, PersonnelDeploymentFactory
+from deployments.models import Personnel
+from notifications.models import RecordType, Subscription, SubscriptionType
 from api.factories.event import (
     EventFactory,
     EventFeaturedDocumentFactory,
@@ -572,3 +595,452 @@ class GlobalEnumEndpointTest(APITestCase):
         response = self.client.get('/api/v2/global-enums/')
         self.assert_200(response)
         self.assertIsNotNone(response.json())
+
+
+class HayStackSearchBenchmarkTest(APITestCase):
+    """
+    Compares the single _msearch request with evaluating each SearchQuerySet one by one
+    using a local stand-in for Elasticsearch with a fixed round trip latency
+    """
+    RUNS = 25
+
+    def _benchmark(self, func):
+        timings = []
+        for _ in range(self.RUNS):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+    def test_multi_search_benchmark(self):
+        backend = haystack.connections['default'].get_backend()
+        backend.setup_complete = True
+        stand_in = ElasticsearchStandIn(latency=0.005)
+
+        with mock.patch.object(backend, 'conn', stand_in):
+            for user in [AnonymousUser(), self.user, self.ifrc_user]:
+                multi_search = HayStackSearch.get_multi_search('nepal', user)
+
+                stand_in.round_trips = 0
+                results = multi_search.execute()
+                self.assertEqual(stand_in.round_trips, 1)
+                self.assertEqual(set(results.keys()), set(multi_search.queries.keys()))
+
+                stand_in.round_trips = 0
+                for search_queryset, limit in multi_search.queries.values():
+                    list(search_queryset[:limit])
+                self.assertEqual(stand_in.round_trips, len(multi_search.queries))
+
+            multi_search = HayStackSearch.get_multi_search('nepal', self.user)
+            sequential_p50, sequential_p99 = self._benchmark(
+                lambda: [
+                    list(search_queryset.all()[:limit])
+                    for search_queryset, limit in multi_search.queries.values()
+                ]
+            )
+            multi_p50, multi_p99 = self._benchmark(multi_search.execute)
+
+        # The timings are only reported when the _msearch path is not faster
+        timings = (
+            f'{self.RUNS} runs: '
+            f'sequential p50={sequential_p50 * 1000:.2f}ms p99={sequential_p99 * 1000:.2f}ms, '
+            f'_msearch p50={multi_p50 * 1000:.2f}ms p99={multi_p99 * 1000:.2f}ms'
+        )
+        self.assertLess(multi_p50, sequential_p50, timings)
+        self.assertLess(multi_p99, sequential_p99, timings)
+
+    def test_search_response_shape(self):
+        backend = haystack.connections['default'].get_backend()
+        backend.setup_complete = True
+        with mock.patch.object(backend, 'conn', ElasticsearchStandIn(latency=0)):
+            response = self.client.get('/api/v1/search/', {'keyword': 'nepal'})
+        self.assert_200(response)
+        self.assertEqual(
+            set(response.json().keys()),
+            {
+                'regions', 'district_province_response', 'countries', 'emergencies', 'surge_alerts',
+                'projects', 'surge_deployments', 'reports', 'rapid_response_deployments',
+            },
+        )
+
+
+class SearchSuggestTest(APITestCase):
+    def _get_scopes(self, mock_es_client):
+        body = mock_es_client.search.call_args[1]['body']
+        return set(body['suggest']['page']['completion']['contexts']['scope'])
+
+    @mock.patch('api.views.ES_CLIENT')
+    def test_suggest_visibility_scope(self, mock_es_client):
+        mock_es_client.search.return_value = {
+            'suggest': {
+                'page': [{
+                    'text': 'nep',
+                    'options': [{
+                        '_score': 1.0,
+                        '_source': {'id': 1, 'type': 'country', 'name': 'Nepal', 'keyword': None, 'event_id': None},
+                    }],
+                }],
+            },
+        }
+        response = self.client.get('/api/v2/search/suggest/', {'keyword': 'nep'})
+        self.assert_200(response)
+        self.assertEqual(response.json()['results'][0]['name'], 'Nepal')
+        scopes = self._get_scopes(mock_es_client)
+        self.assertIn('public.country', scopes)
+        self.assertFalse(any(scope.startswith(('membership.', 'ifrc')) for scope in scopes))
+
+        self.authenticate(self.user)
+        self.client.get('/api/v2/search/suggest/', {'keyword': 'nep'})
+        scopes = self._get_scopes(mock_es_client)
+        self.assertIn('membership.event', scopes)
+        self.assertNotIn('ifrc.event', scopes)
+
+        self.authenticate(self.ifrc_user)
+        self.client.get('/api/v2/search/suggest/', {'keyword': 'nep', 'type': 'event'})
+        self.assertEqual(
+            self._get_scopes(mock_es_client),
+            {'public.event', 'membership.event', 'ifrc.event', 'ifrc_ns.event'},
+        )
+
+    def test_suggest_bad_request(self):
+        self.assert_400(self.client.get('/api/v2/search/suggest/'))
+        self.assert_400(self.client.get('/api/v2/search/suggest/', {'keyword': 'nep', 'type': 'unknown'}))
+
+
+class VisibilityClassCacheTest(APITestCase):
+    def _get_cache_config(self, path, user=None):
+        headers = {}
+        if user is not None:
+            token, _ = Token.objects.get_or_create(user=user)
+            headers['HTTP_AUTHORIZATION'] = f'Token {token.key}'
+        return get_cache_config(RequestFactory().get(path, **headers))
+
+    def test_cache_key_prefix_by_visibility_class(self):
+        prefix = settings.CACHE_MIDDLEWARE_KEY_PREFIX
+        self.assertEqual(self._get_cache_config('/api/v2/country/')[0], f'{prefix}_anonymous')
+        self.assertEqual(self._get_cache_config('/api/v2/country/', self.user)[0], f'{prefix}_authenticated')
+        self.assertEqual(self._get_cache_config('/api/v2/country/', self.ifrc_user)[0], f'{prefix}_ifrc')
+        self.assertEqual(self._get_cache_config('/api/v2/country/', self.root_user)[0], f'{prefix}_ifrc')
+
+    def test_cache_opt_in(self):
+        # Default: only anonymous users are cached
+        self.assertIsNotNone(self._get_cache_config('/api/v2/appeal/'))
+        self.assertIsNone(self._get_cache_config('/api/v2/appeal/', self.user))
+        # IFRC_NS visibility depends on the user's countries
+        self.assertIsNone(self._get_cache_config('/api/v2/event/', self.user))
+        self.assertIsNotNone(self._get_cache_config('/api/v2/event/', self.ifrc_user))
+        # Personal endpoints
+        for path in ['/api/v2/profile/', '/api/v2/user/me/', '/api/v2/subscription/']:
+            self.assertIsNone(self._get_cache_config(path))
+            self.assertIsNone(self._get_cache_config(path, self.user))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_cache_invalidation_on_model_change(self):
+        country = CountryFactory()
+        key_prefix = self._get_cache_config('/api/v2/country/')[0]
+        self.assertEqual(key_prefix, self._get_cache_config('/api/v2/country/')[0])
+
+        # Not a dependency of the country endpoint
+        EventFactory()
+        self.assertEqual(key_prefix, self._get_cache_config('/api/v2/country/')[0])
+
+        with self.capture_on_commit_callbacks(execute=True):
+            country.save()
+        new_key_prefix = self._get_cache_config('/api/v2/country/')[0]
+        self.assertNotEqual(key_prefix, new_key_prefix)
+
+        with self.capture_on_commit_callbacks(execute=True):
+            country.delete()
+        self.assertNotEqual(new_key_prefix, self._get_cache_config('/api/v2/country/')[0])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_cache_invalidation_on_commit(self):
+        country = CountryFactory(name='country-1')
+        url = f'/api/v2/country/{country.pk}/'
+        with self.capture_on_commit_callbacks(execute=True):
+            country.name = 'country-2'
+            country.save()
+            # Served (and cached) before the commit, the generation is not bumped yet
+            self.assertEqual(self.client.get(url).json()['name'], 'country-2')
+            self.assertEqual(self.client.get(url).json()['name'], 'country-2')
+            # Without signals, the change is only visible if the response above is dropped on commit
+            models.Country.objects.filter(pk=country.pk).update(name='country-3')
+        self.assertEqual(self.client.get(url).json()['name'], 'country-3')
+
+
+class AggregateHeaderFiguresTest(APITestCase):
+    def test_rollup_matches_live_figures(self):
+        region = models.Region.objects.create(name=models.RegionName.AFRICA)
+        country1 = CountryFactory(region=region, iso3='AAA')
+        country2 = CountryFactory(region=region, iso3='BBB')
+        # Without appeals
+        empty_region = models.Region.objects.create(name=models.RegionName.EUROPE)
+        empty_country = CountryFactory(region=empty_region, iso3='CCC')
+        now = timezone.now()
+        active = dict(start_date=now - timedelta(days=10), end_date=now + timedelta(days=10))
+        ended = dict(start_date=now - timedelta(days=30), end_date=now - timedelta(days=20))
+        for i, (country, atype, dates) in enumerate([
+            (country1, models.AppealType.DREF, active),
+            (country1, models.AppealType.APPEAL, active),
+            (country1, models.AppealType.INTL, ended),
+            (country2, models.AppealType.APPEAL, active),
+            (country2, models.AppealType.DREF, ended),
+            (None, models.AppealType.APPEAL, active),
+        ]):
+            AppealFactory(code=f'MDR{i}', country=country, region=country and region, atype=atype, **dates)
+
+        params_list = [
+            {},
+            {'region': region.pk},
+            {'country': country1.pk},
+            {'iso3': 'bbb'},
+            {'iso3': 'BBB', 'region': region.pk},
+            {'country': empty_country.pk},
+            {'iso3': 'ccc'},
+            {'region': empty_region.pk},
+        ]
+        url = '/api/v2/appeal/aggregated'
+        # No rollup yet, computed live
+        live_figures = [self.client.get(url, params).json() for params in params_list]
+        self.assertEqual(live_figures[0]['active_appeals'], 3)
+        self.assertEqual(live_figures[1]['active_appeals'], 2)
+        self.assertEqual(live_figures[2]['active_drefs'], 1)
+        self.assertEqual(live_figures[5]['active_appeals'], 0)
+
+        models.DailyAppealFigures.update_for_date(timezone.now())
+        self.assertEqual(live_figures, [self.client.get(url, params).json() for params in params_list])
+
+        # Historic dates
+        yesterday = (now - timedelta(days=1)).date()
+        live_figures = self.client.get(url, {'date': yesterday.isoformat()}).json()
+        models.DailyAppealFigures.update_for_date(datetime.combine(yesterday, datetime.min.time(), tzinfo=timezone.utc))
+        self.assertEqual(live_figures, self.client.get(url, {'date': yesterday.isoformat()}).json())
+
+    def test_historic_figures_at_day_start(self):
+        now = timezone.now()
+        day = (now - timedelta(days=2)).date()
+        day_start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+        # Started during the day
+        appeal = AppealFactory(
+            code='MDR1', atype=models.AppealType.APPEAL,
+            start_date=day_start + timedelta(hours=6), end_date=now + timedelta(days=10),
+        )
+        models.AppealHistory.objects.filter(appeal=appeal).update(valid_from=day_start - timedelta(days=1))
+        url = '/api/v2/appeal/aggregated'
+        params = {'date': day.isoformat()}
+        live_figures = self.client.get(url, params).json()
+        self.assertEqual((live_figures['total_appeals'], live_figures['active_appeals']), (1, 0))
+
+        # Figures of an ingest run during the day are not used for the day
+        models.DailyAppealFigures.update_for_date(day_start + timedelta(hours=12))
+        self.assertEqual(live_figures, self.client.get(url, params).json())
+
+        models.DailyAppealFigures.update_for_date(day_start)
+        self.assertEqual(models.DailyAppealFigures.get_figures(day), live_figures)
+        self.assertEqual(live_figures, self.client.get(url, params).json())
+
+
+class IndexAndNotifyQueryBudgetTest(APITestCase):
+    """ The number of queries of a notification run shouldn't depend on the number of records """
+    QUERY_BUDGET = 30
+
+    def setUp(self):
+        super().setUp()
+        for rtype in [RecordType.NEW_EMERGENCIES, RecordType.NEW_OPERATIONS, RecordType.WEEKLY_DIGEST]:
+            Subscription.objects.create(user=self.user, rtype=rtype, stype=SubscriptionType.NEW)
+
+    def _count_queries(self, records, rtype, digest_mode=False):
+        with mock.patch('api.management.commands.index_and_notify.send_notification') as send_notification, \
+                mock.patch.object(IndexAndNotifyCommand, 'is_digest_mode', return_value=digest_mode), \
+                CaptureQueriesContext(connection) as queries:
+            IndexAndNotifyCommand().notify(records, rtype, SubscriptionType.NEW)
+        self.assertTrue(send_notification.called)
+        return len(queries)
+
+    def _create_field_reports(self, count):
+        event = EventFactory()
+        dtype = event.dtype
+        region = models.Region.objects.create(name=models.RegionName.ASIA_PACIFIC)
+        action = models.Action.objects.create(name='Action')
+        for _ in range(count):
+            field_report = FieldReportFactory(event=event, dtype=dtype, visibility=models.VisibilityChoices.PUBLIC)
+            field_report.countries.add(CountryFactory(region=region))
+            field_report.districts.add(DistrictFactory())
+            models.FieldReportContact.objects.create(field_report=field_report, name='Name', title='Title', email='a@b.c')
+            actions_taken = models.ActionsTaken.objects.create(
+                field_report=field_report, organization='NTLS', summary='Summary',
+            )
+            actions_taken.actions.add(action)
+
+    def test_field_report_notification(self):
+        self._create_field_reports(20)
+        few_queries = self._count_queries(models.FieldReport.objects.all(), RecordType.FIELD_REPORT)
+        self._create_field_reports(480)
+        many_queries = self._count_queries(models.FieldReport.objects.all(), RecordType.FIELD_REPORT)
+        self.assertEqual(few_queries, many_queries)
+        self.assertLessEqual(many_queries, self.QUERY_BUDGET)
+
+    def test_appeal_notification(self):
+        def _create_appeals(count):
+            for _ in range(count):
+                appeal = AppealFactory(country=CountryFactory())
+                FieldReportFactory.create_batch(2, event=appeal.event, dtype=appeal.dtype)
+
+        _create_appeals(20)
+        few_queries = self._count_queries(models.Appeal.objects.all(), RecordType.APPEAL)
+        _create_appeals(480)
+        many_queries = self._count_queries(models.Appeal.objects.all(), RecordType.APPEAL)
+        self.assertEqual(few_queries, many_queries)
+        self.assertLessEqual(many_queries, self.QUERY_BUDGET)
+
+    def test_weekly_digest(self):
+        def _create_digest_records(count):
+            for _ in range(count):
+                event = EventFactory(is_featured=True)
+                appeal = AppealFactory(event=event, country=CountryFactory())
+                EruFactory(event=event, appeal=appeal, units=2)
+                PersonnelFactory(
+                    deployment=PersonnelDeploymentFactory(event_deployed_to=event),
+                    country_from=appeal.country,
+                    start_date=timezone.now(),
+                )
+                FieldReportFactory(event=event, dtype=event.dtype, created_at=timezone.now()).countries.add(appeal.country)
+
+        _create_digest_records(5)
+        few_queries = self._count_queries(None, RecordType.WEEKLY_DIGEST, digest_mode=True)
+        _create_digest_records(45)
+        many_queries = self._count_queries(None, RecordType.WEEKLY_DIGEST, digest_mode=True)
+        self.assertEqual(few_queries, many_queries)
+        self.assertLessEqual(many_queries, self.QUERY_BUDGET)
+
+
+class EventListActiveDeploymentsTest(APITestCase):
+    def _create_events(self, count):
+        now = timezone.now()
+        for _ in range(count):
+            event = EventFactory(parent_event=None, visibility=models.VisibilityChoices.PUBLIC)
+            deployment = PersonnelDeploymentFactory(event_deployed_to=event)
+            PersonnelFactory.create_batch(
+                2, deployment=deployment, type=Personnel.TypeChoices.RR, is_active=True,
+                start_date=now - timedelta(days=1), end_date=now + timedelta(days=1),
+            )
+            # Ended deployment
+            PersonnelFactory(
+                deployment=deployment, type=Personnel.TypeChoices.RR, is_active=True,
+                start_date=now - timedelta(days=10), end_date=now - timedelta(days=1),
+            )
+
+    def _get_events(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v2/event/', {'limit': 50})
+        self.assert_200(response)
+        return response.json()['results'], len(queries)
+
+    def test_active_deployments(self):
+        self._create_events(2)
+        events, few_queries = self._get_events()
+        self.assertEqual([event['active_deployments'] for event in events], [2, 2])
+
+        # Counted by the list query, not per event
+        self._create_events(10)
+        events, many_queries = self._get_events()
+        self.assertEqual([event['active_deployments'] for event in events], [2] * 12)
+        self.assertEqual(few_queries, many_queries)
+
+        # Not annotated (retrieve), counted for the event
+        event_id = events[0]['id']
+        response = self.client.get(f'/api/v2/event/{event_id}/')
+        self.assert_200(response)
+        self.assertEqual(response.json()['active_deployments'], 2)
+
+
+class ServerTimingTest(APITestCase):
+    def test_server_timing_header(self):
+        EventFactory.create_batch(2, parent_event=None, visibility=models.VisibilityChoices.PUBLIC)
+        with self.settings(SERVER_TIMING_HEADER=True):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/v2/event/')
+        self.assert_200(response)
+        metrics = {
+            metric.split(';')[0]: metric
+            for metric in response['Server-Timing'].split(', ')
+        }
+        self.assertEqual(set(metrics), {'db', 'es', 'view', 'render', 'total'})
+        self.assertIn(f'desc="{len(queries)} queries"', metrics['db'])
+
+    def test_server_timing_header_users(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/v2/event/'))
+        self.authenticate(self.user)
+        self.assertNotIn('Server-Timing', self.client.get('/api/v2/event/'))
+        self.authenticate(self.ifrc_user)
+        self.assertIn('Server-Timing', self.client.get('/api/v2/event/'))
+
+
+class TranslatedDeferredFieldsTest(APITestCase):
+    def _create_events(self, count, **kwargs):
+        return EventFactory.create_batch(
+            count, parent_event=None, visibility=models.VisibilityChoices.PUBLIC, summary_en='English summary', **kwargs
+        )
+
+    def _get_events(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v2/event/', {'limit': 50}, HTTP_ACCEPT_LANGUAGE='es')
+        self.assert_200(response)
+        return {event['id']: event['summary'] for event in response.json()['results']}, queries
+
+    def test_deferred_fields(self):
+        translated_event = self._create_events(1, summary_es='Resumen')[0]
+        event = self._create_events(1, summary_es='')[0]
+        summaries, few_queries = self._get_events()
+        self.assertEqual(summaries, {translated_event.id: 'Resumen', event.id: 'English summary'})
+        # The list query only selects the served language
+        self.assertTrue(any(
+            '"summary_es"' in query['sql'] and '"summary_fr"' not in query['sql']
+            for query in few_queries.captured_queries
+        ))
+
+        # The fallbacks (empty in the served language) are loaded for the page, not per event
+        self._create_events(10, summary_es='')
+        summaries, many_queries = self._get_events()
+        self.assertEqual(list(summaries.values()).count('English summary'), 11)
+        self.assertEqual(len(few_queries), len(many_queries))
+
+
+class TileViewTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.country = models.Country.objects.create(name='abc', iso='AB', iso3='ABC')
+        self.country_geoms = models.CountryGeoms.objects.create(
+            country=self.country,
+            geom=MultiPolygon(Polygon.from_bbox((10, 10, 20, 20))),
+        )
+
+    def test_tiles(self):
+        response = self.client.get('/api/v2/tiles/countries/0/0/0.mvt')
+        self.assert_200(response)
+        self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertIn(b'countries', response.content)
+        # Tile (west) without the country
+        response = self.client.get('/api/v2/tiles/countries/1/0/0.mvt')
+        self.assert_200(response)
+        self.assertEqual(response.content, b'')
+        # Below the layer's min zoom
+        self.assertEqual(self.client.get('/api/v2/tiles/admin2/0/0/0.mvt').content, b'')
+        # Out of the zoom level
+        self.assert_404(self.client.get('/api/v2/tiles/countries/1/2/0.mvt'))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_tiles_cache_invalidation(self):
+        url = '/api/v2/tiles/countries/1/1/0.mvt'
+        self.assertIn(b'countries', self.client.get(url).content)
+        # Cached
+        with self.assertNumQueries(0):
+            self.assertIn(b'countries', self.client.get(url).content)
+
+        # Moved to the west
+        self.country_geoms.geom = MultiPolygon(Polygon.from_bbox((-20, 10, -10, 20)))
+        with self.capture_on_commit_callbacks(execute=True):
+            self.country_geoms.save()
+        self.assertEqual(self.client.get(url).content, b'')
+        self.assertIn(b'countries', self.client.get('/api/v2/tiles/countries/1/0/0.mvt').content)
@@ -0,0 +1,139 @@
+import math
+
+from django.conf import settings
+from django.db import connection
+from modeltranslation.utils import build_localized_fieldname
+
+from .models import Admin2, Admin2Geoms, Country, CountryGeoms, District, DistrictGeoms
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_MAX_ZOOM = 22
+# Web Mercator latitude limits, geometries are clipped to them before being projected
+MERCATOR_MAX_LAT = 85.0511287798066
+
+# name_en, name_es, ...
+COUNTRY_NAME_FIELDS = [build_localized_fieldname('name', lang) for lang, _ in settings.LANGUAGES]
+
+# Same features and properties as the Mapbox tilesets (see update-mapbox-tilesets)
+TILE_LAYERS = {
+    'countries': {
+        'models': (CountryGeoms, Country),
+        'min_zoom': 0,
+        'columns': (
+            'c.id AS country_id, c.name, ' + ''.join(f'c.{field}, ' for field in COUNTRY_NAME_FIELDS) +
+            'c.iso, c.iso3, c.region_id, c.independent, c.is_deprecated, c.disputed, c.fdrs, c.record_type'
+        ),
+        'from': (
+            f'{CountryGeoms._meta.db_table} g'
+            f' JOIN {Country._meta.db_table} c ON c.id = g.country_id AND c.record_type = 1'
+        ),
+    },
+    'districts': {
+        'models': (DistrictGeoms, District, Country),
+        'min_zoom': 2,
+        'columns': (
+            'd.id AS district_id, d.name, d.code, d.country_id, d.is_enclave, d.is_deprecated,'
+            ' c.iso AS country_iso, c.iso3 AS country_iso3, c.name AS country_name' +
+            ''.join(f', c.{field} AS country_{field}' for field in COUNTRY_NAME_FIELDS)
+        ),
+        'from': (
+            f'{DistrictGeoms._meta.db_table} g'
+            f' JOIN {District._meta.db_table} d ON d.id = g.district_id'
+            f' JOIN {Country._meta.db_table} c ON c.id = d.country_id'
+        ),
+    },
+    'admin2': {
+        'models': (Admin2Geoms, Admin2, District, Country),
+        'min_zoom': 5,
+        'columns': (
+            'a.id, a.name, a.code, a.is_deprecated, d.id AS admin1_id, d.name AS admin1_name,'
+            ' c.id AS country_id, c.iso3 AS country_iso3'
+        ),
+        'from': (
+            f'{Admin2Geoms._meta.db_table} g'
+            f' JOIN {Admin2._meta.db_table} a ON a.id = g.admin2_id'
+            f' JOIN {District._meta.db_table} d ON d.id = a.admin1_id'
+            f' JOIN {Country._meta.db_table} c ON c.id = d.country_id'
+        ),
+    },
+}
+
+TILE_SQL = '''
+WITH mvtgeom AS (
+    SELECT
+        ST_AsMVTGeom(
+            ST_Transform(
+                ST_SimplifyPreserveTopology(
+                    ST_ClipByBox2D(g.geom, ST_MakeEnvelope(%(west)s, %(south)s, %(east)s, %(north)s, 4326)),
+                    %(tolerance)s
+                ),
+                3857
+            ),
+            ST_TileEnvelope(%(z)s, %(x)s, %(y)s),
+            {extent}, {buffer}, true
+        ) AS geom,
+        {columns}
+    FROM {from_}
+    WHERE g.geom && ST_MakeEnvelope(%(west)s, %(south)s, %(east)s, %(north)s, 4326)
+)
+SELECT ST_AsMVT(mvtgeom.*, %(layer)s, {extent}, 'geom') FROM mvtgeom WHERE geom IS NOT NULL
+'''
+
+
+def is_valid_tile(z, x, y):
+    return 0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def get_tile_bounds(z, x, y, buffer=0):
+    """
+    Returns the (west, south, east, north) lon/lat bounds of the tile, extended by buffer tile units
+    (clamped to the Web Mercator limits)
+    """
+    n = 2 ** z
+    margin = buffer / TILE_EXTENT
+
+    def _lon(tile_x):
+        return tile_x / n * 360 - 180
+
+    def _lat(tile_y):
+        lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+        return max(-MERCATOR_MAX_LAT, min(MERCATOR_MAX_LAT, lat))
+
+    return (
+        max(-180, _lon(x - margin)),
+        _lat(y + 1 + margin),
+        min(180, _lon(x + 1 + margin)),
+        _lat(y - margin),
+    )
+
+
+def get_tile(layer, z, x, y):
+    """
+    Mapbox Vector Tile (bytes) of the layer, generated by PostGIS (ST_AsMVT)
+    The geometries are simplified to the resolution of the zoom level (one tile unit)
+    """
+    layer_config = TILE_LAYERS[layer]
+    if z < layer_config['min_zoom']:
+        return b''
+    west, south, east, north = get_tile_bounds(z, x, y, buffer=TILE_BUFFER)
+    sql = TILE_SQL.format(
+        extent=TILE_EXTENT,
+        buffer=TILE_BUFFER,
+        columns=layer_config['columns'],
+        from_=layer_config['from'],
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'layer': layer,
+            'z': z,
+            'x': x,
+            'y': y,
+            'west': west,
+            'south': south,
+            'east': east,
+            'north': north,
+            'tolerance': 360 / (TILE_EXTENT * 2 ** z),
+        })
+        row = cursor.fetchone()
+    return bytes(row[0]) if row and row[0] else b''
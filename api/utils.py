@@ -44,6 +44,15 @@ def is_user_ifrc(user):
         return True
     return False
 
+
+def get_user_visibility_class(user):
+    """ Users of the same visibility class see the same visibility-filtered records """
+    if not user.is_authenticated:
+        return 'anonymous'
+    if is_user_ifrc(user):
+        return 'ifrc'
+    return 'authenticated'
+
 # FIXME: not usable because of circular dependency
 # def filter_visibility_by_auth(user, visibility_model_class):
 #     if user.is_authenticated:
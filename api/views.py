@@ -1,16 +1,16 @@
 import json
 from datetime import datetime, timedelta
 
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from django.conf import settings
 from django.views import View
 from django.db.models.functions import TruncMonth, TruncYear
-from django.db.models.fields import IntegerField
-from django.db.models import Count, Sum, Q, F, Case, When
+from django.db.models import Count, Sum, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.crypto import get_random_string
 from django.template.loader import render_to_string
 from rest_framework.authtoken.models import Token
@@ -28,14 +28,26 @@ from flash_update.models import FlashUpdate
 from dref.models import Dref, DrefOperationalUpdate
 
 from .esconnection import ES_CLIENT
-from .models import Appeal, AppealHistory, AppealType, CronJob, Event, FieldReport, Snippet
-from .indexes import ES_PAGE_NAME
+from .models import (
+    Appeal,
+    AppealHistory,
+    CronJob,
+    DailyAppealFigures,
+    Event,
+    FieldReport,
+    Snippet,
+    get_appeal_figures_aggregates,
+)
+from .indexes import ES_PAGE_NAME, SUGGEST_TYPES, SUGGEST_ONLY_TYPES
 from .logger import logger
 from haystack.query import SearchQuerySet
 from api.models import Country, Region, District
 from haystack.inputs import AutoQuery, Raw
 from haystack.query import SQ
-from .utils import is_user_ifrc
+from .tiles import TILE_LAYERS, get_tile, is_valid_tile
+from .utils import is_user_ifrc, get_user_visibility_class
+from utils.elasticsearch import get_es_suggest_scopes
+from utils.multi_search import MultiSearchQuerySet
 
 
 def bad_request(message):
@@ -106,6 +118,8 @@ class EsPageSearch(APIView):
 
         if page_type is not None:
             query = {"bool": {"filter": {"term": {"type": page_type}}, "must": {"multi_match": query["multi_match"]}}}
+        else:
+            query = {"bool": {"must_not": {"terms": {"type": SUGGEST_ONLY_TYPES}}, "must": {"multi_match": query["multi_match"]}}}
 
         results = ES_CLIENT.search(
             index=index, doc_type="page", body=json.dumps({"query": query, "sort": sort, "from": 0, "size": 10})
@@ -113,264 +127,211 @@ class EsPageSearch(APIView):
         return JsonResponse(results["hits"])
 
 
-class HayStackSearch(APIView):
+class SearchSuggest(APIView):
+    """
+    Typeahead suggestions using the completion suggester of the page index
+    Optional `type` (comma separated) limits the suggestions to the given page types
+    """
+
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
     def get(self, request):
         phrase = request.GET.get("keyword", None)
-        phrase = phrase.lower()
         if phrase is None:
             return bad_request("Must include a `keyword`")
 
-        if phrase:
-            if self.request.user.is_authenticated:
-                if is_user_ifrc(self.request.user):
-                    project_response = (
-                        SearchQuerySet()
-                        .models(Project)
-                        .filter(SQ(event_name__content=phrase) | SQ(name__content=phrase) | SQ(iso3__contains=phrase))
-                        .order_by("-_score")
-                    )
-                    emergency_response = (
-                        SearchQuerySet()
-                        .models(Event)
-                        .filter(SQ(name__content=phrase) | SQ(iso3__content=phrase))
-                        .order_by("-_score")
-                    )
-                    fieldreport_response = (
-                        SearchQuerySet()
-                        .models(FieldReport)
-                        .filter(SQ(name__content=phrase) | SQ(iso3__content=phrase))
-                        .order_by("-_score")
-                    )
-                    surge_deployments = (
-                        SearchQuerySet()
-                        .models(ERU)
-                        .filter(SQ(event_name__content=phrase) | SQ(country__contains=phrase) | SQ(iso3__contains=phrase))
-                        .order_by("-_score")
-                    )
-                    rapid_response_deployments = (
-                        SearchQuerySet()
-                        .models(Personnel)
-                        .filter(
-                            SQ(deploying_country_name__contains=phrase)
-                            | SQ(deployed_to_country_name__contains=phrase)
-                            | SQ(event_name__content=phrase)
-                        )
-                        .order_by("-_score")
-                    )
-                    surge_alert_response = (
-                        SearchQuerySet()
-                        .models(SurgeAlert)
-                        .filter(
-                            SQ(event_name__content=phrase) | SQ(country_name__contains=phrase) | SQ(iso3__contains=phrase)
-                        )
-                        .order_by("-_score")
-                    )
-                else:
-                    project_response = (
-                        SearchQuerySet()
-                        .models(Project)
-                        .filter(
-                            (SQ(event_name__content=phrase) | SQ(name__content=phrase) | SQ(iso3__contains=phrase))
-                            & ~SQ(visibility="IFRC Only")
-                        )
-                        .order_by("-_score")
-                    )
-                    emergency_response = (
-                        SearchQuerySet()
-                        .models(Event)
-                        .filter((SQ(name__content=phrase) | SQ(iso3__content=phrase)) & ~SQ(visibility="IFRC Only"))
-                        .order_by("-_score")
-                    )
-                    fieldreport_response = (
-                        SearchQuerySet()
-                        .models(FieldReport)
-                        .filter((SQ(name__content=phrase) | SQ(iso3__content=phrase)) & ~SQ(visibility="IFRC Only"))
-                        .order_by("-_score")
-                    )
-                    surge_deployments = (
-                        SearchQuerySet()
-                        .models(ERU)
-                        .filter(
-                            SQ(event_name__content=phrase)
-                            | SQ(country__contains=phrase)
-                            | SQ(iso3__contains=phrase) & ~SQ(visibility="IFRC Only")
-                        )
-                        .order_by("-_score")
-                    )
-                    rapid_response_deployments = (
-                        SearchQuerySet()
-                        .models(Personnel)
-                        .filter(
-                            (
-                                SQ(deploying_country_name__contains=phrase)
-                                | SQ(deployed_to_country_name__contains=phrase)
-                                | SQ(event_name__content=phrase)
-                            )
-                            & ~SQ(visibility="IFRC Only")
-                        )
-                        .order_by("-_score")
-                    )
-                    surge_alert_response = (
-                        SearchQuerySet()
-                        .models(SurgeAlert)
-                        .filter(
-                            (SQ(event_name__content=phrase) | SQ(country_name__contains=phrase) | SQ(iso3__contains=phrase))
-                            & ~SQ(visibility="IFRC Only")
-                        )
-                        .order_by("-_score")
-                    )
+        types = None
+        if request.GET.get("type"):
+            types = [_type for _type in request.GET["type"].split(",") if _type in SUGGEST_TYPES]
+            if not types:
+                return bad_request(f"`type` must be one of {', '.join(SUGGEST_TYPES)}")
+        try:
+            limit = min(int(request.GET.get("limit", self.DEFAULT_LIMIT)), self.MAX_LIMIT)
+        except ValueError:
+            return bad_request("`limit` must be a number")
+        if ES_CLIENT is None:
+            return Response({"results": []})
+
+        body = {
+            "_source": ["id", "type", "name", "keyword", "event_id"],
+            "suggest": {
+                "page": {
+                    "prefix": phrase,
+                    "completion": {
+                        "field": "suggest",
+                        "size": limit,
+                        "skip_duplicates": True,
+                        "contexts": {
+                            "scope": get_es_suggest_scopes(get_user_visibility_class(request.user), types=types),
+                        },
+                    },
+                }
+            },
+        }
+        results = ES_CLIENT.search(index=ES_PAGE_NAME, body=body)
+        return Response(
+            {
+                "results": [
+                    {
+                        **option["_source"],
+                        "score": option["_score"],
+                    }
+                    for suggestion in results["suggest"]["page"]
+                    for option in suggestion["options"]
+                ]
+            }
+        )
 
-            else:
-                project_response = (
-                    SearchQuerySet()
-                    .models(Project)
-                    .filter(
-                        (SQ(event_name__content=phrase) | SQ(name__content=phrase) | SQ(iso3__contains=phrase))
-                        & SQ(visibility="Public")
-                    )
-                    .order_by("-_score")
-                )
-                emergency_response = (
-                    SearchQuerySet()
-                    .models(Event)
-                    .filter((SQ(name__content=phrase) | SQ(iso3__content=phrase)) & SQ(visibility="Public"))
-                    .order_by("-_score")
-                )
-                fieldreport_response = (
-                    SearchQuerySet()
-                    .models(FieldReport)
-                    .filter((SQ(name__content=phrase) | SQ(iso3__content=phrase)) & SQ(visibility="Public"))
-                    .order_by("-_score")
-                )
-                surge_deployments = (
-                    SearchQuerySet()
-                    .models(ERU)
-                    .filter(
-                        SQ(event_name__content=phrase)
-                        | SQ(country__contains=phrase)
-                        | SQ(iso3__contains=phrase) & SQ(visibility="Public")
-                    )
-                    .order_by("-_score")
-                )
-                rapid_response_deployments = (
-                    SearchQuerySet()
-                    .models(Personnel)
-                    .filter(
-                        (
-                            SQ(deploying_country_name__contains=phrase)
-                            | SQ(deployed_to_country_name__contains=phrase)
-                            | SQ(event_name__content=phrase)
-                        )
-                        & SQ(visibility="Public")
-                    )
-                    .order_by("-_score")
-                )
-                surge_alert_response = (
-                    SearchQuerySet()
-                    .models(SurgeAlert)
-                    .filter(
-                        (SQ(event_name__content=phrase) | SQ(country_name__contains=phrase) | SQ(iso3__contains=phrase))
-                        & SQ(visibility="Public")
-                    )
-                    .order_by("-_score")
-                )
 
-            region_response = SearchQuerySet().models(Region).filter(SQ(name__startswith=phrase))
-            country_response = (
-                SearchQuerySet()
-                .models(Country)
-                .filter(SQ(name__contains=phrase, independent="true", is_depercent="false") | SQ(iso3__contains=phrase))
-                .order_by("-_score")
+class HayStackSearch(APIView):
+    @staticmethod
+    def get_visibility_filter(user):
+        if user.is_authenticated:
+            if is_user_ifrc(user):
+                return None
+            return ~SQ(visibility="IFRC Only")
+        return SQ(visibility="Public")
+
+    @classmethod
+    def get_multi_search(cls, phrase, user):
+        """
+        Returns the (unevaluated) SearchQuerySet of each response section bundled in a MultiSearchQuerySet
+        The visibility filter is resolved once for the user and applied to the visibility-aware models
+        """
+        visibility_filter = cls.get_visibility_filter(user)
+
+        def with_visibility(query):
+            if visibility_filter is None:
+                return query
+            return query & visibility_filter
+
+        multi_search = MultiSearchQuerySet()
+        multi_search.add(
+            "projects",
+            SearchQuerySet()
+            .models(Project)
+            .filter(with_visibility(SQ(event_name__content=phrase) | SQ(name__content=phrase) | SQ(iso3__contains=phrase)))
+            .order_by("-_score")
+            .order_by("-start_date"),
+        )
+        multi_search.add(
+            "emergencies",
+            SearchQuerySet()
+            .models(Event)
+            .filter(with_visibility(SQ(name__content=phrase) | SQ(iso3__content=phrase)))
+            .order_by("-_score"),
+        )
+        multi_search.add(
+            "field_reports",
+            SearchQuerySet()
+            .models(FieldReport)
+            .filter(with_visibility(SQ(name__content=phrase) | SQ(iso3__content=phrase)))
+            .order_by("-_score")
+            .order_by("-created_at"),
+        )
+        multi_search.add(
+            "surge_deployments",
+            SearchQuerySet()
+            .models(ERU)
+            .filter(
+                with_visibility(SQ(event_name__content=phrase) | SQ(country__contains=phrase) | SQ(iso3__contains=phrase))
             )
-            # appeal_response = SearchQuerySet().models(Appeal).filter(
-            #     SQ(name__content=phrase) | SQ(code__content=phrase) | SQ(iso3__content=phrase)
-            # ).order_by('-_score')
-
-            district_province_response = (
-                SearchQuerySet()
-                .models(District)
-                .filter(SQ(name__contains=phrase) | SQ(iso3__contains=phrase))
-                .order_by("-_score")
+            .order_by("-_score"),
+        )
+        multi_search.add(
+            "rapid_response_deployments",
+            SearchQuerySet()
+            .models(Personnel)
+            .filter(
+                with_visibility(
+                    SQ(deploying_country_name__contains=phrase)
+                    | SQ(deployed_to_country_name__contains=phrase)
+                    | SQ(event_name__content=phrase)
+                )
             )
-            flash_update_response = (
-                SearchQuerySet()
-                .models(FlashUpdate)
-                .filter(SQ(name__contains=phrase) | SQ(iso3__contains=phrase))
-                .order_by("-_score")
+            .order_by("-_score"),
+        )
+        multi_search.add(
+            "surge_alerts",
+            SearchQuerySet()
+            .models(SurgeAlert)
+            .filter(
+                with_visibility(SQ(event_name__content=phrase) | SQ(country_name__contains=phrase) | SQ(iso3__contains=phrase))
             )
-            # dref_response = SearchQuerySet().models(Dref).filter(
-            #     SQ(name__contains=phrase) | SQ(code__contains=phrase) | SQ(iso3__contains=phrase)
-            # ).order_by('-_score')
-            # dref_operational_update_response = SearchQuerySet().models(DrefOperationalUpdate).filter(
-            #     SQ(name__contains=phrase) | SQ(code__contains=phrase) | SQ(iso3__contains=phrase)
-            # ).order_by('-_score')
-
-            # appeals_list = []
-            # dref = [
-            #     {
-            #         "id": int(data.id.split(".")[-1]),
-            #         "name": data.name,
-            #         "created_at": data.created_at,
-            #         "type": "Dref",
-            #         "score": data.score,
-            #         "country_name": data.country_name,
-            #         "country_id": data.country_id,
-            #         "code": data.code
-            #     } for data in dref_response
-            # ]
-            # appeals_list.extend(dref)
-            # dref_op = [
-            #     {
-            #         "id": int(data.id.split(".")[-1]),
-            #         "name": data.name,
-            #         "created_at": data.created_at,
-            #         "type": "Operational Update",
-            #         "score": data.score,
-            #         "country_name": data.country_name,
-            #         "country_id": data.country_id,
-            #         "code": data.code
-            #     } for data in dref_operational_update_response
-            # ]
-            # appeals_list.extend(dref_op)
-            # appeal_data = [
-            #     {
-            #         "id": int(data.id.split(".")[-1]),
-            #         "name": data.name,
-            #         "code": data.code,
-            #         "country": data.country_name,
-            #         "country_id": data.country_id,
-            #         "start_date": data.start_date,
-            #         "score": data.score,
-            #         "type": "Appeal",
-            #     } for data in appeal_response
-            # ]
-            # appeals_list.extend(appeal_data)
-            field_report = []
-            flash_update = [
-                {
-                    "id": int(data.id.split(".")[-1]),
-                    "name": data.name,
-                    "created_at": data.created_at,
-                    "type": "Flash Update",
-                    "score": data.score,
-                }
-                for data in flash_update_response
-            ]
-            field_report.extend(flash_update)
-            field_reports_data = [
-                {
-                    "id": int(data.id.split(".")[-1]),
-                    "name": data.name,
-                    "created_at": data.created_at,
-                    "type": "Field Report",
-                    "score": data.score,
-                }
-                for data in fieldreport_response.order_by("-created_at")
-            ]
-            field_report.extend(field_reports_data)
+            .order_by("-_score")
+            .order_by("-start_date"),
+        )
+        multi_search.add("regions", SearchQuerySet().models(Region).filter(SQ(name__startswith=phrase)))
+        multi_search.add(
+            "countries",
+            SearchQuerySet()
+            .models(Country)
+            .filter(SQ(name__contains=phrase, independent="true", is_depercent="false") | SQ(iso3__contains=phrase))
+            .order_by("-_score"),
+        )
+        multi_search.add(
+            "district_province_response",
+            SearchQuerySet()
+            .models(District)
+            .filter(SQ(name__contains=phrase) | SQ(iso3__contains=phrase))
+            .order_by("-_score"),
+        )
+        multi_search.add(
+            "flash_updates",
+            SearchQuerySet()
+            .models(FlashUpdate)
+            .filter(SQ(name__contains=phrase) | SQ(iso3__contains=phrase))
+            .order_by("-_score"),
+        )
+        return multi_search
+
+    def get(self, request):
+        phrase = request.GET.get("keyword", None)
+        if phrase is None:
+            return bad_request("Must include a `keyword`")
+        phrase = phrase.lower()
+
+        # NOTE: All the queries are sent to Elasticsearch together using a single _msearch request
+        search_results = self.get_multi_search(phrase, self.request.user).execute()
+
+        project_response = search_results["projects"]
+        emergency_response = search_results["emergencies"]
+        fieldreport_response = search_results["field_reports"]
+        surge_deployments = search_results["surge_deployments"]
+        rapid_response_deployments = search_results["rapid_response_deployments"]
+        surge_alert_response = search_results["surge_alerts"]
+        region_response = search_results["regions"]
+        country_response = search_results["countries"]
+        district_province_response = search_results["district_province_response"]
+        flash_update_response = search_results["flash_updates"]
+
+        field_report = []
+        flash_update = [
+            {
+                "id": int(data.id.split(".")[-1]),
+                "name": data.name,
+                "created_at": data.created_at,
+                "type": "Flash Update",
+                "score": data.score,
+            }
+            for data in flash_update_response
+        ]
+        field_report.extend(flash_update)
+        field_reports_data = [
+            {
+                "id": int(data.id.split(".")[-1]),
+                "name": data.name,
+                "created_at": data.created_at,
+                "type": "Field Report",
+                "score": data.score,
+            }
+            for data in fieldreport_response
+        ]
+        field_report.extend(field_reports_data)
         result = {
             "regions": [
-                {"id": int(data.id.split(".")[-1]), "name": data.name, "score": data.score} for data in region_response[:50]
+                {"id": int(data.id.split(".")[-1]), "name": data.name, "score": data.score} for data in region_response
             ],
             "district_province_response": [
                 {
@@ -380,7 +341,7 @@ class HayStackSearch(APIView):
                     "country": data.country_name,
                     "country_id": data.country_id,
                 }
-                for data in district_province_response[:50]
+                for data in district_province_response
             ],
             "countries": [
                 {
@@ -390,7 +351,7 @@ class HayStackSearch(APIView):
                     "iso3": data.iso3,
                     "score": data.score,
                 }
-                for data in country_response[:50]
+                for data in country_response
             ],
             "emergencies": [
                 {
@@ -407,7 +368,7 @@ class HayStackSearch(APIView):
                     "crisis_categorization": data.crisis_categorization,
                     "appeal_type": data.appeal_type,
                 }
-                for data in emergency_response[:50]
+                for data in emergency_response
             ],
             "surge_alerts": [
                 {
@@ -425,7 +386,7 @@ class HayStackSearch(APIView):
                     "surge_type": data.surge_type,
                     "country_id": data.country_id,
                 }
-                for data in surge_alert_response.order_by("-start_date")[:50]
+                for data in surge_alert_response
             ],
             "projects": [
                 {
@@ -443,7 +404,7 @@ class HayStackSearch(APIView):
                     "event_id": data.event_id,
                     "national_society_id": data.reporting_ns_id,
                 }
-                for data in project_response.order_by("-start_date")[:50]
+                for data in project_response
             ],
             "surge_deployments": [
                 {
@@ -459,7 +420,7 @@ class HayStackSearch(APIView):
                     "deployed_country_id": data.country_id,
                     "deployed_country_name": data.country_name,
                 }
-                for data in surge_deployments[:50]
+                for data in surge_deployments
             ],
             "reports": sorted(field_report, key=lambda d: d["score"], reverse=True)[:50],
             # "emergency_planning": sorted(appeals_list, key=lambda d: d["score"], reverse=True)[:50],
@@ -479,7 +440,7 @@ class HayStackSearch(APIView):
                     "event_id": data.event_id,
                     "score": data.score,
                 }
-                for data in rapid_response_deployments[:50]
+                for data in rapid_response_deployments
             ],
         }
         return Response(result)
@@ -568,7 +529,27 @@ class ProjectStatuses(APIView):
 
 
 class AggregateHeaderFigures(APIView):
-    """Used mainly for the key-figures header and by FDRS"""
+    """
+    Used mainly for the key-figures header and by FDRS
+    Answered from the DailyAppealFigures rollup (maintained by ingest_appeals) when the day is computed
+    """
+
+    @staticmethod
+    def get_rollup_params(date, now):
+        """
+        Rollup figures (day, latest) which match the `date` query param, None if they can only be computed live
+        Without date: the current figures (latest ingest_appeals run), with a day: its figures at 00:00
+        """
+        if date is None:
+            return now.date(), True
+        try:
+            day = parse_date(date)
+        except ValueError:
+            return None
+        # Same moment as the live query for `date=YYYY-MM-DD`
+        if day is not None and day <= now.date():
+            return day, False
+        return None
 
     def get(self, request):
         iso3 = request.GET.get("iso3", None)
@@ -576,12 +557,18 @@ class AggregateHeaderFigures(APIView):
         region = request.GET.get("region", None)
 
         now = timezone.now()
-        date = request.GET.get("date", now)
-        appeal_conditions = (
-            (Q(atype=AppealType.APPEAL) | Q(atype=AppealType.INTL)) & Q(end_date__gt=date) & Q(start_date__lt=date)
-        )
-
-        all_appealhistory = AppealHistory.objects.select_related("appeal").filter(
+        date = request.GET.get("date", None)
+        rollup_params = self.get_rollup_params(date, now)
+        if rollup_params is not None:
+            day, latest = rollup_params
+            figures = DailyAppealFigures.get_figures(day, latest=latest, iso3=iso3, country=country, region=region)
+            if figures is not None:
+                return Response(figures)
+        return Response(self.get_live_figures(date or now, iso3=iso3, country=country, region=region))
+
+    @staticmethod
+    def get_live_figures(date, iso3=None, country=None, region=None):
+        all_appealhistory = AppealHistory.objects.filter(
             valid_from__lt=date, valid_to__gt=date, appeal__code__isnull=False
         )
 
@@ -592,45 +579,7 @@ class AggregateHeaderFigures(APIView):
         if region:
             all_appealhistory = all_appealhistory.filter(country__region__id=region)
 
-        appeals_aggregated = all_appealhistory.annotate(
-            # Active Appeals with DREF type
-            actd=Count(
-                Case(
-                    When(Q(atype=AppealType.DREF) & Q(end_date__gt=date) & Q(start_date__lt=date), then=1),
-                    output_field=IntegerField(),
-                )
-            ),
-            # Active Appeals with type Emergency Appeal or International Appeal
-            acta=Count(Case(When(appeal_conditions, then=1), output_field=IntegerField())),
-            # Total Appeals count which are not DREF
-            tota=Count(
-                Case(When(Q(atype=AppealType.APPEAL) | Q(atype=AppealType.INTL), then=1), output_field=IntegerField())
-            ),
-            # Active Appeals' target population
-            tarp=Sum(
-                Case(
-                    When(Q(end_date__gt=date) & Q(start_date__lt=date), then=F("num_beneficiaries")),
-                    output_field=IntegerField(),
-                )
-            ),
-            # Active Appeals' requested amount, which are not DREF
-            amor=Case(When(appeal_conditions, then=F("amount_requested")), output_field=IntegerField()),
-            amordref=Case(
-                When(Q(end_date__gt=date) & Q(start_date__lt=date), then=F("amount_requested")), output_field=IntegerField()
-            ),
-            # Active Appeals' funded amount, which are not DREF
-            amof=Case(When(appeal_conditions, then=F("amount_funded")), output_field=IntegerField()),
-        ).aggregate(
-            active_drefs=Sum("actd"),
-            active_appeals=Sum("acta"),
-            total_appeals=Sum("tota"),
-            target_population=Sum("tarp"),
-            amount_requested=Sum("amor"),
-            amount_requested_dref_included=Sum("amordref"),
-            amount_funded=Sum("amof"),
-        )
-
-        return Response(dict(appeals_aggregated))
+        return all_appealhistory.aggregate(**get_appeal_figures_aggregates(date))
 
 
 class AreaAggregate(APIView):
@@ -987,3 +936,34 @@ class DummyHttpStatusError(View):
 class DummyExceptionError(View):
     def get(self, request, *args, **kwargs):
         raise Exception("Dev raised exception!")
+
+
+class TileView(View):
+    """
+    Mapbox Vector Tile of a boundary layer (see api.tiles), /api/v2/tiles/{layer}/{z}/{x}/{y}.mvt
+    The tiles are cached by the response cache, which is invalidated when the layer's geometries change
+    """
+    layer = None
+    cache_visibility_classes = ("anonymous", "authenticated", "ifrc")
+    cache_seconds = 60 * 15
+
+    def get(self, request, z, x, y):
+        z, x, y = int(z), int(x), int(y)
+        if not is_valid_tile(z, x, y):
+            raise Http404
+        return HttpResponse(get_tile(self.layer, z, x, y), content_type="application/vnd.mapbox-vector-tile")
+
+
+class CountryTileView(TileView):
+    layer = "countries"
+    cache_dependencies = TILE_LAYERS["countries"]["models"]
+
+
+class DistrictTileView(TileView):
+    layer = "districts"
+    cache_dependencies = TILE_LAYERS["districts"]["models"]
+
+
+class Admin2TileView(TileView):
+    layer = "admin2"
+    cache_dependencies = TILE_LAYERS["admin2"]["models"]
@@ -30,6 +30,8 @@ class ReadOnlyVisibilityViewsetMixin:
 # TODO: Use ReadOnlyVisibilityViewsetMixin instead of ReadOnlyVisibilityViewset
 class ReadOnlyVisibilityViewset(viewsets.ReadOnlyModelViewSet):
     visibility_model_class = None
+    # Payloads only depend on the user's visibility class (middlewares.cache)
+    cache_visibility_classes = ("anonymous", "authenticated", "ifrc")
 
     def get_queryset(self):
         # FIXME: utils.py:43
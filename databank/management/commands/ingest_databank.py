@@ -1,10 +1,18 @@
 import datetime
 import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from api.models import Country, CronJob, CronJobStatus
 from databank.models import CountryOverview
+from middlewares.cache import bump_cache_generation
 
 from .sources import (
     FDRS,
@@ -14,6 +22,7 @@ from .sources import (
     START_NETWORK,
     WB,
 )
+from .sources.utils import log_source_error, source_error_counts
 
 logger = logging.getLogger(__name__)
 
@@ -28,76 +37,166 @@ SOURCES = [
         WB,
     )
 ]
+SOURCE_NAMES = [name for _, name in SOURCES]
+
+# Parallel per-country fetches (network-bound, see the sources' fetch)
+FETCH_WORKERS = 8
+BULK_UPDATE_BATCH_SIZE = 100
+
+
+def timed(func, *args):
+    start = time.monotonic()
+    return func(*args), time.monotonic() - start
 
 
 class Command(BaseCommand):
-    def load(self):
-        """
-        Load data for Databank from specified sources
-        """
-        source_prefetch_data = {}
+    help = 'Load data for Databank from the external sources'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only-source', choices=SOURCE_NAMES,
+            help='Refresh only this source',
+        )
+        parser.add_argument(
+            '--countries', nargs='+', metavar='ISO2',
+            help='Refresh only these countries (ISO2 codes)',
+        )
+        parser.add_argument(
+            '--fetch-workers', type=int, default=FETCH_WORKERS,
+            help='Number of parallel per-country fetches',
+        )
 
-        # Prefetch Data
+    def prefetch(self, sources):
+        source_prefetch_data = {}
         try:
             print('\nPrefetching from sources:: ')
-            for source, name in SOURCES:
+            for source, name in sources:
                 if hasattr(source, 'prefetch'):
-                    start = datetime.datetime.now()
                     print(f'\t -> {name}', end='')
-                    prefetch_response = source.prefetch()
+                    prefetch_response, seconds = timed(source.prefetch)
+                    self.timings[name]['prefetch'] += seconds
                     if prefetch_response is not None:
-                        source_prefetch_data[source.__name__], item_count, sources = prefetch_response
+                        source_prefetch_data[name], item_count, source_urls = prefetch_response
                         # Log success prefetch
                         CronJob.sync_cron({
                             'name': name,
                             'message': f'Done querying {name}' + (
-                                sources and f' using sources: {sources}'
+                                source_urls and f' using sources: {source_urls}'
                             ) or '',
                             'num_result': item_count,
                             'status': CronJobStatus.SUCCESSFUL,
                         })
-                    print(f' [{datetime.datetime.now() - start}]')
+                    print(f' [{datetime.timedelta(seconds=seconds)}]')
         except Exception as ex:
             CronJob.sync_cron({
                 'name': 'ingest_databank',
                 'message': f'Could not prefetch from sources\n\nException:\n{str(ex)}',
                 'status': CronJobStatus.ERRONEOUS,
             })
+        return source_prefetch_data
+
+    def fetch(self, sources, countries, source_prefetch_data, workers):
+        """
+        Runs the network-bound per-country fetches (source.fetch) concurrently, using a shared pooled session
+        Returns {(source name, country id): data}, used by the source's load (in this thread)
+        """
+        fetched_data = {}
+        fetch_sources = [
+            (source, name)
+            for source, name in sources
+            if hasattr(source, 'fetch') and source_prefetch_data.get(name) is not None
+        ]
+        if not fetch_sources:
+            return fetched_data
+
+        print('\nFetching per-country data from sources:: ', end='')
+        start = time.monotonic()
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as executor:
+            adapter = HTTPAdapter(max_retries=settings.RETRY_STRATEGY, pool_connections=workers, pool_maxsize=workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            futures = {
+                executor.submit(timed, source.fetch, country, session): (name, country)
+                for source, name in fetch_sources
+                for country in countries
+            }
+            for future in as_completed(futures):
+                name, country = futures[future]
+                try:
+                    fetched_data[(name, country.pk)], seconds = future.result()
+                    self.timings[name]['fetch'] += seconds
+                except Exception:
+                    log_source_error(name, 'fetch', country=country)
+        print(f'[{datetime.timedelta(seconds=time.monotonic() - start)}]')
+        return fetched_data
+
+    def get_overviews(self, countries):
+        existing_country_ids = set(
+            CountryOverview.objects.filter(country__in=countries).values_list('country_id', flat=True)
+        )
+        CountryOverview.objects.bulk_create([
+            CountryOverview(country=country)
+            for country in countries
+            if country.pk not in existing_country_ids
+        ])
+        return {
+            overview.country_id: overview
+            for overview in CountryOverview.objects.filter(country__in=countries)
+        }
+
+    def load(self, sources, countries, fetch_workers):
+        """
+        Load data for Databank from specified sources
+        """
+        source_prefetch_data = self.prefetch(sources)
 
         # Load
         try:
+            fetched_data = self.fetch(sources, countries, source_prefetch_data, fetch_workers)
+
             print('\nLoading Sources data into GO DB:: ')
-            for source, name in SOURCES:
+            for source, name in sources:
                 if hasattr(source, 'global_load'):
                     print(f'\t -> {name}', end='')
-                    source.global_load(source_prefetch_data.get(source.__name__))
-                    print(f' [{datetime.datetime.now() - start}]')
+                    _, seconds = timed(source.global_load, source_prefetch_data.get(name))
+                    self.timings[name]['load'] += seconds
+                    print(f' [{datetime.timedelta(seconds=seconds)}]')
 
-            index, country_count = 1, Country.objects.count()
+            overviews = self.get_overviews(countries)
+            script_modified_at = timezone.now()
+            country_count = len(countries)
             print('\nLoading Sources data for each country to GO DB:: ')
-            for country in Country.objects.prefetch_related('countryoverview').all():
+            for index, country in enumerate(countries, 1):
                 print(u'\t -> ({}/{}) {}'.format(index, country_count, str(country)))
-                overview = (
-                    country.countryoverview if hasattr(country, 'countryoverview') else
-                    CountryOverview.objects.create(country=country)
-                )
-                overview.script_modified_at = timezone.now()
-                for source, name in SOURCES:
+                overview = overviews[country.pk]
+                overview.script_modified_at = script_modified_at
+                for source, name in sources:
                     if hasattr(source, 'load'):
-                        print(f'\t\t -> {name}', end='')
                         # Load For each country
-                        source_data = source_prefetch_data.get(source.__name__)
-                        start = datetime.datetime.now()
-                        source.load(country, overview, source_data)
-                        print(f' [{datetime.datetime.now() - start}]')
-                overview.save()
-                index += 1
+                        load_args = [country, overview, source_prefetch_data.get(name)]
+                        if hasattr(source, 'fetch'):
+                            load_args.append(fetched_data.get((name, country.pk)))
+                        _, seconds = timed(source.load, *load_args)
+                        self.timings[name]['load'] += seconds
+
+            # Only the fields set by the loaded sources are written
+            overview_fields = {'script_modified_at'}
+            country_fields = set()
+            for source, _ in sources:
+                overview_fields.update(getattr(source, 'OVERVIEW_FIELDS', []))
+                country_fields.update(getattr(source, 'COUNTRY_FIELDS', []))
+            CountryOverview.objects.bulk_update(overviews.values(), overview_fields, batch_size=BULK_UPDATE_BATCH_SIZE)
+            bump_cache_generation(CountryOverview)
+            if country_fields:
+                Country.objects.bulk_update(countries, country_fields, batch_size=BULK_UPDATE_BATCH_SIZE)
+                bump_cache_generation(Country)
+
             # This source can not be checked/logged via prefetch, that is why we do it here, after the "load".
-            if name == 'FTS_HPC':
+            if FTS_HPC in [source for source, _ in sources]:
                 CronJob.sync_cron({
-                    'name': name,
-                    'message': f'Done querying {name} data feeds',
-                    'num_result': index, "status": CronJobStatus.SUCCESSFUL,
+                    'name': 'FTS_HPC',
+                    'message': 'Done querying FTS_HPC data feeds',
+                    'num_result': country_count, "status": CronJobStatus.SUCCESSFUL,
                 })
         except Exception as ex:
             CronJob.sync_cron({
@@ -106,7 +205,43 @@ class Command(BaseCommand):
                 'status': CronJobStatus.ERRONEOUS,
             })
 
-    def handle(self, *args, **kwargs):
+    def log_stats(self, sources, countries, total_seconds):
+        lines = [
+            '{}: prefetch {:.1f}s, fetch {:.1f}s (cumulative), load {:.1f}s, errors {}'.format(
+                name,
+                self.timings[name]['prefetch'],
+                self.timings[name]['fetch'],
+                self.timings[name]['load'],
+                source_error_counts[name],
+            )
+            for _, name in sources
+        ]
+        error_count = sum(source_error_counts[name] for _, name in sources)
+        print('\n' + '\n'.join(lines))
+        CronJob.sync_cron({
+            'name': 'ingest_databank',
+            'message': (
+                f'Done loading {len(countries)} countries in {total_seconds:.1f}s ({error_count} errors)\n\n' +
+                '\n'.join(lines)
+            ),
+            'num_result': len(countries),
+            'status': CronJobStatus.WARNED if error_count else CronJobStatus.SUCCESSFUL,
+        })
+
+    def handle(self, *args, **options):
         start = datetime.datetime.now()
-        self.load()
+        sources = [
+            (source, name)
+            for source, name in SOURCES
+            if options['only_source'] in (None, name)
+        ]
+        countries = Country.objects.order_by('id')
+        if options['countries']:
+            countries = countries.filter(iso__in=[iso.upper() for iso in options['countries']])
+        countries = list(countries)
+
+        self.timings = defaultdict(lambda: defaultdict(float))
+        source_error_counts.clear()
+        self.load(sources, countries, options['fetch_workers'])
+        self.log_stats(sources, countries, (datetime.datetime.now() - start).total_seconds())
         print('Total time: ', datetime.datetime.now() - start)
@@ -1,7 +1,8 @@
 import logging
-import requests
 from django.conf import settings
 
+from main.fetch import fetch
+
 from databank.models import CountryOverview as CO
 from .utils import catch_error
 
@@ -27,6 +28,9 @@ FDRS_INDICATORS_FIELD_MAP = (
 )
 FDRS_INDICATORS = [indicator for indicator, _ in FDRS_INDICATORS_FIELD_MAP]
 
+# CountryOverview fields set by load (saved in bulk by ingest_databank)
+OVERVIEW_FIELDS = [field.field.name for _, field in FDRS_INDICATORS_FIELD_MAP]
+
 # To fetch NS ID
 FDRS_NS_API_ENDPOINT = f'https://data-api.ifrc.org/api/entities/ns?apiKey={settings.FDRS_APIKEY}'
 
@@ -36,7 +40,7 @@ FDRS_DATA_API_ENDPOINT = f'https://data-api.ifrc.org/api/data?apiKey={settings.F
 
 @catch_error('Error occured while fetching from FDRS API.')
 def prefetch():
-    fdrs_entities = requests.get(FDRS_NS_API_ENDPOINT)
+    fdrs_entities = fetch(FDRS_NS_API_ENDPOINT)
     if fdrs_entities.status_code != 200:
         return
     fdrs_entities.raise_for_status()
@@ -55,7 +59,7 @@ def prefetch():
                 ns_data['data'] and len(ns_data['data']) > 0
             ) else None
         )
-        for indicator_data in requests.get(FDRS_DATA_API_ENDPOINT).json()['data']
+        for indicator_data in fetch(FDRS_DATA_API_ENDPOINT).json()['data']
         for ns_data in indicator_data['data']
     }, len(ns_iso_map), FDRS_DATA_API_ENDPOINT
 
@@ -72,4 +76,3 @@ def load(country, overview, fdrs_data):
             field.field.name,
             value and value['value'],
         )
-    overview.save()
@@ -1,17 +1,22 @@
 import csv
 import io
 import datetime
-import requests
 
 # from django.conf import settings
 # from api.utils import base64_encode
 
+from main.fetch import fetch as fetch_url
+
 from .utils import catch_error, get_country_by_iso2
 
 
 FTS_URL = 'https://api.hpc.tools/v1/public/fts/flow?countryISO3={0}&groupby=year&report=3'
 EMERGENCY_URL = 'https://api.hpc.tools/v1/public/emergency/country/{0}'
 GOOGLE_SHEET_URL = 'https://docs.google.com/spreadsheets/d/1MArQSVdbLXLaQ8ixUKo9jIjifTCVDDxTJYbGoRuw3Vw/gviz/tq?tqx=out:csv'
+FETCH_TIMEOUT = 60
+
+# CountryOverview fields set by load (saved in bulk by ingest_databank)
+OVERVIEW_FIELDS = ['fts_data']
 
 HEADERS = {
     # TODO: USE Crendentils here
@@ -21,7 +26,7 @@ HEADERS = {
 
 @catch_error()
 def prefetch():
-    g_sheet_data = requests.get(GOOGLE_SHEET_URL, headers=HEADERS)
+    g_sheet_data = fetch_url(GOOGLE_SHEET_URL, headers=HEADERS)
     g_sheet_data.raise_for_status()
 
     g_sheet_data = list(csv.DictReader(io.StringIO(g_sheet_data.text)))
@@ -39,21 +44,31 @@ def prefetch():
     return gho_data, len(gho_data), GOOGLE_SHEET_URL
 
 
-@catch_error()
-def load(country, overview, gho_data):
-    if country.iso is None or gho_data is None:
+def fetch(country, session):
+    """
+    Per-country FTS/emergency feeds, ingest_databank runs these concurrently (using a shared session)
+    NOTE: Runs outside of the main thread, don't use the database here
+    """
+    if country.iso is None:
         return
     pcountry = get_country_by_iso2(country.iso)
     if pcountry is None:
         return
-    fts_data = requests.get(FTS_URL.format(pcountry.alpha_3), headers=HEADERS)
-    emg_data = requests.get(EMERGENCY_URL.format(pcountry.alpha_3), headers=HEADERS)
+    fts_data = fetch_url(FTS_URL.format(pcountry.alpha_3), headers=HEADERS, session=session, timeout=FETCH_TIMEOUT)
+    emg_data = fetch_url(EMERGENCY_URL.format(pcountry.alpha_3), headers=HEADERS, session=session, timeout=FETCH_TIMEOUT)
 
     fts_data.raise_for_status()
     emg_data.raise_for_status()
 
-    fts_data = fts_data.json()
-    emg_data = emg_data.json()
+    return fts_data.json(), emg_data.json()
+
+
+@catch_error()
+def load(country, overview, gho_data, fetched_data=None):
+    if country.iso is None or gho_data is None or fetched_data is None:
+        return
+    pcountry = get_country_by_iso2(country.iso)
+    fts_data, emg_data = fetched_data
 
     c_data = {}
 
@@ -96,6 +111,5 @@ def load(country, overview, gho_data):
         }
         for year, values in c_data.items()
     ]
-    overview.save()
 
     # Instead of here the CronJob success logging was placed to ingest_databank.py, because here it is in a loop
@@ -1,6 +1,5 @@
-import requests
-
 from databank.models import InformIndicator
+from main.fetch import fetch
 
 from .utils import catch_error, get_country_by_iso3
 
@@ -11,11 +10,14 @@ INFORM_API_ENDPOINT = (
     )
 )
 
+# CountryOverview fields set by load (saved in bulk by ingest_databank)
+OVERVIEW_FIELDS = ['inform_indicators']
+
 
 @catch_error()
 def prefetch():
     inform_data = {}
-    response_d = requests.get(INFORM_API_ENDPOINT)
+    response_d = fetch(INFORM_API_ENDPOINT)
     response_d.raise_for_status()
     response_d = response_d.json()
 
@@ -52,4 +54,3 @@ def load(country, overview, inform_data):
         return
 
     overview.inform_indicators = inform_data[country.iso.upper()]
-    overview.save()
@@ -1,9 +1,9 @@
 import logging
 import datetime
 import json
-import requests
 
 from databank.models import PastCrisesEvent, PastEpidemic, Month
+from main.fetch import fetch
 from .utils import catch_error, get_country_by_iso3
 
 logger = logging.getLogger(__name__)
@@ -11,6 +11,9 @@ logger = logging.getLogger(__name__)
 DISASTER_API = 'https://api.reliefweb.int/v1/disasters/'
 RELIEFWEB_DATETIME_FORMAT = '%Y-%m-%d'
 
+# CountryOverview fields set by load (saved in bulk by ingest_databank)
+OVERVIEW_FIELDS = ['past_crises_events', 'past_epidemics']
+
 
 def parse_date(date):
     # Only works for reliefweb dates
@@ -39,7 +42,7 @@ def _crises_event_prefetch():
     url = DISASTER_API
     data = {}
     while True:
-        response = requests.post(url, data=query_params)
+        response = fetch(url, method='POST', data=query_params)
         response.raise_for_status()
         response = response.json()
 
@@ -87,7 +90,7 @@ def _epidemics_prefetch():
     url = DISASTER_API
     data = {}
     while True:
-        response = requests.post(url, data=query_params)
+        response = fetch(url, method='POST', data=query_params)
         response.raise_for_status()
         response = response.json()
 
@@ -167,4 +170,3 @@ def load(country, overview, relief_data):
             'event_display': str(PastEpidemic.LABEL_MAP.get(data['epidemic'])),
         } for index, data in enumerate(relief_data['epidemics'].get(iso2) or [])
     ]
-    overview.save()
@@ -1,8 +1,8 @@
 import re
 import datetime
-import requests
 import csv
 
+from main.fetch import fetch
 from .utils import catch_error, get_country_by_name
 
 
@@ -12,6 +12,9 @@ DATE_FORMATS = (
     '%m/%d/%Y %H:%M'
 )
 
+# CountryOverview fields set by load (saved in bulk by ingest_databank)
+OVERVIEW_FIELDS = ['start_network_data']
+
 
 def parse_amount(amount_in_string):
     c_string = re.sub('[^0-9]', '', amount_in_string).strip()
@@ -30,7 +33,7 @@ def parse_alert_date(date):
 @catch_error()
 def prefetch():
     data = {}
-    rs = requests.get(API_ENDPOINT)
+    rs = fetch(API_ENDPOINT)
     if rs.status_code != 200:
         return
     rs.raise_for_status()
@@ -68,4 +71,3 @@ def load(country, overview, data):
         return
 
     overview.start_network_data = data[country.iso.upper()]
-    overview.save()
@@ -1,8 +1,8 @@
-import requests
 import datetime
 import logging
 
 from api.models import District
+from main.fetch import fetch
 
 from .utils import catch_error, get_country_by_iso3
 
@@ -10,6 +10,9 @@ from .utils import catch_error, get_country_by_iso3
 logger = logging.getLogger(__name__)
 API_ENDPOINT = 'https://api.worldbank.org/v2/country/ALL/indicator/SP.POP.TOTL'
 
+# Country (and District) fields set by load (saved in bulk by ingest_databank)
+COUNTRY_FIELDS = ['wb_population', 'wb_year']
+
 
 @catch_error()
 def prefetch():
@@ -21,7 +24,7 @@ def prefetch():
     daterange = f'{now.year - 10}:{now.year}'
     while True:
         # TODO: lastupdated
-        rs = requests.get(f'{url}?date={daterange}', params={
+        rs = fetch(f'{url}?date={daterange}', params={
             'format': 'json',
             'source': 50,
             'per_page': 5000 - 1,  # WD throws error on 5000
@@ -63,6 +66,7 @@ def global_load(wd_data):
     if wd_data is None:
         return
 
+    districts = []
     for district in District.objects.all():
         if not district.code:
             continue
@@ -71,7 +75,8 @@ def global_load(wd_data):
             continue
         district.wb_population = pop
         district.wb_year = year
-        district.save(update_fields=['wb_population', 'wb_year'])
+        districts.append(district)
+    District.objects.bulk_update(districts, COUNTRY_FIELDS, batch_size=500)
 
 
 @catch_error()
@@ -84,4 +89,3 @@ def load(country, overview, wd_data):
         return
     country.wb_population = pop
     country.wb_year = year
-    country.save(update_fields=['wb_population', 'wb_year'])
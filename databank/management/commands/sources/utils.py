@@ -1,6 +1,7 @@
 import pycountry
 import logging
 import traceback
+from collections import Counter
 
 from api.models import Country
 from api.models import CronJob, CronJobStatus
@@ -9,6 +10,32 @@ from django.db import transaction
 logger = logging.getLogger(__name__)
 
 
+# Errors logged (and skipped) per source name, reported by ingest_databank
+source_error_counts = Counter()
+
+
+def log_source_error(source_name, func_name, country=None, error_message=None):
+    """ Logs the exception being handled to cronjob, used by catch_error and the per-country fetches """
+    source_error_counts[source_name] += 1
+    CronJob.sync_cron({
+        'name': source_name,
+        'message': (
+            f'Error querying {source_name}.' +
+            (f' For Country: {country}.' if country else '') +
+            f'\n\n' + traceback.format_exc()
+        ),
+        'status': CronJobStatus.ERRONEOUS,
+    })
+    logger.error(
+        f"Failed to load <{source_name}:{func_name}>" + (
+            f'For Country: {country}' if country else ''
+        ) + (
+            f' {error_message}' if error_message else ''
+        ),
+        exc_info=True,
+    )
+
+
 # Custom error catch (for catching errors only)
 # Make sure country is provided in first argument only
 def catch_error(error_message=None):
@@ -21,25 +48,8 @@ def catch_error(error_message=None):
             try:
                 with transaction.atomic():
                     return func(*args, **kwargs)
-            except Exception as e:
-                # Log error to cronjob
-                CronJob.sync_cron({
-                    'name': source_name,
-                    'message': (
-                        f'Error querying {source_name}.' +
-                        (f' For Country: {country}.' if country else '') +
-                        f'\n\n' + traceback.format_exc()
-                    ),
-                    'status': CronJobStatus.ERRONEOUS,
-                })
-                logger.error(
-                    f"Failed to load <{source_name}:{func.__name__}>" + (
-                        f'For Country: {country}' if country else ''
-                    ) + (
-                        f' {error_message}' if error_message else ''
-                    ),
-                    exc_info=True,
-                )
+            except Exception:
+                log_source_error(source_name, func.__name__, country=country, error_message=error_message)
         _caller.__name__ = func.__name__
         _caller.__module__ = func.__module__
         return _caller
@@ -1,3 +1,61 @@
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from api.models import Country, CronJob, CronJobStatus
+from databank.models import CountryOverview
+
+
+FTS_RESPONSE = {
+    'data': {
+        'report3': {
+            'fundingTotals': {
+                'objects': [{'objectsBreakdown': [{'name': '2020', 'totalFunding': 100}]}],
+            },
+            'pledgeTotals': {'objects': []},
+        },
+    },
+}
+EMERGENCY_RESPONSE = {'data': [{'date': '2020-03-01T00:00:00'}]}
+
+
+def fetch_url(url, **kwargs):
+    if 'IND' in url:
+        raise ConnectionError('Connection refused')
+    response = mock.Mock()
+    response.json.return_value = FTS_RESPONSE if '/fts/' in url else EMERGENCY_RESPONSE
+    return response
+
+
+class IngestDatabankTest(TestCase):
+    def setUp(self):
+        self.nepal = Country.objects.create(name='Nepal', iso='NP', iso3='NPL')
+        self.india = Country.objects.create(name='India', iso='IN', iso3='IND')
+        self.bhutan = Country.objects.create(name='Bhutan', iso='BT', iso3='BTN')
+
+    @mock.patch('databank.management.commands.sources.FTS_HPC.fetch_url', side_effect=fetch_url)
+    @mock.patch('databank.management.commands.sources.FDRS.prefetch')
+    @mock.patch('databank.management.commands.sources.FTS_HPC.prefetch')
+    def test_only_source_countries(self, fts_prefetch, fdrs_prefetch, _):
+        fts_prefetch.return_value = ({'NPL-2020': {'people_in_need': '10'}}, 1, 'sheet')
+        call_command('ingest_databank', only_source='FTS_HPC', countries=['np', 'in'])
+
+        # Only the selected source is queried
+        fdrs_prefetch.assert_not_called()
+        # Only the selected countries are loaded (the failed fetch doesn't stop the others)
+        self.assertEqual(
+            CountryOverview.objects.get(country=self.nepal).fts_data,
+            [{'year': 2020, 'funding_totals': 100, 'numActivations': 1, 'people_in_need': '10'}],
+        )
+        india_overview = CountryOverview.objects.get(country=self.india)
+        self.assertEqual(india_overview.fts_data, [])
+        self.assertIsNotNone(india_overview.script_modified_at)
+        self.assertFalse(CountryOverview.objects.filter(country=self.bhutan).exists())
+
+        # Errors are logged per source, and reported in the summary
+        self.assertEqual(CronJob.objects.filter(name='FTS_HPC', status=CronJobStatus.ERRONEOUS).count(), 1)
+        summary = CronJob.objects.get(name='ingest_databank')
+        self.assertEqual(summary.status, CronJobStatus.WARNED)
+        self.assertEqual(summary.num_result, 2)
+        self.assertIn('FTS_HPC', summary.message)
@@ -19,11 +19,13 @@ from django.shortcuts import get_object_or_404
 from reversion.views import RevisionMixin
 from main.utils import is_tableau
 
-from main.serializers import CsvListMixin
+from main.serializers import CsvListMixin, StreamingCsvListMixin
 from api.models import (
     Country,
+    Event,
     Region,
 )
+from api.serializers import ListEventSerializer
 from api.view_filters import ListFilter
 from api.visibility_class import ReadOnlyVisibilityViewsetMixin
 
@@ -72,7 +74,9 @@ class ERUOwnerViewset(viewsets.ReadOnlyModelViewSet):
     authentication_classes = (TokenAuthentication,)
     # Also unauthenticated users should reach Surge page content. 2021.09.28:
     # permission_classes = (IsAuthenticated,)
-    queryset = ERUOwner.objects.all()
+    queryset = ERUOwner.objects.select_related("national_society_country").prefetch_related(
+        models.Prefetch("eru_set", queryset=ERU.objects.select_related("deployed_to")),
+    )
     serializer_class = ERUOwnerSerializer
     ordering_fields = (
         "created_at",
@@ -97,7 +101,18 @@ class ERUViewset(viewsets.ReadOnlyModelViewSet):
     authentication_classes = (TokenAuthentication,)
     # Some figures are shown on the home page also, and not only authenticated users should see them.
     # permission_classes = (IsAuthenticated,)
-    queryset = ERU.objects.all()
+    queryset = ERU.objects.select_related("deployed_to", "eru_owner__national_society_country").prefetch_related(
+        # With the counters of the nested event (ListEventSerializer.row_annotations)
+        models.Prefetch(
+            "event",
+            queryset=ListEventSerializer.annotate_queryset(
+                Event.objects.select_related("dtype").prefetch_related(
+                    "appeals", "countries", "field_reports__contacts", "field_reports__countries"
+                )
+            ),
+        ),
+        models.Prefetch("eru_owner__eru_set", queryset=ERU.objects.select_related("deployed_to")),
+    )
     serializer_class = ERUSerializer
     filterset_class = ERUFilter
     ordering_fields = (
@@ -128,7 +143,9 @@ class PersonnelDeploymentFilter(filters.FilterSet):
 class PersonnelDeploymentViewset(viewsets.ReadOnlyModelViewSet):
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
-    queryset = PersonnelDeployment.objects.all()
+    queryset = PersonnelDeployment.objects.select_related(
+        "country_deployed_to", "event_deployed_to__dtype"
+    ).prefetch_related("event_deployed_to__appeals", "event_deployed_to__countries")
     serializer_class = PersonnelDeploymentSerializer
     filterset_class = PersonnelDeploymentFilter
     ordering_fields = (
@@ -153,7 +170,7 @@ class PersonnelFilter(filters.FilterSet):
         }
 
 
-class PersonnelViewset(viewsets.ReadOnlyModelViewSet):
+class PersonnelViewset(StreamingCsvListMixin, viewsets.ReadOnlyModelViewSet):
     authentication_classes = (TokenAuthentication,)
     # Some figures are shown on the home page also, and not only authenticated users should see them.
     # permission_classes = (IsAuthenticated,)
@@ -187,7 +204,7 @@ class PersonnelViewset(viewsets.ReadOnlyModelViewSet):
             "deployment__event_deployed_to__appeals",
             "country_from",
             "country_to",
-            "molnix_tags",
+            "molnix_tags__groups",
         )
         return qs
 
@@ -379,7 +396,9 @@ class PartnerDeploymentFilterset(filters.FilterSet):
 
 
 class PartnerDeploymentViewset(viewsets.ReadOnlyModelViewSet):
-    queryset = PartnerSocietyDeployment.objects.all()
+    queryset = PartnerSocietyDeployment.objects.select_related(
+        "parent_society", "country_deployed_to", "activity"
+    ).prefetch_related("district_deployed_to")
     serializer_class = PartnerDeploymentSerializer
     filterset_class = PartnerDeploymentFilterset
 
@@ -397,6 +416,7 @@ class RegionalProjectViewset(viewsets.ReadOnlyModelViewSet):
 
 class ProjectViewset(
     RevisionMixin,
+    StreamingCsvListMixin,
     CsvListMixin,
     ReadOnlyVisibilityViewsetMixin,
     viewsets.ModelViewSet,
@@ -405,12 +425,17 @@ class ProjectViewset(
         Project.objects.select_related(
             "user", "modified_by", "project_country", "reporting_ns", "dtype", "regional_project", "primary_sector"
         )
-        .prefetch_related("project_districts", "event", "annual_splits", "secondary_sectors", "project_admin2")
+        .prefetch_related(
+            "project_districts", "event__countries_for_preview", "annual_splits", "secondary_sectors", "project_admin2"
+        )
         .all()
     )
     filterset_class = ProjectFilter
     serializer_class = ProjectSerializer
     csv_serializer_class = ProjectCsvSerializer
+    # Not collected from every row, the list columns (eg: annual_split_detail.N.*) are counted with one query
+    csv_header_from_serializer = True
+    csv_method_field_keys = {"project_districts_detail": ProjectCsvSerializer.PROJECT_DISTRICTS_DETAIL_FIELDS}
     ordering_fields = ("name",)
     search_fields = ("name",)  # for /docs
 
@@ -831,9 +856,24 @@ class EmergencyProjectViewSet(
 ):
     queryset = (
         EmergencyProject.objects.select_related(
-            "created_by", "reporting_ns", "event", "country", "deployed_eru", "modified_by"
+            "created_by",
+            "reporting_ns",
+            "event",
+            "country",
+            "deployed_eru__eru_owner__national_society_country",
+            "modified_by",
+        )
+        .prefetch_related(
+            "districts",
+            "event__countries_for_preview",
+            models.Prefetch(
+                "activities",
+                queryset=EmergencyProjectActivity.objects.select_related("sector", "action").prefetch_related(
+                    "points", "action__supplies"
+                ),
+            ),
+            "admin2",
         )
-        .prefetch_related("districts", "activities", "admin2")
         .order_by("-modified_at")
         .all()
     )
@@ -475,12 +475,11 @@ class ProjectCsvSerializer(ProjectSerializer):
     def get_secondary_sectors_display(obj):
         return ', '.join([t.title for t in obj.secondary_sectors.all()])
 
-    @staticmethod
-    def get_project_districts_detail(obj):
-        return get_merged_items_by_fields(
-            obj.project_districts.all(),
-            ['name', 'code', 'id', 'is_enclave', 'is_deprecated']
-        )
+    PROJECT_DISTRICTS_DETAIL_FIELDS = ['name', 'code', 'id', 'is_enclave', 'is_deprecated']
+
+    @classmethod
+    def get_project_districts_detail(cls, obj):
+        return get_merged_items_by_fields(obj.project_districts.all(), cls.PROJECT_DISTRICTS_DETAIL_FIELDS)
 
 
 class CharKeyValueSerializer(serializers.Serializer):
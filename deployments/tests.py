@@ -1,12 +1,19 @@
+import csv
+import io
 import pydash
 import json
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from main.test_case import SnapshotTestCase, APITestCase
 from deployments.factories.user import UserFactory
 from deployments.factories.project import SectorFactory, SectorTagFactory, ProjectFactory
 from api.factories import country, district
 import api.models as models
-from deployments.models import Project, VisibilityCharChoices, SectorTag
+from deployments.models import AnnualSplit, Project, VisibilityCharChoices, SectorTag
+from deployments.drf_views import PersonnelViewset, ProjectViewset
 
 from .factories.personnel import PersonnelFactory
 from deployments.factories.emergency_project import (
@@ -17,7 +24,9 @@ from deployments.factories.emergency_project import (
     EruFactory,
 )
 from api.factories.event import EventFactory
-from deployments.models import EmergencyProject, EmergencyProjectActivity
+from deployments.models import EmergencyProject, EmergencyProjectActivity, MolnixTag, Personnel
+from notifications.models import SurgeAlert
+from api.management.commands.sync_molnix import add_tags, get_unique_tags, sync_deployments, sync_open_positions
 
 
 class TestProjectAPI(SnapshotTestCase):
@@ -186,7 +195,21 @@ class TestProjectAPI(SnapshotTestCase):
         self.authenticate()
         resp = self.client.get(url)
         self.assert_200(resp)
-        self.assertMatchSnapshot(resp.content.decode('utf-8'))
+        self.assertTrue(resp.streaming)
+        self.assertMatchSnapshot(b''.join(resp.streaming_content).decode('utf-8'))
+
+    def test_personnel_csv_stream(self):
+        personnel_ids = [PersonnelFactory().id for i in range(7)]
+        self.authenticate()
+        with mock.patch.object(PersonnelViewset, 'csv_chunk_size', 2):
+            resp = self.client.get('/api/v2/personnel/?format=csv&ordering=-deployment&limit=5&offset=1')
+            # The rows are only fetched when the response is consumed
+            content = b''.join(resp.streaming_content).decode('utf-8')
+        self.assert_200(resp)
+        self.assertEqual(resp['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        # Chunked, but in the requested order (one deployment per personnel), with the limit/offset applied
+        self.assertEqual([int(row['deployed_id']) for row in rows], sorted(personnel_ids, reverse=True)[1:6])
 
     def test_project_csv_api(self):
         _country = country.CountryFactory()
@@ -206,7 +229,31 @@ class TestProjectAPI(SnapshotTestCase):
         url = '/api/v2/project/?format=csv'
         resp = self.client.get(url)
         self.assert_200(resp)
-        self.assertMatchSnapshot(resp.content.decode('utf-8'))
+        self.assertMatchSnapshot(b''.join(resp.streaming_content).decode('utf-8'))
+
+    def test_project_csv_stream_header(self):
+        for name in ['project-a', 'project-b', 'project-c']:
+            ProjectFactory(name=name, event=None, visibility=VisibilityCharChoices.PUBLIC)
+        event = EventFactory()
+        project = ProjectFactory(name='project-d', event=event, visibility=VisibilityCharChoices.PUBLIC)
+        AnnualSplit.objects.bulk_create([AnnualSplit(project=project, year=year) for year in [2020, 2021]])
+
+        with mock.patch.object(ProjectViewset, 'csv_chunk_size', 2):
+            # Header from the serializer (one query for the list columns), not from a pass over the rows
+            with mock.patch.object(
+                ProjectViewset, 'get_csv_chunks', autospec=True, side_effect=ProjectViewset.get_csv_chunks,
+            ) as get_csv_chunks:
+                resp = self.client.get('/api/v2/project/?format=csv&ordering=name')
+                content = b''.join(resp.streaming_content).decode('utf-8')
+        self.assert_200(resp)
+        self.assertEqual(get_csv_chunks.call_count, 1)
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row['name'] for row in rows], ['project-a', 'project-b', 'project-c', 'project-d'])
+        # Only found in the last chunk
+        self.assertEqual(rows[-1]['event_detail.name'], event.name)
+        self.assertEqual(rows[0]['event_detail.name'], '')
+        self.assertEqual({rows[-1]['annual_split_detail.0.year'], rows[-1]['annual_split_detail.1.year']}, {'2020', '2021'})
+        self.assertNotIn('annual_split_detail.2.year', rows[0])
 
     def test_global_project_api(self):
         country_1 = country.CountryFactory()
@@ -316,3 +363,131 @@ class TestEmergencyProjectAPI(APITestCase):
         self.assert_201(response)
         self.assertEqual(EmergencyProject.objects.count(), old_emergency_project_count + 1)
         self.assertEqual(EmergencyProjectActivity.objects.count(), old_emergency_project_activity_count + 1)
+
+
+class FakeMolnixApi():
+    def get_tag_groups(self, id):
+        return [{'id': 1, 'name': 'Roles', 'created_at': '2021-01-01 00:00:00', 'updated_at': '2021-06-01 00:00:00'}]
+
+    def get_position(self, id):
+        return None
+
+
+class TestSyncMolnix(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.country = models.Country.objects.create(
+            name='Nepal', iso='NP', independent=True, society_name='Nepal Red Cross Society',
+        )
+        self.event = EventFactory.create(countries=[self.country.id])
+        self.countries = {1: 'NP'}
+        self.tags = [
+            {'id': 11, 'name': f'OP-{self.event.id}', 'description': 'Operation', 'type': 'regular'},
+            {'id': 12, 'name': 'HEALTH', 'description': None, 'type': 'regular'},
+        ]
+
+    def get_position(self, id, **kwargs):
+        return {
+            'id': id,
+            'tags': self.tags,
+            'country_id': 1,
+            'name': f'Position {id}',
+            'status': 'active',
+            'opens': '2021-01-01 00:00:00',
+            'closes': '2021-02-01 00:00:00',
+            'start': '2021-03-01 00:00:00',
+            'end': '2021-04-01 00:00:00',
+            **kwargs,
+        }
+
+    def get_deployment(self, id, **kwargs):
+        return {
+            'id': id,
+            'tags': self.tags,
+            'position_id': id,
+            'appraisals': [],
+            'person': {'fullname': f'Person {id}', 'sex': 'female'},
+            'contact': {'addresses': [{'city': 'Kathmandu'}]},
+            'hidden': 0,
+            'draft': 0,
+            'start': '2021-03-01 00:00:00',
+            'end': '2021-04-01 00:00:00',
+            'title': 'Health Coordinator',
+            'country_id': 1,
+            'incoming': {'name': 'Nepal Red Cross Society'},
+            **kwargs,
+        }
+
+    def sync(self, positions, deployments):
+        api = FakeMolnixApi()
+        add_tags(get_unique_tags(deployments, positions), api)
+        positions_messages, _, _ = sync_open_positions(positions, api, self.countries)
+        deployments_messages, _, _ = sync_deployments(deployments, api, self.countries)
+        return positions_messages, deployments_messages
+
+    def test_sync(self):
+        ids = range(1, 6)
+        positions_messages, deployments_messages = self.sync(
+            [self.get_position(id) for id in ids],
+            [self.get_deployment(id) for id in ids],
+        )
+        self.assertIn('Successfully created: 5', positions_messages)
+        self.assertIn('Successfully created: 5', deployments_messages)
+        self.assertEqual(MolnixTag.objects.get(molnix_id=11).groups.count(), 1)
+        alert = SurgeAlert.objects.get(molnix_id=1)
+        self.assertEqual(alert.message, 'Position 1')
+        self.assertEqual(set(alert.molnix_tags.values_list('molnix_id', flat=True)), {11, 12})
+        personnel = Personnel.objects.get(molnix_id=1)
+        self.assertEqual(
+            (personnel.name, personnel.role, personnel.country_to, personnel.country_from, personnel.surge_alert),
+            ('Person 1', 'Health Coordinator', self.country, self.country, alert),
+        )
+        self.assertEqual(personnel.deployment.event_deployed_to, self.event)
+        self.assertEqual(set(personnel.molnix_tags.values_list('molnix_id', flat=True)), {11, 12})
+
+        # Nothing changed
+        positions_messages, deployments_messages = self.sync(
+            [self.get_position(id) for id in ids],
+            [self.get_deployment(id) for id in ids],
+        )
+        for messages in [positions_messages, deployments_messages]:
+            self.assertIn('Successfully created: 0', messages)
+            self.assertIn('Successfully updated: 0', messages)
+            self.assertIn('Unchanged: 5', messages)
+
+        # Changed, removed from Molnix
+        positions_messages, deployments_messages = self.sync(
+            [self.get_position(1, name='Position 1 (updated)')] + [self.get_position(id) for id in range(2, 5)],
+            [self.get_deployment(1, title='Team Leader', tags=self.tags[:1])] + [self.get_deployment(id) for id in range(2, 5)],
+        )
+        for messages in [positions_messages, deployments_messages]:
+            self.assertIn('Successfully updated: 1', messages)
+            self.assertIn('Marked inactive: 1', messages)
+        self.assertEqual(SurgeAlert.objects.get(molnix_id=1).message, 'Position 1 (updated)')
+        self.assertFalse(SurgeAlert.objects.get(molnix_id=5).is_active)
+        personnel = Personnel.objects.get(molnix_id=1)
+        self.assertEqual(personnel.role, 'Team Leader')
+        self.assertEqual(set(personnel.molnix_tags.values_list('molnix_id', flat=True)), {11})
+        personnel = Personnel.objects.get(molnix_id=5)
+        self.assertEqual((personnel.molnix_status, personnel.is_active), ('deleted', False))
+
+    def test_sync_query_count(self):
+        ids = range(1, 31)
+        self.sync([self.get_position(id) for id in ids], [self.get_deployment(id) for id in ids])
+
+        def get_query_count(changed_count, suffix):
+            with CaptureQueriesContext(connection) as context:
+                self.sync(
+                    [
+                        self.get_position(id, name=f'Position {id} {suffix}') if id <= changed_count else self.get_position(id)
+                        for id in ids
+                    ],
+                    [
+                        self.get_deployment(id, title=f'Role {suffix}') if id <= changed_count else self.get_deployment(id)
+                        for id in ids
+                    ],
+                )
+            return len(context.captured_queries)
+
+        # Doesn't depend on the number of updated records
+        self.assertEqual(get_query_count(5, 'a'), get_query_count(30, 'b'))
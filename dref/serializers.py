@@ -10,6 +10,7 @@ from django.contrib.auth.models import User
 from rest_framework import serializers
 
 from lang.serializers import ModelSerializer
+from main.serializers import RowAnnotationsSerializerMixin, SubqueryCount
 from main.writable_nested_serializers import NestedCreateMixin, NestedUpdateMixin
 from api.serializers import UserNameSerializer, DisasterTypeSerializer, MiniDistrictSerializer, MiniCountrySerializer
 
@@ -132,7 +133,7 @@ class MiniDrefFinalReportActiveSerializer(serializers.ModelSerializer):
         return "Final report"
 
 
-class MiniDrefSerializer(serializers.ModelSerializer):
+class MiniDrefSerializer(RowAnnotationsSerializerMixin, serializers.ModelSerializer):
     type_of_onset_display = serializers.CharField(source="get_type_of_onset_display", read_only=True)
     disaster_category_display = serializers.CharField(source="get_disaster_category_display", read_only=True)
     type_of_dref_display = serializers.CharField(source="get_type_of_dref_display", read_only=True)
@@ -178,24 +179,32 @@ class MiniDrefSerializer(serializers.ModelSerializer):
             "date_of_approval"
         ]
 
+    row_annotations = {
+        "has_ops_update": lambda: models.Exists(DrefOperationalUpdate.objects.filter(dref=models.OuterRef("pk"))),
+        "has_final_report": lambda: models.Exists(DrefFinalReport.objects.filter(dref=models.OuterRef("pk"))),
+        "unpublished_op_update_count": lambda: SubqueryCount(
+            DrefOperationalUpdate.objects.filter(dref=models.OuterRef("pk"), is_published=False)
+        ),
+        "unpublished_final_report_count": lambda: SubqueryCount(
+            DrefFinalReport.objects.filter(dref=models.OuterRef("pk"), is_published=False)
+        ),
+    }
+
     def get_operational_update_details(self, obj):
-        queryset = DrefOperationalUpdate.objects.filter(dref_id=obj.id).order_by('-created_at')
-        return MiniOperationalUpdateActiveSerializer(queryset, many=True).data
+        # Sorted in python to use the operational updates prefetched by the viewsets
+        op_updates = sorted(obj.drefoperationalupdate_set.all(), key=lambda op_update: op_update.created_at, reverse=True)
+        return MiniOperationalUpdateActiveSerializer(op_updates, many=True).data
 
     def get_final_report_details(self, obj):
-        queryset = DrefFinalReport.objects.filter(dref_id=obj.id)
-        return MiniDrefFinalReportActiveSerializer(queryset, many=True).data
+        final_report = getattr(obj, "dreffinalreport", None)
+        final_reports = [final_report] if final_report is not None else []
+        return MiniDrefFinalReportActiveSerializer(final_reports, many=True).data
 
     def get_has_ops_update(self, obj):
-        op_count_count = obj.drefoperationalupdate_set.count()
-        if op_count_count > 0:
-            return True
-        return False
+        return self.get_row_annotation(obj, "has_ops_update")
 
     def get_has_final_report(self, obj):
-        if hasattr(obj, 'dreffinalreport'):
-            return True
-        return False
+        return self.get_row_annotation(obj, "has_final_report")
 
     def get_application_type(self, obj):
         return "DREF"
@@ -204,10 +213,10 @@ class MiniDrefSerializer(serializers.ModelSerializer):
         return "DREF application"
 
     def get_unpublished_op_update_count(self, obj):
-        return DrefOperationalUpdate.objects.filter(dref_id=obj.id, is_published=False).count()
+        return self.get_row_annotation(obj, "unpublished_op_update_count")
 
     def get_unpublished_final_report_count(self, obj):
-        return DrefFinalReport.objects.filter(dref_id=obj.id, is_published=False).count()
+        return self.get_row_annotation(obj, "unpublished_final_report_count")
 
 
 class PlannedInterventionSerializer(ModelSerializer):
@@ -347,11 +356,10 @@ class DrefSerializer(NestedUpdateMixin, NestedCreateMixin, ModelSerializer):
         exclude = ("cover_image", "event_map", "images")
 
     def get_dref_access_user_list(self, obj):
-        dref_users_list = get_dref_users()
-        for dref in dref_users_list:
-            if obj.id == dref["id"]:
-                return dref["users"]
-        return
+        # get_dref_users covers every DREF: fetch it once per serializer (the list shares its child serializer)
+        if not hasattr(self, "_dref_users"):
+            self._dref_users = {dref["id"]: dref["users"] for dref in get_dref_users()}
+        return self._dref_users.get(obj.id)
 
     def to_representation(self, instance):
         def _remove_digits_after_decimal(value):
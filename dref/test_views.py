@@ -5,7 +5,9 @@ from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.auth.models import Permission
+from django.contrib.auth.models import Group, Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from main.test_case import APITestCase
 
@@ -1282,6 +1284,30 @@ class DrefTestCase(APITestCase):
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(len(response.data['results'][0]['final_report_details']), 1)
 
+    def test_active_dref_counters(self):
+        country = Country.objects.create(name="country1")
+        dref_1, dref_2 = DrefFactory.create_batch(2, is_active=True, country=country, created_by=self.root_user)
+        DrefOperationalUpdateFactory.create(dref=dref_1, country=country, is_published=True)
+        DrefOperationalUpdateFactory.create_batch(2, dref=dref_1, country=country, is_published=False)
+        DrefFinalReportFactory.create(dref=dref_1, country=country, is_published=False)
+
+        self.client.force_authenticate(self.root_user)
+        response = self.client.get("/api/v2/active-dref/")
+        self.assertEqual(response.status_code, 200)
+        counters = {
+            item["id"]: (
+                item["has_ops_update"],
+                item["has_final_report"],
+                item["unpublished_op_update_count"],
+                item["unpublished_final_report_count"],
+            )
+            for item in response.data["results"]
+        }
+        self.assertEqual(counters, {
+            dref_1.id: (True, True, 2, 1),
+            dref_2.id: (False, False, 0, 0),
+        })
+
     def test_dref_share_users(self):
         user1 = UserFactory.create(
             username="user1@test.com",
@@ -1326,3 +1352,78 @@ class DrefTestCase(APITestCase):
             set(response.data['results'][0]['users']),
             set([user2.id, user3.id, user4.id])
         )
+
+    def test_active_dref_access(self):
+        region = Region.objects.create(name=RegionName.AFRICA)
+        country = Country.objects.create(name="country1", region=region)
+        other_country = Country.objects.create(name="country2")
+        user1, user2, region_admin = UserFactory.create_batch(3)
+        group = Group.objects.create(name="Dref Region Admins")
+        group.permissions.add(
+            Permission.objects.create(
+                codename=f"dref_region_admin_{region.id}",
+                name="Dref region admin",
+                content_type=ContentType.objects.get_for_model(Dref),
+            )
+        )
+        region_admin.groups.add(group)
+
+        created_dref = DrefFactory.create(created_by=user1, country=other_country, is_active=True)
+        shared_dref = DrefFactory.create(country=other_country, is_active=True)
+        shared_dref.users.add(user1, user2)
+        op_update_dref = DrefFactory.create(country=other_country, is_active=True)
+        DrefOperationalUpdateFactory.create(dref=op_update_dref, created_by=user1, country=other_country)
+        region_dref = DrefFactory.create(country=country, is_active=True)
+        # Only the final report is in the region
+        region_final_report_dref = DrefFactory.create(country=other_country, is_active=True)
+        DrefFinalReportFactory.create(dref=region_final_report_dref, country=country)
+        DrefFactory.create(created_by=user1, country=country, is_active=False)
+
+        url = "/api/v2/active-dref/"
+        for user, expected_drefs in [
+            (self.root_user, [created_dref, shared_dref, op_update_dref, region_dref, region_final_report_dref]),
+            (user1, [created_dref, shared_dref, op_update_dref]),
+            (user2, [shared_dref]),
+            (region_admin, [region_dref, region_final_report_dref]),
+            (self.user, []),
+        ]:
+            self.client.force_authenticate(user)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                [item["id"] for item in response.data["results"]],
+                [dref.id for dref in sorted(expected_drefs, key=lambda dref: dref.created_at, reverse=True)],
+            )
+
+    def test_active_dref_benchmark(self):
+        region = Region.objects.create(name=RegionName.AFRICA)
+        country = Country.objects.create(name="country1", region=region)
+        user = UserFactory.create()
+        group = Group.objects.create(name="Dref Region Admins")
+        group.permissions.add(
+            Permission.objects.create(
+                codename=f"dref_region_admin_{region.id}",
+                name="Dref region admin",
+                content_type=ContentType.objects.get_for_model(Dref),
+            )
+        )
+        user.groups.add(group)
+        drefs = Dref.objects.bulk_create(
+            DrefFactory.build_batch(3000, country=country, national_society=country, is_active=True)
+        )
+        DrefOperationalUpdate.objects.bulk_create(
+            DrefOperationalUpdateFactory.build_batch(
+                500, country=country, national_society=country, dref=drefs[0],
+            )
+        )
+
+        # The listing is resolved by the database, the number of queries doesn't depend on the number of DREFs
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as context:
+            start_time = datetime.now()
+            response = self.client.get("/api/v2/active-dref/?limit=1")
+            duration = datetime.now() - start_time
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 3000)
+        self.assertLess(len(context.captured_queries), 30)
+        self.assertLess(duration, timedelta(seconds=5))
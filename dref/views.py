@@ -1,6 +1,3 @@
-from itertools import chain
-from operator import attrgetter
-
 from django.utils.translation import gettext
 import django.utils.timezone as timezone
 from reversion.views import RevisionMixin
@@ -44,19 +41,25 @@ from dref.filter_set import (
     DrefShareUserFilterSet,
 )
 from dref.permissions import PublishDrefPermission
+from main.serializers import RowAnnotationsViewSetMixin
+from lang.serializers import TranslatedModelViewSetMixin
 
 
-def filter_dref_queryset_by_user_access(user, queryset):
-    if user.is_superuser:
-        return queryset
-    # Check if regional admin
-    dref_admin_regions_id = [
+def get_dref_admin_regions_id(user):
+    return [
         codename.replace('dref_region_admin_', '')
         for codename in Permission.objects.filter(
             group__user=user,
             codename__startswith='dref_region_admin_',
         ).values_list('codename', flat=True)
     ]
+
+
+def filter_dref_queryset_by_user_access(user, queryset):
+    if user.is_superuser:
+        return queryset
+    # Check if regional admin
+    dref_admin_regions_id = get_dref_admin_regions_id(user)
     if len(dref_admin_regions_id):
         return queryset.filter(
             models.Q(created_by=user) | models.Q(country__region__in=dref_admin_regions_id) | models.Q(users=user)
@@ -65,7 +68,7 @@ def filter_dref_queryset_by_user_access(user, queryset):
     return queryset.model.get_for(user)
 
 
-class DrefViewSet(RevisionMixin, viewsets.ModelViewSet):
+class DrefViewSet(TranslatedModelViewSetMixin, RevisionMixin, viewsets.ModelViewSet):
     serializer_class = DrefSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_class = DrefFilter
@@ -73,7 +76,28 @@ class DrefViewSet(RevisionMixin, viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         queryset = (
-            Dref.objects.prefetch_related("planned_interventions", "needs_identified", "national_society_actions", "users")
+            Dref.objects.select_related(
+                "created_by",
+                "modified_by",
+                "disaster_type",
+                "country",
+                "dreffinalreport",
+                "event_map__created_by",
+                "cover_image__created_by",
+                "budget_file__created_by",
+                "assessment_report__created_by",
+                "supporting_document__created_by",
+            )
+            .prefetch_related(
+                "planned_interventions__indicators",
+                "needs_identified",
+                "national_society_actions",
+                "users",
+                "images__created_by",
+                "drefoperationalupdate_set",
+                "district",
+                "risk_security",
+            )
             .order_by("-created_at")
             .distinct()
         )
@@ -105,22 +129,26 @@ class DrefOperationalUpdateViewSet(RevisionMixin, viewsets.ModelViewSet):
         user = self.request.user
         queryset = (
             DrefOperationalUpdate.objects.select_related(
-                "national_society",
                 "national_society",
                 "disaster_type",
-                "event_map",
-                "cover_image",
-                "budget_file",
-                "assessment_report",
+                "created_by",
+                "modified_by",
+                "country",
+                "event_map__created_by",
+                "cover_image__created_by",
+                "budget_file__created_by",
+                "assessment_report__created_by",
             )
             .prefetch_related(
                 "dref",
-                "planned_interventions",
+                "planned_interventions__indicators",
                 "needs_identified",
                 "national_society_actions",
                 "users",
-                "images",
-                "photos",
+                "images__created_by",
+                "photos__created_by",
+                "district",
+                "risk_security",
             )
             .order_by("-created_at")
             .distinct()
@@ -150,9 +178,27 @@ class DrefFinalReportViewSet(RevisionMixin, viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         queryset = (
-            DrefFinalReport.objects.prefetch_related(
+            DrefFinalReport.objects.select_related(
+                "disaster_type",
+                "created_by",
+                "modified_by",
+                "country",
+                "event_map__created_by",
+                "cover_image__created_by",
+                "assessment_report__created_by",
+                "financial_report__created_by",
+            )
+            .prefetch_related(
                 "dref__planned_interventions",
                 "dref__needs_identified",
+                "planned_interventions__indicators",
+                "needs_identified",
+                "national_society_actions",
+                "users",
+                "images__created_by",
+                "photos__created_by",
+                "district",
+                "risk_security",
             )
             .order_by("-created_at")
             .distinct()
@@ -211,7 +257,7 @@ class DrefFileViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.G
     def get_queryset(self):
         if self.request is None:
             return DrefFile.objects.none()
-        return DrefFile.objects.filter(created_by=self.request.user)
+        return DrefFile.objects.filter(created_by=self.request.user).select_related("created_by")
 
     @action(
         detail=False,
@@ -240,211 +286,70 @@ class CompletedDrefOperationsViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        queryset = DrefFinalReport.objects.filter(is_published=True).order_by("-created_at").distinct()
-        return filter_dref_queryset_by_user_access(user, queryset)
+        queryset = (
+            DrefFinalReport.objects.filter(is_published=True).select_related("country").order_by("-created_at").distinct()
+        )
+        return filter_dref_queryset_by_user_access(user, queryset).prefetch_related(
+            # With the counters of the nested DREF (MiniDrefSerializer.row_annotations)
+            models.Prefetch(
+                "dref",
+                queryset=MiniDrefSerializer.annotate_queryset(
+                    Dref.objects.select_related("country", "dreffinalreport__country").prefetch_related(
+                        models.Prefetch(
+                            "drefoperationalupdate_set",
+                            queryset=DrefOperationalUpdate.objects.select_related("country"),
+                        )
+                    )
+                ),
+            ),
+        )
 
 
-class ActiveDrefOperationsViewSet(viewsets.ReadOnlyModelViewSet):
+class ActiveDrefOperationsViewSet(RowAnnotationsViewSetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = MiniDrefSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_class = ActiveDrefFilterSet
 
     def get_queryset(self):
+        """
+        Active DREFs the user can access, as a single query:
+        - superusers: all of them
+        - regional admins: DREFs which are (or have an operational update/final report) in their regions
+        - everyone: DREFs they created or are shared with, directly or through an operational update/final report
+        """
         user = self.request.user
-        if user.is_superuser:
-            dref = (
-                Dref.objects.prefetch_related(
-                    "planned_interventions", "needs_identified", "national_society_actions", "users"
-                ).distinct()
-            )
-            dref_op_update = (
-                DrefOperationalUpdate.objects.select_related(
-                    "national_society",
-                    "national_society",
-                    "disaster_type",
-                    "event_map",
-                    "cover_image",
-                    "budget_file",
-                    "assessment_report",
+        queryset = (
+            Dref.objects.filter(is_active=True)
+            .select_related("country", "dreffinalreport__country")
+            # The operational_update_details of MiniDrefSerializer
+            .prefetch_related(
+                models.Prefetch(
+                    "drefoperationalupdate_set",
+                    queryset=DrefOperationalUpdate.objects.select_related("country"),
                 )
-                .prefetch_related(
-                    "dref",
-                    "planned_interventions",
-                    "needs_identified",
-                    "national_society_actions",
-                    "users",
-                    "images",
-                    "photos",
-                ).order_by('-operational_update_number').distinct()
             )
-            dref_final_report = (
-                DrefFinalReport.objects.prefetch_related(
-                    "dref__planned_interventions",
-                    "dref__needs_identified",
-                ).distinct()
+            .order_by("-created_at")
+        )
+        if user.is_superuser:
+            return queryset
+
+        op_updates = DrefOperationalUpdate.objects.filter(dref=models.OuterRef("pk"))
+        final_reports = DrefFinalReport.objects.filter(dref=models.OuterRef("pk"))
+        access_filter = (
+            models.Q(created_by=user)
+            | models.Q(users=user)
+            | models.Q(models.Exists(op_updates.filter(models.Q(created_by=user) | models.Q(users=user))))
+            | models.Q(models.Exists(final_reports.filter(models.Q(created_by=user) | models.Q(users=user))))
+        )
+        dref_admin_regions_id = get_dref_admin_regions_id(user)
+        if dref_admin_regions_id:
+            access_filter |= (
+                models.Q(country__region__in=dref_admin_regions_id)
+                | models.Q(models.Exists(op_updates.filter(country__region__in=dref_admin_regions_id)))
+                | models.Q(models.Exists(final_reports.filter(country__region__in=dref_admin_regions_id)))
             )
-            result_list = sorted(chain(dref, dref_op_update, dref_final_report), key=attrgetter("created_at"), reverse=True)
-            dref_list = []
-            for data in result_list:
-                if data.__class__.__name__ == "DrefFinalReport":
-                    final_report = DrefFinalReport.objects.get(id=data.id)
-                    dref_list.append(final_report)
-                elif data.__class__.__name__ == "DrefOperationalUpdate":
-                    operational_update = DrefOperationalUpdate.objects.get(id=data.id)
-                    dref_list.append(operational_update)
-                elif data.__class__.__name__ == "Dref":
-                    dref = Dref.objects.get(id=data.id)
-                    dref_list.append(dref)
-            # iterate over the list and get the dref from that
-            # check the dref in the new list if exists
-            # annotated dref here
-            annoatated_drefs = []
-            for dref in dref_list:
-                if dref.__class__.__name__ == "DrefOperationalUpdate":
-                    # annotate the dref and other operational update for that dref
-                    operational_update = DrefOperationalUpdate.objects.get(id=dref.id)
-                    dref_object = Dref.objects.get(drefoperationalupdate=operational_update.id)
-                    if dref_object not in annoatated_drefs:
-                        annoatated_drefs.append(dref_object)
-                elif dref.__class__.__name__ == "Dref":
-                    dref_object = Dref.objects.get(id=dref.id)
-                    if dref_object not in annoatated_drefs:
-                        annoatated_drefs.append(dref_object)
-                elif dref.__class__.__name__ == "DrefFinalReport":
-                    final_report = DrefFinalReport.objects.get(id=dref.id)
-                    dref_object = Dref.objects.get(dreffinalreport=final_report.id)
-                    if dref_object not in annoatated_drefs:
-                        annoatated_drefs.append(dref_object)
-            dref_list = []
-            for dref in annoatated_drefs:
-                new_dref = Dref.objects.get(id=dref.id)
-                dref_list.append(new_dref.id)
-            return Dref.objects.filter((models.Q(id__in=dref_list) | models.Q(created_by=user) | models.Q(users=user)), is_active=True).distinct().order_by("-created_at")
-        elif not user.is_superuser:
-            # get current user dref regions
-            regions = [0, 1, 2, 3, 4]
-            final_report_list = []
-            for region in regions:
-                codename = f"dref_region_admin_{region}"
-                if Permission.objects.filter(group__user=user, codename=codename).exists():
-                    dref = (
-                        Dref.objects.prefetch_related(
-                            "planned_interventions", "needs_identified", "national_society_actions", "users"
-                        )
-                        .filter(country__region=region)
-                        .distinct()
-                    )
-                    dref_op_update = (
-                        DrefOperationalUpdate.objects.select_related(
-                            "national_society",
-                            "national_society",
-                            "disaster_type",
-                            "event_map",
-                            "cover_image",
-                            "budget_file",
-                            "assessment_report",
-                        )
-                        .prefetch_related(
-                            "dref",
-                            "planned_interventions",
-                            "needs_identified",
-                            "national_society_actions",
-                            "users",
-                            "images",
-                            "photos",
-                        )
-                        .filter(country__region=region)
-                        .order_by('-operational_update_number').distinct()
-                    )
-                    dref_final_report = (
-                        DrefFinalReport.objects.prefetch_related(
-                            "dref__planned_interventions",
-                            "dref__needs_identified",
-                        )
-                        .filter(country__region=region)
-                        .distinct()
-                    )
-                    result_list = sorted(chain(dref, dref_op_update, dref_final_report), key=attrgetter("created_at"), reverse=True)
-                    final_report_list.append(result_list)
-            dref_list = []
-            for data in final_report_list:
-                for new in data:
-                    if new.__class__.__name__ == "DrefFinalReport":
-                        final_report = DrefFinalReport.objects.get(id=new.id)
-                        dref_list.append(final_report)
-                    elif new.__class__.__name__ == "DrefOperationalUpdate":
-                        operational_update = DrefOperationalUpdate.objects.get(id=new.id)
-                        dref_list.append(operational_update)
-                    elif new.__class__.__name__ == "Dref":
-                        dref = Dref.objects.get(id=new.id)
-                        dref_list.append(dref)
-            # iterate over the list and get the dref from that
-            # check the dref in the new list if exists
-            # annotated dref here
-            annoatated_drefs = []
-            for dref in dref_list:
-                if dref.__class__.__name__ == "DrefOperationalUpdate":
-                    # annotate the dref and other operational update for that dref
-                    operational_update = DrefOperationalUpdate.objects.get(id=dref.id)
-                    dref_object = Dref.objects.get(drefoperationalupdate=operational_update.id)
-                    if dref_object not in annoatated_drefs:
-                        annoatated_drefs.append(dref_object)
-                elif dref.__class__.__name__ == "Dref":
-                    dref_object = Dref.objects.get(id=dref.id)
-                    if dref_object not in annoatated_drefs:
-                        annoatated_drefs.append(dref_object)
-                elif dref.__class__.__name__ == "DrefFinalReport":
-                    final_report = DrefFinalReport.objects.get(id=dref.id)
-                    dref_object = Dref.objects.get(dreffinalreport=final_report.id)
-                    if dref_object not in annoatated_drefs:
-                        annoatated_drefs.append(dref_object)
-            dref_list = []
-            for dref in annoatated_drefs:
-                new_dref = Dref.objects.get(id=dref.id)
-                dref_list.append(new_dref.id)
-            if len(dref_list):
-                return Dref.objects.filter((models.Q(id__in=dref_list) | models.Q(created_by=user) | models.Q(users=user)), is_active=True).distinct().order_by("-created_at")
-            else:
-                dref = Dref.get_for(user)
-                dref_op_update = DrefOperationalUpdate.get_for(user)
-                dref_final_report = DrefFinalReport.get_for(user)
-                result_list = sorted(chain(dref, dref_op_update, dref_final_report), key=attrgetter("created_at"), reverse=True)
-                dref_list = []
-                for data in result_list:
-                    if data.__class__.__name__ == "DrefFinalReport":
-                        final_report = DrefFinalReport.objects.get(id=data.id)
-                        dref_list.append(final_report)
-                    elif data.__class__.__name__ == "DrefOperationalUpdate":
-                        operational_update = DrefOperationalUpdate.objects.get(id=data.id)
-                        dref_list.append(operational_update)
-                    elif data.__class__.__name__ == "Dref":
-                        dref = Dref.objects.get(id=data.id)
-                        dref_list.append(dref)
-                # iterate over the list and get the dref from that
-                # check the dref in the new list if exists
-                # annotated dref here
-                annoatated_drefs = []
-                for dref in dref_list:
-                    if dref.__class__.__name__ == "DrefOperationalUpdate":
-                        # annotate the dref and other operational update for that dref
-                        operational_update = DrefOperationalUpdate.objects.get(id=dref.id)
-                        dref_object = Dref.objects.get(drefoperationalupdate=operational_update.id)
-                        if dref_object not in annoatated_drefs:
-                            annoatated_drefs.append(dref_object)
-                    elif dref.__class__.__name__ == "Dref":
-                        dref_object = Dref.objects.get(id=dref.id)
-                        if dref_object not in annoatated_drefs:
-                            annoatated_drefs.append(dref_object)
-                    elif dref.__class__.__name__ == "DrefFinalReport":
-                        final_report = DrefFinalReport.objects.get(id=dref.id)
-                        dref_object = Dref.objects.get(dreffinalreport=final_report.id)
-                        if dref_object not in annoatated_drefs:
-                            annoatated_drefs.append(dref_object)
-                dref_list = []
-                for dref in annoatated_drefs:
-                    new_dref = Dref.objects.get(id=dref.id)
-                    dref_list.append(new_dref.id)
-                return Dref.objects.filter(id__in=dref_list, is_active=True).order_by("-created_at")
+        # Filtering with the `users` join can repeat rows, select the ids in a subquery instead of using distinct()
+        return queryset.filter(id__in=Dref.objects.filter(access_filter).values("id"))
 
 
 class DrefShareView(views.APIView):
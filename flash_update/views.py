@@ -113,7 +113,7 @@ class DonorGroupViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 class DonorsViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Donors.objects.all()
+    queryset = Donors.objects.prefetch_related('groups')
     serializer_class = DonorsSerializer
 
 
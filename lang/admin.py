@@ -25,6 +25,7 @@ from .serializers import TranslatedModelSerializerMixin
 
 from .models import (
     String,
+    TranslationMemory,
 )
 
 
@@ -160,3 +161,10 @@ class StringAdmin(admin.ModelAdmin):
     search_fields = ('language', 'value',)
     list_display = ('key', 'language', 'value')
     list_filter = ('language',)
+
+
+@admin.register(TranslationMemory)
+class TranslationMemoryAdmin(admin.ModelAdmin):
+    search_fields = ('source_text', 'translated_text',)
+    list_display = ('source_text', 'source_language', 'target_language', 'translated_text', 'created_at')
+    list_filter = ('translator', 'source_language', 'target_language',)
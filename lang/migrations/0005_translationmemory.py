@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lang', '0004_auto_20200616_0713'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('translator', models.CharField(max_length=255, verbose_name='translator')),
+                ('source_language', models.CharField(choices=[('en', 'English'), ('es', 'Spanish'), ('fr', 'French'), ('ar', 'Arabic')], max_length=8, verbose_name='source language')),
+                ('target_language', models.CharField(choices=[('en', 'English'), ('es', 'Spanish'), ('fr', 'French'), ('ar', 'Arabic')], max_length=8, verbose_name='target language')),
+                ('text_hash', models.CharField(max_length=64, verbose_name='text hash')),
+                ('source_text', models.TextField(verbose_name='source text')),
+                ('translated_text', models.TextField(verbose_name='translated text')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+            ],
+            options={
+                'verbose_name': 'Translation Memory',
+                'verbose_name_plural': 'Translation Memory',
+                'unique_together': {('translator', 'source_language', 'target_language', 'text_hash')},
+            },
+        ),
+    ]
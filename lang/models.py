@@ -1,5 +1,9 @@
+import hashlib
+from collections import defaultdict
+
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 
 
@@ -33,3 +37,113 @@ class String(models.Model):
             lang_code: user.has_perm(cls._get_permission_per_language_codename(lang_code))
             for lang_code, _ in settings.LANGUAGES
         }
+
+
+class TranslationMemory(models.Model):
+    """
+    Translations already received from the translation provider (lang.translation), used by lang.tasks.ModelTranslator
+    so that the same text isn't sent twice. Redis (default cache) is used as a front cache.
+    """
+    CACHE_KEY = 'translation-memory:{}:{}:{}:{}'
+    CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+    translator = models.CharField(max_length=255, verbose_name=_('translator'))
+    source_language = models.CharField(max_length=8, verbose_name=_('source language'), choices=settings.LANGUAGES)
+    target_language = models.CharField(max_length=8, verbose_name=_('target language'), choices=settings.LANGUAGES)
+    # sha256 of the normalized source text
+    text_hash = models.CharField(max_length=64, verbose_name=_('text hash'))
+    source_text = models.TextField(verbose_name=_('source text'))
+    translated_text = models.TextField(verbose_name=_('translated text'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('created at'))
+
+    class Meta:
+        unique_together = ('translator', 'source_language', 'target_language', 'text_hash')
+        verbose_name = _('Translation Memory')
+        verbose_name_plural = _('Translation Memory')
+
+    def __str__(self):
+        return '{} ({} -> {})'.format(self.source_text[:50], self.source_language, self.target_language)
+
+    @staticmethod
+    def normalize_text(text):
+        # Only surrounding and repeated spaces are dropped, line breaks are kept as they can be part of the translation
+        return '\n'.join(' '.join(line.split()) for line in text.strip().splitlines())
+
+    @classmethod
+    def get_text_hash(cls, text):
+        return hashlib.sha256(cls.normalize_text(text).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_translator_name(translator_class):
+        # Translations of different providers are kept apart
+        return f'{translator_class.__module__}.{translator_class.__name__}'
+
+    @classmethod
+    def _get_cache_key(cls, translator_name, source_language, target_language, text_hash):
+        return cls.CACHE_KEY.format(translator_name, source_language, target_language, text_hash)
+
+    @classmethod
+    def get_translations(cls, translator_name, source_language, target_language, texts):
+        """
+        Returns ({text: translated text}, cache hits count) for the texts found in the memory
+        The cache is checked first, the misses are fetched from the database (and cached)
+        """
+        hash_texts = defaultdict(list)
+        for text in texts:
+            hash_texts[cls.get_text_hash(text)].append(text)
+        cache_keys = {
+            cls._get_cache_key(translator_name, source_language, target_language, text_hash): text_hash
+            for text_hash in hash_texts
+        }
+
+        translations_by_hash = {
+            cache_keys[key]: value
+            for key, value in cache.get_many(cache_keys.keys()).items()
+        }
+        cache_hits = sum(len(hash_texts[text_hash]) for text_hash in translations_by_hash)
+        missing_hashes = set(hash_texts) - set(translations_by_hash)
+        if missing_hashes:
+            db_translations = dict(
+                cls.objects.filter(
+                    translator=translator_name,
+                    source_language=source_language,
+                    target_language=target_language,
+                    text_hash__in=missing_hashes,
+                ).values_list('text_hash', 'translated_text')
+            )
+            cache.set_many({
+                cls._get_cache_key(translator_name, source_language, target_language, text_hash): value
+                for text_hash, value in db_translations.items()
+            }, timeout=cls.CACHE_TIMEOUT)
+            translations_by_hash.update(db_translations)
+
+        translations = {
+            text: value
+            for text_hash, value in translations_by_hash.items()
+            for text in hash_texts[text_hash]
+        }
+        return translations, cache_hits
+
+    @classmethod
+    def save_translations(cls, translator_name, source_language, target_language, translations):
+        """ translations: {text: translated text} """
+        entries = {
+            cls.get_text_hash(text): cls(
+                translator=translator_name,
+                source_language=source_language,
+                target_language=target_language,
+                text_hash=cls.get_text_hash(text),
+                source_text=text,
+                translated_text=value,
+            )
+            for text, value in translations.items()
+            if value
+        }
+        if not entries:
+            return
+        # Concurrent runs can translate the same text, keep the first one
+        cls.objects.bulk_create(entries.values(), ignore_conflicts=True)
+        cache.set_many({
+            cls._get_cache_key(translator_name, source_language, target_language, text_hash): entry.translated_text
+            for text_hash, entry in entries.items()
+        }, timeout=cls.CACHE_TIMEOUT)
@@ -223,3 +223,59 @@ class ModelSerializer(TranslatedModelSerializerMixin, serializers.ModelSerialize
     Custom ModelSerializer with translaion logic (Also works for normal models)
     """
     pass
+
+
+class TranslatedModelViewSetMixin():
+    """
+    Defers the localized fields of the languages not served by the serializer (TranslatedModelSerializerMixin) on lists
+    NOTE: A translated field falls back to the other languages (MODELTRANSLATION_FALLBACK_LANGUAGES) when it is empty in
+    the requested one, the deferred fields of these objects are loaded for the whole page at once (load_fallback_fields)
+    """
+
+    def get_deferred_translated_fields(self, queryset):
+        # Not paginated lists are serialized from the queryset, without a page to load the fallbacks
+        if self.action != 'list' or self.paginator is None:
+            return None, None
+        serializer_class = self.get_serializer_class()
+        if (
+            not issubclass(serializer_class, TranslatedModelSerializerMixin) or
+            serializer_class.Meta.model is not queryset.model or
+            queryset.model not in serializer_class.TRANSLATION_REGISTERED_MODELS
+        ):
+            return None, None
+        included_fields_lang, excluded_fields, _ = serializer_class._get_included_excluded_fields(queryset.model)
+        # The original fields are not deferred (modeltranslation defers all of their localized fields)
+        return included_fields_lang, excluded_fields - set(included_fields_lang)
+
+    def load_fallback_fields(self, model, page):
+        instances = [
+            instance for instance in page
+            if any(
+                getattr(instance, lang_field) in (None, '')
+                for lang_field in self.included_fields_lang.values()
+            )
+        ]
+        if not instances:
+            return
+        values_by_pk = {
+            values.pop('pk'): values
+            for values in model._base_manager.filter(
+                pk__in=[instance.pk for instance in instances]
+            ).values('pk', *self.deferred_translated_fields)
+        }
+        for instance in instances:
+            for field, value in values_by_pk.get(instance.pk, {}).items():
+                setattr(instance, field, value)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        self.included_fields_lang, self.deferred_translated_fields = self.get_deferred_translated_fields(queryset)
+        if self.deferred_translated_fields:
+            queryset = queryset.defer(*self.deferred_translated_fields)
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and getattr(self, 'deferred_translated_fields', None):
+            self.load_fallback_fields(queryset.model, page)
+        return page
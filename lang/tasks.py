@@ -1,4 +1,9 @@
 import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 from celery import shared_task
 from modeltranslation.translator import translator
 from modeltranslation.utils import build_localized_fieldname
@@ -12,21 +17,44 @@ from functools import reduce
 
 from main.translation import TRANSLATOR_SKIP_FIELD_NAME, TRANSLATOR_ORIGINAL_LANGUAGE_FIELD_NAME
 from main.celery import Queues
+from middlewares.cache import bump_cache_generation
+from .models import TranslationMemory
 from .translation import AVAILABLE_LANGUAGES, get_translator_class
 
 
 logger = logging.getLogger(__name__)
 
 
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 class ModelTranslator():
-    def __init__(self):
-        self.default_translator = get_translator_class()()
+    # Batch mode: number of texts sent in one translator request and number of parallel requests
+    BATCH_TEXTS_COUNT = 25
+    BATCH_MAX_WORKERS = 4
+    # Batch mode: number of objects loaded and saved (bulk_update) at once
+    BATCH_OBJECTS_COUNT = 200
+
+    def __init__(self, translator=None, max_workers=None, use_memory=True):
+        self.default_translator = translator or get_translator_class()()
+        self.max_workers = max_workers or self.BATCH_MAX_WORKERS
+        # Reuse the translations stored in TranslationMemory instead of requesting them again
+        self.use_memory = use_memory
 
     @property
     def translator(self):
         return self.default_translator
 
-    def translate_fields_object(self, obj, field):
+    @property
+    def translator_name(self):
+        return TranslationMemory.get_translator_name(type(self.translator))
+
+    @staticmethod
+    def get_missing_translations(obj, field):
+        """ Yields (lang_field, initial_lang, initial_value) for each language without translation """
         initial_lang = getattr(obj, TRANSLATOR_ORIGINAL_LANGUAGE_FIELD_NAME)
         initial_value = getattr(obj, build_localized_fieldname(field, initial_lang), None)
         if not initial_value or not initial_lang:
@@ -37,20 +65,147 @@ class ModelTranslator():
             value = getattr(obj, lang_field, None)
             if value:
                 continue
+            yield lang, lang_field, initial_lang, initial_value
 
-            new_value = self.translator.translate_text(
+    @staticmethod
+    def set_translation(obj, field, lang_field, new_value):
+        field_max_length = type(obj)._meta.get_field(field).max_length
+        if field_max_length and len(new_value) > field_max_length:
+            logger.warning(f'Greater then max_length found for Model ({type(obj)}<{lang_field}>) pk: ({obj.pk})')
+            new_value = new_value[:field_max_length]
+        setattr(obj, lang_field, new_value)
+
+    def translate_text(self, text, dest_language, source_language):
+        if not self.use_memory:
+            return self.translator.translate_text(text, dest_language, source_language=source_language)
+        translations, _ = TranslationMemory.get_translations(self.translator_name, source_language, dest_language, [text])
+        if text in translations:
+            return translations[text]
+        new_value = self.translator.translate_text(text, dest_language, source_language=source_language)
+        TranslationMemory.save_translations(self.translator_name, source_language, dest_language, {text: new_value})
+        return new_value
+
+    def translate_fields_object(self, obj, field):
+        for lang, lang_field, initial_lang, initial_value in self.get_missing_translations(obj, field):
+            new_value = self.translate_text(
                 initial_value,
                 lang,
                 source_language=initial_lang,
             )
+            self.set_translation(obj, field, lang_field, new_value)
+            yield lang_field
 
-            field_max_length = type(obj)._meta.get_field(field).max_length
-            if field_max_length and len(new_value) > field_max_length:
-                logger.warning(f'Greater then max_length found for Model ({type(obj)}<{lang_field}>) pk: ({obj.pk})')
-                new_value = new_value[:field_max_length]
+    def _translate_texts(self, texts, dest_language, source_language):
+        try:
+            return self.translator.translate_texts(texts, dest_language, source_language=source_language)
+        except Exception:
+            logger.error(
+                f'Failed to translate {len(texts)} texts from {source_language} to {dest_language}',
+                exc_info=True,
+            )
+            return None
 
-            setattr(obj, lang_field, new_value)
-            yield lang_field
+    def translate_objects(self, model, objs, translatable_fields=None):
+        """
+        Batch mode of translate_model_fields
+        Collects the missing (field, language) values of all the objects, takes the already known texts from
+        TranslationMemory, translates each remaining distinct text once (BATCH_TEXTS_COUNT texts per request,
+        max_workers parallel requests) and saves them using bulk_update
+        Returns the stats of the batch
+        """
+        start_time = time.monotonic()
+        translatable_fields = translatable_fields or self.get_translatable_fields(model)
+        objs = [obj for obj in objs if not getattr(obj, TRANSLATOR_SKIP_FIELD_NAME)]
+
+        # (source language, destination language) -> text -> [(obj, field, lang_field), ...]
+        pending = defaultdict(lambda: defaultdict(list))
+        strings_count = 0
+        for obj in objs:
+            for field in translatable_fields:
+                for lang, lang_field, initial_lang, initial_value in self.get_missing_translations(obj, field):
+                    pending[(initial_lang, lang)][initial_value].append((obj, field, lang_field))
+                    strings_count += 1
+        unique_texts_count = sum(len(texts_targets) for texts_targets in pending.values())
+        characters_count = sum(len(text) for texts_targets in pending.values() for text in texts_targets)
+
+        updated_objs = {}
+        updated_fields = set()
+        memory_hits = memory_cache_hits = memory_characters = 0
+        if self.use_memory:
+            for (source_language, dest_language), texts_targets in pending.items():
+                translations, cache_hits = TranslationMemory.get_translations(
+                    self.translator_name, source_language, dest_language, list(texts_targets.keys()),
+                )
+                memory_cache_hits += cache_hits
+                for text, new_value in translations.items():
+                    for obj, field, lang_field in texts_targets.pop(text):
+                        self.set_translation(obj, field, lang_field, new_value)
+                        updated_objs[obj.pk] = obj
+                        updated_fields.add(lang_field)
+                    memory_hits += 1
+                    memory_characters += len(text)
+
+        requests = [
+            (texts, dest_language, source_language)
+            for (source_language, dest_language), texts_targets in pending.items()
+            for texts in chunks(texts_targets.keys(), self.BATCH_TEXTS_COUNT)
+        ]
+        failed_count = 0
+        if requests:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(requests))) as executor:
+                results = executor.map(lambda request: self._translate_texts(*request), requests)
+                for (texts, dest_language, source_language), new_values in zip(requests, results):
+                    texts_targets = pending[(source_language, dest_language)]
+                    if new_values is None:
+                        failed_count += sum(len(texts_targets[text]) for text in texts)
+                        continue
+                    for text, new_value in zip(texts, new_values):
+                        for obj, field, lang_field in texts_targets[text]:
+                            self.set_translation(obj, field, lang_field, new_value)
+                            updated_objs[obj.pk] = obj
+                            updated_fields.add(lang_field)
+                    if self.use_memory:
+                        TranslationMemory.save_translations(
+                            self.translator_name, source_language, dest_language, dict(zip(texts, new_values)),
+                        )
+
+        if updated_objs:
+            model.objects.bulk_update(updated_objs.values(), sorted(updated_fields), batch_size=self.BATCH_OBJECTS_COUNT)
+            # bulk_update doesn't send post_save (see api.receivers)
+            bump_cache_generation(model)
+
+        duration = time.monotonic() - start_time
+        stats = dict(
+            objects=len(objs),
+            updated_objects=len(updated_objs),
+            strings=strings_count,
+            unique_texts=unique_texts_count,
+            characters=characters_count,
+            memory_hits=memory_hits,
+            memory_cache_hits=memory_cache_hits,
+            memory_characters=memory_characters,
+            requests=len(requests),
+            failed_strings=failed_count,
+            seconds=duration,
+        )
+        return stats
+
+    @staticmethod
+    def log_stats(model, stats):
+        seconds = stats['seconds']
+        logger.info(
+            f'\t{model._meta.verbose_name.title()}: {stats["strings"]} strings'
+            f' ({stats["unique_texts"]} unique, {stats["characters"]} characters)'
+            f' of {stats["updated_objects"]}/{stats["objects"]} objects translated using {stats["requests"]} requests'
+            f' in {seconds:.2f}s ({stats["strings"] / seconds if seconds else 0:.1f} strings/s),'
+            f' {stats["failed_strings"]} failed'
+        )
+        if stats['unique_texts']:
+            logger.info(
+                f'\t\tTranslation memory: {stats["memory_hits"]}/{stats["unique_texts"]} unique texts'
+                f' ({stats["memory_hits"] / stats["unique_texts"]:.1%} hit rate, {stats["memory_cache_hits"]} from cache),'
+                f' {stats["memory_characters"]}/{stats["characters"]} characters not sent to the translator'
+            )
 
     @staticmethod
     def _get_filter(translation_fields):
@@ -102,17 +257,43 @@ class ModelTranslator():
             )
         obj.save(update_fields=update_fields)
 
+    @classmethod
+    def get_memory_stats(cls, qs, translatable_fields, translator_name):
+        """ Returns (unique texts, characters, memory hits, memory characters) of the missing translations """
+        # (source language, destination language) -> texts
+        pending = defaultdict(set)
+        for obj in qs.filter(**{TRANSLATOR_SKIP_FIELD_NAME: False}).iterator(chunk_size=cls.BATCH_OBJECTS_COUNT):
+            for field in translatable_fields:
+                for lang, _, initial_lang, initial_value in cls.get_missing_translations(obj, field):
+                    pending[(initial_lang, lang)].add(initial_value)
+
+        unique_texts_count = characters_count = memory_hits = memory_characters = 0
+        for (source_language, dest_language), texts in pending.items():
+            unique_texts_count += len(texts)
+            characters_count += sum(len(text) for text in texts)
+            for texts_chunk in chunks(texts, cls.BATCH_OBJECTS_COUNT):
+                translations, _ = TranslationMemory.get_translations(
+                    translator_name, source_language, dest_language, texts_chunk,
+                )
+                memory_hits += len(translations)
+                memory_characters += sum(len(text) for text in translations)
+        return unique_texts_count, characters_count, memory_hits, memory_characters
+
     @classmethod
     def show_characters_counts(cls):
         """
         Retrive and search for fields to be translated and show total character count
+        Also shows how much of it can be taken from the translation memory
         """
         translatable_models = cls.get_translatable_models()
+        translator_name = TranslationMemory.get_translator_name(get_translator_class())
         logger.info(f'Languages: {AVAILABLE_LANGUAGES}')
         logger.info(f'Default language: {mt_settings.DEFAULT_LANGUAGE}')
         logger.info(f'Number of models: {len(translatable_models)}')
+        logger.info(f'Translation memory: {TranslationMemory.objects.filter(translator=translator_name).count()} entries')
 
         total_count = 0
+        total_memory_characters = 0
         for model in translatable_models:
             logger.info(f'Processing for Model: {model._meta.verbose_name.title()}')
 
@@ -129,8 +310,21 @@ class ModelTranslator():
                     .aggregate(total_text_length=Sum('text_length'))['total_text_length'] or 0
                 total_count += count
                 logger.info(f'\t\t {field} - {count}')
+
+            unique_texts_count, characters_count, memory_hits, memory_characters = cls.get_memory_stats(
+                qs, translatable_fields, translator_name,
+            )
+            total_memory_characters += memory_characters
+            if unique_texts_count:
+                logger.info(
+                    f'\tTranslation memory: {memory_hits}/{unique_texts_count} unique texts'
+                    f' ({memory_hits / unique_texts_count:.1%} hit rate),'
+                    f' {memory_characters}/{characters_count} characters'
+                )
         logger.info(f'Total Count: {total_count}')
         logger.info(f'Estimated Cost (AWS): {(len(AVAILABLE_LANGUAGES) -1) * total_count * 0.000015}')
+        logger.info(f'Translation memory characters: {total_memory_characters}')
+        logger.info(f'Estimated Savings (AWS): {total_memory_characters * 0.000015}')
 
     def run(self, batch_size=None):
         """
@@ -166,12 +360,15 @@ class ModelTranslator():
             else:
                 qs = qs.all()
 
-            for obj in qs.iterator():
-                # Skip if it is flagged as skip by user # TODO: Remove this later
-                assert getattr(obj, TRANSLATOR_SKIP_FIELD_NAME) is False
-                logger.info(f'\t\t ({index}/{qs_count}) - {obj}')
-                self.translate_model_fields(obj, translatable_fields)
-                index += 1
+            model_stats = defaultdict(int)
+            for objs in chunks(qs.iterator(), self.BATCH_OBJECTS_COUNT):
+                logger.info(f'\t\t ({index}-{index + len(objs) - 1}/{qs_count})')
+                stats = self.translate_objects(model, objs, translatable_fields)
+                for key, value in stats.items():
+                    model_stats[key] += value
+                index += len(objs)
+            if model_stats:
+                self.log_stats(model, model_stats)
 
 
 @shared_task(queue=Queues.CRONJOB)
@@ -197,5 +394,5 @@ def translate_model_fields_in_bulk(model_name, pks):
         pk__in=pks,
         **{TRANSLATOR_SKIP_FIELD_NAME: False},
     )
-    for obj in qs:
-        ModelTranslator().translate_model_fields(obj)
+    model_translator = ModelTranslator()
+    model_translator.log_stats(model, model_translator.translate_objects(model, qs))
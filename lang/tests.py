@@ -1,3 +1,4 @@
+import time
 import unittest
 from unittest import mock
 
@@ -5,12 +6,15 @@ from django.test import override_settings
 from django.conf import settings
 from django.core import management
 from django.contrib.auth.models import User, Permission
+from modeltranslation.utils import build_localized_fieldname
 from main.test_case import APITestCase
 
-from lang.translation import IfrcTranslator
+from api.models import Action
+from lang.tasks import ModelTranslator
+from lang.translation import IfrcTranslator, DummyTranslator, AVAILABLE_LANGUAGES
 
 from .serializers import LanguageBulkActionSerializer
-from .models import String
+from .models import String, TranslationMemory
 
 
 class LangTest(APITestCase):
@@ -166,7 +170,7 @@ class TranslatorMockTest(unittest.TestCase):
     @mock.patch('lang.translation.requests')
     def test_ifrc_translator(self, requests_mock):
         # Simple mock test where we define what the expected response is from provider
-        requests_mock.post.return_value.json.return_value = [{
+        requests_mock.Session.return_value.post.return_value.json.return_value = [{
             "detectedLanguage": {"language": "en", "score": 1},
             "translations": [{"text": "Hola", "to": "es"}]
         }]
@@ -200,3 +204,84 @@ class TranslatorMockTest(unittest.TestCase):
             # with settings.TESTING False
             with override_settings(TESTING=False):
                 assert ifrc_translator.translate_text('hello', 'es') == "Hola"
+
+
+class ModelTranslatorBatchTest(APITestCase):
+    def _create_actions(self, count, distinct_names):
+        return [Action.objects.create(name=f'Action {i % distinct_names}') for i in range(count)]
+
+    def _get_dest_languages(self):
+        return [lang for lang in AVAILABLE_LANGUAGES if lang != 'en']
+
+    def test_translate_objects(self):
+        actions = self._create_actions(30, distinct_names=10)
+        translator = DummyTranslator()
+        stats = ModelTranslator(translator=translator, max_workers=2).translate_objects(Action, actions)
+
+        dest_languages = self._get_dest_languages()
+        self.assertEqual(stats['objects'], 30)
+        self.assertEqual(stats['updated_objects'], 30)
+        self.assertEqual(stats['strings'], 30 * len(dest_languages))
+        # Identical texts are translated once, in one request per language
+        self.assertEqual(stats['unique_texts'], 10 * len(dest_languages))
+        self.assertEqual(translator.requests_count, len(dest_languages))
+        for action in Action.objects.filter(pk__in=[action.pk for action in actions]):
+            for lang in dest_languages:
+                self.assertEqual(
+                    getattr(action, build_localized_fieldname('name', lang)),
+                    translator._fake_translation(action.name_en, lang, 'en'),
+                )
+
+        # Nothing left to translate
+        actions = Action.objects.filter(pk__in=[action.pk for action in actions])
+        stats = ModelTranslator(translator=translator).translate_objects(Action, actions)
+        self.assertEqual(stats['strings'], 0)
+        self.assertEqual(stats['requests'], 0)
+
+    def test_batch_benchmark(self):
+        actions = self._create_actions(20, distinct_names=20)
+        dest_fields = [build_localized_fieldname('name', lang) for lang in self._get_dest_languages()]
+
+        translator = DummyTranslator(latency=0.005)
+        start_time = time.monotonic()
+        for action in actions:
+            ModelTranslator(translator=translator, use_memory=False).translate_model_fields(action)
+        sequential_time = time.monotonic() - start_time
+        sequential_requests_count = translator.requests_count
+
+        Action.objects.filter(pk__in=[action.pk for action in actions]).update(**{field: None for field in dest_fields})
+        actions = list(Action.objects.filter(pk__in=[action.pk for action in actions]))
+        translator = DummyTranslator(latency=0.005)
+        stats = ModelTranslator(translator=translator, use_memory=False).translate_objects(Action, actions)
+
+        self.assertEqual(sequential_requests_count, 20 * len(dest_fields))
+        self.assertEqual(translator.requests_count, len(dest_fields))
+        self.assertLess(stats['seconds'], sequential_time)
+
+    def test_translation_memory(self):
+        actions = self._create_actions(20, distinct_names=10)
+        dest_languages = self._get_dest_languages()
+        stats = ModelTranslator(translator=DummyTranslator()).translate_objects(Action, actions)
+        self.assertEqual(stats['memory_hits'], 0)
+        self.assertEqual(TranslationMemory.objects.count(), 10 * len(dest_languages))
+
+        # Same texts (apart from the spaces) are taken from the memory
+        actions = [Action.objects.create(name=f'  Action {i}  ') for i in range(10)] + [Action.objects.create(name='New')]
+        translator = DummyTranslator()
+        stats = ModelTranslator(translator=translator).translate_objects(Action, actions)
+        self.assertEqual(stats['memory_hits'], 10 * len(dest_languages))
+        self.assertEqual(stats['updated_objects'], 11)
+        # Only the new text is sent to the translator
+        self.assertEqual(translator.requests_count, len(dest_languages))
+        action = Action.objects.get(pk=actions[0].pk)
+        for lang in dest_languages:
+            self.assertEqual(
+                getattr(action, build_localized_fieldname('name', lang)),
+                translator._fake_translation('Action 0', lang, 'en'),
+            )
+
+        # Single object translation uses the memory too
+        action = Action.objects.create(name='New')
+        translator = DummyTranslator()
+        ModelTranslator(translator=translator).translate_model_fields(action)
+        self.assertEqual(translator.requests_count, 0)
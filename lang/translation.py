@@ -1,4 +1,6 @@
 import logging
+import threading
+import time
 import requests
 import boto3
 
@@ -20,11 +22,44 @@ class BaseTranslator():
         """
         return text + f' translated to "{dest_language}" using source language "{source_language}"'
 
+    def translate_texts(self, texts, dest_language, source_language=None):
+        """
+        Translate multiple texts to the same language
+        Providers without a batch API translate them one by one, one request per text: neither the IFRC translation
+        API (one `text` per request) nor Amazon Translate (TranslateText, the batch jobs are asynchronous, using S3)
+        have a synchronous multi-text call. The batch still saves the TranslationMemory lookups and runs the requests
+        in parallel (lang.tasks.ModelTranslator.translate_objects).
+        """
+        return [
+            self.translate_text(text, dest_language, source_language=source_language)
+            for text in texts
+        ]
+
 
 class DummyTranslator(BaseTranslator):
+    """
+    Also usable as a local stand-in for the translation providers (e.g. for benchmarks):
+    each request waits for `latency` seconds and is counted in `requests_count`
+    """
+    def __init__(self, latency=0):
+        self.latency = latency
+        self.requests_count = 0
+        self._lock = threading.Lock()
+
+    def _request(self):
+        with self._lock:
+            self.requests_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
     def translate_text(self, text, dest_language, source_language='auto'):
+        self._request()
         return self._fake_translation(text, dest_language, source_language)
 
+    def translate_texts(self, texts, dest_language, source_language='auto'):
+        self._request()
+        return [self._fake_translation(text, dest_language, source_language) for text in texts]
+
 
 class AmazonTranslator(BaseTranslator):
     """
@@ -64,6 +99,7 @@ class AmazonTranslator(BaseTranslator):
 class IfrcTranslator(BaseTranslator):
     """
     IFRC Translator helper
+    The API translates one text per request, each thread reuses its own (keep-alive) session for them
     """
     domain: str
     url: str
@@ -84,6 +120,15 @@ class IfrcTranslator(BaseTranslator):
         self.params = dict(
             apiKey=settings.IFRC_TRANSLATION_GET_API_KEY
         )
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        # Sessions are not thread-safe, translate_objects sends the requests from a pool of threads
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
 
     def translate_text(self, text, dest_language, source_language=None):
         if settings.TESTING:
@@ -94,7 +139,7 @@ class IfrcTranslator(BaseTranslator):
             "from": source_language,
             "to": dest_language,
         }
-        response = requests.post(
+        response = self.session.post(
             self.url,
             headers=self.headers,
             params=self.params,
@@ -3,9 +3,13 @@ import csv
 from django.core.management.base import BaseCommand, CommandError
 from django.contrib.gis.geos import Point
 
+from api.geo import get_admin_areas
 from api.models import Country
+from middlewares.cache import bump_cache_generation
 from ...models import LocalUnit, LocalUnitType
 
+BULK_CREATE_BATCH_SIZE = 1000
+
 
 class Command(BaseCommand):
     help = "Import LocalUnits data from CSV"
@@ -18,48 +22,70 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         filename = options['filename'][0]
         with open(filename) as csvfile:
-            reader = csv.DictReader(csvfile)
-            for i, row in enumerate(reader):
-                # Without positions we can't use the row:
-                if not row['LONGITUDE'] or not row['LATITUDE']:
-                    continue
-                if len(row['POSTCODE']) > 10:
-                    row['POSTCODE'] = ''  # better then inserting wrong textual data
-                unit = LocalUnit()
-                unit.country = Country.objects.get(iso3=row['ISO3'])
-                if   row['TYPECODE'] == 'NS0': row['TYPECODE'] = 1
-                elif row['TYPECODE'] == 'NS1': row['TYPECODE'] = 2
-                elif row['TYPECODE'] == 'NS2': row['TYPECODE'] = 3
-                elif row['TYPECODE'] == 'NS3': row['TYPECODE'] = 4
-                else: row['TYPECODE'] = int(row['TYPECODE'])
-                unit.type, created = LocalUnitType.objects.all().get_or_create(
+            # Without positions we can't use the row:
+            rows = [
+                (i, row)
+                for i, row in enumerate(csv.DictReader(csvfile))
+                if row['LONGITUDE'] and row['LATITUDE']
+            ]
+
+        countries = Country.objects.in_bulk({row['ISO3'] for _, row in rows}, field_name='iso3')
+        unit_types = {unit_type.level: unit_type for unit_type in LocalUnitType.objects.all()}
+        units = []
+        for i, row in rows:
+            if len(row['POSTCODE']) > 10:
+                row['POSTCODE'] = ''  # better then inserting wrong textual data
+            unit = LocalUnit()
+            unit.country = countries.get(row['ISO3'])
+            if   row['TYPECODE'] == 'NS0': row['TYPECODE'] = 1
+            elif row['TYPECODE'] == 'NS1': row['TYPECODE'] = 2
+            elif row['TYPECODE'] == 'NS2': row['TYPECODE'] = 3
+            elif row['TYPECODE'] == 'NS3': row['TYPECODE'] = 4
+            else: row['TYPECODE'] = int(row['TYPECODE'])
+            if row['TYPECODE'] not in unit_types:
+                unit_types[row['TYPECODE']], created = LocalUnitType.objects.all().get_or_create(
                     level=row['TYPECODE'],
                     # name=row['TYPENAME'] -- we should create it in advance, not this way.
                 )
                 if created:
-                    print(f'New LocalUnitType created: {unit.type.name}')
+                    print(f'New LocalUnitType created: {unit_types[row["TYPECODE"]].name}')
+            unit.type = unit_types[row['TYPECODE']]
+
+            unit.local_branch_name = row['NAME_LOC']
+            unit.english_branch_name = row['NAME_EN']
+            unit.postcode = row['POSTCODE'].strip()[:10]
+            unit.address_loc = row['ADDRESS_LOC']
+            unit.address_en = row['ADDRESS_EN']
+            unit.city_loc = row['CITY_LOC']
+            unit.city_en = row['CITY_EN']
+            unit.focal_person_loc = row['FOCAL_PERSON_LOC']
+            unit.focal_person_en = row['FOCAL_PERSON_EN']
+            unit.phone = row['TELEPHONE'].strip()[:30]
+            unit.email = row['EMAIL']
+            unit.link = row['WEBSITE']
+            unit.source_en = row['SOURCE_EN']
+            unit.source_loc = row['SOURCE_LOC']
+            unit.location = Point(float(row['LONGITUDE']), float(row['LATITUDE']), srid=4326)
+            units.append((i, row, unit))
+
+        # Unknown ISO3: the country containing the location, all found in one query
+        units_without_country = [unit for _, _, unit in units if unit.country is None]
+        admin_areas = get_admin_areas([unit.location for unit in units_without_country])
+        for unit, areas in zip(units_without_country, admin_areas):
+            unit.country_id = areas.country_id
+
+        for i, row, unit in units:
+            if unit.country_id is None:
+                raise CommandError(f'{i} | Country not found for ISO3 "{row["ISO3"]}" and the location')
+        LocalUnit.objects.bulk_create([unit for _, _, unit in units], batch_size=BULK_CREATE_BATCH_SIZE)
+        bump_cache_generation(LocalUnit)
 
-                unit.local_branch_name = row['NAME_LOC']
-                unit.english_branch_name = row['NAME_EN']
-                unit.postcode = row['POSTCODE'].strip()[:10]
-                unit.address_loc = row['ADDRESS_LOC']
-                unit.address_en = row['ADDRESS_EN']
-                unit.city_loc = row['CITY_LOC']
-                unit.city_en = row['CITY_EN']
-                unit.focal_person_loc = row['FOCAL_PERSON_LOC']
-                unit.focal_person_en = row['FOCAL_PERSON_EN']
-                unit.phone = row['TELEPHONE'].strip()[:30]
-                unit.email = row['EMAIL']
-                unit.link = row['WEBSITE']
-                unit.source_en = row['SOURCE_EN']
-                unit.source_loc = row['SOURCE_LOC']
-                unit.location = Point(float(row['LONGITUDE']), float(row['LATITUDE']))
-                unit.save()
-                name = unit.local_branch_name if unit.local_branch_name else unit.english_branch_name
-                city = unit.city_loc if unit.city_loc else unit.city_en
-                if name:
-                    print(f'{i} | {name} saved')
-                elif city:
-                    print(f'{i} | ** {city} city location saved')
-                else:
-                    print(f'{i} | *** entity with ID saved')
+        for i, row, unit in units:
+            name = unit.local_branch_name if unit.local_branch_name else unit.english_branch_name
+            city = unit.city_loc if unit.city_loc else unit.city_en
+            if name:
+                print(f'{i} | {name} saved')
+            elif city:
+                print(f'{i} | ** {city} city location saved')
+            else:
+                print(f'{i} | *** entity with ID saved')
@@ -1,9 +1,15 @@
+import csv
+import tempfile
+
 import factory
+from django.core.management import call_command
+from unittest import mock
+
 from django.test import TestCase
-from django.contrib.gis.geos import Point
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
 
 from .models import LocalUnit, LocalUnitType
-from api.models import Country, Region
+from api.models import Country, CountryGeoms, Region
 
 
 class LocalUnitFactory(factory.django.DjangoModelFactory):
@@ -107,3 +113,92 @@ class TestLocalUnitsDetailView(TestCase):
         self.assertEqual(response.data['country']['iso3'], 'NLP')
         self.assertEqual(response.data['type']['name'], 'Level 0')
         self.assertEqual(response.data['type']['level'], 0)
+
+
+class TestImportLocalUnitsCsv(TestCase):
+    FIELDS = [
+        'ISO3', 'TYPECODE', 'NAME_LOC', 'NAME_EN', 'POSTCODE', 'ADDRESS_LOC', 'ADDRESS_EN', 'CITY_LOC', 'CITY_EN',
+        'FOCAL_PERSON_LOC', 'FOCAL_PERSON_EN', 'TELEPHONE', 'EMAIL', 'WEBSITE', 'SOURCE_EN', 'SOURCE_LOC',
+        'LONGITUDE', 'LATITUDE',
+    ]
+
+    def test_import(self):
+        nepal = Country.objects.create(name='Nepal', iso3='NPL')
+        philippines = Country.objects.create(name='Philippines', iso3='PHL')
+        CountryGeoms.objects.create(country=philippines, geom=MultiPolygon(Polygon.from_bbox((120, 5, 125, 20))))
+        LocalUnitType.objects.create(level=1, name='Level 1')
+        rows = [
+            ('NPL', 'NS0', 'Branch 1', '85.3', '27.7'),
+            # Unknown ISO3, the country is found using the location
+            ('', 'NS1', 'Branch 2', '121', '14.5'),
+            ('PHL', 'NS1', 'Branch 3', '122', '15'),
+            # Without positions
+            ('NPL', 'NS0', 'Branch 4', '', ''),
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=self.FIELDS, restval='')
+            writer.writeheader()
+            for iso3, typecode, name, longitude, latitude in rows:
+                writer.writerow({
+                    'ISO3': iso3, 'TYPECODE': typecode, 'NAME_EN': name, 'LONGITUDE': longitude, 'LATITUDE': latitude,
+                })
+            csv_file.flush()
+            call_command('import-local-units-csv', csv_file.name)
+
+        self.assertEqual(
+            set(LocalUnit.objects.values_list('english_branch_name', 'country', 'type__level')),
+            {('Branch 1', nepal.pk, 1), ('Branch 2', philippines.pk, 2), ('Branch 3', philippines.pk, 2)},
+        )
+        # Missing types are created once
+        self.assertEqual(LocalUnitType.objects.filter(level=2).count(), 1)
+
+
+class TestLocalUnitsMapView(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Nepal', iso3='NPL')
+        type = LocalUnitType.objects.create(level=1, name='Level 1')
+        # Kathmandu (3), Pokhara (1)
+        for lon, lat in [(85.32, 27.70), (85.33, 27.71), (85.34, 27.70), (83.98, 28.21)]:
+            LocalUnitFactory(country=country, type=type, location=Point(lon, lat), english_branch_name=f'{lon}')
+
+    def test_spatial_filters(self):
+        response = self.client.get('/api/v2/local-unit/?bbox=85,27,86,28')
+        self.assertEqual(response.data['count'], 3)
+        # ~5km around Kathmandu
+        response = self.client.get('/api/v2/local-unit/?near=85.32,27.70&radius=5000')
+        self.assertEqual(response.data['count'], 3)
+        response = self.client.get('/api/v2/local-unit/?near=85.32,27.70&radius=1000')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(self.client.get('/api/v2/local-unit/?near=85.32,27.70').status_code, 400)
+        self.assertEqual(self.client.get('/api/v2/local-unit/?radius=5000').status_code, 400)
+        self.assertEqual(self.client.get('/api/v2/local-unit/?bbox=85,27').status_code, 400)
+
+    def test_compact_output(self):
+        response = self.client.get('/api/v2/local-unit/?output=flat&bbox=83,28,84,29')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['fields'], ('id', 'lon', 'lat', 'type_level', 'country_iso3', 'name'))
+        unit = LocalUnit.objects.get(english_branch_name='83.98')
+        self.assertEqual(response.data['data'], [[unit.id, 83.98, 28.21, 1, 'NPL', '83.98']])
+        self.assertFalse(response.data['truncated'])
+
+        response = self.client.get('/api/v2/local-unit/?output=geojson')
+        self.assertEqual(response.data['type'], 'FeatureCollection')
+        self.assertEqual(len(response.data['features']), 4)
+        self.assertFalse(response.data['truncated'])
+
+        with mock.patch('local_units.views.LOCAL_UNIT_MAX_FEATURES', 3):
+            response = self.client.get('/api/v2/local-unit/?output=geojson')
+            self.assertEqual(len(response.data['features']), 3)
+            self.assertTrue(response.data['truncated'])
+            response = self.client.get('/api/v2/local-unit/?zoom=6&output=flat')
+            self.assertFalse(response.data['truncated'])
+
+    def test_clusters(self):
+        # A zoom level where Kathmandu's units share a cell
+        response = self.client.get('/api/v2/local-unit/?zoom=6')
+        self.assertEqual(response.status_code, 200)
+        clusters = sorted(feature['properties']['count'] for feature in response.data['features'])
+        self.assertEqual(clusters, [1, 3])
+        # No clustering at high zoom levels
+        response = self.client.get('/api/v2/local-unit/?zoom=18&output=flat')
+        self.assertEqual(len(response.data['data']), 4)
@@ -1,13 +1,38 @@
+import math
+
+from rest_framework import serializers
 from rest_framework.generics import (
     ListAPIView, RetrieveAPIView
 )
+from rest_framework.response import Response
+from django.contrib.gis.db.models import Collect, PointField
+from django.contrib.gis.db.models.functions import Centroid
+from django.contrib.gis.geos import Point, Polygon
+from django.contrib.gis.measure import D
+from django.db.models import Count, Func, Min, Value
 from django_filters import rest_framework as filters
 
 from .models import LocalUnit
 from .serializers import LocalUnitSerializer
 
+# Compact (output=geojson/flat) responses are not paginated, larger viewports should use zoom (clustering)
+# Above this, the response is cut and flagged as truncated
+LOCAL_UNIT_MAX_FEATURES = 5000
+# Grid clustering: cells per 256px tile width, no clustering from LOCAL_UNIT_CLUSTER_MAX_ZOOM
+LOCAL_UNIT_CLUSTER_CELLS_PER_TILE = 8
+LOCAL_UNIT_CLUSTER_MAX_ZOOM = 16
+METERS_PER_DEGREE = 111320
+
+
+class FloatCSVFilter(filters.BaseCSVFilter, filters.NumberFilter):
+    pass
+
 
 class LocalUnitFilters(filters.FilterSet):
+    bbox = FloatCSVFilter(label='Bounding box: west,south,east,north', method='filter_bbox')
+    near = FloatCSVFilter(label='Point: lon,lat (used with radius)', method='filter_near')
+    radius = filters.NumberFilter(label='Radius around near (meters)', method='filter_radius')
+
     class Meta:
         model = LocalUnit
         fields = (
@@ -19,13 +44,125 @@ class LocalUnitFilters(filters.FilterSet):
             'validated',
         )
 
+    def filter_bbox(self, queryset, name, value):
+        if len(value) != 4:
+            raise serializers.ValidationError({'bbox': 'Expected west,south,east,north'})
+        west, south, east, north = map(float, value)
+        # The location's GiST index is used by the bbox containment (@)
+        return queryset.filter(location__contained=Polygon.from_bbox((west, south, east, north)))
+
+    def filter_near(self, queryset, name, value):
+        radius = self.form.cleaned_data.get('radius')
+        if len(value) != 2 or radius is None:
+            raise serializers.ValidationError({'near': 'Expected lon,lat and a radius (meters)'})
+        lon, lat = map(float, value)
+        radius = float(radius)
+        point = Point(lon, lat, srid=4326)
+        # Index-backed pre-filter (in degrees, wide enough at this latitude), then the exact distance in meters
+        degrees = radius / (METERS_PER_DEGREE * math.cos(math.radians(min(abs(lat), 89))))
+        return queryset.filter(
+            location__dwithin=(point, degrees),
+            location__distance_lte=(point, D(m=radius)),
+        )
+
+    def filter_radius(self, queryset, name, value):
+        # Used by near
+        if self.form.cleaned_data.get('near') is None:
+            raise serializers.ValidationError({'radius': 'Expected with near (lon,lat)'})
+        return queryset
+
 
 class LocalUnitListAPIView(ListAPIView):
+    """
+    Local units, with the bbox or near/radius spatial filters
+    output=geojson|flat returns compact (not paginated) features for maps,
+    with zoom=<z> the units are clustered on a grid of the zoom level
+    At most LOCAL_UNIT_MAX_FEATURES features are returned, `truncated` tells if there are more
+    """
     queryset = LocalUnit.objects.all()
     serializer_class = LocalUnitSerializer
     filterset_class = LocalUnitFilters
     search_fields = ('local_branch_name', 'english_branch_name',)
 
+    FLAT_FIELDS = ('id', 'lon', 'lat', 'type_level', 'country_iso3', 'name')
+    FLAT_CLUSTER_FIELDS = ('id', 'lon', 'lat', 'count')
+
+    def get_output_params(self):
+        output = self.request.query_params.get('output')
+        zoom = self.request.query_params.get('zoom')
+        if output is None and zoom is None:
+            return None
+        if output not in (None, 'geojson', 'flat'):
+            raise serializers.ValidationError({'output': 'Expected geojson or flat'})
+        if zoom is not None:
+            if not zoom.isdigit():
+                raise serializers.ValidationError({'zoom': 'Expected a zoom level'})
+            zoom = int(zoom)
+        return output or 'geojson', zoom
+
+    def get_features(self, queryset):
+        for unit in queryset.values(
+            'id', 'location', 'type__level', 'country__iso3', 'local_branch_name', 'english_branch_name',
+        )[:LOCAL_UNIT_MAX_FEATURES + 1]:
+            yield unit['id'], unit['location'], {
+                'type_level': unit['type__level'],
+                'country_iso3': unit['country__iso3'],
+                'name': unit['local_branch_name'] or unit['english_branch_name'],
+            }
+
+    def get_clusters(self, queryset, zoom):
+        cell_size = 360 / (2 ** zoom * LOCAL_UNIT_CLUSTER_CELLS_PER_TILE)
+        clusters = queryset.annotate(
+            cell=Func('location', Value(cell_size), function='ST_SnapToGrid', output_field=PointField(srid=4326)),
+        ).values('cell').annotate(
+            count=Count('id'),
+            center=Centroid(Collect('location')),
+            unit_id=Min('id'),
+        ).order_by()
+        for cluster in clusters[:LOCAL_UNIT_MAX_FEATURES + 1]:
+            # id: of the unit if it is alone in its cell
+            yield cluster['unit_id'] if cluster['count'] == 1 else None, cluster['center'], {'count': cluster['count']}
+
+    def list(self, request, *args, **kwargs):
+        output_params = self.get_output_params()
+        if output_params is None:
+            return super().list(request, *args, **kwargs)
+        output, zoom = output_params
+        queryset = self.filter_queryset(self.get_queryset())
+        if zoom is not None and zoom < LOCAL_UNIT_CLUSTER_MAX_ZOOM:
+            features = self.get_clusters(queryset, zoom)
+            flat_fields = self.FLAT_CLUSTER_FIELDS
+        else:
+            features = self.get_features(queryset)
+            flat_fields = self.FLAT_FIELDS
+        # One more is fetched to know if there are more
+        features = list(features)
+        truncated = len(features) > LOCAL_UNIT_MAX_FEATURES
+        features = features[:LOCAL_UNIT_MAX_FEATURES]
+
+        if output == 'flat':
+            return Response({
+                'fields': flat_fields,
+                'truncated': truncated,
+                'data': [
+                    [_id, point.x, point.y, *properties.values()]
+                    for _id, point, properties in features
+                ],
+            })
+        return Response({
+            'type': 'FeatureCollection',
+            'truncated': truncated,
+            'features': [
+                {
+                    'type': 'Feature',
+                    'id': _id,
+                    'geometry': {'type': 'Point', 'coordinates': [point.x, point.y]},
+                    'properties': properties,
+                }
+                for _id, point, properties in features
+            ],
+        })
+
 
 class LocalUnitDetailAPIView(RetrieveAPIView):
     queryset = LocalUnit.objects.all()
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Last response of each fetched (GET) url: body digest, validators (ETag/Last-Modified) and body
+FETCH_CACHE_KEY = 'fetch:{}'
+FETCH_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+# Only the digest of larger bodies is cached (no revalidation, but changed still works)
+FETCH_CACHE_MAX_BODY_SIZE = 10 * 1024 * 1024
+FETCH_TIMEOUT = 60
+FETCH_POOL_SIZE = 10
+
+_local = threading.local()
+
+
+def get_session():
+    """ Pooled session (one per thread) which retries using settings.RETRY_STRATEGY """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        adapter = HTTPAdapter(
+            max_retries=settings.RETRY_STRATEGY,
+            pool_connections=FETCH_POOL_SIZE,
+            pool_maxsize=FETCH_POOL_SIZE,
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+    return session
+
+
+def get_cache_key(url, params=None):
+    request = requests.Request('GET', url, params=params).prepare()
+    return FETCH_CACHE_KEY.format(hashlib.sha256(request.url.encode()).hexdigest())
+
+
+class FetchResponse():
+    """
+    Response of fetch, with the requests.Response attributes used by the ingestors
+    changed is False when the body is the same as the last saved one (304 or same digest)
+    """
+
+    def __init__(self, url, status_code, content, headers, encoding, changed, cache_key=None, cache_entry=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding
+        self.changed = changed
+        self._cache_key = cache_key
+        self._cache_entry = cache_entry
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f'{self.status_code} Error for url: {self.url}', response=self)
+
+    def save(self):
+        """ Stores the response as the last one of the url (used by fetch(..., save=False) callers) """
+        if self._cache_entry is not None:
+            cache.set(self._cache_key, self._cache_entry, timeout=FETCH_CACHE_TIMEOUT)
+
+
+def fetch(
+    url, method='GET', params=None, headers=None, use_cache=True, save=True, session=None, timeout=FETCH_TIMEOUT, **kwargs,
+):
+    """
+    Request used by the ingestors, using the shared pooled session
+    The last body of each GET url is cached with its ETag/Last-Modified, which are sent back (If-None-Match and
+    If-Modified-Since) so that an unchanged feed costs a 304 (the cached body is returned).
+    Use response.changed to skip the feeds which are unchanged since the last saved response.
+    Use save=False to store the response only once it is handled (response.save()), a failed run then doesn't mark
+    the feed as seen.
+    Authenticated requests (Authorization header or auth) are never cached, the cache key is only the url.
+    """
+    session = session or get_session()
+    headers = dict(headers or {})
+    is_authenticated = kwargs.get('auth') is not None or any(key.lower() == 'authorization' for key in headers)
+    use_cache = use_cache and method == 'GET' and not is_authenticated
+    cache_key = cache_entry = None
+    if use_cache:
+        cache_key = get_cache_key(url, params)
+        cache_entry = cache.get(cache_key)
+        if cache_entry and cache_entry['content'] is not None:
+            if cache_entry['etag']:
+                headers['If-None-Match'] = cache_entry['etag']
+            if cache_entry['last_modified']:
+                headers['If-Modified-Since'] = cache_entry['last_modified']
+
+    response = session.request(method, url, params=params, headers=headers, timeout=timeout, **kwargs)
+    if response.status_code == 304 and cache_entry and cache_entry['content'] is not None:
+        logger.info(f'Not modified: {url}')
+        return FetchResponse(url, 200, cache_entry['content'], response.headers, cache_entry['encoding'], False)
+
+    content = response.content
+    encoding = response.encoding or response.apparent_encoding
+    digest = hashlib.sha256(content).hexdigest()
+    new_cache_entry = None
+    if use_cache and response.status_code == 200:
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        new_cache_entry = {
+            'digest': digest,
+            'etag': etag,
+            'last_modified': last_modified,
+            'encoding': encoding,
+            'content': content if (etag or last_modified) and len(content) <= FETCH_CACHE_MAX_BODY_SIZE else None,
+        }
+    fetch_response = FetchResponse(
+        url,
+        response.status_code,
+        content,
+        response.headers,
+        encoding,
+        changed=not cache_entry or cache_entry['digest'] != digest,
+        cache_key=cache_key,
+        cache_entry=new_cache_entry,
+    )
+    if save:
+        fetch_response.save()
+    return fetch_response
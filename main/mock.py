@@ -1,3 +1,6 @@
+import smtplib
+import threading
+import time
 from unittest.mock import Mock
 
 
@@ -12,3 +15,82 @@ def erp_request_side_effect_mock(url, json, headers):
     if json['Emergency']['FieldReport']['AffectedCountries']:
         return _generate_mock(200, None, None)
     return _generate_mock(400, None, None)
+
+
+class ElasticsearchStandIn():
+    """
+    Local stand-in for the Elasticsearch client used by haystack
+    Each call counts as one round trip and waits for the given latency
+    """
+    def __init__(self, latency=0.005):
+        self.latency = latency
+        self.round_trips = 0
+
+    def _wait(self):
+        self.round_trips += 1
+        time.sleep(self.latency)
+
+    @staticmethod
+    def _empty_response():
+        return {
+            'took': 1,
+            'timed_out': False,
+            'hits': {'total': {'value': 0, 'relation': 'eq'}, 'max_score': None, 'hits': []},
+        }
+
+    def search(self, body=None, index=None, **kwargs):
+        self._wait()
+        return self._empty_response()
+
+    def msearch(self, body=None, index=None, **kwargs):
+        self._wait()
+        # body is a list of (header, query) pairs
+        return {'responses': [self._empty_response() for _ in body[1::2]]}
+
+
+class SMTPStandIn():
+    """
+    Local stand-in for smtplib.SMTP, use with mock.patch('smtplib.SMTP', SMTPStandIn())
+    Counts the opened connections/logins and records the sent messages
+    The first `fail_first` sends drop the connection (smtplib.SMTPServerDisconnected)
+    """
+    def __init__(self, latency=0, fail_first=0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.connections = 0
+        self.logins = 0
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def __call__(self, host=None, port=None, **kwargs):
+        with self.lock:
+            self.connections += 1
+        return SMTPConnectionStandIn(self)
+
+
+class SMTPConnectionStandIn():
+    def __init__(self, server):
+        self.server = server
+
+    def ehlo(self):
+        return 250, b'OK'
+
+    def starttls(self):
+        return 220, b'Ready to start TLS'
+
+    def login(self, user, password):
+        with self.server.lock:
+            self.server.logins += 1
+        return 235, b'Authentication successful'
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            if self.server.fail_first > 0:
+                self.server.fail_first -= 1
+                raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+            self.server.sent.append((from_addr, to_addrs, msg))
+        return {}
+
+    def quit(self):
+        return 221, b'Bye'
@@ -1,3 +1,13 @@
+import csv
+
+from django.db import models
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework_csv.renderers import CSVRenderer
+
+from api.utils import Echo
+
 
 # Attention! deployments/PersonnelViewset CSV output does not use this:
 class CsvListMixin():
@@ -15,3 +25,165 @@ class CsvListMixin():
             if format == 'csv':
                 return self.get_csv_serializer_class()
         return super().get_serializer_class()
+
+
+class StreamingCsvListMixin():
+    """
+    Streams the CSV list (format=csv) instead of rendering it at once with the (Paginated)CSVRenderer.
+    The objects are fetched and serialized per chunk of csv_chunk_size (keeping the queryset's select/prefetch_related),
+    flattened using the renderer and the header/labels of the renderer context, and written row by row.
+    limit/offset are applied as for the paginated CSV.
+    NOTE: Without a header in the renderer context, the header is the sorted keys of every row (as the renderer does),
+    so the rows are serialized twice: once for the header, then to be written. With csv_header_from_serializer, it is
+    built from the serializer's fields instead (see get_csv_serializer_keys), csv_method_field_keys gives the keys of
+    the method fields returning a dict.
+    """
+    csv_chunk_size = 500
+    csv_header_from_serializer = False
+    csv_method_field_keys = {}
+
+    def get_csv_chunks(self, queryset):
+        pks = queryset.values_list('pk', flat=True)
+        paginator = self.paginator
+        if isinstance(paginator, LimitOffsetPagination):
+            offset = paginator.get_offset(self.request)
+            limit = paginator.get_limit(self.request)
+            pks = pks[offset:offset + limit] if limit is not None else pks[offset:]
+
+        def _get_objects(chunk_pks):
+            objects = {obj.pk: obj for obj in queryset.filter(pk__in=chunk_pks)}
+            return [objects[pk] for pk in chunk_pks if pk in objects]
+
+        chunk_pks = []
+        for pk in pks.iterator(chunk_size=self.csv_chunk_size):
+            chunk_pks.append(pk)
+            if len(chunk_pks) == self.csv_chunk_size:
+                yield _get_objects(chunk_pks)
+                chunk_pks = []
+        if chunk_pks:
+            yield _get_objects(chunk_pks)
+
+    def get_csv_serializer_keys(self, fields, get_count, prefix='', lookup_prefix=''):
+        """
+        Flattened keys (as renderer.flatten_item) of the serializer fields, the list fields get a set of columns per
+        related object, up to get_count(relation lookup), eg: annual_split_detail.0.year, annual_split_detail.1.year
+        """
+        keys = []
+        for name, field in fields.items():
+            if field.write_only:
+                continue
+            key = f'{prefix}{name}'
+            lookup = f'{lookup_prefix}{field.source.replace(".", "__")}'
+            if key in self.csv_method_field_keys:
+                keys.extend(f'{key}.{sub_key}' for sub_key in self.csv_method_field_keys[key])
+            elif isinstance(field, serializers.ListSerializer):
+                child_keys = self.get_csv_serializer_keys(field.child.fields, get_count, lookup_prefix=f'{lookup}__')
+                keys.extend(f'{key}.{i}.{child_key}' for i in range(get_count(lookup)) for child_key in child_keys)
+            elif isinstance(field, serializers.ManyRelatedField):
+                keys.extend(f'{key}.{i}' for i in range(get_count(lookup)))
+            elif isinstance(field, serializers.BaseSerializer):
+                keys.extend(self.get_csv_serializer_keys(field.fields, get_count, f'{key}.', f'{lookup}__'))
+            else:
+                keys.append(key)
+        return keys
+
+    def get_csv_header(self, queryset, renderer):
+        if self.csv_header_from_serializer:
+            fields = self.get_serializer().fields
+            lookups = set()
+            self.get_csv_serializer_keys(fields, lambda lookup: lookups.add(lookup) or 0)
+            # Max number of related objects of each list field, using one query
+            aliases = {f'csv_count_{i}': lookup for i, lookup in enumerate(sorted(lookups))}
+            counts = {}
+            if aliases:
+                max_counts = queryset.order_by().annotate(**{
+                    alias: models.Count(lookup, distinct=True) for alias, lookup in aliases.items()
+                }).aggregate(**{f'{alias}_max': models.Max(alias) for alias in aliases})
+                counts = {lookup: max_counts[f'{alias}_max'] or 0 for alias, lookup in aliases.items()}
+            return sorted(self.get_csv_serializer_keys(fields, counts.get))
+
+        # Nested/list columns can first appear in any row
+        keys = set()
+        for objects in self.get_csv_chunks(queryset):
+            for item in self.get_serializer(objects, many=True).data:
+                keys.update(renderer.flatten_item(item))
+        return sorted(keys)
+
+    def get_csv_rows(self, queryset, renderer, header=None, labels=None):
+        labels = labels or {}
+        if not header:
+            header = self.get_csv_header(queryset, renderer)
+        if header:
+            yield [labels.get(key, key) for key in header]
+        for objects in self.get_csv_chunks(queryset):
+            items = [renderer.flatten_item(item) for item in self.get_serializer(objects, many=True).data]
+            for item in items:
+                yield [item.get(key) for key in header]
+
+    def list(self, request, *args, **kwargs):
+        renderer = getattr(request, 'accepted_renderer', None)
+        if not isinstance(renderer, CSVRenderer):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        context = self.get_renderer_context()
+        writer = csv.writer(Echo(), **(context.get('writer_opts') or renderer.writer_opts or {}))
+        rows = self.get_csv_rows(
+            queryset,
+            renderer,
+            header=context.get('header', renderer.header),
+            labels=context.get('labels', renderer.labels),
+        )
+        return StreamingHttpResponse(
+            (writer.writerow(row).encode(renderer.charset) for row in rows),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+
+
+class SubqueryCount(models.Subquery):
+    """ Number of rows of the queryset (filtered with OuterRef), eg: SubqueryCount(Child.objects.filter(parent=OuterRef('pk'))) """
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+
+    def __init__(self, queryset, **extra):
+        super().__init__(queryset.order_by().values('pk'), output_field=models.IntegerField(), **extra)
+
+
+class RowAnnotationsSerializerMixin():
+    """
+    Per-row counts/flags of a (list) serializer, computed by the database along with the rows.
+    row_annotations: {name: function returning the expression (SubqueryCount, Exists, ...)}
+    The viewset adds them to its queryset (RowAnnotationsViewSetMixin) and the serializer reads them with
+    get_row_annotation, which queries them for the object only when it was not annotated (eg: nested or retrieved objects).
+    """
+    row_annotations = {}
+
+    @staticmethod
+    def get_row_annotation_alias(name):
+        return f'annotated_{name}'
+
+    @classmethod
+    def annotate_queryset(cls, queryset):
+        return queryset.annotate(**{
+            cls.get_row_annotation_alias(name): expression()
+            for name, expression in cls.row_annotations.items()
+        })
+
+    def get_row_annotation(self, obj, name):
+        alias = self.get_row_annotation_alias(name)
+        if not hasattr(obj, alias):
+            value = type(obj)._default_manager.filter(pk=obj.pk).annotate(
+                **{alias: self.row_annotations[name]()}
+            ).values_list(alias, flat=True).first()
+            setattr(obj, alias, value)
+        return getattr(obj, alias)
+
+
+class RowAnnotationsViewSetMixin():
+    """ Adds the row_annotations of the serializer (RowAnnotationsSerializerMixin) to the filtered queryset """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, RowAnnotationsSerializerMixin):
+            queryset = serializer_class.annotate_queryset(queryset)
+        return queryset
@@ -9,6 +9,7 @@ from urllib3.util.retry import Retry
 from corsheaders.defaults import default_headers
 
 from main import sentry
+from middlewares.timing import TimedElasticsearchConnection
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
@@ -43,6 +44,8 @@ env = environ.Env(
     EMAIL_USER=(str, None),
     EMAIL_PASS=(str, None),
     DEBUG_EMAIL=(bool, False),  # This was 0/1 before
+    EMAIL_DELIVERY_WORKERS=(int, 4),  # Parallel connections used to send batches of e-mails
+    EMAIL_DELIVERY_RETRIES=(int, 3),
     # TEST_EMAILS=(list, ['im@ifrc.org']), # maybe later
     # Translation
     # Translator Available:
@@ -94,6 +97,8 @@ env = environ.Env(
     SENTRY_SAMPLE_RATE=(float, 0.2),
     # Maintenance mode
     DJANGO_READ_ONLY=(bool, False),
+    # Server-Timing header for all the users (otherwise only with DEBUG and for the IFRC users)
+    SERVER_TIMING_HEADER=(bool, False),
 )
 
 
@@ -218,6 +223,8 @@ GRAPHENE = {
 
 MIDDLEWARE = [
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    # Before the cache middlewares, so that cached responses get their own timings
+    'middlewares.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -403,6 +410,8 @@ EMAIL_PORT = env('EMAIL_PORT')
 EMAIL_USER = env('EMAIL_USER')
 EMAIL_PASS = env('EMAIL_PASS')
 DEBUG_EMAIL = env('DEBUG_EMAIL')
+EMAIL_DELIVERY_WORKERS = env('EMAIL_DELIVERY_WORKERS')
+EMAIL_DELIVERY_RETRIES = env('EMAIL_DELIVERY_RETRIES')
 # TEST_EMAILS = env('TEST_EMAILS') # maybe later
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 104857600  # default 2621440, 2.5MB -> 100MB
@@ -544,11 +553,15 @@ HAYSTACK_CONNECTIONS = {
         'ENGINE': 'haystack.backends.elasticsearch7_backend.Elasticsearch7SearchEngine',
         'URL': ELASTIC_SEARCH_HOST,
         'INDEX_NAME': ELASTIC_SEARCH_INDEX,
+        # The time of the search requests is added to the Server-Timing header
+        'KWARGS': {'connection_class': TimedElasticsearchConnection},
     },
 }
 
 HAYSTACK_LIMIT_TO_REGISTERED_MODELS = False
 
+SERVER_TIMING_HEADER = env('SERVER_TIMING_HEADER')
+
 SUSPEND_SIGNALS = True
 
 # Maintenance mode
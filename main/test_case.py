@@ -13,11 +13,78 @@ from django.core import management
 from django.conf import settings
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
-from django.db import DEFAULT_DB_ALIAS, connections
+from django.db import DEFAULT_DB_ALIAS, connection, connections
 from django.test import override_settings
-
-from api.models import Country
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import (
+    Action,
+    Admin2,
+    AppealDocument,
+    AppealDocumentType,
+    Country,
+    CountryKeyFigure,
+    CountryOfFieldReportToReview,
+    CountrySnippet,
+    ExternalPartner,
+    MainContact,
+    RegionKeyFigure,
+    RegionSnippet,
+    SituationReport,
+    SituationReportType,
+    Snippet,
+    SupportedActivity,
+    VisibilityCharChoices,
+    VisibilityChoices,
+)
+from api.factories.country import CountryFactory
+from api.factories.district import DistrictFactory
+from api.factories.event import AppealFactory, EventFactory
+from api.factories.field_report import FieldReportFactory
+from deployments.models import (
+    MolnixTag,
+    MolnixTagGroup,
+    PartnerSocietyActivities,
+    PartnerSocietyDeployment,
+    Personnel,
+)
+from deployments.factories.emergency_project import (
+    EmergencyProjectActivityFactory,
+    EmergencyProjectFactory,
+    EruFactory,
+)
+from deployments.factories.personnel import PersonnelDeploymentFactory, PersonnelFactory
+from deployments.factories.project import ProjectFactory, SectorFactory
 from deployments.factories.user import UserFactory
+from dref.factories.dref import (
+    DrefFactory,
+    DrefFileFactory,
+    DrefFinalReportFactory,
+    DrefOperationalUpdateFactory,
+)
+from flash_update.factories import (
+    DonorFactory,
+    DonorGroupFactory,
+    FlashActionFactory,
+    FlashGraphicMapFactory,
+    FlashUpdateFactory,
+)
+from notifications.models import RecordType, Subscription, SurgeAlert
+from per.models import (
+    AssessmentType,
+    Form,
+    FormAnswer,
+    FormArea,
+    FormComponent,
+    FormData,
+    FormQuestion,
+    NiceDocument,
+    NSPhase,
+    Overview,
+    WorkPlan,
+)
+from registrations.models import DomainWhitelist
 
 from lang.translation import BaseTranslator
 
@@ -140,6 +207,47 @@ class GoAPITestMixin():
     def assert_500(self, response):
         self.assert_http_code(response, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @staticmethod
+    def get_router_routes():
+        """ (prefix, viewset) of the routes registered in main.urls.router """
+        from main.urls import router
+        return [(prefix, viewset) for prefix, viewset, _ in router.registry]
+
+    def _get_rows(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        if response.status_code != status.HTTP_200_OK:
+            return None, len(queries)
+        data = response.json()
+        return (data['results'] if isinstance(data, dict) and 'results' in data else data), len(queries)
+
+    def assert_query_budget(self, routes=None, page_size=20):
+        """
+        Walks the list routes of main.urls.router (or only the given prefixes) with the data created by the test:
+        the number of queries of a page of page_size rows must be the same as for a page of 1 row (no N+1).
+        The detail route of the first row is requested too, it must not fail.
+        Routes with less than 2 rows (or not readable: status != 200) are skipped, the checked prefixes are returned.
+        """
+        checked = []
+        failures = {}
+        for prefix, viewset in self.get_router_routes():
+            if (routes is not None and prefix not in routes) or not hasattr(viewset, 'list'):
+                continue
+            url = f'/api/v2/{prefix}/'
+            rows, page_queries = self._get_rows(f'{url}?limit={page_size}')
+            if not isinstance(rows, list) or len(rows) < 2:
+                continue
+            _, row_queries = self._get_rows(f'{url}?limit=1')
+            checked.append(prefix)
+            if page_queries != row_queries:
+                failures[prefix] = f'{row_queries} queries for 1 row, {page_queries} for {len(rows)} rows'
+            if hasattr(viewset, 'retrieve') and isinstance(rows[0], dict) and 'id' in rows[0]:
+                response = self.client.get(f'{url}{rows[0]["id"]}/')
+                if response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+                    failures[prefix] = f'detail failed with {response.status_code}'
+        self.assertEqual(failures, {})
+        return checked
+
     @classmethod
     def capture_on_commit_callbacks(cls, *, using=DEFAULT_DB_ALIAS, execute=False):
         """
@@ -219,3 +327,132 @@ class GoApiGlobalTest(APITestCase):
     def test_docs_api(self, **kwargs):
         resp = self.client.get('/docs/')
         self.assert_200(resp)
+
+    # List routes which can not return 2 rows whatever the data, so the query budget of their pages can not be compared
+    QUERY_BUDGET_EXCLUDED_ROUTES = {
+        'profile': 'only the profile of the authenticated user',
+        'user': 'only the authenticated user',
+        'latest_country_overview': 'requires ?country_id= and returns at most 1 overview',
+        'per_mission': 'at most 1 row, a permission flag',
+        'per_engaged_ns_percentage': 'always an empty list',
+        'per_global_preparedness': 'always an empty list',
+    }
+
+    def create_query_budget_data(self, count=3):
+        """
+        count rows for every list route of main.urls.router.
+        Every row has the same nested relations: a page of 1 row runs the same (prefetch) queries as a full page.
+        """
+        now = timezone.now()
+        appeal_document_type = AppealDocumentType.objects.create(name='appeal-document-type')
+        for i in range(count):
+            country = CountryFactory(url_ifrc=f'https://www.ifrc.org/national-society-{i}')
+            district = DistrictFactory(country=country, is_deprecated=False)
+            Admin2.objects.create(admin1=district, name=f'admin2-{i}', code=f'admin2-{i}')
+            CountryKeyFigure.objects.create(
+                country=country, figure='1', deck='deck', source='source', visibility=VisibilityChoices.PUBLIC,
+            )
+            CountrySnippet.objects.create(country=country, snippet='snippet', visibility=VisibilityChoices.PUBLIC)
+            RegionKeyFigure.objects.create(
+                region=country.region, figure='1', deck='deck', source='source', visibility=VisibilityChoices.PUBLIC,
+            )
+            RegionSnippet.objects.create(region=country.region, snippet='snippet', visibility=VisibilityChoices.PUBLIC)
+            CountryOfFieldReportToReview.objects.create(country=country)
+            DomainWhitelist.objects.create(domain_name=f'national-society-{i}.org')
+            ExternalPartner.objects.create(name=f'external-partner-{i}')
+            SupportedActivity.objects.create(name=f'supported-activity-{i}')
+            MainContact.objects.create(extent=f'extent-{i}', name=f'contact-{i}', email=f'contact-{i}@ifrc.org')
+            Action.objects.create(name=f'action-{i}')
+
+            # Emergencies
+            event = EventFactory(parent_event=None, countries=[country], visibility=VisibilityChoices.PUBLIC)
+            event.countries_for_preview.add(country)
+            for field_report in FieldReportFactory.create_batch(
+                2, event=event, dtype=event.dtype, visibility=VisibilityChoices.PUBLIC,
+            ):
+                field_report.countries.add(country)
+            appeal = AppealFactory(
+                event=event, dtype=event.dtype, country=country, region=country.region, code=f'MDR0000{i}',
+            )
+            AppealDocument.objects.create(
+                created_at=now, name=f'appeal-document-{i}', appeal=appeal, type=appeal_document_type,
+            )
+            SituationReport.objects.create(
+                name=f'situation-report-{i}', event=event, visibility=VisibilityChoices.PUBLIC,
+                type=SituationReportType.objects.create(type=f'situation-report-type-{i}'),
+            )
+            Snippet.objects.create(event=event, snippet='snippet', visibility=VisibilityChoices.PUBLIC)
+            Subscription.objects.create(user=self.root_user, rtype=RecordType.EVENT, event=event, country=country)
+
+            # Deployments
+            eru = EruFactory(event=event, appeal=appeal, deployed_to=country)
+            emergency_project = EmergencyProjectFactory(
+                event=event, country=country, reporting_ns=country, deployed_eru=eru, districts=[district],
+            )
+            EmergencyProjectActivityFactory(project=emergency_project)
+            ProjectFactory(
+                event=event, dtype=event.dtype, reporting_ns=country, project_country=country, project_districts=[district],
+                primary_sector=SectorFactory(), visibility=VisibilityCharChoices.PUBLIC,
+            )
+            partner_deployment = PartnerSocietyDeployment.objects.create(
+                activity=PartnerSocietyActivities.objects.create(activity=f'activity-{i}'),
+                parent_society=country,
+                country_deployed_to=country,
+            )
+            partner_deployment.district_deployed_to.add(district)
+            molnix_tag = MolnixTag.objects.create(molnix_id=i, name=f'tag-{i}', color='ff0000', tag_type='regular')
+            molnix_tag.groups.add(MolnixTagGroup.objects.create(molnix_id=i, name=f'tag-group-{i}'))
+            # Ongoing rapid response: featured_event_deployments and personnel_by_event have 1 row per event
+            personnel = PersonnelFactory(
+                deployment=PersonnelDeploymentFactory(country_deployed_to=country, event_deployed_to=event),
+                type=Personnel.TypeChoices.RR,
+                country_from=country,
+                start_date=now - datetime.timedelta(days=10),
+                end_date=now + datetime.timedelta(days=10),
+                is_active=True,
+            )
+            personnel.molnix_tags.add(molnix_tag)
+            surge_alert = SurgeAlert.objects.create(
+                operation=f'operation-{i}', message='message', event=event, country=country, created_at=now,
+            )
+            surge_alert.molnix_tags.add(molnix_tag)
+
+            # Flash updates
+            FlashUpdateFactory()
+            FlashGraphicMapFactory(created_by=self.root_user)
+            FlashActionFactory()
+            DonorFactory(organization_name=f'donor-{i}').groups.add(DonorGroupFactory(name=f'donor-group-{i}'))
+
+            # PER
+            area = FormArea.objects.create(title=f'area-{i}', area_num=i + 1)
+            component = FormComponent.objects.create(area=area, title=f'component-{i}', component_num=i + 1)
+            question = FormQuestion.objects.create(component=component, question=f'question-{i}', question_num=i + 1)
+            answer = FormAnswer.objects.create(text=f'answer-{i}')
+            question.answers.add(answer)
+            overview = Overview.objects.create(
+                country=country,
+                date_of_assessment=now,
+                type_of_assessment=AssessmentType.objects.create(name=f'assessment-type-{i}'),
+                user=self.root_user,
+            )
+            form = Form.objects.create(area=area, overview=overview, user=self.root_user)
+            FormData.objects.create(form=form, question=question, selected_answer=answer)
+            NiceDocument.objects.create(name=f'document-{i}', country=country)
+            NSPhase.objects.create(country=country)
+            WorkPlan.objects.create(timeline=now, country=country, user=self.root_user)
+
+            # DREF
+            dref = DrefFactory(created_by=self.root_user, country=country, is_active=True)
+            DrefOperationalUpdateFactory(dref=dref, created_by=self.root_user, country=country, operational_update_number=1)
+            DrefFinalReportFactory(dref=dref, created_by=self.root_user, country=country, is_published=True)
+            DrefFileFactory(created_by=self.root_user)
+
+    def test_query_budget(self):
+        self.create_query_budget_data()
+        self.authenticate(self.root_user)
+        routes = [
+            prefix
+            for prefix, viewset in self.get_router_routes()
+            if hasattr(viewset, 'list') and prefix not in self.QUERY_BUDGET_EXCLUDED_ROUTES
+        ]
+        self.assertEqual(self.assert_query_budget(routes=routes), routes)
@@ -0,0 +1,95 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from main.fetch import fetch
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """ Local stand-in of an external feed, /feed supports ETag revalidation, /plain-feed doesn't """
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get('If-None-Match')))
+        body = f'<rss>{server.version}</rss>'.encode()
+        etag = f'"v{server.version}"'
+        if self.path == '/feed' and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if self.path == '/feed':
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FetchTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+        self.server.version = 1
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_revalidation(self):
+        response = fetch(f'{self.url}/feed')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, '<rss>1</rss>')
+        self.assertTrue(response.changed)
+
+        # Unchanged: 304, the cached body is returned
+        response = fetch(f'{self.url}/feed')
+        self.assertEqual(self.server.requests[-1], ('/feed', '"v1"'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, '<rss>1</rss>')
+        self.assertFalse(response.changed)
+
+        # Changed
+        self.server.version = 2
+        response = fetch(f'{self.url}/feed')
+        self.assertEqual(response.text, '<rss>2</rss>')
+        self.assertTrue(response.changed)
+
+    def test_save_after_handling(self):
+        response = fetch(f'{self.url}/feed', save=False)
+        self.assertTrue(response.changed)
+        # Not saved (e.g. the run failed): the next fetch is not conditional and the feed is still changed
+        response = fetch(f'{self.url}/feed', save=False)
+        self.assertEqual(self.server.requests[-1], ('/feed', None))
+        self.assertTrue(response.changed)
+        response.save()
+        self.assertFalse(fetch(f'{self.url}/feed').changed)
+
+    def test_without_validators(self):
+        self.assertTrue(fetch(f'{self.url}/plain-feed').changed)
+        # Full response, but the same body
+        response = fetch(f'{self.url}/plain-feed')
+        self.assertEqual(self.server.requests[-1], ('/plain-feed', None))
+        self.assertEqual(response.text, '<rss>1</rss>')
+        self.assertFalse(response.changed)
+
+        self.server.version = 2
+        self.assertTrue(fetch(f'{self.url}/plain-feed').changed)
+
+    def test_authenticated_not_cached(self):
+        for _ in range(2):
+            response = fetch(f'{self.url}/feed', headers={'Authorization': 'Bearer token'})
+            self.assertEqual(self.server.requests[-1], ('/feed', None))
+            self.assertTrue(response.changed)
+        self.assertIsNone(response._cache_entry)
+        # Not cached for the anonymous requests either
+        self.assertTrue(fetch(f'{self.url}/feed').changed)
@@ -54,6 +54,10 @@ from api.views import (
     DummyExceptionError,
     ResendValidation,
     HayStackSearch,
+    SearchSuggest,
+    CountryTileView,
+    DistrictTileView,
+    Admin2TileView,
 )
 from registrations.views import NewRegistration, VerifyEmail, ValidateUser
 from per.views import (
@@ -177,6 +181,7 @@ admin.site.site_title = "IFRC Go admin"
 urlpatterns = [
     url(r"^api/v1/es_search/", EsPageSearch.as_view()),
     url(r"^api/v1/search/", HayStackSearch.as_view()),
+    url(r"^api/v2/search/suggest/", SearchSuggest.as_view()),
     url(r"^api/v1/es_health/", EsPageHealth.as_view()),
     # If we want to use the next one, some fixes needed, e.g.
     # stackoverflow.com/questions/47166385/dont-know-how-to-convert-the-django-field-skills-class-taggit-managers-tagga
@@ -230,6 +235,9 @@ urlpatterns = [
     url(r"^api/v2/exportperresults/", per_views.ExportAssessmentToCSVViewset.as_view()),
     url(r"^api/v2/local-unit/(?P<pk>\d+)", LocalUnitDetailAPIView.as_view()),
     url(r"^api/v2/local-unit/", LocalUnitListAPIView.as_view()),
+    url(r"^api/v2/tiles/countries/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt$", CountryTileView.as_view()),
+    url(r"^api/v2/tiles/districts/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt$", DistrictTileView.as_view()),
+    url(r"^api/v2/tiles/admin2/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt$", Admin2TileView.as_view()),
     url(r"^tinymce/", include("tinymce.urls")),
     url(r"^$", RedirectView.as_view(url="/admin")),
     # url(r'^', admin.site.urls),
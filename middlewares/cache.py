@@ -1,26 +1,142 @@
+import functools
+import time
+
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.middleware.cache import FetchFromCacheMiddleware, UpdateCacheMiddleware
+from django.urls import get_resolver, resolve, Resolver404
+from django.utils.cache import get_max_age, patch_cache_control
+from rest_framework.exceptions import APIException
 from rest_framework.views import APIView
 
+from api.utils import get_user_visibility_class
+
+# Visibility classes (api.utils.get_user_visibility_class) which share cached responses
+# Views can override this using `cache_visibility_classes` and the TTL using `cache_seconds`
+DEFAULT_CACHE_VISIBILITY_CLASSES = ('anonymous',)
+
+# Views can define `cache_dependencies` (models), cached responses are dropped when any of them changes
+CACHE_GENERATION_KEY = 'response-cache-generation:{}'
+
+
+def get_callback_view_class(callback):
+    # DRF views/viewsets set cls, Django class-based views set view_class
+    return getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+
+
+def get_cache_generation_key(model):
+    return CACHE_GENERATION_KEY.format(model._meta.concrete_model._meta.label_lower)
+
+
+@functools.lru_cache(maxsize=None)
+def get_cache_dependency_keys():
+    """ Generation keys of all the models used as `cache_dependencies` by the routed views """
+    keys = set()
+
+    def _collect(url_patterns):
+        for url_pattern in url_patterns:
+            if hasattr(url_pattern, 'url_patterns'):
+                _collect(url_pattern.url_patterns)
+                continue
+            view_class = get_callback_view_class(url_pattern.callback)
+            for model in getattr(view_class, 'cache_dependencies', ()):
+                keys.add(get_cache_generation_key(model))
+
+    _collect(get_resolver().url_patterns)
+    return keys
+
+
+def _incr_cache_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing (or evicted) generation, use the current time so that it never matches an older generation
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def bump_cache_generation(model):
+    """
+    Invalidates the cached responses which depend on the model (used by api.receivers)
+    The generation is bumped once the current transaction commits (right away outside of one), otherwise a request
+    served before the commit would cache the old rows under the new generation
+    """
+    key = get_cache_generation_key(model)
+    if key not in get_cache_dependency_keys():
+        return
+    transaction.on_commit(functools.partial(_incr_cache_generation, key))
+
+
+def get_cache_generation(view_class):
+    keys = [get_cache_generation_key(model) for model in getattr(view_class, 'cache_dependencies', ())]
+    if not keys:
+        return None
+    generations = cache.get_many(keys)
+    return '-'.join(str(generations.get(key, 0)) for key in keys)
+
+
+def get_view_class(request):
+    try:
+        return get_callback_view_class(resolve(request.path_info).func)
+    except Resolver404:
+        return None
+
+
+def get_cache_config(request):
+    """
+    Returns (key_prefix, cache_seconds, visibility_class) if the response can be shared, else None
+    Users with the same visibility class get identical visibility-filtered payloads, so they share the cache entries
+    """
+    if hasattr(request, '_go_cache_config'):
+        return request._go_cache_config
+
+    cache_config = None
+    view_class = get_view_class(request)
+    visibility_classes = getattr(view_class, 'cache_visibility_classes', DEFAULT_CACHE_VISIBILITY_CLASSES)
+    if visibility_classes:
+        drf_request = APIView().initialize_request(request)
+        try:
+            visibility_class = get_user_visibility_class(drf_request.user)
+        except APIException:
+            # Invalid credentials, let the view handle it
+            visibility_class = None
+        if visibility_class in visibility_classes:
+            key_prefix = f'{settings.CACHE_MIDDLEWARE_KEY_PREFIX}_{visibility_class}'
+            if cache_generation := get_cache_generation(view_class):
+                key_prefix = f'{key_prefix}_{cache_generation}'
+            cache_config = (
+                key_prefix,
+                getattr(view_class, 'cache_seconds', None),
+                visibility_class,
+            )
+    request._go_cache_config = cache_config
+    return cache_config
 
-def get_cache_key_prefix(request):
-    cache_prefix = settings.CACHE_MIDDLEWARE_KEY_PREFIX
-    drf_request = APIView().initialize_request(request)
 
-    if drf_request.user.is_anonymous:
-        return f'{cache_prefix}_anonymous'
+def mark_as_private(response, visibility_class):
+    # Responses of logged-in users are shared only inside this cache, not with downstream (CDN/browser) caches
+    if visibility_class != 'anonymous':
+        patch_cache_control(response, private=True)
+    return response
 
 
 class UpdateCacheForUserMiddleware(UpdateCacheMiddleware):
     def process_response(self, request, response):
-        if key_prefix := get_cache_key_prefix(request):
-            self.key_prefix = key_prefix
-            return super().process_response(request, response)
+        if cache_config := get_cache_config(request):
+            self.key_prefix, cache_seconds, visibility_class = cache_config
+            if cache_seconds and get_max_age(response) is None:
+                # Used by UpdateCacheMiddleware as the cache timeout
+                patch_cache_control(response, max_age=cache_seconds)
+            response = super().process_response(request, response)
+            return mark_as_private(response, visibility_class)
         return response
 
 
 class FetchFromCacheForUserMiddleware(FetchFromCacheMiddleware):
     def process_request(self, request):
-        if key_prefix := get_cache_key_prefix(request):
-            self.key_prefix = key_prefix
-            return super().process_request(request)
+        if cache_config := get_cache_config(request):
+            self.key_prefix, _, visibility_class = cache_config
+            response = super().process_request(request)
+            if response is not None:
+                return mark_as_private(response, visibility_class)
+            return response
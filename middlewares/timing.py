@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from elasticsearch import Urllib3HttpConnection
+
+# NOTE: Also imported by the settings (HAYSTACK_CONNECTIONS), keep the imports free of the apps
+
+# Requests above this number of queries are logged right away
+REQUEST_QUERY_WARNING = 100
+# The per-view stats of the process are logged (and reset) every this many requests
+REQUEST_STATS_LOG_INTERVAL = 1000
+
+_threadlocal = threading.local()
+
+
+class RequestTimings():
+    """ Number of queries and durations (ms) spent by a request, by category (db, es, view, render) """
+
+    def __init__(self):
+        self.queries = 0
+        self.durations = defaultdict(float)
+
+    def add(self, name, started_at):
+        self.durations[name] += (time.perf_counter() - started_at) * 1000
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.add('db', started_at)
+
+    def get_header(self):
+        """ Server-Timing header value """
+        metrics = []
+        for name, duration in self.durations.items():
+            desc = f';desc="{self.queries} queries"' if name == 'db' else ''
+            metrics.append(f'{name};dur={duration:.1f}{desc}')
+        return ', '.join(metrics)
+
+
+def get_request_timings():
+    return getattr(_threadlocal, 'timings', None)
+
+
+class TimedElasticsearchConnection(Urllib3HttpConnection):
+    """ Elasticsearch connection (connection_class) adding the time of its requests to the current request's timings """
+
+    def perform_request(self, *args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            return super().perform_request(*args, **kwargs)
+        finally:
+            timings = get_request_timings()
+            if timings is not None:
+                timings.add('es', started_at)
+
+
+class RequestStats():
+    """ Per-view stats of the process: number of requests, queries (total/max) and durations (ms) """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.views = defaultdict(lambda: {'requests': 0, 'queries': 0, 'max_queries': 0, 'durations': defaultdict(float)})
+
+    def add(self, view_name, timings):
+        with self.lock:
+            self.requests += 1
+            stats = self.views[view_name]
+            stats['requests'] += 1
+            stats['queries'] += timings.queries
+            stats['max_queries'] = max(stats['max_queries'], timings.queries)
+            for name, duration in timings.durations.items():
+                stats['durations'][name] += duration
+            if self.requests < REQUEST_STATS_LOG_INTERVAL:
+                return
+            views = self.views
+            self.reset()
+        self.log(views)
+
+    @staticmethod
+    def log(views):
+        from api.logger import logger
+
+        # Most expensive views first
+        for view_name, stats in sorted(views.items(), key=lambda item: -item[1]['durations']['total']):
+            count = stats['requests']
+            durations = ', '.join(
+                f'{name}: {duration / count:.1f}ms' for name, duration in stats['durations'].items()
+            )
+            logger.info(
+                f'Request stats | {view_name} | requests: {count}, queries: {stats["queries"] / count:.1f}'
+                f' (max {stats["max_queries"]}), {durations}'
+            )
+
+
+REQUEST_STATS = RequestStats()
+
+
+class ServerTimingMiddleware():
+    """
+    Records the number of queries and the time spent in the database, Elasticsearch (TimedElasticsearchConnection),
+    the view (without the db/es time: mostly the serializers) and the rendering of each request.
+    They are aggregated per view in the logs (REQUEST_STATS), and returned in the Server-Timing header to the IFRC
+    users, or everyone with DEBUG/SERVER_TIMING_HEADER (see has_server_timing_header).
+    NOTE: Streamed content is not included
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def has_server_timing_header(request):
+        if settings.DEBUG or settings.SERVER_TIMING_HEADER:
+            return True
+        from api.utils import is_user_ifrc
+
+        # Set by the authentication (also for the DRF ones)
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_authenticated and is_user_ifrc(user)
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        _threadlocal.timings = timings
+        started_at = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            _threadlocal.timings = None
+        timings.add('total', started_at)
+        if response is None:
+            return response
+        if self.has_server_timing_header(request):
+            response['Server-Timing'] = timings.get_header()
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        # Responses served by the cache middlewares are not resolved
+        view_name = resolver_match.view_name if resolver_match else 'cached'
+        if timings.queries > REQUEST_QUERY_WARNING:
+            from api.logger import logger
+            logger.warning(f'{view_name} ({request.get_full_path()}) made {timings.queries} queries')
+        REQUEST_STATS.add(view_name, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = get_request_timings()
+        if timings is not None:
+            timings.view_started_at = time.perf_counter()
+            timings.view_db_es = timings.durations['db'] + timings.durations['es']
+
+    def process_template_response(self, request, response):
+        # Called between the view and the rendering (DRF responses)
+        timings = get_request_timings()
+        if timings is not None and hasattr(timings, 'view_started_at'):
+            timings.add('view', timings.view_started_at)
+            # Without the db/es time of the view
+            timings.durations['view'] -= timings.durations['db'] + timings.durations['es'] - timings.view_db_es
+            render_started_at = time.perf_counter()
+            response.add_post_render_callback(lambda _: timings.add('render', render_started_at))
+        return response
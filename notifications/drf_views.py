@@ -45,15 +45,20 @@ class SurgeAlertViewset(viewsets.ReadOnlyModelViewSet):
         # cond1 = Q(is_stood_down=True)
         # cond2 = Q(end__lt=datetime.utcnow().replace(tzinfo=timezone.utc)-timedelta(days=limit))
         return super().get_queryset().\
-            select_related('country')
+            select_related('country', 'event__dtype').\
+            prefetch_related('event__appeals', 'event__countries', 'molnix_tags__groups')
         #    exclude(cond1 & cond2)  # 'event' inclusion ^ to _related needs frontend change, otherwise the Position column shows garbage in /alerts/all
 
 
 class SubscriptionViewset(viewsets.ModelViewSet):
+    # Personal endpoint, never cached
+    cache_visibility_classes = ()
     serializer_class = SubscriptionSerializer
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
     search_fields = ('user__username', 'rtype')  # for /docs
 
     def get_queryset(self):
-        return Subscription.objects.filter(user=self.request.user)
+        return Subscription.objects.filter(user=self.request.user).select_related(
+            'country', 'event',
+        ).prefetch_related('event__countries_for_preview')
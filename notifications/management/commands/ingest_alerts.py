@@ -1,8 +1,8 @@
-import requests
 from datetime import datetime, timezone
 from django.core.management.base import BaseCommand
 from notifications.models import SurgeAlertType, SurgeAlertCategory, SurgeAlert
 from lang.serializers import TranslatedModelSerializerMixin
+from main.fetch import fetch
 
 
 categories = {
@@ -34,9 +34,12 @@ class Command(BaseCommand):
             'url=https%3A//docs.google.com/spreadsheets/d/1eVpS1Bob4G2KzSwco6ELTzIsYHKvqKsNQI7ZdAzmPuQ&strip-headers=on'
         )
 
-        response = requests.get(url)
+        response = fetch(url, save=False)
         if response.status_code != 200:
             raise Exception('Error querying Appeals API')
+        if not response.changed:
+            print('Alerts sheet unchanged, 0 alerts ingesting')
+            return
         alerts = response.json()
 
         aids = [self.id_from_model(m) for m in SurgeAlert.objects.all()]
@@ -65,4 +68,6 @@ class Command(BaseCommand):
 
         # Trigger translation
         TranslatedModelSerializerMixin.trigger_field_translation_in_bulk(SurgeAlert, surge_alerts)
+        # Handled, the next run can skip the sheet if it's unchanged
+        response.save()
         print('%s current surge alerts' % SurgeAlert.objects.all().count())
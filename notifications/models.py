@@ -66,6 +66,25 @@ class SurgeAlert(models.Model):
         self.is_stood_down = self.molnix_status == 'unfilled'
         return super(SurgeAlert, self).save(*args, **kwargs)
 
+    def indexing(self):
+        return {
+            'id': self.id,
+            'event_id': self.event_id,
+            'type': 'surgealert',
+            'name': self.operation or None,
+            'keyword': None,
+            'visibility': self.event.visibility if self.event else None,
+            'ns': self.country_id,
+            'body': '%s %s' % (
+                self.operation,
+                getattr(self.country, 'name', None),
+            ),
+            'date': self.opens or self.created_at,
+        }
+
+    def es_id(self):
+        return 'surgealert-%s' % self.id
+
     def __str__(self):
         if self.operation and self.operation != '':
             return self.operation
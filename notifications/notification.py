@@ -1,7 +1,9 @@
 import requests
 import base64
 import threading
+import time
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from django.conf import settings
@@ -9,47 +11,238 @@ from django.utils.html import strip_tags
 
 from api.logger import logger
 from api.models import CronJob, CronJobStatus
+from api.create_cron import create_cron_record
 from notifications.models import NotificationGUID
 
 
 EMAIL_TO = 'no-reply@ifrc.org'
 IS_PROD = settings.GO_ENVIRONMENT == 'production'
+EMAIL_TIMEOUT = 30  # seconds
 
 
-class SendMail(threading.Thread):
-    def __init__(self, recipients, msg, **kwargs):
+CRON_NAME = 'notification'
+
+
+class Email():
+    """ A notification e-mail waiting for delivery """
+    def __init__(self, subject, recipients, html, mailtype=''):
+        self.subject = subject
         self.recipients = recipients
-        self.msg = msg
-        super(SendMail, self).__init__(**kwargs)
+        self.html = html
+        self.mailtype = mailtype
 
-    def run(self):
-        try:
-            server = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT)
+    @property
+    def recipients_as_string(self):
+        return ','.join(self.recipients)
+
+
+class EmailAPIError(Exception):
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        super().__init__(f'E-mail sender API responded with {status_code}: {text[:100]}')
+
+
+class EmailAPIConnection():
+    """ Persistent (keep-alive) HTTP session to the e-mail sender API """
+    def __init__(self):
+        self.session = requests.Session()
+
+    def send(self, email):
+        # Encode with base64 into bytes, then converting it back to strings for the JSON
+        payload = {
+            "FromAsBase64": str(base64.b64encode(settings.EMAIL_USER.encode('utf-8')), 'utf-8'),
+            "ToAsBase64": str(base64.b64encode(EMAIL_TO.encode('utf-8')), 'utf-8'),
+            "CcAsBase64": "",
+            "BccAsBase64": str(base64.b64encode(email.recipients_as_string.encode('utf-8')), 'utf-8'),
+            "SubjectAsBase64": str(base64.b64encode(email.subject.encode('utf-8')), 'utf-8'),
+            "BodyAsBase64": str(base64.b64encode(email.html.encode('utf-8')), 'utf-8'),
+            "IsBodyHtml": True,
+            "TemplateName": "",
+            "TemplateLanguage": ""
+        }
+        res = self.session.post(settings.EMAIL_API_ENDPOINT, json=payload, timeout=EMAIL_TIMEOUT)
+        if res.status_code != 200:
+            raise EmailAPIError(res.status_code, res.text)
+        # The response contains the GUID
+        return res.text.replace('"', '')
+
+    def close(self):
+        self.session.close()
+
+
+class SMTPConnection():
+    """ Persistent SMTP session (STARTTLS + login once), reopened when the server drops it """
+    def __init__(self):
+        self.server = None
+
+    def open(self):
+        if self.server is None:
+            server = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT, timeout=EMAIL_TIMEOUT)
             server.ehlo()
             server.starttls()
             server.ehlo()
-            succ = server.login(settings.EMAIL_USER, settings.EMAIL_PASS)
-            if 'successful' not in str(succ[1]):
-                cron_rec = {"name": "notification",
-                            "message": 'Error contacting ' + settings.EMAIL_HOST + ' smtp server for notifications',
-                            "status": CronJobStatus.ERRONEOUS}
-                CronJob.sync_cron(cron_rec)
-            if len(self.recipients) > 0:
-                server.sendmail(settings.EMAIL_USER, self.recipients, self.msg.as_string())
-            server.quit()
-            logger.info('E-mails were sent successfully.')
-        except Exception as exc:
-            logger.error('Could not send emails with Python smtlib, exception: {} -- {}'.format(type(exc).__name__,
-                                                                                                exc.args))
-            ex = ''
+            server.login(settings.EMAIL_USER, settings.EMAIL_PASS)
+            self.server = server
+        return self.server
+
+    def send(self, email):
+        msg = construct_msg(email.subject, email.html)
+        try:
+            self.open().sendmail(settings.EMAIL_USER, email.recipients, msg.as_string())
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # Connection is unusable, a retry opens a new one
+            self.server = None
+            raise
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+
+class EmailDelivery():
+    """
+    Sends e-mails in batches from a bounded pool of workers, each worker reusing its own
+    e-mail API session and SMTP connection. Failed sends are retried with exponential backoff,
+    the API falls back to SMTP (as before). Used as a context manager, send_notification queues into it:
+        with EmailDelivery('index_and_notify'):
+            send_notification(...)
+            send_notification(...)
+    The batch is sent when leaving the block, with its throughput and failures stored as a CronJob record.
+    """
+    _active = threading.local()
+
+    def __init__(self, name=CRON_NAME, max_workers=None, max_retries=None, backoff=1, log_successful=True):
+        self.name = name
+        self.max_workers = max_workers or settings.EMAIL_DELIVERY_WORKERS
+        self.max_retries = settings.EMAIL_DELIVERY_RETRIES if max_retries is None else max_retries
+        self.backoff = backoff
+        self.log_successful = log_successful
+        self.queue = []
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    @classmethod
+    def get_active(cls):
+        stack = getattr(cls._active, 'stack', None)
+        return stack[-1] if stack else None
+
+    def __enter__(self):
+        if not hasattr(self._active, 'stack'):
+            self._active.stack = []
+        self._active.stack.append(self)
+        return self
+
+    def __exit__(self, *_):
+        self._active.stack.remove(self)
+        self.flush()
+
+    def add(self, email):
+        self.queue.append(email)
+
+    def _get_connection(self, connection_class):
+        # Connections are not thread-safe, each worker thread gets its own
+        attr = connection_class.__name__
+        connection = getattr(self._local, attr, None)
+        if connection is None:
+            connection = connection_class()
+            setattr(self._local, attr, connection)
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _with_retries(self, send, email, is_retryable):
+        for attempt in range(self.max_retries + 1):
             try:
-                ex = str(exc.args)
-            except Exception as exctwo:
-                logger.error(exctwo.args)
-            cron_rec = {"name": "notification",
-                        "message": 'Error sending out email with Python smtplib: {}'.format(ex),
-                        "status": CronJobStatus.ERRONEOUS}
-            CronJob.sync_cron(cron_rec)
+                return send(email)
+            except Exception as exc:
+                if attempt == self.max_retries or not is_retryable(exc):
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _deliver(self, email):
+        """ Returns (email, channel, guid, error) """
+        if settings.EMAIL_API_ENDPOINT:
+            try:
+                guid = self._with_retries(
+                    self._get_connection(EmailAPIConnection).send,
+                    email,
+                    # Retrying doesn't help with authorization/authentication or request errors
+                    lambda exc: not (isinstance(exc, EmailAPIError) and exc.status_code < 500),
+                )
+                return email, 'api', guid, None
+            except Exception as exc:
+                # Try sending with Python smtplib, if reaching the API fails
+                logger.error(f'Could not send e-mail using the e-mail sender API ({exc}). Trying with Python smtplib...')
+        try:
+            self._with_retries(
+                self._get_connection(SMTPConnection).send,
+                email,
+                # Only retry transient errors (dropped connections, 4xx responses)
+                lambda exc: (
+                    isinstance(exc, (smtplib.SMTPServerDisconnected, OSError)) or
+                    (isinstance(exc, smtplib.SMTPResponseException) and 400 <= exc.smtp_code < 500)
+                ),
+            )
+            return email, 'smtp', None, None
+        except Exception as exc:
+            return email, None, None, f'{type(exc).__name__}: {exc}'
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def flush(self):
+        """ Sends the queued e-mails, returns a list of (email, channel, guid, error) """
+        emails, self.queue = self.queue, []
+        if not emails:
+            return []
+
+        start_time = time.monotonic()
+        max_workers = min(self.max_workers, len(emails))
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(self._deliver, emails))
+        finally:
+            self.close()
+        duration = time.monotonic() - start_time
+
+        # Saving GUIDs into a table so that the API can be queried with it to get info about
+        # if the actual sending has failed or not.
+        NotificationGUID.objects.bulk_create([
+            NotificationGUID(
+                api_guid=guid,
+                email_type=email.mailtype,
+                to_list=f'To: {EMAIL_TO}; Bcc: {email.recipients_as_string}'
+            )
+            for email, channel, guid, _ in results
+            if channel == 'api'
+        ])
+
+        failures = [(email, error) for email, channel, _, error in results if channel is None]
+        sent_count = len(emails) - len(failures)
+        api_count = len([channel for _, channel, _, _ in results if channel == 'api'])
+        message = (
+            f'Sent {sent_count}/{len(emails)} e-mails ({api_count} via API, {sent_count - api_count} via SMTP)'
+            f' in {duration:.2f}s ({len(emails) / duration if duration else 0:.1f} e-mails/s, {max_workers} workers)'
+        )
+        logger.info(message)
+        if failures:
+            message += '\nFailed:\n' + '\n'.join(
+                f'{email.subject} ({len(email.recipients)} recipients): {error}' for email, error in failures[:20]
+            )
+            status = CronJobStatus.ERRONEOUS if not sent_count else CronJobStatus.WARNED
+            create_cron_record(self.name, message, status, len(failures))
+        elif self.log_successful:
+            create_cron_record(self.name, message, CronJobStatus.SUCCESSFUL, sent_count)
+        return results
 
 
 def construct_msg(subject, html):
@@ -117,45 +310,14 @@ def send_notification(subject, recipients, html, mailtype='', files=None):
             logger.info('Recipients string is empty')
         return  # If there are no recipients it's unnecessary to send out the email
 
-    # Encode with base64 into bytes, then converting it back to strings for the JSON
-    payload = {
-        "FromAsBase64": str(base64.b64encode(settings.EMAIL_USER.encode('utf-8')), 'utf-8'),
-        "ToAsBase64": str(base64.b64encode(EMAIL_TO.encode('utf-8')), 'utf-8'),
-        "CcAsBase64": "",
-        "BccAsBase64": str(base64.b64encode(recipients_as_string.encode('utf-8')), 'utf-8'),
-        "SubjectAsBase64": str(base64.b64encode(subject.encode('utf-8')), 'utf-8'),
-        "BodyAsBase64": str(base64.b64encode(html.encode('utf-8')), 'utf-8'),
-        "IsBodyHtml": True,
-        "TemplateName": "",
-        "TemplateLanguage": ""
-    }
-
-    # The response contains the GUID (res.text)
-    res = requests.post(settings.EMAIL_API_ENDPOINT, json=payload)
-    res_text = res.text.replace('"', '')
-
-    if res.status_code == 200:
-        logger.info(u'Subject: {subject}, Recipients: {recs}'.format(subject=subject, recs=recipients_as_string))
-
-        logger.info('GUID: {}'.format(res_text))
-        # Saving GUID into a table so that the API can be queried with it to get info about
-        # if the actual sending has failed or not.
-        NotificationGUID.objects.create(
-            api_guid=res_text,
-            email_type=mailtype,
-            to_list=f'To: {EMAIL_TO}; Bcc: {recipients_as_string}'
-        )
-
-        logger.info('E-mails were sent successfully.')
-    elif res.status_code == 401 or res.status_code == 403:
-        # Try sending with Python smtplib, if reaching the API fails
-        logger.error(f'Authorization/authentication failed ({res.status_code}) to the e-mail sender API.')
-        msg = construct_msg(subject, html)
-        SendMail(to_addresses, msg).start()
-    else:
-        # Try sending with Python smtplib, if reaching the API fails
-        logger.error('Could not reach the e-mail sender API. Trying with Python smtplib...')
-        msg = construct_msg(subject, html)
-        SendMail(to_addresses, msg).start()
-
-    return res.text
+    logger.debug(u'Subject: {subject}, Recipients: {recs}'.format(subject=subject, recs=recipients_as_string))
+    email = Email(subject, to_addresses, html, mailtype)
+    delivery = EmailDelivery.get_active()
+    if delivery is not None:
+        delivery.add(email)
+        return
+    # Not part of a batch (e.g. during a request), send it right away without retrying (nor backing off) inline
+    delivery = EmailDelivery(max_workers=1, max_retries=0, log_successful=False)
+    delivery.add(email)
+    [(_, _, guid, _)] = delivery.flush()
+    return guid
@@ -0,0 +1,74 @@
+from collections import defaultdict, namedtuple
+
+from django.contrib.auth.models import User
+from django.db.models import Q
+
+from notifications.models import Subscription, SubscriptionType
+
+
+SubscriberUser = namedtuple('SubscriberUser', ['email', 'is_staff', 'is_ifrc'])
+
+IFRC_USER_FILTER = Q(groups__name='IFRC Admins') | Q(is_superuser=True)
+
+
+class SubscriberIndex():
+    """
+    In-memory inverted index of the active users' subscriptions, used to resolve notification recipients
+    Keys are (rtype, stype) tuples and lookup ids ('c<id>', 'r<id>', 'd<id>', 'e<id>'), so finding the
+    subscribers of a set of records is a union of sets instead of a User/Subscription join per lookup.
+    It is a snapshot, built once per notification run (index_and_notify): the subscriptions changed meanwhile
+    (in any process) are only seen by the next run.
+    """
+
+    def __init__(self):
+        self.users = {}  # user id -> SubscriberUser
+        self.subscription_users = {}  # subscription id -> user id
+        self.followed_events = defaultdict(set)  # user id -> followed event ids
+        self.index = defaultdict(set)  # key -> subscription ids
+        self.build()
+
+    def build(self):
+        ifrc_user_ids = set(User.objects.filter(IFRC_USER_FILTER, is_active=True).values_list('pk', flat=True))
+        subscriptions = Subscription.objects.filter(user__is_active=True).values_list(
+            'pk', 'rtype', 'stype', 'lookup_id', 'event_id', 'user_id', 'user__email', 'user__is_staff',
+        )
+        for pk, rtype, stype, lookup_id, event_id, user_id, email, is_staff in subscriptions:
+            self.users[user_id] = SubscriberUser(email, is_staff, user_id in ifrc_user_ids)
+            self._add(pk, user_id, rtype, stype, lookup_id, event_id)
+
+    def _add(self, pk, user_id, rtype, stype, lookup_id, event_id):
+        keys = [(rtype, stype)]
+        if lookup_id:
+            keys.append(lookup_id)
+        for key in keys:
+            self.index[key].add(pk)
+        self.subscription_users[pk] = user_id
+        if event_id is not None:
+            self.followed_events[user_id].add(event_id)
+
+    def get_user(self, user_id):
+        return self.users.get(user_id)
+
+    def get_user_ids(self, *keys):
+        return {
+            self.subscription_users[pk]
+            for key in keys
+            for pk in self.index.get(key, ())
+        }
+
+    def get_emails(self, *keys, is_ifrc=None):
+        """ Emails of the users subscribed to any of the keys, optionally only (not) IFRC users """
+        emails = set()
+        for user_id in self.get_user_ids(*keys):
+            user = self.users[user_id]
+            if is_ifrc is None or user.is_ifrc == is_ifrc:
+                emails.add(user.email)
+        return emails
+
+    def get_rtype_emails(self, rtype, stype=None, **kwargs):
+        stypes = [stype] if stype is not None else SubscriptionType.values
+        return self.get_emails(*[(rtype, _stype) for _stype in stypes], **kwargs)
+
+    def get_followed_events(self):
+        """ user id -> followed event ids """
+        return {user_id: event_ids for user_id, event_ids in self.followed_events.items() if event_ids}
@@ -1,12 +1,22 @@
 from datetime import datetime, timezone
+from unittest import mock
+
 from django.conf import settings
+from django.test import override_settings
 from modeltranslation.utils import build_localized_fieldname
 
 from notifications.management.commands.ingest_alerts import categories, timeformat
 from lang.serializers import TranslatedModelSerializerMixin
 from main.test_case import APITestCase
+from main.mock import SMTPStandIn
+from api.models import CronJob, CronJobStatus
+from notifications.notification import Email, EmailDelivery, send_notification
+from notifications.subscribers import SubscriberIndex
+from api.factories.country import CountryFactory
+from api.factories.event import EventFactory
+from deployments.factories.user import UserFactory
 
-from .models import SurgeAlert, SurgeAlertType
+from .models import SurgeAlert, SurgeAlertType, NotificationGUID, Subscription, RecordType, SubscriptionType
 
 
 class NotificationTestCase(APITestCase):
@@ -56,3 +66,122 @@ class NotificationTestCase(APITestCase):
                         getattr(surge_alert, build_localized_fieldname(field, lang)),
                         self.aws_translator._fake_translation(original_value, lang, 'en') if lang != 'en' else original_value,
                     )
+
+
+@override_settings(
+    EMAIL_API_ENDPOINT=None,
+    EMAIL_HOST='localhost',
+    EMAIL_PORT=25,
+    EMAIL_USER='go@example.com',
+    EMAIL_PASS='password',
+)
+class EmailDeliveryTestCase(APITestCase):
+    def _get_emails(self, count):
+        return [
+            Email(f'Subject {i}', [f'user{i}@example.com'], f'<p>Body {i}</p>', 'test')
+            for i in range(count)
+        ]
+
+    def test_batched_smtp_delivery(self):
+        smtp = SMTPStandIn(latency=0.01)
+        with mock.patch('smtplib.SMTP', smtp):
+            with EmailDelivery('test_delivery', max_workers=4) as delivery:
+                for email in self._get_emails(40):
+                    delivery.add(email)
+        self.assertEqual(len(smtp.sent), 40)
+        # One persistent session per worker
+        self.assertLessEqual(smtp.connections, 4)
+        self.assertEqual(smtp.connections, smtp.logins)
+        # One record for the whole batch
+        cron_job = CronJob.objects.get(name='test_delivery')
+        self.assertEqual(cron_job.status, CronJobStatus.SUCCESSFUL)
+        self.assertEqual(cron_job.num_result, 40)
+
+    def test_retry_dropped_connection(self):
+        smtp = SMTPStandIn(fail_first=2)
+        with mock.patch('smtplib.SMTP', smtp):
+            delivery = EmailDelivery('test_delivery', max_workers=1, backoff=0)
+            for email in self._get_emails(3):
+                delivery.add(email)
+            results = delivery.flush()
+        self.assertEqual(len(smtp.sent), 3)
+        self.assertEqual(smtp.connections, 3)
+        self.assertEqual([channel for _, channel, _, _ in results], ['smtp'] * 3)
+
+        smtp = SMTPStandIn(fail_first=10)
+        with mock.patch('smtplib.SMTP', smtp):
+            delivery = EmailDelivery('test_failed_delivery', max_workers=1, max_retries=1, backoff=0)
+            for email in self._get_emails(2):
+                delivery.add(email)
+            delivery.flush()
+        self.assertEqual(len(smtp.sent), 0)
+        cron_job = CronJob.objects.get(name='test_failed_delivery')
+        self.assertEqual(cron_job.status, CronJobStatus.ERRONEOUS)
+        self.assertEqual(cron_job.num_result, 2)
+
+    @override_settings(EMAIL_API_ENDPOINT='https://email.example.com/api')
+    def test_send_notification_batch(self):
+        response = mock.Mock(status_code=200, text='"the-guid"')
+        with mock.patch('requests.Session.post', return_value=response) as post:
+            with EmailDelivery('test_delivery', max_workers=2):
+                for i in range(5):
+                    send_notification(f'Subject {i}', [f'user{i}@example.com'], '<p>Body</p>', 'test')
+                # Queued until the end of the batch
+                post.assert_not_called()
+        self.assertEqual(post.call_count, 5)
+        self.assertEqual(NotificationGUID.objects.filter(api_guid='the-guid').count(), 5)
+
+        # Authorization errors are not retried, SMTP is used instead
+        smtp = SMTPStandIn()
+        response = mock.Mock(status_code=401, text='Unauthorized')
+        with mock.patch('requests.Session.post', return_value=response) as post, mock.patch('smtplib.SMTP', smtp):
+            send_notification('Subject', ['user@example.com'], '<p>Body</p>', 'test')
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(len(smtp.sent), 1)
+
+        # Outside of a batch, server errors are not retried either
+        smtp = SMTPStandIn()
+        response = mock.Mock(status_code=503, text='Service Unavailable')
+        with mock.patch('requests.Session.post', return_value=response) as post, mock.patch('smtplib.SMTP', smtp):
+            send_notification('Subject', ['user@example.com'], '<p>Body</p>', 'test')
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(len(smtp.sent), 1)
+
+
+class SubscriberIndexTestCase(APITestCase):
+    def test_subscriber_index(self):
+        country = CountryFactory()
+        event = EventFactory()
+        Subscription.objects.create(user=self.user, rtype=RecordType.NEW_EMERGENCIES, stype=SubscriptionType.NEW)
+        Subscription.objects.create(user=self.root_user, rtype=RecordType.NEW_EMERGENCIES, stype=SubscriptionType.NEW)
+        Subscription.objects.create(
+            user=self.ifrc_user, rtype=RecordType.COUNTRY, country=country, lookup_id=f'c{country.pk}',
+        )
+        followed_event = Subscription.objects.create(
+            user=self.user, rtype=RecordType.FOLLOWED_EVENT, event=event, lookup_id=f'e{event.pk}',
+        )
+        inactive_user = UserFactory.create(is_active=False, email='inactive@example.com')
+        Subscription.objects.create(user=inactive_user, rtype=RecordType.NEW_EMERGENCIES, stype=SubscriptionType.NEW)
+
+        with self.assertNumQueries(2):
+            subscriber_index = SubscriberIndex()
+        with self.assertNumQueries(0):
+            new_emergencies = (RecordType.NEW_EMERGENCIES, SubscriptionType.NEW)
+            self.assertEqual(subscriber_index.get_emails(new_emergencies), {self.user.email, self.root_user.email})
+            self.assertEqual(subscriber_index.get_emails(new_emergencies, is_ifrc=True), {self.root_user.email})
+            self.assertEqual(subscriber_index.get_emails(new_emergencies, is_ifrc=False), {self.user.email})
+            self.assertEqual(
+                subscriber_index.get_emails(new_emergencies, f'c{country.pk}', 'r0'),
+                {self.user.email, self.root_user.email, self.ifrc_user.email},
+            )
+            self.assertEqual(subscriber_index.get_followed_events(), {self.user.pk: {event.pk}})
+            self.assertEqual(subscriber_index.get_user(self.user.pk).email, self.user.email)
+            self.assertIsNone(subscriber_index.get_user(inactive_user.pk))
+
+        # Snapshot, the changes are seen by the next index
+        Subscription.objects.create(user=self.ifrc_user, rtype=RecordType.WEEKLY_DIGEST, stype=SubscriptionType.NEW)
+        followed_event.delete()
+        self.assertEqual(subscriber_index.get_rtype_emails(RecordType.WEEKLY_DIGEST), set())
+        subscriber_index = SubscriberIndex()
+        self.assertEqual(subscriber_index.get_rtype_emails(RecordType.WEEKLY_DIGEST), {self.ifrc_user.email})
+        self.assertEqual(subscriber_index.get_followed_events(), {})
@@ -75,16 +75,15 @@ class FormViewset(viewsets.ReadOnlyModelViewSet):
         return (
             self.get_filtered_queryset(self.request, queryset, 1)
                 .order_by('area__area_num')
-                .select_related('area', 'overview')
-                .prefetch_related('form_data')
+                .select_related('area', 'overview', 'user')
+                .prefetch_related('form_data__selected_answer')
         )
 
     def get_serializer_class(self):
         with_data = self.request.GET.get('with_data', 'false')
         if with_data == 'true':
             return ListFormWithDataSerializer
-        if self.action == 'list':
-            return ListFormSerializer
+        return ListFormSerializer
         # else:
         #     return DetailFormSerializer
         # ordering_fields = ('name',)
@@ -112,14 +111,7 @@ class FormDataViewset(viewsets.ReadOnlyModelViewSet):
     filterset_class = FormDataFilter
 
     def get_queryset(self):
-        queryset = FormData.objects.all().select_related(
-            'question',
-            'selected_answer',
-            'question__component',
-            'question__component__area'
-        ).prefetch_related(
-            'question__answers'
-        )
+        queryset = FormData.objects.all().select_related('selected_answer')
         cond1 = Q()
         cond2 = Q()
         if 'new' in self.request.query_params.keys():
@@ -133,14 +125,13 @@ class FormDataViewset(viewsets.ReadOnlyModelViewSet):
             country = Country.objects.filter(pk=cid)
             if country:
                 cond2 = Q(form__overview__country_id=country[0].id)
-        queryset = FormData.objects.filter(cond1 & cond2)
+        queryset = queryset.filter(cond1 & cond2)
         if queryset.exists():
             queryset = self.get_filtered_queryset(self.request, queryset, 2)
         return queryset
 
     def get_serializer_class(self):
-        if self.action == 'list':
-            return ListFormDataSerializer
+        return ListFormDataSerializer
         # else:
         #     return DetailFormDataSerializer
         # ordering_fields = ('name',)
@@ -198,14 +189,13 @@ class PERDocsViewset(viewsets.ReadOnlyModelViewSet):
                 cond2 = Q(country_id=country[0].id)
         if 'visible' in self.request.query_params.keys():
             cond3 = Q(visibility=1)
-        queryset = NiceDocument.objects.filter(cond1 & cond2 & cond3)
+        queryset = NiceDocument.objects.filter(cond1 & cond2 & cond3).select_related('country')
         if queryset.exists():
             queryset = self.get_filtered_queryset(self.request, queryset, 4)
         return queryset
 
     def get_serializer_class(self):
-        if self.action == 'list':
-            return ListNiceDocSerializer
+        return ListNiceDocSerializer
         # else:
         #     return DetailFormDataSerializer
         # ordering_fields = ('name', 'country',)
@@ -251,12 +241,11 @@ class FormStatViewset(viewsets.ReadOnlyModelViewSet):
     authentication_classes = (TokenAuthentication,)
 
     def get_queryset(self):
-        queryset = Form.objects.all()
+        queryset = Form.objects.all().select_related('area', 'overview')
         return queryset
 
     def get_serializer_class(self):
-        if self.action == 'list':
-            return FormStatSerializer
+        return FormStatSerializer
         # else:
         #     return DetailFormSerializer
         # ordering_fields = ('name',)
@@ -293,7 +282,7 @@ class CountryDuedateViewset(viewsets.ReadOnlyModelViewSet):
             last_duedate = tmz.localize(datetime(2000, 11, 15, 9, 59, 25, 0))
         if not next_duedate:
             next_duedate = tmz.localize(datetime(2222, 11, 15, 9, 59, 25, 0))
-        queryset = Form.objects.filter(updated_at__gt=last_duedate)
+        queryset = Form.objects.filter(updated_at__gt=last_duedate).select_related('area', 'overview')
         if queryset.exists():
             return queryset
         else:
@@ -412,7 +401,7 @@ class WorkPlanFilter(filters.FilterSet):
 
 class WorkPlanViewset(viewsets.ReadOnlyModelViewSet):
     """ PER Work Plan Viewset"""
-    queryset = WorkPlan.objects.all()
+    queryset = WorkPlan.objects.select_related('user')
     # Some parts can be seen by public | NO authentication_classes = (TokenAuthentication,)
     # Some parts can be seen by public | NO permission_classes = (IsAuthenticated,)
     filterset_class = WorkPlanFilter
@@ -435,7 +424,7 @@ class OverviewViewset(viewsets.ReadOnlyModelViewSet):
     """ PER Overview Viewset"""
     queryset = Overview.objects.all().select_related(
         'country', 'user', 'type_of_assessment'
-    ).prefetch_related('forms').order_by(
+    ).prefetch_related('forms__area').order_by(
         'country__name', '-updated_at'
     )
     # Some parts can be seen by public | NO authentication_classes = (TokenAuthentication,)
@@ -458,6 +447,7 @@ class OverviewStrictViewset(OverviewViewset):
         return (
             self.get_filtered_queryset(self.request, queryset, 4)
                 .select_related('country', 'user', 'type_of_assessment')
+                .prefetch_related('forms__area')
                 .order_by('country__name', '-updated_at')
         )
 
@@ -527,7 +517,7 @@ class FormQuestionViewset(viewsets.ReadOnlyModelViewSet):
         FormQuestion.objects
                     .all()
                     .order_by('component__component_num', 'question_num', 'question')
-                    .select_related('component')
+                    .select_related('component__area')
                     .prefetch_related('answers')
     )
 
@@ -1,8 +1,25 @@
 from api.logger import logger
-from api.indexes import ES_PAGE_NAME
+from api.indexes import ES_PAGE_NAME, SUGGEST_TYPES
 from api.esconnection import ES_CLIENT
+from api.models import VisibilityChoices
 from elasticsearch.helpers import bulk
 
+SUGGEST_VISIBILITY_CONTEXT = {
+    None: 'public',  # Records without visibility (eg: Country, District)
+    VisibilityChoices.PUBLIC: 'public',
+    VisibilityChoices.MEMBERSHIP: 'membership',
+    VisibilityChoices.IFRC: 'ifrc',
+    VisibilityChoices.IFRC_NS: 'ifrc_ns',
+}
+
+# Suggestion visibility contexts allowed for each user visibility class (api.utils.get_user_visibility_class)
+# NOTE: IFRC_NS records are only suggested to IFRC users as they depend on the user's countries
+SUGGEST_USER_VISIBILITY_CONTEXTS = {
+    'anonymous': ['public'],
+    'authenticated': ['public', 'membership'],
+    'ifrc': ['public', 'membership', 'ifrc', 'ifrc_ns'],
+}
+
 
 def log_errors(errors):
     if len(errors):
@@ -31,8 +48,47 @@ def delete_es_index(instance):
             logger.warning('instance does not have an es_id() method')
 
 
+def delete_es_index_by_id(es_id):
+    ''' Deletes the Elasticsearch index of an (already deleted) record, errors are raised (used by api.outbox) '''
+
+    if ES_CLIENT and ES_PAGE_NAME:
+        # A missing index is not an error
+        ES_CLIENT.delete(index=ES_PAGE_NAME, doc_type='page', id=es_id, ignore=[404])
+        logger.info(f'Deleted {es_id}')
+
+
+def construct_es_suggest(data):
+    ''' Completion suggester data (typeahead) for the indexed data, None if not suggested '''
+
+    if data['type'] not in SUGGEST_TYPES:
+        return None
+    inputs = [str(value) for value in [data['name'], data['keyword']] if value]
+    if not inputs:
+        return None
+    visibility = SUGGEST_VISIBILITY_CONTEXT.get(data['visibility'], 'ifrc')
+    return {
+        'input': inputs,
+        'contexts': {
+            'scope': [f'{visibility}.{data["type"]}'],
+        },
+    }
+
+
+def get_es_suggest_scopes(visibility_class, types=None):
+    ''' Completion suggester scope contexts visible to the given user visibility class '''
+
+    return [
+        f'{visibility}.{_type}'
+        for visibility in SUGGEST_USER_VISIBILITY_CONTEXTS[visibility_class]
+        for _type in (types or SUGGEST_TYPES)
+    ]
+
+
 def construct_es_data(instance, is_create=False):
     data = instance.indexing()
+    suggest = construct_es_suggest(data)
+    if suggest is not None:
+        data['suggest'] = suggest
     metadata = {
         '_op_type': 'create' if is_create else 'update',
         '_index': ES_PAGE_NAME,
@@ -64,3 +120,14 @@ def update_es_index(instance):
         updated, errors = bulk(client=ES_CLIENT, actions=[construct_es_data(instance)])
         logger.info(f'Updated {updated} records')
         log_errors(errors)
+
+
+def index_es_index(instance):
+    ''' Creates or replaces the Elasticsearch index of the record instance, errors are raised (used by api.outbox) '''
+
+    if ES_CLIENT and ES_PAGE_NAME:
+        # To make sure it doesn't run for tests
+        metadata = construct_es_data(instance, True)
+        metadata['_op_type'] = 'index'
+        indexed, _ = bulk(client=ES_CLIENT, actions=[metadata])
+        logger.info(f'Indexed {indexed} records')
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+import haystack
+
+from api.logger import logger
+
+
+class MultiSearchQuerySet():
+    """
+    Evaluates several haystack SearchQuerySets with a single Elasticsearch `_msearch` round trip.
+    Usage:
+        multi_search = MultiSearchQuerySet()
+        multi_search.add('events', SearchQuerySet().models(Event).filter(...), limit=50)
+        multi_search.add('countries', SearchQuerySet().models(Country).filter(...), limit=50)
+        results = multi_search.execute()  # {'events': [SearchResult, ...], 'countries': [...]}
+    The query body of each SearchQuerySet is built by haystack itself, so filters, model
+    narrowing and ordering stay exactly the same as when evaluating them one by one.
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+        self.queries = OrderedDict()
+
+    def add(self, key, search_queryset, limit=50):
+        self.queries[key] = (search_queryset, limit)
+        return self
+
+    def _get_backend(self):
+        backend = haystack.connections[self.using].get_backend()
+        if not backend.setup_complete:
+            backend.setup()
+        return backend
+
+    def _build_search_kwargs(self, backend, search_queryset, limit):
+        query = search_queryset.query._clone()
+        query.set_limits(0, limit)
+        search_params = query.build_params()
+        search_kwargs = backend.build_search_kwargs(query.build_query(), **search_params)
+        search_kwargs['from'] = 0
+        search_kwargs['size'] = limit
+        return search_kwargs, search_params
+
+    def execute(self):
+        if not self.queries:
+            return {}
+        backend = self._get_backend()
+
+        body = []
+        search_params_list = []
+        for search_queryset, limit in self.queries.values():
+            search_kwargs, search_params = self._build_search_kwargs(backend, search_queryset, limit)
+            body.extend([{'index': backend.index_name}, search_kwargs])
+            search_params_list.append(search_params)
+
+        try:
+            raw_responses = backend.conn.msearch(body=body, index=backend.index_name)['responses']
+        except Exception:
+            if not backend.silently_fail:
+                raise
+            logger.error('Failed to query Elasticsearch using multi search', exc_info=True)
+            return {key: [] for key in self.queries.keys()}
+
+        results = {}
+        for key, search_params, raw_response in zip(self.queries.keys(), search_params_list, raw_responses):
+            if 'error' in raw_response:
+                logger.error(f'Multi search query failed for {key}: {raw_response["error"]}')
+                results[key] = []
+                continue
+            results[key] = backend._process_results(
+                raw_response,
+                result_class=search_params.get('result_class'),
+            )['results']
+        return results